@@ -0,0 +1,137 @@
+"""Compare the results of the throughput benchmarks against a baseline.
+
+Every metric of every benchmark in both files (see `throughput.py`) is
+compared, and metrics that are worse than the baseline by more than the
+tolerance are flagged as regressions. The script exits with a non-zero status
+if any regression is found, so that it may be used in continuous integration.
+
+Usage
+    python compare_throughput.py baseline.json results.json --tolerance 0.1
+"""
+import sys
+import argparse
+import json
+
+# dictionary that maps the metrics of throughput.py to whether higher values
+# are better. Unknown metrics are assumed to be better when higher.
+METRICS = {
+    "inference_ms": False,
+    "updates_per_sec": True,
+    "buffer_adds_per_sec": True,
+    "buffer_samples_per_sec": True,
+    "correction_ms": False,
+    "learn_steps_per_sec": True,
+}
+
+
+def parse_options(args):
+    """Parse comparison options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Compare the results of the throughput benchmarks '
+                    'against a baseline.',
+        epilog='python compare_throughput.py baseline.json results.json '
+               '--tolerance 0.1')
+
+    # required input parameters
+    parser.add_argument(
+        'baseline', type=str,
+        help='the path to the JSON file of the baseline results')
+    parser.add_argument(
+        'results', type=str,
+        help='the path to the JSON file of the new results')
+
+    # optional arguments
+    parser.add_argument(
+        '--tolerance', type=float, default=0.1,
+        help='the relative change in a metric, in the worse direction, above '
+             'which the metric is flagged as a regression')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def compare(baseline, results, tolerance):
+    """Compare the metrics of two sets of results.
+
+    Parameters
+    ----------
+    baseline : dict <str, dict <str, float>>
+        the value of every metric of every benchmark of the baseline
+    results : dict <str, dict <str, float>>
+        the value of every metric of every benchmark of the new results
+    tolerance : float
+        the relative change in a metric, in the worse direction, above which
+        the metric is flagged as a regression
+
+    Returns
+    -------
+    list of (str, str, float, float, float, bool)
+        the name of the benchmark and metric, the baseline and new values, the
+        relative change, and whether the change is a regression, for every
+        metric available in both sets of results
+    """
+    comparisons = []
+    for name in sorted(set(baseline.keys()) & set(results.keys())):
+        for metric in sorted(set(baseline[name]) & set(results[name])):
+            old = baseline[name][metric]
+            new = results[name][metric]
+            change = (new - old) / old if old != 0 else 0.
+            if METRICS.get(metric, True):
+                regression = change < -tolerance
+            else:
+                regression = change > tolerance
+            comparisons.append((name, metric, old, new, change, regression))
+
+    return comparisons
+
+
+def main(args):
+    """Print the comparison, and exit with an error on regressions."""
+    flags = parse_options(args)
+
+    with open(flags.baseline, "r") as f:
+        baseline = json.load(f)["results"]
+    with open(flags.results, "r") as f:
+        results = json.load(f)["results"]
+
+    comparisons = compare(baseline, results, flags.tolerance)
+
+    # Print the comparison, as a single write to the console.
+    lines = ["-" * 105]
+    lines.append("| {:<40} | {:<22} | {:>10} | {:>10} | {:>8} |".format(
+        "benchmark", "metric", "baseline", "new", "change"))
+    lines.append("-" * 105)
+    for name, metric, old, new, change, regression in comparisons:
+        lines.append(
+            "| {:<40} | {:<22} | {:>10.3f} | {:>10.3f} | {:>+7.1%} |{}".format(
+                name, metric, old, new, change,
+                " REGRESSION" if regression else ""))
+    lines.append("-" * 105)
+
+    # Benchmarks that are only available in one of the files.
+    for name in sorted(set(baseline.keys()) - set(results.keys())):
+        lines.append("Missing from the results: {}".format(name))
+    for name in sorted(set(results.keys()) - set(baseline.keys())):
+        lines.append("Missing from the baseline: {}".format(name))
+    print("\n".join(lines))
+
+    num_regressions = sum(c[-1] for c in comparisons)
+    if num_regressions > 0:
+        print("{} regression(s) found with a tolerance of {:.0%}.".format(
+            num_regressions, flags.tolerance))
+        sys.exit(1)
+
+    print("No regressions found with a tolerance of {:.0%}.".format(
+        flags.tolerance))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
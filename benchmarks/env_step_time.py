@@ -0,0 +1,140 @@
+"""Benchmark the step time of the mixed-autonomy environments.
+
+This also compares the time needed to access the (cached) action and
+observation spaces of the environment against the time needed to recompute
+them, as was done on every access before the spaces were cached.
+
+Usage
+    python env_step_time.py ring --simulator numpy --num_steps 1000
+"""
+import sys
+import argparse
+import time
+
+from hbaselines.envs.mixed_autonomy import FlowEnv
+from hbaselines.envs.mixed_autonomy.params.ring \
+    import get_flow_params as ring
+from hbaselines.envs.mixed_autonomy.params.highway_single \
+    import get_flow_params as highway_single
+
+# dictionary that maps network names to the functions returning flow_params
+FLOW_PARAMS = {
+    "ring": ring,
+    "highway-single": highway_single,
+}
+
+
+def parse_options(args):
+    """Parse benchmark options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Benchmark the step time of a mixed-autonomy '
+                    'environment.',
+        epilog='python env_step_time.py ring --simulator numpy')
+
+    # required input parameters
+    parser.add_argument(
+        'env_name', type=str, choices=list(FLOW_PARAMS.keys()),
+        help='the name of the network')
+
+    # optional arguments
+    parser.add_argument(
+        '--simulator', type=str, default='numpy',
+        help='the simulator to use, one of {traci, numpy}')
+    parser.add_argument(
+        '--multiagent', action='store_true',
+        help='whether to use the multi-agent variant of the environment')
+    parser.add_argument(
+        '--num_steps', type=int, default=1000,
+        help='the number of environment steps to time')
+    parser.add_argument(
+        '--num_accesses', type=int, default=10000,
+        help='the number of times each space is accessed')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def time_space_access(env, name, num_accesses):
+    """Return the time needed to access a space with and without caching.
+
+    Parameters
+    ----------
+    env : flow.envs.Env
+        the wrapped Flow environment
+    name : str
+        the name of the space property
+    num_accesses : int
+        the number of times the space is accessed
+
+    Returns
+    -------
+    float
+        the time per cached access, in seconds
+    float
+        the time per recomputation of the space, in seconds
+    """
+    fget = getattr(type(env), name).fget
+
+    t0 = time.time()
+    for _ in range(num_accesses):
+        fget(env)
+    cached_time = (time.time() - t0) / num_accesses
+
+    # the original method, without the caching decorator
+    uncached_fget = getattr(fget, "__wrapped__", fget)
+    t0 = time.time()
+    for _ in range(num_accesses):
+        uncached_fget(env)
+    uncached_time = (time.time() - t0) / num_accesses
+
+    return cached_time, uncached_time
+
+
+def main(args):
+    """Run the benchmark and print the results."""
+    flags = parse_options(args)
+
+    env = FlowEnv(
+        flow_params=FLOW_PARAMS[flags.env_name](
+            simulator=flags.simulator,
+            multiagent=flags.multiagent,
+        ),
+        multiagent=flags.multiagent,
+        shared=True,
+    )
+    obs = env.reset()
+
+    # Time the environment steps.
+    t0 = time.time()
+    for _ in range(flags.num_steps):
+        if flags.multiagent:
+            action = {key: env.action_space.sample() for key in obs.keys()}
+        else:
+            action = env.action_space.sample()
+        obs, _, done, _ = env.step(action)
+        if (done["__all__"] if flags.multiagent else done):
+            obs = env.reset()
+    step_time = (time.time() - t0) / flags.num_steps
+    print("{}: {:.1f} steps/sec ({:.1f} us/step)".format(
+        flags.env_name, 1 / step_time, 1e6 * step_time))
+
+    # Time the space accesses.
+    for name in ["action_space", "observation_space"]:
+        cached_time, uncached_time = time_space_access(
+            env.wrapped_env, name, flags.num_accesses)
+        print("{}: {:.2f} us (cached) vs. {:.2f} us (recomputed)".format(
+            name, 1e6 * cached_time, 1e6 * uncached_time))
+
+    env.wrapped_env.terminate()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,121 @@
+"""Benchmark the training throughput of the imitation learning policy.
+
+This compares one epoch of training on randomly sampled batches, as performed
+by `update`, against one epoch of training through `update_epoch`, for
+different numbers of gradient steps per session run.
+
+Usage
+    python imitation_train_time.py --num_samples 100000 --num_steps 1 4 16
+"""
+import sys
+import argparse
+import time
+import numpy as np
+import tensorflow as tf
+from gym.spaces import Box
+
+from hbaselines.fcnet.imitation import FeedForwardPolicy
+from hbaselines.algorithms.dagger import FEEDFORWARD_PARAMS
+
+
+def parse_options(args):
+    """Parse benchmark options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Benchmark the training throughput of the imitation '
+                    'learning policy.',
+        epilog='python imitation_train_time.py --num_steps 1 4 16')
+
+    # optional arguments
+    parser.add_argument(
+        '--num_samples', type=int, default=100000,
+        help='the number of samples in the replay buffer')
+    parser.add_argument(
+        '--batch_size', type=int, default=128,
+        help='the size of the batch for learning the policy')
+    parser.add_argument(
+        '--ob_dim', type=int, default=25,
+        help='the number of elements in the observations')
+    parser.add_argument(
+        '--ac_dim', type=int, default=5,
+        help='the number of elements in the actions')
+    parser.add_argument(
+        '--num_epochs', type=int, default=3,
+        help='the number of epochs to time')
+    parser.add_argument(
+        '--num_steps', type=int, nargs='+', default=[1, 4, 16],
+        help='the number of gradient steps per session run to time')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def print_rate(name, epoch_time, num_samples):
+    """Print the number of epochs and examples per second."""
+    print("{}: {:.2f} epochs/sec, {:.0f} examples/sec".format(
+        name, 1 / epoch_time, num_samples / epoch_time))
+
+
+def main(args):
+    """Run the benchmark and print the results."""
+    flags = parse_options(args)
+
+    policy_kwargs = FEEDFORWARD_PARAMS.copy()
+    policy_kwargs.update(
+        buffer_size=flags.num_samples, batch_size=flags.batch_size)
+
+    sess = tf.compat.v1.Session()
+    policy = FeedForwardPolicy(
+        sess=sess,
+        ob_space=Box(low=-1, high=1, shape=(flags.ob_dim,)),
+        ac_space=Box(low=-1, high=1, shape=(flags.ac_dim,)),
+        co_space=None,
+        verbose=0,
+        **policy_kwargs
+    )
+    sess.run(tf.compat.v1.global_variables_initializer())
+
+    # Fill the replay buffer with random samples.
+    for _ in range(flags.num_samples):
+        policy.store_transition(
+            obs0=np.random.uniform(-1, 1, flags.ob_dim),
+            context0=None,
+            action=np.random.uniform(-1, 1, flags.ac_dim),
+            obs1=np.random.uniform(-1, 1, flags.ob_dim),
+            context1=None,
+        )
+
+    # the number of samples that are trained on in an epoch
+    num_batches = flags.num_samples // flags.batch_size
+    num_samples = num_batches * flags.batch_size
+
+    # Time training on randomly sampled batches.
+    t0 = time.time()
+    for _ in range(flags.num_epochs):
+        for _ in range(num_batches):
+            policy.update()
+    print_rate("update", (time.time() - t0) / flags.num_epochs, num_samples)
+
+    # Time training through the epoch iterator.
+    for num_steps in flags.num_steps:
+        # Build the operations before timing.
+        policy.update_epoch(num_steps=num_steps)
+
+        t0 = time.time()
+        for _ in range(flags.num_epochs):
+            policy.update_epoch(num_steps=num_steps)
+        print_rate("update_epoch (num_steps={})".format(num_steps),
+                   (time.time() - t0) / flags.num_epochs, num_samples)
+
+    sess.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
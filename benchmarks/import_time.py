@@ -0,0 +1,112 @@
+"""Benchmark the time needed to import the h-baselines modules.
+
+Every trial imports the module in a fresh interpreter, so that no module is
+cached from a previous trial.
+
+Usage
+    python import_time.py --module hbaselines.algorithms --num_trials 10
+"""
+import sys
+import argparse
+import subprocess
+import time
+import numpy as np
+
+
+def parse_options(args):
+    """Parse benchmark options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Benchmark the import time of a module.',
+        epilog='python import_time.py --module hbaselines.algorithms')
+
+    parser.add_argument(
+        '--module', type=str, default='hbaselines.algorithms',
+        help='the module to import')
+    parser.add_argument(
+        '--num_trials', type=int, default=10,
+        help='the number of times the module is imported')
+    parser.add_argument(
+        '--num_modules', type=int, default=10,
+        help='the number of slowest imported modules to print')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def time_import(module):
+    """Return the time needed to import a module in a new interpreter.
+
+    Parameters
+    ----------
+    module : str
+        the module to import
+
+    Returns
+    -------
+    float
+        the wall-clock time of the interpreter, in seconds
+    """
+    t0 = time.time()
+    subprocess.check_call(
+        [sys.executable, "-c", "import {}".format(module)],
+        stdout=subprocess.DEVNULL)
+    return time.time() - t0
+
+
+def slowest_imports(module, num_modules):
+    """Return the imported modules with the largest cumulative import time.
+
+    Parameters
+    ----------
+    module : str
+        the module to import
+    num_modules : int
+        the number of modules to return
+
+    Returns
+    -------
+    list of (str, float)
+        the name and cumulative import time (in seconds) of the slowest
+        modules
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    ).stderr
+
+    times = []
+    for line in output.splitlines():
+        # lines are of the form: "import time: self | cumulative | name"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(cumulative) / 1e6))
+
+    return sorted(times, key=lambda x: -x[1])[:num_modules]
+
+
+def main(args):
+    """Run the benchmark and print the results."""
+    flags = parse_options(args)
+
+    times = [time_import(flags.module) for _ in range(flags.num_trials)]
+    print("import {}: {:.3f} s (median), {:.3f} s (min) over {} trials".format(
+        flags.module, np.median(times), np.min(times), flags.num_trials))
+
+    print("slowest imports (cumulative):")
+    for name, cumulative in slowest_imports(flags.module, flags.num_modules):
+        print("  {:.3f} s  {}".format(cumulative, name))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,213 @@
+"""Lightweight stand-ins for the environments of the throughput benchmarks.
+
+The stand-in environments match the observation, action, and context spaces
+(and time horizons) of the environments they replace, but return random
+observations and rewards, so that the benchmarks measure the cost of the
+algorithms and policies without any simulator. They do not require MuJoCo,
+Flow, or SUMO to be installed.
+
+The shapes are those of the following environments:
+
+* AntMaze: the Ant observations (joint positions, velocities, external contact
+  forces, and the time step), with an (x, y) goal as the context
+* UR5: the joint angles and velocities of the UR5 arm, with joint-angle goals
+  as the context
+* ring / highway-single: the single-agent mixed-autonomy traffic environments,
+  in which one policy controls all automated vehicles
+* multiagent-ring / multiagent-highway-single: the multi-agent variants, in
+  which every automated vehicle is a separate agent
+"""
+import numpy as np
+import gym
+from gym.spaces import Box
+
+# dictionary that maps environment names to the shapes of their stand-ins
+STAND_IN_ENVS = {
+    "AntMaze": dict(ob_dim=114, ac_dim=8, co_dim=2, horizon=500),
+    "UR5": dict(ob_dim=6, ac_dim=3, co_dim=3, horizon=500),
+    "ring": dict(ob_dim=25, ac_dim=5, co_dim=None, horizon=1800),
+    "highway-single": dict(ob_dim=50, ac_dim=10, co_dim=None, horizon=1800),
+    "multiagent-ring": dict(
+        ob_dim=5, ac_dim=1, co_dim=None, horizon=1800, num_agents=5),
+    "multiagent-highway-single": dict(
+        ob_dim=5, ac_dim=1, co_dim=None, horizon=1800, num_agents=10),
+}
+
+
+def create_stand_in_env(env_name, seed=0):
+    """Return the stand-in of an environment.
+
+    Parameters
+    ----------
+    env_name : str
+        the name of the environment. Must be one of the keys of
+        `STAND_IN_ENVS`.
+    seed : int
+        the seed of the random observations and rewards
+
+    Returns
+    -------
+    StandInEnv or MultiAgentStandInEnv
+        the stand-in environment
+
+    Raises
+    ------
+    ValueError
+        if no stand-in is available for the environment
+    """
+    if env_name not in STAND_IN_ENVS:
+        raise ValueError("No stand-in for environment: {}".format(env_name))
+
+    kwargs = STAND_IN_ENVS[env_name]
+    if "num_agents" in kwargs:
+        return MultiAgentStandInEnv(env_name, seed=seed, **kwargs)
+    else:
+        return StandInEnv(env_name, seed=seed, **kwargs)
+
+
+class StandInEnv(gym.Env):
+    """A single-agent environment with random observations and rewards.
+
+    Attributes
+    ----------
+    name : str
+        the name of the environment this environment stands in for
+    horizon : int
+        the number of steps in an episode
+    current_context : np.ndarray
+        the goal of the current episode. Only available if the environment
+        has a context space.
+    """
+
+    def __init__(self, name, ob_dim, ac_dim, co_dim, horizon, seed=0):
+        """Instantiate the environment.
+
+        Parameters
+        ----------
+        name : str
+            the name of the environment this environment stands in for
+        ob_dim : int
+            the number of elements in the observations
+        ac_dim : int
+            the number of elements in the actions
+        co_dim : int or None
+            the number of elements in the contexts. If set to None, the
+            environment does not provide a context.
+        horizon : int
+            the number of steps in an episode
+        seed : int
+            the seed of the random observations and rewards
+        """
+        self.name = name
+        self.observation_space = Box(-1, 1, (ob_dim,), dtype=np.float32)
+        self.action_space = Box(-1, 1, (ac_dim,), dtype=np.float32)
+        self.horizon = horizon
+        self._co_dim = co_dim
+        self._rng = np.random.RandomState(seed)
+        self._t = 0
+
+        if co_dim is not None:
+            self.context_space = Box(-1, 1, (co_dim,), dtype=np.float32)
+            self.current_context = np.zeros(co_dim)
+
+    def __str__(self):
+        """Return the name of the environment this environment stands in for.
+
+        This is used by the goal-conditioned policies to choose the goal
+        dimensions of the environment (see `hbaselines.utils.env_util`).
+        """
+        return self.name
+
+    def _obs(self):
+        """Return a random observation."""
+        return self._rng.uniform(-1, 1, self.observation_space.shape)
+
+    def reset(self):
+        """Start a new episode, with a new context if one is used."""
+        self._t = 0
+        if self._co_dim is not None:
+            self.current_context = self._rng.uniform(-1, 1, self._co_dim)
+        return self._obs()
+
+    def step(self, action):
+        """Advance the episode by a step, ignoring the action."""
+        self._t += 1
+        done = self._t >= self.horizon
+        return self._obs(), self._rng.uniform(-1, 1), done, {}
+
+    def contextual_reward(self, states, goals, next_states):
+        """Return the negative distance between the goal and next state."""
+        return -np.linalg.norm(next_states[:len(goals)] - goals)
+
+
+class MultiAgentStandInEnv(gym.Env):
+    """A multi-agent environment with random observations and rewards.
+
+    Every agent has its own observation and action space, as in the
+    multi-agent Flow environments with independent policies.
+
+    Attributes
+    ----------
+    name : str
+        the name of the environment this environment stands in for
+    agents : list of str
+        the name of every agent
+    horizon : int
+        the number of steps in an episode
+    """
+
+    def __init__(self, name, ob_dim, ac_dim, co_dim, horizon, num_agents,
+                 seed=0):
+        """Instantiate the environment.
+
+        Parameters
+        ----------
+        name : str
+            the name of the environment this environment stands in for
+        ob_dim : int
+            the number of elements in the observations of every agent
+        ac_dim : int
+            the number of elements in the actions of every agent
+        co_dim : None
+            unused. The multi-agent environments do not provide contexts.
+        horizon : int
+            the number of steps in an episode
+        num_agents : int
+            the number of agents
+        seed : int
+            the seed of the random observations and rewards
+        """
+        del co_dim
+        self.name = name
+        self.agents = ["agent_{}".format(i) for i in range(num_agents)]
+        self.observation_space = {
+            key: Box(-1, 1, (ob_dim,), dtype=np.float32)
+            for key in self.agents}
+        self.action_space = {
+            key: Box(-1, 1, (ac_dim,), dtype=np.float32)
+            for key in self.agents}
+        self.horizon = horizon
+        self._rng = np.random.RandomState(seed)
+        self._t = 0
+
+    def __str__(self):
+        """Return the name of the environment this stands in for."""
+        return self.name
+
+    def _obs(self):
+        """Return a random observation for every agent."""
+        return {key: self._rng.uniform(-1, 1, space.shape)
+                for key, space in self.observation_space.items()}
+
+    def reset(self):
+        """Start a new episode."""
+        self._t = 0
+        return self._obs()
+
+    def step(self, action):
+        """Advance the episode by a step, ignoring the actions."""
+        self._t += 1
+        done = {key: self._t >= self.horizon for key in self.agents}
+        done["__all__"] = self._t >= self.horizon
+        reward = {key: self._rng.uniform(-1, 1) for key in self.agents}
+        return self._obs(), reward, done, {}
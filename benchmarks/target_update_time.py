@@ -0,0 +1,228 @@
+"""Benchmark the latency of the soft target updates of the TD3 policies.
+
+This compares the soft target updates of every policy when computed with one
+assign operation per variable (see `get_target_updates` in
+`hbaselines.utils.tf_util`), against fused updates computed over flat buffers
+of the variables (see `get_fused_target_updates`). The updates are timed for
+feedforward and hierarchical policies with 1, 2, and 3 levels, as well as for
+multi-agent policies with independent agents.
+
+The fused updates concatenate the variables into new buffers, and split the
+result back, at every update. They were measured slower than the updates of
+the policies on CPU, and are therefore not used by the policies.
+
+Usage
+    python target_update_time.py --num_levels 1 2 3 --num_agents 20
+"""
+import sys
+import argparse
+import time
+import numpy as np
+import tensorflow as tf
+from gym.spaces import Box
+
+from hbaselines.fcnet.td3 import FeedForwardPolicy
+from hbaselines.goal_conditioned.td3 import GoalConditionedPolicy
+from hbaselines.multi_fcnet.td3 import MultiFeedForwardPolicy
+from hbaselines.algorithms.off_policy import TD3_PARAMS
+from hbaselines.algorithms.off_policy import FEEDFORWARD_PARAMS
+from hbaselines.algorithms.off_policy import GOAL_CONDITIONED_PARAMS
+from hbaselines.algorithms.off_policy import MULTI_FEEDFORWARD_PARAMS
+from hbaselines.utils.tf_util import get_trainable_vars
+from hbaselines.utils.tf_util import get_target_updates
+
+
+def parse_options(args):
+    """Parse benchmark options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Benchmark the latency of the soft target updates of the '
+                    'TD3 policies.',
+        epilog='python target_update_time.py --num_levels 1 2 3 '
+               '--num_agents 20')
+
+    # optional arguments
+    parser.add_argument(
+        '--num_levels', type=int, nargs='+', default=[1, 2, 3],
+        help='the numbers of levels of the hierarchical policies to time. A '
+             'single level corresponds to a feedforward policy.')
+    parser.add_argument(
+        '--num_agents', type=int, nargs='+', default=[20],
+        help='the numbers of independent agents of the multi-agent policies '
+             'to time')
+    parser.add_argument(
+        '--ob_dim', type=int, default=25,
+        help='the number of elements in the observations')
+    parser.add_argument(
+        '--ac_dim', type=int, default=5,
+        help='the number of elements in the actions')
+    parser.add_argument(
+        '--num_updates', type=int, default=1000,
+        help='the number of soft target updates to time')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def get_fused_target_updates(_vars, target_vars, tau):
+    """Get soft target update operations computed over flat buffers.
+
+    The variables are concatenated into flat buffers, the Polyak averaging is
+    computed over the buffers, and the result is split and assigned to the
+    target variables. All variables must have the same data type.
+
+    Parameters
+    ----------
+    _vars : list of tf.Tensor
+        the initial variables
+    target_vars : list of tf.Tensor
+        the target variables
+    tau : float
+        the soft update coefficient (keep old values, between 0 and 1)
+
+    Returns
+    -------
+    tf.Operation
+        soft update
+    """
+    with tf.compat.v1.name_scope("fused_target_updates"):
+        flat_vars = tf.concat(
+            [tf.reshape(var, [-1]) for var in _vars], axis=0)
+        flat_target_vars = tf.concat(
+            [tf.reshape(var, [-1]) for var in target_vars], axis=0)
+        flat_updates = (1.-tau) * flat_target_vars + tau * flat_vars
+
+        sizes = [var.shape.num_elements() for var in target_vars]
+        soft_updates = []
+        for target_var, update in zip(
+                target_vars, tf.split(flat_updates, sizes)):
+            soft_updates.append(tf.compat.v1.assign(
+                target_var, tf.reshape(update, target_var.shape)))
+
+    return tf.group(*soft_updates)
+
+
+def create_policy(sess, flags, num_levels=1, num_agents=None):
+    """Create a policy, and return the scopes of its TD3 policies.
+
+    Parameters
+    ----------
+    sess : tf.compat.v1.Session
+        the current TensorFlow session
+    flags : argparse.Namespace
+        the benchmark options
+    num_levels : int
+        the number of levels of the policy. A single level corresponds to a
+        feedforward policy.
+    num_agents : int or None
+        the number of independent agents of the policy. If set to None, a
+        single-agent policy is created.
+
+    Returns
+    -------
+    list of str or None
+        the outer scope of every TD3 policy
+    """
+    ob_space = Box(low=-1, high=1, shape=(flags.ob_dim,), dtype=np.float32)
+    ac_space = Box(low=-1, high=1, shape=(flags.ac_dim,), dtype=np.float32)
+    policy_kwargs = TD3_PARAMS.copy()
+
+    if num_agents is not None:
+        policy_kwargs.update(MULTI_FEEDFORWARD_PARAMS)
+        keys = ["agent_{}".format(i) for i in range(num_agents)]
+        MultiFeedForwardPolicy(
+            sess=sess,
+            ob_space={key: ob_space for key in keys},
+            ac_space={key: ac_space for key in keys},
+            co_space=None,
+            verbose=0,
+            **policy_kwargs
+        )
+        return keys
+
+    elif num_levels == 1:
+        policy_kwargs.update(FEEDFORWARD_PARAMS)
+        FeedForwardPolicy(
+            sess=sess,
+            ob_space=ob_space,
+            ac_space=ac_space,
+            co_space=None,
+            verbose=0,
+            **policy_kwargs
+        )
+        return [None]
+
+    else:
+        policy_kwargs.update(GOAL_CONDITIONED_PARAMS)
+        policy_kwargs["num_levels"] = num_levels
+        GoalConditionedPolicy(
+            sess=sess,
+            ob_space=ob_space,
+            ac_space=ac_space,
+            co_space=ob_space,
+            verbose=0,
+            **policy_kwargs
+        )
+        return ["level_{}".format(i) for i in range(num_levels)]
+
+
+def time_updates(name, flags, num_levels=1, num_agents=None):
+    """Print the latency of the unfused and fused soft target updates."""
+    graph = tf.Graph()
+    with graph.as_default():
+        sess = tf.compat.v1.Session(graph=graph)
+        scopes = create_policy(sess, flags, num_levels, num_agents)
+
+        # Create the soft updates of every policy, with and without fusing.
+        soft_updates = {False: [], True: []}
+        num_vars = 0
+        for scope in scopes:
+            prefix = "" if scope is None else scope + "/"
+            model_vars = get_trainable_vars(prefix + "model")
+            target_vars = get_trainable_vars(prefix + "target")
+            num_vars += len(model_vars)
+            _, soft = get_target_updates(
+                model_vars, target_vars, FEEDFORWARD_PARAMS["tau"])
+            soft_updates[False].append(soft)
+            soft_updates[True].append(get_fused_target_updates(
+                model_vars, target_vars, FEEDFORWARD_PARAMS["tau"]))
+
+        sess.run(tf.compat.v1.global_variables_initializer())
+
+    for fused in [False, True]:
+        # Run the operations once before timing.
+        sess.run(soft_updates[fused])
+
+        t0 = time.time()
+        for _ in range(flags.num_updates):
+            sess.run(soft_updates[fused])
+        print("{} ({} policies, {} variable pairs), fused={}: {:.3f} "
+              "ms/update".format(
+                  name, len(scopes), num_vars, fused,
+                  1000 * (time.time() - t0) / flags.num_updates))
+
+    sess.close()
+
+
+def main(args):
+    """Run the benchmark and print the results."""
+    flags = parse_options(args)
+
+    for num_levels in flags.num_levels:
+        time_updates("levels={}".format(num_levels), flags,
+                     num_levels=num_levels)
+
+    for num_agents in flags.num_agents:
+        time_updates("agents={}".format(num_agents), flags,
+                     num_agents=num_agents)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,415 @@
+"""Benchmark the end-to-end throughput of every policy family.
+
+The benchmarks are run on stand-in environments that match the observation,
+action, and context shapes of AntMaze, UR5, the ring and highway-single
+mixed-autonomy networks, and their multi-agent variants (see
+`stand_in_envs.py`), so that no simulator is needed. For every environment and
+every applicable policy family (feed-forward, goal-conditioned, and
+multi-agent) and algorithm (TD3 and SAC), the following metrics are measured:
+
+* inference_ms: the latency of computing the action of a single observation,
+  without noise
+* updates_per_sec: the number of `update_from_batch` calls per second on
+  random batches, for every sub-policy of the policy (e.g. every level of a
+  goal-conditioned policy, or every agent of a multi-agent policy)
+* buffer_adds_per_sec: the number of transitions stored per second, through
+  the `store_transition` method of the policy
+* buffer_samples_per_sec: the number of batches sampled per second from the
+  replay buffer(s) of the policy
+* correction_ms: the latency of the HIRO off-policy corrections of a batch.
+  Only measured for the goal-conditioned policies.
+* learn_steps_per_sec: the number of environment steps per second performed
+  by `OffPolicyRLAlgorithm.learn`, including the initial exploration steps
+
+The results are written to a JSON file, which can be compared against the
+results of a previous run with `compare_throughput.py`.
+
+Usage
+    python throughput.py --env AntMaze ring --alg TD3 --output results.json
+"""
+import sys
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import numpy as np
+import tensorflow as tf
+
+from hbaselines.algorithms import OffPolicyRLAlgorithm
+from hbaselines.utils.env_util import ENV_ATTRIBUTES
+from stand_in_envs import STAND_IN_ENVS
+from stand_in_envs import create_stand_in_env
+
+
+def get_policy(family, alg):
+    """Return the policy class of a policy family and algorithm.
+
+    Parameters
+    ----------
+    family : str
+        the policy family. One of {"fcnet", "goal_conditioned",
+        "multi_fcnet"}
+    alg : str
+        the algorithm. One of {"TD3", "SAC"}
+
+    Returns
+    -------
+    type [ hbaselines.base_policies.ActorCriticPolicy ]
+        the policy class
+    """
+    if family == "fcnet" and alg == "TD3":
+        from hbaselines.fcnet.td3 import FeedForwardPolicy as policy
+    elif family == "fcnet" and alg == "SAC":
+        from hbaselines.fcnet.sac import FeedForwardPolicy as policy
+    elif family == "goal_conditioned" and alg == "TD3":
+        from hbaselines.goal_conditioned.td3 import GoalConditionedPolicy \
+            as policy
+    elif family == "goal_conditioned" and alg == "SAC":
+        from hbaselines.goal_conditioned.sac import GoalConditionedPolicy \
+            as policy
+    elif family == "multi_fcnet" and alg == "TD3":
+        from hbaselines.multi_fcnet.td3 import MultiFeedForwardPolicy \
+            as policy
+    elif family == "multi_fcnet" and alg == "SAC":
+        from hbaselines.multi_fcnet.sac import MultiFeedForwardPolicy \
+            as policy
+    else:
+        raise ValueError("Unknown policy: {} {}".format(family, alg))
+
+    return policy
+
+
+def get_families(env_name):
+    """Return the policy families that can be trained on an environment."""
+    if "num_agents" in STAND_IN_ENVS[env_name]:
+        return ["multi_fcnet"]
+    else:
+        return ["fcnet", "goal_conditioned"]
+
+
+def parse_options(args):
+    """Parse benchmark options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Benchmark the end-to-end throughput of every policy '
+                    'family on stand-in environments.',
+        epilog='python throughput.py --env AntMaze ring --alg TD3 '
+               '--output results.json')
+
+    # optional arguments
+    parser.add_argument(
+        '--env', type=str, nargs='+', default=list(STAND_IN_ENVS.keys()),
+        choices=list(STAND_IN_ENVS.keys()),
+        help='the environments whose stand-ins are used')
+    parser.add_argument(
+        '--family', type=str, nargs='+',
+        default=["fcnet", "goal_conditioned", "multi_fcnet"],
+        choices=["fcnet", "goal_conditioned", "multi_fcnet"],
+        help='the policy families to time. Every family is only timed on the '
+             'environments it supports.')
+    parser.add_argument(
+        '--alg', type=str, nargs='+', default=["TD3", "SAC"],
+        choices=["TD3", "SAC"],
+        help='the algorithms to time')
+    parser.add_argument(
+        '--output', type=str, default='throughput.json',
+        help='the path to the JSON file the results are written to')
+    parser.add_argument(
+        '--num_cpus', type=int, default=1,
+        help='the number of threads used by tensorflow to run operations')
+    parser.add_argument(
+        '--num_samples', type=int, default=5000,
+        help='the number of transitions stored in the replay buffers before '
+             'they are sampled. Must be large enough to sample a batch from '
+             'every replay buffer.')
+    parser.add_argument(
+        '--num_actions', type=int, default=1000,
+        help='the number of actions to time')
+    parser.add_argument(
+        '--num_updates', type=int, default=200,
+        help='the number of updates and batches to time')
+    parser.add_argument(
+        '--num_corrections', type=int, default=10,
+        help='the number of off-policy corrections to time')
+    parser.add_argument(
+        '--learn_steps', type=int, default=3000,
+        help='the number of training steps performed by learn')
+    parser.add_argument(
+        '--initial_exploration_steps', type=int, default=1500,
+        help='the number of exploration steps performed by learn before '
+             'training')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def time_calls(fn, num_calls):
+    """Return the average duration of a function call, in seconds.
+
+    The function is called once before timing, so that one-time costs (e.g.
+    the first run of a tensorflow operation) are not included.
+    """
+    fn()
+    t0 = time.time()
+    for _ in range(num_calls):
+        fn()
+    return (time.time() - t0) / num_calls
+
+
+def create_algorithm(env_name, family, alg, flags):
+    """Create an algorithm object on the stand-in of an environment.
+
+    Returns
+    -------
+    hbaselines.algorithms.OffPolicyRLAlgorithm
+        the algorithm object
+    """
+    policy_kwargs = {}
+    if family == "goal_conditioned":
+        policy_kwargs["off_policy_corrections"] = True
+
+        # The goal-conditioned policies use the name of the environment (see
+        # the __str__ method of the stand-ins) to choose the goal dimensions.
+        # Environments without state indices are assigned goals for all
+        # observations instead, with the same meta action space shape.
+        if ENV_ATTRIBUTES.get(env_name, {}).get("state_indices", []) is None:
+            policy_kwargs["env_name"] = ""
+
+    return OffPolicyRLAlgorithm(
+        policy=get_policy(family, alg),
+        env=create_stand_in_env(env_name),
+        verbose=0,
+        num_cpus=flags.num_cpus,
+        policy_kwargs=policy_kwargs,
+    )
+
+
+def get_sub_policies(policy):
+    """Return the feed-forward policies that compose a policy."""
+    if hasattr(policy, "agents"):
+        return list(policy.agents.values())
+    elif hasattr(policy, "policy") and isinstance(policy.policy, list):
+        return policy.policy
+    else:
+        return [policy]
+
+
+def sample_batches(policy):
+    """Sample a batch from every replay buffer of a policy."""
+    if hasattr(policy, "agents"):
+        for agent in policy.agents.values():
+            agent.replay_buffer.sample()
+    elif hasattr(policy, "off_policy_corrections"):
+        policy.replay_buffer.sample(policy.off_policy_corrections)
+    else:
+        policy.replay_buffer.sample()
+
+
+def time_inference(algorithm, flags):
+    """Return the latency of the actions of a policy, in milliseconds."""
+    env = algorithm.env
+    obs = env.reset()
+    context = [env.current_context] \
+        if hasattr(env, "current_context") else None
+
+    def get_action():
+        algorithm._policy(obs.copy(), context, apply_noise=False)
+
+    return 1000 * time_calls(get_action, flags.num_actions)
+
+
+def time_buffer_adds(algorithm, flags):
+    """Return the number of transitions stored per second by a policy.
+
+    The transitions are collected as in `_collect_samples`, with random
+    actions, but only the calls to `_store_transition` are timed. This
+    accounts for the goal-conditioned policies, whose transitions depend on the
+    meta actions of the most recent call to the policy.
+    """
+    env = algorithm.env
+    obs = env.reset()
+    episode_step = 0
+    duration = 0
+    for _ in range(flags.num_samples):
+        context = [env.current_context] \
+            if hasattr(env, "current_context") else None
+        action = algorithm._policy(obs, context, random_actions=True)
+        new_obs, reward, done, _ = env.step(action)
+        if isinstance(done, dict):
+            done = done["__all__"]
+        context1 = getattr(env, "current_context", None)
+
+        t0 = time.time()
+        algorithm._store_transition(
+            obs0=obs,
+            context0=context1,
+            action=action,
+            reward=reward,
+            obs1=new_obs,
+            context1=context1,
+            terminal1=done,
+            is_final_step=episode_step >= algorithm.horizon - 1,
+        )
+        duration += time.time() - t0
+
+        obs = new_obs
+        episode_step += 1
+        if done:
+            obs = env.reset()
+            episode_step = 0
+
+    return flags.num_samples / duration
+
+
+def time_updates(algorithm, flags):
+    """Return the number of updates per second of a policy.
+
+    Every update consists of one `update_from_batch` call for every sub-policy
+    of the policy, on random batches of the shape of their inputs.
+    """
+    batches = []
+    for policy in get_sub_policies(algorithm.policy_tf):
+        batch_size = policy.batch_size
+        ob_dim = policy.obs_ph.shape.as_list()[1:]
+        ac_dim = policy.action_ph.shape.as_list()[1:]
+        batches.append((policy, dict(
+            obs0=np.random.uniform(-1, 1, [batch_size] + ob_dim),
+            actions=np.random.uniform(-1, 1, [batch_size] + ac_dim),
+            rewards=np.random.uniform(-1, 1, batch_size),
+            obs1=np.random.uniform(-1, 1, [batch_size] + ob_dim),
+            terminals1=np.zeros(batch_size),
+            update_actor=True,
+        )))
+
+    def update():
+        for policy, batch in batches:
+            policy.update_from_batch(**batch)
+
+    return 1 / time_calls(update, flags.num_updates)
+
+
+def time_buffer_samples(algorithm, flags):
+    """Return the number of batches sampled per second from a policy."""
+    return 1 / time_calls(
+        lambda: sample_batches(algorithm.policy_tf), flags.num_updates)
+
+
+def time_corrections(algorithm, flags):
+    """Return the latency of the off-policy corrections, in milliseconds.
+
+    The corrections are performed on batches sampled from the replay buffer,
+    as done by the `update` method of the goal-conditioned policies.
+    """
+    policy = algorithm.policy_tf
+    obs0, obs1, act, _, _, additional = policy.replay_buffer.sample(True)
+
+    def correct():
+        policy._sample_best_meta_action(
+            meta_obs0=obs0[0],
+            meta_obs1=obs1[0],
+            meta_action=act[0],
+            worker_obses=additional["worker_obses"],
+            worker_actions=additional["worker_actions"],
+            k=8,
+        )
+
+    return 1000 * time_calls(correct, flags.num_corrections)
+
+
+def time_learn(env_name, family, alg, flags):
+    """Return the number of environment steps per second of `learn`."""
+    algorithm = create_algorithm(env_name, family, alg, flags)
+    log_dir = tempfile.mkdtemp()
+    num_steps = flags.learn_steps + flags.initial_exploration_steps
+
+    t0 = time.time()
+    algorithm.learn(
+        total_timesteps=flags.learn_steps,
+        log_dir=log_dir,
+        log_interval=flags.learn_steps,
+        save_interval=num_steps + 1,
+        initial_exploration_steps=flags.initial_exploration_steps,
+        print_interval=num_steps + 1,
+    )
+    duration = time.time() - t0
+
+    algorithm.sess.close()
+    shutil.rmtree(log_dir)
+
+    return num_steps / duration
+
+
+def run_benchmark(env_name, family, alg, flags):
+    """Return the metrics of a policy on the stand-in of an environment.
+
+    Returns
+    -------
+    dict <str, float>
+        the value of every metric
+    """
+    algorithm = create_algorithm(env_name, family, alg, flags)
+
+    results = {}
+    with algorithm.sess.as_default(), algorithm.graph.as_default():
+        results["inference_ms"] = time_inference(algorithm, flags)
+        results["buffer_adds_per_sec"] = time_buffer_adds(algorithm, flags)
+        results["buffer_samples_per_sec"] = \
+            time_buffer_samples(algorithm, flags)
+        results["updates_per_sec"] = time_updates(algorithm, flags)
+        if family == "goal_conditioned":
+            results["correction_ms"] = time_corrections(algorithm, flags)
+
+    algorithm.sess.close()
+
+    results["learn_steps_per_sec"] = time_learn(env_name, family, alg, flags)
+
+    return results
+
+
+def main(args):
+    """Run the benchmarks, and write the results to a JSON file."""
+    flags = parse_options(args)
+
+    results = {}
+    for env_name in flags.env:
+        for family in get_families(env_name):
+            if family not in flags.family:
+                continue
+            for alg in flags.alg:
+                name = "{}/{}/{}".format(env_name, family, alg)
+                print("Running {}...".format(name))
+                results[name] = run_benchmark(env_name, family, alg, flags)
+                print(json.dumps(results[name], sort_keys=True, indent=4))
+
+    output = {
+        "info": {
+            "date": time.strftime("%Y-%m-%d-%H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "tensorflow": tf.__version__,
+            "num_cpus": flags.num_cpus,
+            "options": vars(flags),
+        },
+        "results": results,
+    }
+
+    output_dir = os.path.dirname(flags.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(flags.output, "w") as f:
+        json.dump(output, f, sort_keys=True, indent=4)
+    print("Results written to {}".format(flags.output))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
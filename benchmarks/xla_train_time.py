@@ -0,0 +1,139 @@
+"""Benchmark the training throughput of the policies when compiled with XLA.
+
+This compares the number of updates per second of the feedforward TD3 and SAC
+policies when the update operations are executed op by op, against the same
+operations compiled with XLA (see the "use_xla" policy parameter). The first
+updates, in which the operations are compiled, are not timed.
+
+Usage
+    python xla_train_time.py --alg TD3 SAC --num_updates 2000
+"""
+import sys
+import argparse
+import time
+import numpy as np
+import tensorflow as tf
+from gym.spaces import Box
+
+from hbaselines.fcnet.td3 import FeedForwardPolicy as TD3FeedForwardPolicy
+from hbaselines.fcnet.sac import FeedForwardPolicy as SACFeedForwardPolicy
+from hbaselines.algorithms.off_policy import TD3_PARAMS
+from hbaselines.algorithms.off_policy import SAC_PARAMS
+from hbaselines.algorithms.off_policy import FEEDFORWARD_PARAMS
+from hbaselines.utils.tf_util import make_session
+from hbaselines.utils.tf_util import xla_available
+
+# dictionary that maps algorithm names to their policies and parameters
+POLICIES = {
+    "TD3": (TD3FeedForwardPolicy, TD3_PARAMS),
+    "SAC": (SACFeedForwardPolicy, SAC_PARAMS),
+}
+
+
+def parse_options(args):
+    """Parse benchmark options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Benchmark the training throughput of the policies when '
+                    'compiled with XLA.',
+        epilog='python xla_train_time.py --alg TD3 SAC --num_updates 2000')
+
+    # optional arguments
+    parser.add_argument(
+        '--alg', type=str, nargs='+', default=["TD3", "SAC"],
+        choices=list(POLICIES.keys()),
+        help='the algorithms to time')
+    parser.add_argument(
+        '--batch_size', type=int, default=128,
+        help='the size of the batch for learning the policy')
+    parser.add_argument(
+        '--ob_dim', type=int, default=25,
+        help='the number of elements in the observations')
+    parser.add_argument(
+        '--ac_dim', type=int, default=5,
+        help='the number of elements in the actions')
+    parser.add_argument(
+        '--layers', type=int, nargs='+', default=[256, 256],
+        help='the size of the hidden layers of the networks')
+    parser.add_argument(
+        '--num_cpus', type=int, default=1,
+        help='the number of threads used by tensorflow to run operations')
+    parser.add_argument(
+        '--num_updates', type=int, default=2000,
+        help='the number of updates to time')
+    parser.add_argument(
+        '--num_warmup', type=int, default=20,
+        help='the number of updates performed before timing')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def time_updates(alg, use_xla, flags):
+    """Return the number of updates per second of a policy."""
+    policy_cls, alg_params = POLICIES[alg]
+    policy_kwargs = alg_params.copy()
+    policy_kwargs.update(FEEDFORWARD_PARAMS)
+    policy_kwargs.update(
+        batch_size=flags.batch_size, layers=flags.layers, use_xla=use_xla)
+
+    graph = tf.Graph()
+    with graph.as_default():
+        sess = make_session(num_cpu=flags.num_cpus, graph=graph)
+        policy = policy_cls(
+            sess=sess,
+            ob_space=Box(low=-1, high=1, shape=(flags.ob_dim,)),
+            ac_space=Box(low=-1, high=1, shape=(flags.ac_dim,)),
+            co_space=None,
+            verbose=0,
+            **policy_kwargs
+        )
+        sess.run(tf.compat.v1.global_variables_initializer())
+        policy.initialize()
+
+    # a random batch, used for every update
+    batch = dict(
+        obs0=np.random.uniform(-1, 1, (flags.batch_size, flags.ob_dim)),
+        actions=np.random.uniform(-1, 1, (flags.batch_size, flags.ac_dim)),
+        rewards=np.random.uniform(-1, 1, flags.batch_size),
+        obs1=np.random.uniform(-1, 1, (flags.batch_size, flags.ob_dim)),
+        terminals1=np.zeros(flags.batch_size),
+        update_actor=True,
+    )
+
+    # Compile the operations before timing.
+    for _ in range(flags.num_warmup):
+        policy.update_from_batch(**batch)
+
+    t0 = time.time()
+    for _ in range(flags.num_updates):
+        policy.update_from_batch(**batch)
+    duration = time.time() - t0
+
+    sess.close()
+
+    return flags.num_updates / duration
+
+
+def main(args):
+    """Run the benchmark and print the results."""
+    flags = parse_options(args)
+
+    if not xla_available():
+        return
+
+    for alg in flags.alg:
+        for use_xla in [False, True]:
+            print("{} (use_xla={}): {:.1f} updates/sec".format(
+                alg, use_xla, time_updates(alg, use_xla, flags)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -141,9 +141,9 @@ def main(args):
     # get the checkpoint number
     if flags.ckpt_num is None:
         filenames = os.listdir(os.path.join(flags.dir_name, "checkpoints"))
-        metafiles = [f[:-5] for f in filenames if f[-5:] == ".meta"]
-        metanum = [int(f.split("-")[-1]) for f in metafiles]
-        ckpt_num = max(metanum)
+        indexfiles = [f[:-6] for f in filenames if f[-6:] == ".index"]
+        indexnum = [int(f.split("-")[-1]) for f in indexfiles]
+        ckpt_num = max(indexnum)
     else:
         ckpt_num = flags.ckpt_num
 
@@ -6,7 +6,9 @@ import sys
 
 from hbaselines.utils.misc import ensure_dir
 from hbaselines.utils.train import parse_options, get_hyperparameters
+from hbaselines.utils.train import run_parallel
 from hbaselines.algorithms import OffPolicyRLAlgorithm
+from hbaselines.algorithms import SeedEnsembleRLAlgorithm
 
 EXAMPLE_USAGE = 'python run_fcnet.py "HalfCheetah-v2" --total_steps 1e6'
 
@@ -21,7 +23,9 @@ def run_exp(env,
             eval_interval,
             log_interval,
             save_interval,
-            initial_exploration_steps):
+            initial_exploration_steps,
+            num_seeds=1,
+            num_cpus=3):
     """Run a single training procedure.
 
     Parameters
@@ -51,15 +55,31 @@ def run_exp(env,
     initial_exploration_steps : int
         number of timesteps that the policy is run before training to
         initialize the replay buffer with samples
+    num_seeds : int
+        the number of seeds to train together. If greater than one, the seeds
+        are trained by a single `SeedEnsembleRLAlgorithm` object
+    num_cpus : int
+        the number of threads used by tensorflow to run operations
     """
     eval_env = env if evaluate else None
 
-    alg = OffPolicyRLAlgorithm(
-        policy=policy,
-        env=env,
-        eval_env=eval_env,
-        **hp
-    )
+    if num_seeds > 1:
+        alg = SeedEnsembleRLAlgorithm(
+            policy=policy,
+            env=env,
+            num_seeds=num_seeds,
+            eval_env=eval_env,
+            num_cpus=num_cpus,
+            **hp
+        )
+    else:
+        alg = OffPolicyRLAlgorithm(
+            policy=policy,
+            env=env,
+            eval_env=eval_env,
+            num_cpus=num_cpus,
+            **hp
+        )
 
     # perform training
     alg.learn(
@@ -75,6 +95,7 @@ def run_exp(env,
 
 def main(args, base_dir):
     """Execute multiple training operations."""
+    runs = []
     for i in range(args.n_training):
         # value of the next seed
         seed = args.seed + i
@@ -84,6 +105,10 @@ def main(args, base_dir):
 
         # Create a save directory folder (if it doesn't exist).
         dir_name = os.path.join(base_dir, '{}/{}'.format(args.env_name, now))
+        if args.n_parallel > 1:
+            # Parallel operations are created within the same second, and are
+            # differentiated by their seed.
+            dir_name += '-{}'.format(seed)
         ensure_dir(dir_name)
 
         # Get the policy class.
@@ -104,12 +129,13 @@ def main(args, base_dir):
         params_with_extra['policy_name'] = "FeedForwardPolicy"
         params_with_extra['algorithm'] = args.alg
         params_with_extra['date/time'] = now
+        params_with_extra['num_seeds'] = args.num_seeds
 
         # Add the hyperparameters to the folder.
         with open(os.path.join(dir_name, 'hyperparameters.json'), 'w') as f:
             json.dump(params_with_extra, f, sort_keys=True, indent=4)
 
-        run_exp(
+        run = dict(
             env=args.env_name,
             policy=FeedForwardPolicy,
             hp=hp,
@@ -121,8 +147,18 @@ def main(args, base_dir):
             log_interval=args.log_interval,
             save_interval=args.save_interval,
             initial_exploration_steps=args.initial_exploration_steps,
+            num_seeds=args.num_seeds,
         )
 
+        if args.n_parallel > 1:
+            runs.append(run)
+        else:
+            run_exp(**run)
+
+    # Perform the operations in parallel processes.
+    if args.n_parallel > 1:
+        run_parallel(run_exp, runs, args.n_parallel)
+
 
 if __name__ == '__main__':
     # collect arguments
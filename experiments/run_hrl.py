@@ -6,6 +6,7 @@ import sys
 
 from hbaselines.utils.misc import ensure_dir
 from hbaselines.utils.train import parse_options, get_hyperparameters
+from hbaselines.utils.train import run_parallel
 from hbaselines.algorithms import OffPolicyRLAlgorithm
 
 EXAMPLE_USAGE = 'python run_hrl.py "HalfCheetah-v2" --meta_period 10'
@@ -21,7 +22,8 @@ def run_exp(env,
             eval_interval,
             log_interval,
             save_interval,
-            initial_exploration_steps):
+            initial_exploration_steps,
+            num_cpus=3):
     """Run a single training procedure.
 
     Parameters
@@ -51,6 +53,8 @@ def run_exp(env,
     initial_exploration_steps : int
         number of timesteps that the policy is run before training to
         initialize the replay buffer with samples
+    num_cpus : int
+        the number of threads used by tensorflow to run operations
     """
     eval_env = env if evaluate else None
 
@@ -58,6 +62,7 @@ def run_exp(env,
         policy=policy,
         env=env,
         eval_env=eval_env,
+        num_cpus=num_cpus,
         **hp
     )
 
@@ -75,6 +80,7 @@ def run_exp(env,
 
 def main(args, base_dir):
     """Execute multiple training operations."""
+    runs = []
     for i in range(args.n_training):
         # value of the next seed
         seed = args.seed + i
@@ -84,6 +90,10 @@ def main(args, base_dir):
 
         # Create a save directory folder (if it doesn't exist).
         dir_name = os.path.join(base_dir, '{}/{}'.format(args.env_name, now))
+        if args.n_parallel > 1:
+            # Parallel operations are created within the same second, and are
+            # differentiated by their seed.
+            dir_name += '-{}'.format(seed)
         ensure_dir(dir_name)
 
         # Get the policy class.
@@ -109,7 +119,7 @@ def main(args, base_dir):
         with open(os.path.join(dir_name, 'hyperparameters.json'), 'w') as f:
             json.dump(params_with_extra, f, sort_keys=True, indent=4)
 
-        run_exp(
+        run = dict(
             env=args.env_name,
             policy=GoalConditionedPolicy,
             hp=hp,
@@ -123,6 +133,15 @@ def main(args, base_dir):
             initial_exploration_steps=args.initial_exploration_steps,
         )
 
+        if args.n_parallel > 1:
+            runs.append(run)
+        else:
+            run_exp(**run)
+
+    # Perform the operations in parallel processes.
+    if args.n_parallel > 1:
+        run_parallel(run_exp, runs, args.n_parallel)
+
 
 if __name__ == '__main__':
     # collect arguments
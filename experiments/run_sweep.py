@@ -0,0 +1,248 @@
+"""A runner script for hyperparameter sweeps via successive halving."""
+import os
+import json
+import argparse
+from copy import deepcopy
+from time import strftime
+import sys
+import tensorflow as tf
+
+from hbaselines.utils.misc import ensure_dir
+from hbaselines.utils.train import parse_options, get_hyperparameters
+from hbaselines.utils.sweep import get_configurations, get_rungs
+from hbaselines.utils.sweep import successive_halving
+from hbaselines.algorithms import OffPolicyRLAlgorithm
+
+EXAMPLE_USAGE = 'python run_sweep.py "HalfCheetah-v2" --space space.json ' \
+                '--total_steps 1e6 --min_steps 50000 --n_parallel 8'
+
+
+def parse_sweep_options(args):
+    """Parse sweep options user can specify in command line.
+
+    Returns
+    -------
+    argparse.Namespace
+        the output parser object
+    """
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description='Tune the hyperparameters of a model via successive '
+                    'halving.',
+        epilog=EXAMPLE_USAGE)
+
+    # required input parameters
+    parser.add_argument(
+        '--space', type=str, required=True,
+        help='Path to a JSON file mapping the name of every tuned '
+             'hyperparameter (e.g. "actor_lr") to the list of its values.')
+
+    # optional input parameters
+    parser.add_argument(
+        '--model', type=str, default='fcnet',
+        help='The model to tune. Must be one of [fcnet, hrl, multi_fcnet].')
+    parser.add_argument(
+        '--num_samples', type=int, default=None,
+        help='Number of configurations sampled from the search space. If not '
+             'specified, every combination of values is tried.')
+    parser.add_argument(
+        '--min_steps', type=int, default=50000,
+        help='Number of timesteps every configuration is trained for before '
+             'the first configurations are stopped.')
+    parser.add_argument(
+        '--eta', type=int, default=3,
+        help='Only the best 1/eta configurations are trained further at the '
+             'end of each rung, for eta times as many timesteps.')
+
+    flags, _ = parser.parse_known_args(args)
+
+    return flags
+
+
+def get_policy(model, alg):
+    """Return the policy class of a model and algorithm."""
+    if model == "fcnet" and alg == "TD3":
+        from hbaselines.fcnet.td3 import FeedForwardPolicy as policy
+    elif model == "fcnet" and alg == "SAC":
+        from hbaselines.fcnet.sac import FeedForwardPolicy as policy
+    elif model == "hrl" and alg == "TD3":
+        from hbaselines.goal_conditioned.td3 import GoalConditionedPolicy \
+            as policy
+    elif model == "hrl" and alg == "SAC":
+        from hbaselines.goal_conditioned.sac import GoalConditionedPolicy \
+            as policy
+    elif model == "multi_fcnet" and alg == "TD3":
+        from hbaselines.multi_fcnet.td3 import MultiFeedForwardPolicy \
+            as policy
+    elif model == "multi_fcnet" and alg == "SAC":
+        from hbaselines.multi_fcnet.sac import MultiFeedForwardPolicy \
+            as policy
+    else:
+        raise ValueError("Unknown model and algorithm: {}, {}".format(
+            model, alg))
+
+    return policy
+
+
+def run_trial(env,
+              policy,
+              hp,
+              steps,
+              dir_name,
+              load_dirs,
+              seed,
+              log_interval,
+              initial_exploration_steps,
+              num_cpus=3):
+    """Run a single rung of a trial.
+
+    If the trial has completed previous rungs, the model is restored from the
+    last checkpoint of the previous rung, and the replay buffer is filled with
+    the transitions collected during the previous rungs.
+
+    Parameters
+    ----------
+    env : str or gym.Env
+        the training/testing environment
+    policy : type [ hbaselines.base_policies.ActorCriticPolicy ]
+        the policy class to use
+    hp : dict
+        additional algorithm hyper-parameters
+    steps : int
+        number of training steps in the rung
+    dir_name : str
+        the location the results files of the rung are meant to be stored
+    load_dirs : list of str
+        the locations of the results of the previous rungs
+    seed : int
+        specified the random seed for numpy, tensorflow, and random
+    log_interval : int
+        the number of training steps before logging training results
+    initial_exploration_steps : int
+        number of timesteps that the policy is run before training to
+        initialize the replay buffer with samples. Only used in the first
+        rung.
+    num_cpus : int
+        the number of threads used by tensorflow to run operations
+    """
+    alg = OffPolicyRLAlgorithm(
+        policy=policy,
+        env=env,
+        eval_env=env,
+        num_cpus=num_cpus,
+        **hp
+    )
+
+    if len(load_dirs) > 0:
+        # restore the previous checkpoint
+        alg.saver = tf.compat.v1.train.Saver(alg.trainable_vars)
+        alg.load(tf.train.latest_checkpoint(
+            os.path.join(load_dirs[-1], "checkpoints")))
+
+        # restore the replay buffer
+        for load_dir in load_dirs:
+            alg.load_transitions(os.path.join(load_dir, "transitions"))
+        initial_exploration_steps = 0
+
+    # Evaluate and save the model once, at the end of the rung.
+    alg.learn(
+        total_timesteps=steps,
+        log_dir=dir_name,
+        log_interval=log_interval,
+        eval_interval=steps,
+        save_interval=steps,
+        initial_exploration_steps=initial_exploration_steps,
+        seed=seed,
+        record_transitions=True,
+    )
+
+
+def main(args, sweep_args, base_dir):
+    """Execute a hyperparameter sweep."""
+    if sweep_args.min_steps % args.log_interval != 0 or \
+            args.total_steps % args.log_interval != 0:
+        raise ValueError(
+            "min_steps and total_steps must be multiples of log_interval.")
+
+    with open(sweep_args.space, "r") as f:
+        space = json.load(f)
+
+    # Get the policy class.
+    policy = get_policy(sweep_args.model, args.alg)
+
+    # The time when the sweep started.
+    now = strftime("%Y-%m-%d-%H:%M:%S")
+    sweep_dir = os.path.join(base_dir, '{}/{}'.format(args.env_name, now))
+
+    configs = get_configurations(
+        space, num_samples=sweep_args.num_samples, seed=args.seed)
+
+    trials = []
+    for i, config in enumerate(configs):
+        # Create a save directory folder (if it doesn't exist).
+        dir_name = ensure_dir(os.path.join(sweep_dir, 'trial_{}'.format(i)))
+
+        # Get the hyperparameters of the configuration.
+        trial_args = deepcopy(args)
+        for key, value in config.items():
+            if not hasattr(trial_args, key):
+                raise ValueError("Unknown hyperparameter: {}".format(key))
+            setattr(trial_args, key, value)
+        hp = get_hyperparameters(trial_args, policy)
+
+        # Add the seed for logging purposes.
+        params_with_extra = hp.copy()
+        params_with_extra['seed'] = args.seed
+        params_with_extra['env_name'] = args.env_name
+        params_with_extra['policy_name'] = policy.__name__
+        params_with_extra['algorithm'] = args.alg
+        params_with_extra['date/time'] = now
+
+        # Add the hyperparameters to the folder.
+        with open(os.path.join(dir_name, 'hyperparameters.json'), 'w') as f:
+            json.dump(params_with_extra, f, sort_keys=True, indent=4)
+
+        trials.append(dict(
+            env=args.env_name,
+            policy=policy,
+            hp=hp,
+            dir_name=dir_name,
+            seed=args.seed,
+            log_interval=args.log_interval,
+            initial_exploration_steps=args.initial_exploration_steps,
+        ))
+
+    # Perform the sweep.
+    rungs = get_rungs(sweep_args.min_steps, args.total_steps, sweep_args.eta)
+    scores = successive_halving(
+        run_trial, trials, rungs, sweep_args.eta, args.n_parallel)
+
+    # Store and print the results of every trial, from best to worst.
+    results = [{"dir_name": trial["dir_name"], "config": config,
+                "steps": rungs[len(score) - 1] if score else 0,
+                "scores": score}
+               for trial, config, score in zip(trials, configs, scores)]
+    results = sorted(results, key=lambda res: (len(res["scores"]), (
+        res["scores"][-1] if res["scores"] else -float("inf"))), reverse=True)
+
+    with open(os.path.join(sweep_dir, 'results.json'), 'w') as f:
+        json.dump(results, f, indent=4)
+
+    for res in results:
+        print("{}: {} steps, return {} -- {}".format(
+            res["dir_name"], res["steps"],
+            res["scores"][-1] if res["scores"] else None, res["config"]))
+
+
+if __name__ == '__main__':
+    # collect arguments
+    args = parse_options(
+        description='Tune the hyperparameters of a model via successive '
+                    'halving.',
+        example_usage=EXAMPLE_USAGE,
+        args=sys.argv[1:]
+    )
+    sweep_args = parse_sweep_options(sys.argv[1:])
+
+    # execute the sweep
+    main(args, sweep_args, 'data/sweep')
@@ -1,4 +1,7 @@
 """Init script for the algorithms submodule."""
 from hbaselines.algorithms.off_policy import OffPolicyRLAlgorithm
+from hbaselines.algorithms.dagger import DAggerAlgorithm
+from hbaselines.algorithms.seed_ensemble import SeedEnsembleRLAlgorithm
 
-__all__ = ["OffPolicyRLAlgorithm"]
+__all__ = ["OffPolicyRLAlgorithm", "DAggerAlgorithm",
+           "SeedEnsembleRLAlgorithm"]
@@ -2,8 +2,21 @@
 
 See: https://arxiv.org/pdf/1011.0686.pdf
 """
+import os
+import time
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import tensorflow as tf
 
+from hbaselines.utils.tf_util import make_session
+from hbaselines.utils.misc import ensure_dir
+from hbaselines.utils.checkpoint import CheckpointWriter
+from hbaselines.utils.metrics import MetricsWriter
+from hbaselines.utils.env_util import create_env
+from hbaselines.utils.transitions import load_into_policy
+
 
 # =========================================================================== #
 #                   Policy parameters for FeedForwardPolicy                   #
@@ -50,6 +63,584 @@ GOAL_CONDITIONED_PARAMS.update(dict(
 
 
 class DAggerAlgorithm(object):
-    """DAgger training algorithm."""
+    """DAgger training algorithm.
+
+    Rollouts are performed with a mixture of the expert and learned policy:
+    at every step, each worker follows the expert with probability `beta`,
+    and the learned policy otherwise. The expert is queried on every visited
+    state regardless of which action is executed, and the resulting
+    (observation, expert action) pairs are aggregated in the replay buffer of
+    the imitation policy, from which the policy is trained between sample
+    collection iterations. The value of `beta` is decayed geometrically after
+    every training epoch.
+
+    Attributes
+    ----------
+    policy : type [ hbaselines.base_policies.ImitationLearningPolicy ]
+        the policy model to use
+    env_name : str
+        name of the environment
+    env : list of gym.Env
+        the environment workers to collect samples from. Every worker is
+        stepped once per rollout step, in parallel if there is more than one.
+    num_envs : int
+        number of environment workers
+    nb_train_steps : int
+        the number of training steps
+    nb_rollout_steps : int
+        the number of rollout steps. Every rollout step collects one sample
+        from each environment worker.
+    beta : float
+        the current probability that the expert's actions are executed in
+        place of the policy's actions
+    beta_decay : float
+        the factor by which `beta` is multiplied after every training epoch
+    render : bool
+        enable rendering of the training environment
+    verbose : int
+        the verbosity level: 0 none, 1 training information, 2 tensorflow debug
+    action_space : gym.spaces.*
+        the action space of the training environment
+    observation_space : gym.spaces.*
+        the observation space of the training environment
+    context_space : gym.spaces.*
+        the context space of the training environment (i.e. the same of the
+        desired environmental goal)
+    policy_kwargs : dict
+        policy-specific hyperparameters
+    graph : tf.Graph
+        the current tensorflow graph
+    policy_tf : hbaselines.base_policies.ImitationLearningPolicy
+        the policy object
+    sess : tf.compat.v1.Session
+        the current tensorflow session
+    summary : tf.Summary
+        tensorboard summary object
+    obs : list of array_like
+        the most recent training observation from each environment worker
+    episode_step : list of int
+        the number of steps since the most recent rollout began, for each
+        environment worker
+    episode_reward : list of float
+        the cumulative reward since the most recent rollout began, for each
+        environment worker
+    episodes : int
+        the total number of rollouts performed since training began
+    total_steps : int
+        the total number of samples that have been collected since training
+        began, across all environment workers
+    epoch_episode_rewards : list of float
+        a list of cumulative rollout rewards from the most recent training
+        iterations
+    epoch_episode_steps : list of int
+        a list of rollout lengths from the most recent training iterations
+    epoch_episodes : int
+        the total number of rollouts performed since the most recent training
+        iteration began
+    epoch_loss : list of float
+        the training losses from the most recent training iterations
+    epoch : int
+        the total number of training iterations
+    episode_rew_history : list of float
+        the cumulative return from the last 100 training episodes
+    expert_query_time : float
+        the time (in seconds) spent querying the expert since training began
+    epoch_expert_query_time : float
+        the time (in seconds) spent querying the expert since the most recent
+        training iteration began
+    saver : tf.compat.v1.train.Saver
+        tensorflow saver object
+    checkpoint_writer : hbaselines.utils.checkpoint.CheckpointWriter or None
+        the object that writes checkpoints in the background during training.
+        None outside of `learn`.
+    metrics : hbaselines.utils.metrics.MetricsWriter or None
+        the object that writes the training statistics in the background
+        during training. None outside of `learn`.
+    trainable_vars : list of str
+        the trainable variables
+    rew_ph : tf.compat.v1.placeholder
+        a placeholder for the average training return for the last epoch. Used
+        for logging purposes.
+    rew_history_ph : tf.compat.v1.placeholder
+        a placeholder for the average training return for the last 100
+        episodes. Used for logging purposes.
+    """
+
+    def __init__(self,
+                 policy,
+                 env,
+                 num_envs=1,
+                 nb_train_steps=1,
+                 nb_rollout_steps=1,
+                 beta=1.,
+                 beta_decay=0.9,
+                 render=False,
+                 verbose=0,
+                 policy_kwargs=None,
+                 _init_setup_model=True):
+        """Instantiate the algorithm object.
+
+        Parameters
+        ----------
+        policy : type [ hbaselines.base_policies.ImitationLearningPolicy ]
+            the policy model to use
+        env : gym.Env or list of gym.Env or str
+            the environment to learn from (if registered in Gym, can be str).
+            If a list of environments is provided, each element is used as a
+            separate environment worker.
+        num_envs : int
+            number of environment workers. If `env` is a string, this many
+            copies of the environment are created. Otherwise, this term is
+            ignored.
+        nb_train_steps : int
+            the number of training steps
+        nb_rollout_steps : int
+            the number of rollout steps. Every rollout step collects one sample
+            from each environment worker.
+        beta : float
+            the initial probability that the expert's actions are executed in
+            place of the policy's actions
+        beta_decay : float
+            the factor by which `beta` is multiplied after every training epoch
+        render : bool
+            enable rendering of the training environment
+        verbose : int
+            the verbosity level: 0 none, 1 training information, 2 tensorflow
+            debug
+        policy_kwargs : dict
+            policy-specific hyperparameters
+        _init_setup_model : bool
+            Whether or not to build the network at the creation of the instance
+        """
+        self.policy = policy
+        self.env_name = env if isinstance(env, str) else env.__str__()
+        if isinstance(env, str):
+            self.env = [create_env(env, render, evaluate=False)
+                        for _ in range(num_envs)]
+        elif isinstance(env, list):
+            self.env = env
+        else:
+            self.env = [env]
+        self.num_envs = len(self.env)
+        self.nb_train_steps = nb_train_steps
+        self.nb_rollout_steps = nb_rollout_steps
+        self.beta = beta
+        self.beta_decay = beta_decay
+        self.render = render
+        self.verbose = verbose
+        self.action_space = self.env[0].action_space
+        self.observation_space = self.env[0].observation_space
+        self.context_space = getattr(self.env[0], "context_space", None)
+        self.policy_kwargs = {'verbose': verbose}
+
+        # add the default policy kwargs to the policy_kwargs term
+        self.policy_kwargs.update(FEEDFORWARD_PARAMS.copy())
+        self.policy_kwargs.update(policy_kwargs or {})
+
+        # The workers are stepped from a thread pool. Most of the time spent
+        # in a step is within the simulator (e.g. sumo, reached over a socket)
+        # which releases the GIL, so the workers progress concurrently.
+        self._pool = ThreadPoolExecutor(max_workers=self.num_envs) \
+            if self.num_envs > 1 else None
+
+        # init
+        self.graph = None
+        self.policy_tf = None
+        self.sess = None
+        self.summary = None
+        self.obs = None
+        self.episode_step = [0] * self.num_envs
+        self.episode_reward = [0] * self.num_envs
+        self.episodes = 0
+        self.total_steps = 0
+        self.epoch_episode_steps = []
+        self.epoch_episode_rewards = []
+        self.epoch_episodes = 0
+        self.epoch_loss = []
+        self.epoch = 0
+        self.episode_rew_history = deque(maxlen=100)
+        self.expert_query_time = 0
+        self.epoch_expert_query_time = 0
+        self.rew_ph = None
+        self.rew_history_ph = None
+        self.saver = None
+        self.checkpoint_writer = None
+        self.metrics = None
+
+        # Create the model variables and operations.
+        if _init_setup_model:
+            self.trainable_vars = self.setup_model()
+
+    def setup_model(self):
+        """Create the graph, session, policy, and summary objects."""
+        self.graph = tf.Graph()
+        with self.graph.as_default():
+            # Create the tensorflow session.
+            self.sess = make_session(num_cpu=3, graph=self.graph)
+
+            # Create the policy.
+            self.policy_tf = self.policy(
+                self.sess,
+                self.observation_space,
+                self.action_space,
+                self.context_space,
+                **self.policy_kwargs
+            )
+
+            # for tensorboard logging
+            with tf.compat.v1.variable_scope("Train"):
+                self.rew_ph = tf.compat.v1.placeholder(tf.float32)
+                self.rew_history_ph = tf.compat.v1.placeholder(tf.float32)
+
+            # Add tensorboard scalars for the return and return history.
+            tf.compat.v1.summary.scalar("Train/return", self.rew_ph)
+            tf.compat.v1.summary.scalar("Train/return_history",
+                                        self.rew_history_ph)
+
+            # Create the tensorboard summary.
+            self.summary = tf.compat.v1.summary.merge_all()
+
+            # Initialize the model parameters and optimizers.
+            with self.sess.as_default():
+                self.sess.run(tf.compat.v1.global_variables_initializer())
+
+            return tf.compat.v1.get_collection(
+                tf.compat.v1.GraphKeys.TRAINABLE_VARIABLES)
+
+    def learn(self,
+              total_timesteps,
+              log_dir=None,
+              seed=None,
+              log_interval=2000,
+              save_interval=10000,
+              keep_last_checkpoints=5,
+              log_format="csv"):
+        """Perform the complete training operation.
+
+        Parameters
+        ----------
+        total_timesteps : int
+            the total number of samples to train on
+        log_dir : str
+            the directory where the training statistics, as well as the
+            tensorboard log, should be stored
+        seed : int or None
+            the initial seed for training, if None: keep current seed
+        log_interval : int
+            the number of training steps before logging training results
+        save_interval : int
+            number of simulation steps in the training environment before the
+            model is saved
+        keep_last_checkpoints : int or None
+            the number of most recent checkpoints to keep. If set to None, all
+            checkpoints are kept.
+        log_format : str
+            the format of the training statistics file. Must be one of
+            {"csv", "npy"}, see `hbaselines.utils.metrics`.
+        """
+        # Create a saver object.
+        self.saver = tf.compat.v1.train.Saver(self.trainable_vars)
+
+        # Make sure that the log directory exists, and if not, make it.
+        ensure_dir(log_dir)
+        ensure_dir(os.path.join(log_dir, "checkpoints"))
+
+        # Create an object to write checkpoints in the background. There is no
+        # evaluation return to rank the checkpoints by, so only the most recent
+        # checkpoints are kept.
+        self.checkpoint_writer = CheckpointWriter(
+            self.sess,
+            self.trainable_vars,
+            os.path.join(log_dir, "checkpoints"),
+            keep_last=keep_last_checkpoints,
+            keep_best=0,
+        )
+
+        # Create a tensorboard object for logging.
+        save_path = os.path.join(log_dir, "tb_log")
+        writer = tf.compat.v1.summary.FileWriter(save_path)
+
+        # Create an object to write the training results.
+        self.metrics = MetricsWriter(log_dir, fmt=log_format)
+
+        # Setup the seed value.
+        random.seed(seed)
+        np.random.seed(seed)
+        tf.compat.v1.set_random_seed(seed)
+
+        if self.verbose >= 2:
+            print('Using agent with the following configuration:')
+            print(str(self.__dict__.items()))
+
+        save_steps_incr = 0
+        start_time = time.time()
+
+        with self.sess.as_default(), self.graph.as_default():
+            # Prepare everything.
+            self.obs = self._map(lambda i: self.env[i].reset())
+
+            while True:
+                # Reset epoch-specific variables.
+                self.epoch_episodes = 0
+                self.epoch_episode_steps = []
+                self.epoch_episode_rewards = []
+                self.epoch_loss = []
+                self.epoch_expert_query_time = 0
+
+                # Every iteration collects samples from all workers, so at
+                # least one iteration is run even if log_interval is smaller.
+                for _ in range(max(1, round(log_interval / (
+                        self.nb_rollout_steps * self.num_envs)))):
+                    # If the requirement number of time steps has been met,
+                    # terminate training.
+                    if self.total_steps >= total_timesteps:
+                        self._close_writers()
+                        return
+
+                    # Perform rollouts.
+                    self._collect_samples()
+
+                    # Train.
+                    self._train()
+
+                # Log statistics.
+                self._log_training(start_time)
+
+                # Run and store summary.
+                if writer is not None:
+                    td_map = self.policy_tf.get_td_map()
+
+                    # Check if td_map is empty.
+                    if td_map:
+                        td_map.update({
+                            self.rew_ph: np.mean(self.epoch_episode_rewards),
+                            self.rew_history_ph:
+                                np.mean(self.episode_rew_history),
+                        })
+                        summary = self.sess.run(self.summary, td_map)
+                        writer.add_summary(summary, self.total_steps)
+
+                # Save a checkpoint of the model.
+                if (self.total_steps - save_steps_incr) >= save_interval:
+                    save_steps_incr += save_interval
+                    self.save(os.path.join(log_dir, "checkpoints/itr"))
+
+                # Update the epoch count and the expert mixing probability.
+                self.epoch += 1
+                self.beta *= self.beta_decay
+
+    def _close_writers(self):
+        """Write the pending checkpoints and statistics."""
+        self.checkpoint_writer.close()
+        self.checkpoint_writer = None
+        self.metrics.close()
+        self.metrics = None
+
+    def save(self, save_path):
+        """Save the parameters of a tensorflow model.
+
+        During training, the parameters are written by a background thread,
+        and older checkpoints are deleted (see the `keep_last_checkpoints`
+        argument of `learn`).
+
+        Parameters
+        ----------
+        save_path : str
+            Prefix of filenames created for the checkpoint
+        """
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.save(
+                save_path, global_step=self.total_steps)
+        else:
+            self.saver.save(self.sess, save_path, global_step=self.total_steps)
+
+    def load(self, load_path):
+        """Load model parameters from a checkpoint.
+
+        Parameters
+        ----------
+        load_path : str
+            location of the checkpoint
+        """
+        self.saver.restore(self.sess, load_path)
+
+    def load_transitions(self, load_path):
+        """Fill the replay buffer of the policy with recorded transitions.
+
+        The recorded actions are treated as expert actions. This may be used
+        to pretrain the policy from the transitions collected by an expert.
+
+        Parameters
+        ----------
+        load_path : str
+            location of the recorded transitions (see the `record_transitions`
+            argument of `OffPolicyRLAlgorithm.learn`)
+        """
+        load_into_policy(self.policy_tf, load_path)
+
+    def _map(self, fn):
+        """Apply a function to every environment worker.
+
+        Parameters
+        ----------
+        fn : function
+            the function to apply. Takes as input the index of an environment
+            worker
+
+        Returns
+        -------
+        list
+            the output from each environment worker, in order
+        """
+        if self._pool is None:
+            return [fn(i) for i in range(self.num_envs)]
+        else:
+            return list(self._pool.map(fn, range(self.num_envs)))
+
+    def _get_contexts(self):
+        """Return the contextual term of every environment worker.
+
+        Returns
+        -------
+        list of array_like or list of None
+            the contextual term of each environment worker. None if it is not
+            passed by the environment.
+        """
+        return [getattr(env, "current_context", None) for env in self.env]
+
+    def _collect_samples(self):
+        """Perform the sample collection operation.
+
+        This method is responsible for executing rollouts for a number of steps
+        before training is executed. At every step, the policy and the expert
+        actions are computed for all environment workers at once, and each
+        worker executes the expert's action with probability `beta`. The
+        observations and corresponding expert actions are stored in the
+        policy's replay buffer.
+        """
+        for _ in range(self.nb_rollout_steps):
+            # Collect the contextual term. None if it is not passed.
+            contexts = self._get_contexts()
+            context = None if contexts[0] is None else np.array(contexts)
+
+            # Compute the policy actions of all workers in a single call.
+            obs = np.array(self.obs).reshape(
+                (self.num_envs,) + self.observation_space.shape)
+            action = self.policy_tf.get_action(obs, context)
+            action = action.reshape((self.num_envs,) + self.action_space.shape)
+
+            # Query the expert actions of all workers.
+            t0 = time.time()
+            expert_action = np.array(self._map(
+                lambda i: self.env[i].query_expert(obs[i])
+            ), dtype=np.float32).reshape(
+                (self.num_envs,) + self.action_space.shape)
+            query_time = time.time() - t0
+            self.expert_query_time += query_time
+            self.epoch_expert_query_time += query_time
+
+            # Choose which workers follow the expert.
+            use_expert = np.random.uniform(size=self.num_envs) < self.beta
+            action[use_expert] = expert_action[use_expert]
+
+            # Execute next action.
+            ret = self._map(lambda i: self.env[i].step(action[i]))
+
+            # Visualize the current step.
+            if self.render:
+                self.env[0].render()  # pragma: no cover
+
+            for i, (new_obs, reward, done, _) in enumerate(ret):
+                # Store the visited observation with the expert action in the
+                # replay buffer.
+                self.policy_tf.store_transition(
+                    obs0=obs[i],
+                    context0=contexts[i],
+                    action=expert_action[i],
+                    obs1=new_obs,
+                    context1=contexts[i],
+                )
+
+                # Book-keeping.
+                self.episode_step[i] += 1
+                self.episode_reward[i] += reward
+                self.obs[i] = new_obs
+
+                if done:
+                    # Episode done.
+                    self.epoch_episode_rewards.append(self.episode_reward[i])
+                    self.episode_rew_history.append(self.episode_reward[i])
+                    self.epoch_episode_steps.append(self.episode_step[i])
+                    self.episode_reward[i] = 0
+                    self.episode_step[i] = 0
+                    self.epoch_episodes += 1
+                    self.episodes += 1
+
+                    # Reset the environment.
+                    self.obs[i] = self.env[i].reset()
+
+            self.total_steps += self.num_envs
+
+    def _train(self):
+        """Perform the training operation.
+
+        Through this method, the policy is updated from batches of the
+        aggregated dataset in the policy's replay buffer.
+        """
+        for _ in range(self.nb_train_steps):
+            # Not enough samples in the replay buffer.
+            if not self.policy_tf.replay_buffer.can_sample():
+                return
+
+            # Run a step of training from batch.
+            obs0, actions, _, _, _ = self.policy_tf.replay_buffer.sample()
+            loss = self.policy_tf.update_from_batch(obs0, actions)
+            self.epoch_loss.append(loss)
+
+    def _log_training(self, start_time):
+        """Log training statistics.
+
+        The statistics are written to the "train" file of the metrics writer,
+        if one is available.
+
+        Parameters
+        ----------
+        start_time : float
+            the time when training began. This is used to print the total
+            training time.
+        """
+        # Log statistics.
+        duration = time.time() - start_time
+
+        combined_stats = {
+            # Rollout statistics.
+            'rollout/episodes': self.epoch_episodes,
+            'rollout/episode_steps': np.mean(self.epoch_episode_steps),
+            'rollout/return': np.mean(self.epoch_episode_rewards),
+            'rollout/return_history': np.mean(self.episode_rew_history),
+            'rollout/beta': self.beta,
+            'rollout/expert_query_time': self.epoch_expert_query_time,
+
+            # Training statistics.
+            'train/loss': np.mean(self.epoch_loss),
+
+            # Total statistics.
+            'total/epochs': self.epoch + 1,
+            'total/steps': self.total_steps,
+            'total/duration': duration,
+            'total/samples_per_second': self.total_steps / duration,
+            'total/expert_query_time': self.expert_query_time,
+            'total/episodes': self.episodes,
+        }
+
+        # Save combined_stats in the train file.
+        if self.metrics is not None:
+            self.metrics.write("train", combined_stats)
 
-    pass
+        # Print statistics.
+        print("-" * 67)
+        for key in sorted(combined_stats.keys()):
+            val = combined_stats[key]
+            print("| {:<30} | {:<30} |".format(key, val))
+        print("-" * 67)
+        print('')
@@ -12,7 +12,6 @@ environments and hierarchical policies.
 import os
 import time
 from collections import deque
-import csv
 import random
 from copy import deepcopy
 from gym.spaces import Box
@@ -26,6 +25,10 @@ from hbaselines.algorithms.utils import is_multiagent_policy
 from hbaselines.utils.tf_util import make_session
 from hbaselines.utils.misc import ensure_dir
 from hbaselines.utils.env_util import create_env
+from hbaselines.utils.transitions import TransitionRecorder
+from hbaselines.utils.transitions import load_into_policy
+from hbaselines.utils.checkpoint import CheckpointWriter
+from hbaselines.utils.metrics import MetricsWriter
 
 
 # =========================================================================== #
@@ -82,6 +85,11 @@ FEEDFORWARD_PARAMS = dict(
     # specifies whether to use the huber distance function as the loss for the
     # critic. If set to False, the mean-squared error metric is used instead
     use_huber=False,
+    # whether to compile the update operations of the policy with XLA
+    use_xla=False,
+    # whether to represent the twin critics as a single network with stacked
+    # parameters, trained by a single optimizer
+    fused_critics=False,
 )
 
 
@@ -137,6 +145,9 @@ MULTI_FEEDFORWARD_PARAMS.update(dict(
     shared=False,
     # whether to use an algorithm-specific variant of the MADDPG algorithm
     maddpg=False,
+    # whether to store the parameters of the independent agents in stacked
+    # tensors. Only used if `shared` and `maddpg` are set to False.
+    stacked=False,
 ))
 
 
@@ -182,6 +193,8 @@ class OffPolicyRLAlgorithm(object):
         returned.
     verbose : int
         the verbosity level: 0 none, 1 training information, 2 tensorflow debug
+    num_cpus : int
+        the number of threads used by tensorflow to run operations
     action_space : gym.spaces.*
         the action space of the training environment
     observation_space : gym.spaces.*
@@ -202,8 +215,6 @@ class OffPolicyRLAlgorithm(object):
         the policy object
     sess : tf.compat.v1.Session
         the current tensorflow session
-    summary : tf.Summary
-        tensorboard summary object
     obs : array_like or dict < str, array_like >
         the most recent training observation. If you are using a multi-agent
         environment, this will be a dictionary of observations for each agent,
@@ -233,14 +244,17 @@ class OffPolicyRLAlgorithm(object):
         the cumulative reward since the most reward began
     saver : tf.compat.v1.train.Saver
         tensorflow saver object
+    checkpoint_writer : hbaselines.utils.checkpoint.CheckpointWriter or None
+        the object that writes checkpoints in the background during training.
+        None outside of `learn`.
+    recorder : hbaselines.utils.transitions.TransitionRecorder or None
+        the object that records the transitions collected during training.
+        None if transitions are not being recorded.
+    metrics : hbaselines.utils.metrics.MetricsWriter or None
+        the object that writes the training and evaluation statistics in the
+        background during training. None outside of `learn`.
     trainable_vars : list of str
         the trainable variables
-    rew_ph : tf.compat.v1.placeholder
-        a placeholder for the average training return for the last epoch. Used
-        for logging purposes.
-    rew_history_ph : tf.compat.v1.placeholder
-        a placeholder for the average training return for the last 100
-        episodes. Used for logging purposes.
     eval_rew_ph : tf.compat.v1.placeholder
         placeholder for the average evaluation return from the last time
         evaluations occurred. Used for logging purposes.
@@ -263,6 +277,7 @@ class OffPolicyRLAlgorithm(object):
                  render_eval=False,
                  eval_deterministic=True,
                  verbose=0,
+                 num_cpus=3,
                  policy_kwargs=None,
                  _init_setup_model=True):
         """Instantiate the algorithm object.
@@ -302,6 +317,8 @@ class OffPolicyRLAlgorithm(object):
         verbose : int
             the verbosity level: 0 none, 1 training information, 2 tensorflow
             debug
+        num_cpus : int
+            the number of threads used by tensorflow to run operations
         policy_kwargs : dict
             policy-specific hyperparameters
         _init_setup_model : bool
@@ -329,6 +346,7 @@ class OffPolicyRLAlgorithm(object):
         self.render_eval = render_eval
         self.eval_deterministic = eval_deterministic
         self.verbose = verbose
+        self.num_cpus = num_cpus
         self.action_space = self.env.action_space
         self.observation_space = self.env.observation_space
         self.context_space = getattr(self.env, "context_space", None)
@@ -372,7 +390,6 @@ class OffPolicyRLAlgorithm(object):
         self.graph = None
         self.policy_tf = None
         self.sess = None
-        self.summary = None
         self.obs = None
         self.all_obs = None
         self.episode_step = 0
@@ -384,11 +401,12 @@ class OffPolicyRLAlgorithm(object):
         self.epoch = 0
         self.episode_rew_history = deque(maxlen=100)
         self.episode_reward = 0
-        self.rew_ph = None
-        self.rew_history_ph = None
         self.eval_rew_ph = None
         self.eval_success_ph = None
         self.saver = None
+        self.checkpoint_writer = None
+        self.recorder = None
+        self.metrics = None
 
         # Append the fingerprint dimension to the observation dimension, if
         # needed.
@@ -405,11 +423,11 @@ class OffPolicyRLAlgorithm(object):
             self.trainable_vars = self.setup_model()
 
     def setup_model(self):
-        """Create the graph, session, policy, and summary objects."""
+        """Create the graph, session, and policy objects."""
         self.graph = tf.Graph()
         with self.graph.as_default():
             # Create the tensorflow session.
-            self.sess = make_session(num_cpu=3, graph=self.graph)
+            self.sess = make_session(num_cpu=self.num_cpus, graph=self.graph)
 
             # Create the policy.
             self.policy_tf = self.policy(
@@ -420,20 +438,6 @@ class OffPolicyRLAlgorithm(object):
                 **self.policy_kwargs
             )
 
-            # for tensorboard logging
-            with tf.compat.v1.variable_scope("Train"):
-                self.rew_ph = tf.compat.v1.placeholder(tf.float32)
-                self.rew_history_ph = tf.compat.v1.placeholder(tf.float32)
-
-            # Add tensorboard scalars for the return, return history, and
-            # success rate.
-            tf.compat.v1.summary.scalar("Train/return", self.rew_ph)
-            tf.compat.v1.summary.scalar("Train/return_history",
-                                        self.rew_history_ph)
-
-            # Create the tensorboard summary.
-            self.summary = tf.compat.v1.summary.merge_all()
-
             # Initialize the model parameters and optimizers.
             with self.sess.as_default():
                 self.sess.run(tf.compat.v1.global_variables_initializer())
@@ -556,7 +560,12 @@ class OffPolicyRLAlgorithm(object):
               log_interval=2000,
               eval_interval=50000,
               save_interval=10000,
-              initial_exploration_steps=10000):
+              initial_exploration_steps=10000,
+              record_transitions=False,
+              keep_last_checkpoints=5,
+              keep_best_checkpoints=1,
+              log_format="csv",
+              print_interval=None):
         """Perform the complete training operation.
 
         Parameters
@@ -579,24 +588,51 @@ class OffPolicyRLAlgorithm(object):
         initial_exploration_steps : int
             number of timesteps that the policy is run before training to
             initialize the replay buffer with samples
+        record_transitions : bool
+            whether to record the transitions collected in the training
+            environment. If set to True, the transitions are stored in the
+            "transitions" folder of log_dir, and may be used to fill the replay
+            buffer of a policy via `load_transitions`.
+        keep_last_checkpoints : int or None
+            the number of most recent checkpoints to keep. If set to None, all
+            checkpoints are kept.
+        keep_best_checkpoints : int
+            the number of checkpoints with the highest evaluation returns to
+            keep, in addition to the most recent checkpoints
+        log_format : str
+            the format of the training and evaluation statistics files. Must
+            be one of {"csv", "npy"}, see `hbaselines.utils.metrics`.
+        print_interval : int or None
+            the number of training steps before printing training results. If
+            set to None, the results are printed every time they are logged.
         """
         # Create a saver object.
-        self.saver = tf.compat.v1.train.Saver(
-            self.trainable_vars,
-            max_to_keep=total_timesteps // save_interval
-        )
+        self.saver = tf.compat.v1.train.Saver(self.trainable_vars)
 
         # Make sure that the log directory exists, and if not, make it.
         ensure_dir(log_dir)
         ensure_dir(os.path.join(log_dir, "checkpoints"))
 
+        # Create an object to write checkpoints in the background.
+        self.checkpoint_writer = CheckpointWriter(
+            self.sess,
+            self.trainable_vars,
+            os.path.join(log_dir, "checkpoints"),
+            keep_last=keep_last_checkpoints,
+            keep_best=keep_best_checkpoints,
+        )
+
         # Create a tensorboard object for logging.
         save_path = os.path.join(log_dir, "tb_log")
         writer = tf.compat.v1.summary.FileWriter(save_path)
 
-        # file path for training and evaluation results
-        train_filepath = os.path.join(log_dir, "train.csv")
-        eval_filepath = os.path.join(log_dir, "eval.csv")
+        # Create an object to write the training and evaluation results.
+        self.metrics = MetricsWriter(log_dir, fmt=log_format)
+
+        # Create an object to record the collected transitions.
+        self.recorder = TransitionRecorder(
+            os.path.join(log_dir, "transitions")) \
+            if record_transitions else None
 
         # Setup the seed value.
         random.seed(seed)
@@ -609,16 +645,12 @@ class OffPolicyRLAlgorithm(object):
 
         eval_steps_incr = 0
         save_steps_incr = 0
+        print_steps_incr = 0
         start_time = time.time()
 
         with self.sess.as_default(), self.graph.as_default():
             # Prepare everything.
-            obs = self.env.reset()
-            self.obs, self.all_obs = self._get_obs(obs)
-
-            # Add the fingerprint term, if needed.
-            self.obs = self._add_fingerprint(
-                self.obs, self.total_steps, total_timesteps)
+            self._reset_env(total_timesteps)
 
             # Collect preliminary random samples.
             print("Collecting initial exploration samples...")
@@ -628,20 +660,17 @@ class OffPolicyRLAlgorithm(object):
             print("Done!")
 
             # Reset total statistics variables.
-            self.episodes = 0
-            self.total_steps = 0
-            self.episode_rew_history = deque(maxlen=100)
+            self._reset_total_statistics()
 
             while True:
                 # Reset epoch-specific variables.
-                self.epoch_episodes = 0
-                self.epoch_episode_steps = []
-                self.epoch_episode_rewards = []
+                self._reset_epoch_statistics()
 
                 for _ in range(round(log_interval / self.nb_rollout_steps)):
                     # If the requirement number of time steps has been met,
                     # terminate training.
                     if self.total_steps >= total_timesteps:
+                        self._close_writers()
                         return
 
                     # Perform rollouts.
@@ -650,66 +679,107 @@ class OffPolicyRLAlgorithm(object):
                     # Train.
                     self._train()
 
-                # Log statistics.
-                self._log_training(train_filepath, start_time)
-
-                # Evaluate.
+                # Log statistics, and print them at every print interval.
+                print_stats = print_interval is None or \
+                    (self.total_steps - print_steps_incr) >= print_interval
+                if print_interval is not None and print_stats:
+                    print_steps_incr += print_interval
+                self._log_training(start_time, print_stats=print_stats)
+
+                # Evaluate. Checkpoints saved at this iteration are scored by
+                # the return of this evaluation, and are not scored if none is
+                # run, so that the best checkpoints match their evaluations.
+                eval_return = None
                 if self.eval_env is not None and \
                         (self.total_steps - eval_steps_incr) >= eval_interval:
                     eval_steps_incr += eval_interval
+                    eval_return = self._run_evaluations(
+                        total_timesteps, start_time)
 
-                    # Run the evaluation operations over the evaluation env(s).
-                    # Note that multiple evaluation envs can be provided.
-                    if isinstance(self.eval_env, list):
-                        eval_rewards = []
-                        eval_successes = []
-                        eval_info = []
-                        for env in self.eval_env:
-                            rew, suc, inf = \
-                                self._evaluate(total_timesteps, env)
-                            eval_rewards.append(rew)
-                            eval_successes.append(suc)
-                            eval_info.append(inf)
-                    else:
-                        eval_rewards, eval_successes, eval_info = \
-                            self._evaluate(total_timesteps, self.eval_env)
-
-                    # Log the evaluation statistics.
-                    self._log_eval(eval_filepath, start_time, eval_rewards,
-                                   eval_successes, eval_info)
-
-                # Run and store summary.
+                # Store the summary. The statistics of the policy are averaged
+                # over the batches it was trained on since the last summary.
                 if writer is not None:
-                    td_map = self.policy_tf.get_td_map()
-
-                    # Check if td_map is empty.
-                    if not td_map:
-                        break
-
-                    td_map.update({
-                        self.rew_ph: np.mean(self.epoch_episode_rewards),
-                        self.rew_history_ph: np.mean(self.episode_rew_history),
+                    summary = self.policy_tf.get_summary()
+                    summary.update({
+                        "Train/return": np.mean(self.epoch_episode_rewards),
+                        "Train/return_history":
+                            np.mean(self.episode_rew_history),
                     })
-                    summary = self.sess.run(self.summary, td_map)
-                    writer.add_summary(summary, self.total_steps)
+                    writer.add_summary(tf.compat.v1.Summary(value=[
+                        tf.compat.v1.Summary.Value(tag=tag, simple_value=val)
+                        for tag, val in sorted(summary.items())
+                    ]), self.total_steps)
 
                 # Save a checkpoint of the model.
                 if (self.total_steps - save_steps_incr) >= save_interval:
                     save_steps_incr += save_interval
-                    self.save(os.path.join(log_dir, "checkpoints/itr"))
+                    self.save(os.path.join(log_dir, "checkpoints/itr"),
+                              score=eval_return)
+
+                    # Save the recorded transitions as well.
+                    if self.recorder is not None:
+                        self.recorder.flush()
 
                 # Update the epoch count.
                 self.epoch += 1
 
-    def save(self, save_path):
+    def _reset_env(self, total_timesteps):
+        """Reset the training environment, and store its observation.
+
+        Parameters
+        ----------
+        total_timesteps : int
+            the total number of samples to train on. Used by the fingerprint
+            element
+        """
+        obs = self.env.reset()
+        self.obs, self.all_obs = self._get_obs(obs)
+
+        # Add the fingerprint term, if needed.
+        self.obs = self._add_fingerprint(
+            self.obs, self.total_steps, total_timesteps)
+
+    def _reset_total_statistics(self):
+        """Reset the statistics accumulated since training began."""
+        self.episodes = 0
+        self.total_steps = 0
+        self.episode_rew_history = deque(maxlen=100)
+
+    def _reset_epoch_statistics(self):
+        """Reset the statistics of the current training iteration."""
+        self.epoch_episodes = 0
+        self.epoch_episode_steps = []
+        self.epoch_episode_rewards = []
+
+    def _close_writers(self):
+        """Write the pending transitions, checkpoints, and statistics."""
+        if self.recorder is not None:
+            self.recorder.close()
+        self.checkpoint_writer.close()
+        self.checkpoint_writer = None
+        self.metrics.close()
+        self.metrics = None
+
+    def save(self, save_path, score=None):
         """Save the parameters of a tensorflow model.
 
+        During training, the parameters are written by a background thread,
+        and older checkpoints are deleted (see the `keep_last_checkpoints` and
+        `keep_best_checkpoints` arguments of `learn`).
+
         Parameters
         ----------
         save_path : str
             Prefix of filenames created for the checkpoint
+        score : float or None
+            the evaluation return of the current parameters, used to keep the
+            best checkpoints. Set to None if they were not evaluated.
         """
-        self.saver.save(self.sess, save_path, global_step=self.total_steps)
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.save(
+                save_path, global_step=self.total_steps, score=score)
+        else:
+            self.saver.save(self.sess, save_path, global_step=self.total_steps)
 
     def load(self, load_path):
         """Load model parameters from a checkpoint.
@@ -721,6 +791,20 @@ class OffPolicyRLAlgorithm(object):
         """
         self.saver.restore(self.sess, load_path)
 
+    def load_transitions(self, load_path):
+        """Fill the replay buffer of the policy with recorded transitions.
+
+        This may be used to warm-start training, or to pretrain the policy
+        without running the environment.
+
+        Parameters
+        ----------
+        load_path : str
+            location of the recorded transitions (see the
+            `record_transitions` argument of `learn`)
+        """
+        load_into_policy(self.policy_tf, load_path, self.reward_scale)
+
     def _collect_samples(self,
                          total_timesteps,
                          run_steps=None,
@@ -796,6 +880,21 @@ class OffPolicyRLAlgorithm(object):
                 all_obs1=new_all_obs,
             )
 
+            # Record the transition.
+            if self.recorder is not None:
+                self.recorder.add(
+                    obs0=self.obs,
+                    context0=context0,
+                    action=action,
+                    reward=reward,
+                    obs1=new_obs,
+                    done=done,
+                    is_final_step=self.episode_step >= self.horizon - 1,
+                    all_obs0=self.all_obs,
+                    all_obs1=new_all_obs,
+                    meta_action=getattr(self.policy_tf, "_meta_action", None),
+                )
+
             # Book-keeping.
             self.total_steps += 1
             self.episode_step += 1
@@ -819,12 +918,7 @@ class OffPolicyRLAlgorithm(object):
                 self.episodes += 1
 
                 # Reset the environment.
-                obs = self.env.reset()
-                self.obs, self.all_obs = self._get_obs(obs)
-
-                # Add the fingerprint term, if needed.
-                self.obs = self._add_fingerprint(
-                    self.obs, self.total_steps, total_timesteps)
+                self._reset_env(total_timesteps)
 
     def _train(self):
         """Perform the training operation.
@@ -854,6 +948,43 @@ class OffPolicyRLAlgorithm(object):
             # Run a step of training from batch.
             _ = self.policy_tf.update(update_actor=update, **kwargs)
 
+    def _run_evaluations(self, total_timesteps, start_time):
+        """Evaluate the policy, and log the evaluation statistics.
+
+        Parameters
+        ----------
+        total_timesteps : int
+            the total number of samples to train on
+        start_time : float
+            the time when training began
+
+        Returns
+        -------
+        float
+            the average return in the first evaluation environment, i.e. the
+            return logged in the "eval_0" file
+        """
+        # Run the evaluation operations over the evaluation env(s). Note that
+        # multiple evaluation envs can be provided.
+        if isinstance(self.eval_env, list):
+            eval_rewards = []
+            eval_successes = []
+            eval_info = []
+            for env in self.eval_env:
+                rew, suc, inf = self._evaluate(total_timesteps, env)
+                eval_rewards.append(rew)
+                eval_successes.append(suc)
+                eval_info.append(inf)
+        else:
+            eval_rewards, eval_successes, eval_info = \
+                self._evaluate(total_timesteps, self.eval_env)
+
+        # Log the evaluation statistics.
+        self._log_eval(start_time, eval_rewards, eval_successes, eval_info)
+
+        return np.mean(eval_rewards[0] if isinstance(self.eval_env, list)
+                       else eval_rewards)
+
     def _evaluate(self, total_timesteps, env):
         """Perform the evaluation operation.
 
@@ -1088,17 +1219,19 @@ class OffPolicyRLAlgorithm(object):
 
         return obs, all_obs
 
-    def _log_training(self, file_path, start_time):
+    def _log_training(self, start_time, print_stats=True):
         """Log training statistics.
 
+        The statistics are written to the "train" file of the metrics writer,
+        if one is available.
+
         Parameters
         ----------
-        file_path : str
-            the list of cumulative rewards from every episode in the evaluation
-            phase
         start_time : float
             the time when training began. This is used to print the total
             training time.
+        print_stats : bool
+            whether to print the statistics as well
         """
         # Log statistics.
         duration = time.time() - start_time
@@ -1118,30 +1251,27 @@ class OffPolicyRLAlgorithm(object):
             'total/episodes': self.episodes,
         }
 
-        # Save combined_stats in a csv file.
-        if file_path is not None:
-            exists = os.path.exists(file_path)
-            with open(file_path, 'a') as f:
-                w = csv.DictWriter(f, fieldnames=combined_stats.keys())
-                if not exists:
-                    w.writeheader()
-                w.writerow(combined_stats)
-
-        # Print statistics.
-        print("-" * 67)
-        for key in sorted(combined_stats.keys()):
-            val = combined_stats[key]
-            print("| {:<30} | {:<30} |".format(key, val))
-        print("-" * 67)
-        print('')
-
-    def _log_eval(self, file_path, start_time, rewards, successes, info):
+        # Save combined_stats in the train file.
+        if self.metrics is not None:
+            self.metrics.write("train", combined_stats)
+
+        # Print statistics, as a single write to the console.
+        if print_stats:
+            lines = ["-" * 67]
+            for key in sorted(combined_stats.keys()):
+                val = combined_stats[key]
+                lines.append("| {:<30} | {:<30} |".format(key, val))
+            lines.append("-" * 67)
+            print("\n".join(lines) + "\n")
+
+    def _log_eval(self, start_time, rewards, successes, info):
         """Log evaluation statistics.
 
+        The statistics of every evaluation environment are written to the
+        "eval_<i>" file of the metrics writer, if one is available.
+
         Parameters
         ----------
-        file_path : str
-            path to the evaluation csv file
         start_time : float
             the time when training began. This is used to print the total
             training time.
@@ -1178,15 +1308,7 @@ class OffPolicyRLAlgorithm(object):
             # Add additional evaluation information.
             evaluation_stats.update(info_i)
 
-            if file_path is not None:
-                # Add an evaluation number to the csv file in case of multiple
+            if self.metrics is not None:
+                # Add an evaluation number to the file in case of multiple
                 # evaluation environments.
-                eval_fp = file_path[:-4] + "_{}.csv".format(i)
-                exists = os.path.exists(eval_fp)
-
-                # Save evaluation statistics in a csv file.
-                with open(eval_fp, "a") as f:
-                    w = csv.DictWriter(f, fieldnames=evaluation_stats.keys())
-                    if not exists:
-                        w.writeheader()
-                    w.writerow(evaluation_stats)
+                self.metrics.write("eval_{}".format(i), evaluation_stats)
@@ -0,0 +1,668 @@
+"""Script contain an off-policy algorithm that trains several seeds at once.
+
+The parameters of every seed are stored in stacked tensors of a single
+feed-forward policy (see the `num_models` argument of the TD3 and SAC
+feed-forward policies). The actions of all seeds are computed by a single call
+to the policy, and all seeds are updated by a single optimizer step, while
+every seed keeps its own environments, replay buffer, and statistics.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from hbaselines.algorithms.off_policy import OffPolicyRLAlgorithm
+from hbaselines.algorithms.utils import is_feedforward_policy
+from hbaselines.utils.misc import ensure_dir
+from hbaselines.utils.env_util import create_env
+from hbaselines.utils.metrics import MetricsWriter
+
+
+class SeedEnsembleRLAlgorithm(OffPolicyRLAlgorithm):
+    """Off-policy RL algorithm that trains several seeds of a policy at once.
+
+    Every seed is trained on its own copy of the environment, and all copies
+    are stepped together, with the actions of every seed computed by a single
+    call to the policy. The number of steps (e.g. `total_timesteps` and the
+    logging intervals) counts the steps performed by every seed, so that each
+    seed is trained for the same number of steps as a single-seed run.
+
+    The statistics of every seed are written to the "seed_<i>" subdirectory of
+    the log directory, while the log directory contains the statistics of the
+    episodes of all seeds, as well as the tensorboard summaries and the
+    checkpoints, which contain the parameters of every seed.
+
+    Only the feed-forward policies are supported.
+
+    Attributes
+    ----------
+    num_seeds : int
+        the number of seeds that are trained
+    env : list of gym.Env
+        the training environment of every seed
+    eval_env : list of gym.Env or list of list of gym.Env or None
+        the evaluation environment(s) of every seed
+    obs : list of array_like
+        the most recent training observation of every seed
+    episode_step : list of int
+        the number of steps since the most recent rollout of every seed began
+    episode_reward : list of float
+        the cumulative reward since the most recent rollout of every seed
+        began
+    seed_episodes : list of int
+        the total number of rollouts performed by every seed since training
+        began
+    seed_epoch_episode_rewards : list of list of float
+        the cumulative rollout rewards of every seed from the most recent
+        training iterations
+    seed_epoch_episode_steps : list of list of int
+        the rollout lengths of every seed from the most recent training
+        iterations
+    seed_episode_rew_history : list of deque
+        the cumulative return from the last 100 training episodes of every
+        seed
+    seed_metrics : list of hbaselines.utils.metrics.MetricsWriter or None
+        the objects that write the training and evaluation statistics of every
+        seed. None outside of `learn`.
+    """
+
+    def __init__(self,
+                 policy,
+                 env,
+                 num_seeds,
+                 eval_env=None,
+                 nb_train_steps=1,
+                 nb_rollout_steps=1,
+                 nb_eval_episodes=50,
+                 actor_update_freq=2,
+                 meta_update_freq=10,
+                 reward_scale=1.,
+                 render=False,
+                 render_eval=False,
+                 eval_deterministic=True,
+                 verbose=0,
+                 num_cpus=3,
+                 policy_kwargs=None,
+                 _init_setup_model=True):
+        """Instantiate the algorithm object.
+
+        Parameters
+        ----------
+        policy : type [ hbaselines.base_policies.ActorCriticPolicy ]
+            the policy model to use. Must be a feed-forward policy.
+        env : str or list of gym.Env
+            the name of the environment to learn from, or the environment of
+            every seed
+        num_seeds : int
+            the number of seeds that are trained
+        eval_env : str or list of gym.Env or None
+            the name of the environment to evaluate from, or the evaluation
+            environment of every seed
+        nb_train_steps : int
+            the number of training steps
+        nb_rollout_steps : int
+            the number of rollout steps. Every rollout step collects one sample
+            for every seed.
+        nb_eval_episodes : int
+            the number of evaluation episodes of every seed
+        actor_update_freq : int
+            number of training steps per actor policy update step. The critic
+            policy is updated every training step.
+        meta_update_freq : int
+            unused by this algorithm, which only supports feed-forward policies
+        reward_scale : float
+            the value the reward should be scaled by
+        render : bool
+            enable rendering of the training environment of the first seed
+        render_eval : bool
+            enable rendering of the evaluation environment of the first seed
+        eval_deterministic : bool
+            if set to True, the policy provides deterministic actions to the
+            evaluation environment. Otherwise, stochastic or noisy actions are
+            returned.
+        verbose : int
+            the verbosity level: 0 none, 1 training information, 2 tensorflow
+            debug
+        num_cpus : int
+            the number of threads used by tensorflow to run operations
+        policy_kwargs : dict
+            policy-specific hyperparameters
+        _init_setup_model : bool
+            Whether or not to build the network at the creation of the instance
+
+        Raises
+        ------
+        ValueError
+            if the policy is not a feed-forward policy, if fingerprints are
+            used, or if the number of environments does not match the number
+            of seeds
+        """
+        if not is_feedforward_policy(policy):
+            raise ValueError(
+                "Seed ensembles only support feed-forward policies.")
+        if (policy_kwargs or {}).get("use_fingerprints", False):
+            raise ValueError("Seed ensembles do not support fingerprints.")
+
+        # Create the environments of every seed.
+        env = self._create_envs(env, num_seeds, render, evaluate=False)
+        eval_env = self._create_envs(
+            eval_env, num_seeds, render_eval, evaluate=True)
+
+        # Stack the parameters of every seed within the policy.
+        policy_kwargs = dict(policy_kwargs or {}, num_models=num_seeds)
+
+        super(SeedEnsembleRLAlgorithm, self).__init__(
+            policy=policy,
+            env=env[0],
+            eval_env=None,
+            nb_train_steps=nb_train_steps,
+            nb_rollout_steps=nb_rollout_steps,
+            nb_eval_episodes=nb_eval_episodes,
+            actor_update_freq=actor_update_freq,
+            meta_update_freq=meta_update_freq,
+            reward_scale=reward_scale,
+            render=render,
+            render_eval=render_eval,
+            eval_deterministic=eval_deterministic,
+            verbose=verbose,
+            num_cpus=num_cpus,
+            policy_kwargs=policy_kwargs,
+            _init_setup_model=False,
+        )
+
+        self.num_seeds = num_seeds
+        self.env = env
+        self.eval_env = eval_env
+
+        # The environments are stepped from a thread pool, similar to the
+        # environment workers of the DAgger algorithm.
+        self._pool = ThreadPoolExecutor(max_workers=num_seeds) \
+            if num_seeds > 1 else None
+
+        # init
+        self.episode_step = [0] * num_seeds
+        self.episode_reward = [0] * num_seeds
+        self.seed_episodes = None
+        self.seed_epoch_episode_rewards = None
+        self.seed_epoch_episode_steps = None
+        self.seed_episode_rew_history = None
+        self.seed_metrics = None
+        self._reset_total_statistics()
+        self._reset_epoch_statistics()
+
+        # Create the model variables and operations.
+        if _init_setup_model:
+            self.trainable_vars = self.setup_model()
+
+    @staticmethod
+    def _create_envs(env, num_seeds, render, evaluate):
+        """Return the environment(s) of every seed.
+
+        Parameters
+        ----------
+        env : str or list of gym.Env or None
+            the name of the environment, or the environment of every seed
+        num_seeds : int
+            the number of seeds
+        render : bool
+            whether to render the environment of the first seed
+        evaluate : bool
+            specifies whether these are training or evaluation environments
+
+        Returns
+        -------
+        list of gym.Env or list of list of gym.Env or None
+            the environment(s) of every seed
+
+        Raises
+        ------
+        ValueError
+            if the number of environments does not match the number of seeds
+        """
+        if env is None:
+            return None
+        elif isinstance(env, str):
+            return [create_env(env, render and i == 0, evaluate=evaluate)
+                    for i in range(num_seeds)]
+        elif not isinstance(env, list) or len(env) != num_seeds:
+            raise ValueError(
+                "Expected the name of an environment or a list of {} "
+                "environments, got: {}".format(num_seeds, env))
+        else:
+            return env
+
+    def _map(self, fn):
+        """Apply a function to every seed.
+
+        Parameters
+        ----------
+        fn : function
+            the function to apply. Takes as input the index of a seed
+
+        Returns
+        -------
+        list
+            the output from each seed, in order
+        """
+        if self._pool is None:
+            return [fn(i) for i in range(self.num_seeds)]
+        else:
+            return list(self._pool.map(fn, range(self.num_seeds)))
+
+    @staticmethod
+    def _get_contexts(envs):
+        """Return the contextual term of the environment of every seed.
+
+        Returns
+        -------
+        list of array_like or None
+            the contextual term of each environment. None if it is not passed
+            by the environments.
+        """
+        if not hasattr(envs[0], "current_context"):
+            return None
+        return [env.current_context for env in envs]
+
+    def learn(self,
+              total_timesteps,
+              log_dir=None,
+              seed=None,
+              log_interval=2000,
+              eval_interval=50000,
+              save_interval=10000,
+              initial_exploration_steps=10000,
+              record_transitions=False,
+              keep_last_checkpoints=5,
+              keep_best_checkpoints=1,
+              log_format="csv",
+              print_interval=None):
+        """See parent class.
+
+        Raises
+        ------
+        ValueError
+            if `record_transitions` is set to True, which is not supported by
+            this algorithm
+        """
+        if record_transitions:
+            raise ValueError(
+                "Seed ensembles do not support recording transitions.")
+
+        # Create an object to write the results of every seed.
+        self.seed_metrics = []
+        for i in range(self.num_seeds):
+            seed_dir = os.path.join(log_dir, "seed_{}".format(i))
+            ensure_dir(seed_dir)
+            self.seed_metrics.append(MetricsWriter(seed_dir, fmt=log_format))
+
+        super(SeedEnsembleRLAlgorithm, self).learn(
+            total_timesteps=total_timesteps,
+            log_dir=log_dir,
+            seed=seed,
+            log_interval=log_interval,
+            eval_interval=eval_interval,
+            save_interval=save_interval,
+            initial_exploration_steps=initial_exploration_steps,
+            record_transitions=False,
+            keep_last_checkpoints=keep_last_checkpoints,
+            keep_best_checkpoints=keep_best_checkpoints,
+            log_format=log_format,
+            print_interval=print_interval,
+        )
+
+    def load_transitions(self, load_path):
+        """See parent class.
+
+        Raises
+        ------
+        ValueError
+            always, since loading transitions is not supported by this
+            algorithm
+        """
+        raise ValueError("Seed ensembles do not support loading transitions.")
+
+    def _close_writers(self):
+        """See parent class."""
+        super(SeedEnsembleRLAlgorithm, self)._close_writers()
+        for metrics in self.seed_metrics:
+            metrics.close()
+        self.seed_metrics = None
+
+    def _policy(self, obs, context, apply_noise=True, random_actions=False):
+        """Compute the actions of every seed.
+
+        The observations and contexts of all seeds are stacked, and passed to
+        the policy in a single call. See the parent class for a description of
+        the arguments.
+
+        Returns
+        -------
+        np.ndarray
+            the action of every seed
+        """
+        obs = np.array(obs).reshape(
+            (self.num_seeds, 1) + self.observation_space.shape)
+        if context is not None:
+            context = np.array(context).reshape((self.num_seeds, 1, -1))
+
+        action = self.policy_tf.get_action(
+            obs, context,
+            apply_noise=apply_noise,
+            random_actions=random_actions
+        )
+
+        return action.reshape((self.num_seeds,) + self.action_space.shape)
+
+    def _reset_env(self, total_timesteps):
+        """Reset the training environment of every seed."""
+        del total_timesteps  # fingerprints are not used by this algorithm
+        self.obs = self._map(lambda i: self.env[i].reset())
+        self.all_obs = None
+
+    def _reset_total_statistics(self):
+        """See parent class."""
+        super(SeedEnsembleRLAlgorithm, self)._reset_total_statistics()
+        self.seed_episodes = [0] * self.num_seeds
+        self.seed_episode_rew_history = [
+            deque(maxlen=100) for _ in range(self.num_seeds)]
+
+    def _reset_epoch_statistics(self):
+        """See parent class."""
+        super(SeedEnsembleRLAlgorithm, self)._reset_epoch_statistics()
+        self.seed_epoch_episode_rewards = [[] for _ in range(self.num_seeds)]
+        self.seed_epoch_episode_steps = [[] for _ in range(self.num_seeds)]
+
+    def _collect_samples(self,
+                         total_timesteps,
+                         run_steps=None,
+                         random_actions=False):
+        """Perform the sample collection operation.
+
+        Every rollout step collects one sample for every seed, and stores it
+        in the replay buffer of the seed. See the parent class for a
+        description of the arguments.
+        """
+        for _ in range(run_steps or self.nb_rollout_steps):
+            # Collect the contextual term. None if it is not passed.
+            context = self._get_contexts(self.env)
+
+            # Predict the next action of every seed. Use random actions when
+            # initializing the replay buffers.
+            action = self._policy(
+                self.obs, context,
+                apply_noise=True,
+                random_actions=random_actions,
+            )
+
+            # Execute the next actions.
+            ret = self._map(lambda i: self.env[i].step(action[i]))
+            new_obs, reward, done, _ = zip(*ret)
+
+            # Visualize the current step.
+            if self.render:
+                self.env[0].render()  # pragma: no cover
+
+            # Get the contextual term.
+            context0 = context1 = self._get_contexts(self.env)
+
+            # Store a transition in the replay buffer of every seed. The
+            # terminal flag is chosen to match the TD3 implementation (see
+            # Appendix 1 of their paper).
+            self._store_transition(
+                obs0=self.obs,
+                context0=context0,
+                action=action,
+                reward=np.array(reward, dtype=np.float64),
+                obs1=new_obs,
+                context1=context1,
+                terminal1=done,
+                is_final_step=[step >= self.horizon - 1
+                               for step in self.episode_step],
+            )
+
+            # Book-keeping.
+            self.total_steps += 1
+            for i in range(self.num_seeds):
+                self.episode_step[i] += 1
+                self.episode_reward[i] += reward[i]
+
+                # Update the current observation.
+                self.obs[i] = new_obs[i]
+
+                if done[i]:
+                    # Episode done.
+                    self.epoch_episode_rewards.append(self.episode_reward[i])
+                    self.episode_rew_history.append(self.episode_reward[i])
+                    self.epoch_episode_steps.append(self.episode_step[i])
+                    self.seed_epoch_episode_rewards[i].append(
+                        self.episode_reward[i])
+                    self.seed_episode_rew_history[i].append(
+                        self.episode_reward[i])
+                    self.seed_epoch_episode_steps[i].append(
+                        self.episode_step[i])
+                    self.episode_reward[i] = 0
+                    self.episode_step[i] = 0
+                    self.epoch_episodes += 1
+                    self.episodes += 1
+                    self.seed_episodes[i] += 1
+
+                    # Reset the environment.
+                    self.obs[i] = self.env[i].reset()
+
+    def _run_evaluations(self, total_timesteps, start_time):
+        """See parent class.
+
+        The returned value is the average return of all seeds.
+        """
+        # Group the evaluation environments of all seeds. Note that multiple
+        # evaluation envs can be provided.
+        if isinstance(self.eval_env[0], list):
+            eval_envs = [list(envs) for envs in zip(*self.eval_env)]
+        else:
+            eval_envs = [self.eval_env]
+
+        eval_rewards = []
+        eval_successes = []
+        eval_info = []
+        for envs in eval_envs:
+            rew, suc, inf = self._evaluate(total_timesteps, envs)
+            eval_rewards.append(rew)
+            eval_successes.append(suc)
+            eval_info.append(inf)
+
+        # Log the evaluation statistics.
+        self._log_eval(start_time, eval_rewards, eval_successes, eval_info)
+
+        return np.mean(eval_rewards[0])
+
+    def _evaluate(self, total_timesteps, env):
+        """Perform the evaluation operation.
+
+        This method runs the evaluation environment of every seed for a
+        number of episodes. The episodes of all seeds begin together, and the
+        environments of seeds whose episode is done are not stepped until the
+        episodes of all seeds are done.
+
+        Parameters
+        ----------
+        total_timesteps : int
+            the total number of samples to train on
+        env : list of gym.Env
+            the evaluation environment of every seed
+
+        Returns
+        -------
+        list of list of float
+            the cumulative rewards from every episode of every seed
+        list of list of bool
+            the success of every episode of every seed. If the lists are
+            empty, then the environment did not output successes or failures.
+        list of dict
+            additional information that is meant to be logged, for every seed
+        """
+        del total_timesteps  # fingerprints are not used by this algorithm
+
+        eval_episode_rewards = [[] for _ in range(self.num_seeds)]
+        eval_episode_successes = [[] for _ in range(self.num_seeds)]
+        ret_info = [{'initial': [], 'final': [], 'average': []}
+                    for _ in range(self.num_seeds)]
+
+        if self.verbose >= 1:
+            for _ in range(3):
+                print("-------------------")
+            print("Running evaluation for {} episodes per seed:".format(
+                self.nb_eval_episodes))
+
+        for i in range(self.nb_eval_episodes):
+            # Reset the environments.
+            eval_obs = self._map(lambda k: env[k].reset())
+
+            # Reset rollout-specific variables.
+            eval_episode_reward = [0.] * self.num_seeds
+            rets = [[] for _ in range(self.num_seeds)]
+            active = [True] * self.num_seeds
+
+            while any(active):
+                # Collect the contextual term. None if it is not passed.
+                context = self._get_contexts(env)
+
+                eval_action = self._policy(
+                    eval_obs, context,
+                    apply_noise=not self.eval_deterministic,
+                    random_actions=False,
+                )
+
+                # Only step the environments whose episode is not done.
+                ret = self._map(lambda k: env[k].step(eval_action[k])
+                                if active[k] else None)
+
+                # Visualize the current step.
+                if self.render_eval:
+                    env[0].render()  # pragma: no cover
+
+                for k, ret_k in enumerate(ret):
+                    if ret_k is None:
+                        continue
+                    obs, eval_r, done, info = ret_k
+
+                    # Add the distance to this list for logging purposes
+                    # (applies only to the Ant* environments).
+                    if context is not None:
+                        rets[k].append(env[k].contextual_reward(
+                            eval_obs[k], env[k].current_context, obs))
+
+                    # Update the previous step observation, and increment the
+                    # reward.
+                    eval_obs[k] = obs
+                    eval_episode_reward[k] += eval_r
+
+                    if done:
+                        active[k] = False
+                        eval_episode_rewards[k].append(eval_episode_reward[k])
+                        maybe_is_success = info.get('is_success')
+                        if maybe_is_success is not None:
+                            eval_episode_successes[k].append(
+                                float(maybe_is_success))
+
+                        if context is not None:
+                            ret_info[k]['initial'].append(rets[k][0])
+                            ret_info[k]['final'].append(rets[k][-1])
+                            ret_info[k]['average'].append(
+                                float(np.mean(rets[k])))
+
+            if self.verbose >= 1:
+                print("%d/%d" % (i + 1, self.nb_eval_episodes))
+
+        if self.verbose >= 1:
+            print("Done.")
+            print("Average return: {}".format(np.mean(eval_episode_rewards)))
+            for _ in range(3):
+                print("-------------------")
+            print("")
+
+        # get the average of the reward information
+        ret_info = [{key: np.mean(val) for key, val in info_k.items()}
+                    for info_k in ret_info]
+
+        return eval_episode_rewards, eval_episode_successes, ret_info
+
+    def _log_training(self, start_time, print_stats=True):
+        """Log training statistics.
+
+        The statistics of the episodes of all seeds are logged (and printed)
+        as in the parent class, and the statistics of every seed are written
+        to the "train" file of its metrics writer, if one is available.
+        """
+        super(SeedEnsembleRLAlgorithm, self)._log_training(
+            start_time, print_stats=print_stats)
+
+        if self.seed_metrics is None:
+            return
+
+        duration = time.time() - start_time
+
+        for i, metrics in enumerate(self.seed_metrics):
+            metrics.write("train", {
+                # Rollout statistics.
+                'rollout/episodes': len(self.seed_epoch_episode_rewards[i]),
+                'rollout/episode_steps':
+                    np.mean(self.seed_epoch_episode_steps[i]),
+                'rollout/return': np.mean(self.seed_epoch_episode_rewards[i]),
+                'rollout/return_history':
+                    np.mean(self.seed_episode_rew_history[i]),
+
+                # Total statistics.
+                'total/epochs': self.epoch + 1,
+                'total/steps': self.total_steps,
+                'total/duration': duration,
+                'total/steps_per_second': self.total_steps / duration,
+                'total/episodes': self.seed_episodes[i],
+            })
+
+    def _log_eval(self, start_time, rewards, successes, info):
+        """Log evaluation statistics.
+
+        The statistics of the episodes of all seeds are logged as in the
+        parent class, and the statistics of every seed are written to the
+        "eval_<i>" files of its metrics writer, if one is available.
+
+        Parameters
+        ----------
+        start_time : float
+            the time when training began
+        rewards : list of list of list of float
+            the cumulative rewards from every episode of every seed, for every
+            evaluation environment
+        successes : list of list of list of bool
+            the success of every episode of every seed, for every evaluation
+            environment
+        info : list of list of dict
+            additional information that is meant to be logged, for every seed
+            and evaluation environment
+        """
+        super(SeedEnsembleRLAlgorithm, self)._log_eval(
+            start_time,
+            rewards=[sum(rew, []) for rew in rewards],
+            successes=[sum(suc, []) for suc in successes],
+            info=[{key: np.mean([info_k[key] for info_k in info_i])
+                   for key in info_i[0].keys()} for info_i in info],
+        )
+
+        if self.seed_metrics is None:
+            return
+
+        duration = time.time() - start_time
+
+        for i, (rew, suc, info_i) in enumerate(zip(rewards, successes, info)):
+            for k, metrics in enumerate(self.seed_metrics):
+                evaluation_stats = {
+                    "duration": duration,
+                    "total_step": self.total_steps,
+                    "success_rate": np.mean(suc[k]) if len(suc[k]) > 0 else 0,
+                    "average_return": np.mean(rew[k])
+                }
+                # Add additional evaluation information.
+                evaluation_stats.update(info_i[k])
+
+                metrics.write("eval_{}".format(i), evaluation_stats)
@@ -4,6 +4,7 @@ import tensorflow as tf
 
 from hbaselines.utils.tf_util import get_trainable_vars
 from hbaselines.utils.tf_util import get_target_updates
+from hbaselines.utils.misc import StreamingMean
 
 
 class ActorCriticPolicy(object):
@@ -43,6 +44,19 @@ class ActorCriticPolicy(object):
         specifies whether to use the huber distance function as the loss for
         the critic. If set to False, the mean-squared error metric is used
         instead
+    use_xla : bool
+        whether to compile the update operations of the policy with XLA.
+        If XLA is not available, the operations are not compiled.
+    fused_critics : bool
+        whether to represent the twin critics as a single network with stacked
+        parameters, trained by a single optimizer
+    summary_tensors : dict < str, tf.Tensor >
+        the scalar tensorboard summaries of the policy, by tag. These are
+        fetched alongside the training operations, so that the summaries can be
+        logged without processing an additional batch.
+    summary_stats : hbaselines.utils.misc.StreamingMean
+        the average value of the fetched summaries since the last call to
+        `get_summary`
     """
 
     def __init__(self,
@@ -60,7 +74,9 @@ class ActorCriticPolicy(object):
                  layer_norm,
                  layers,
                  act_fun,
-                 use_huber):
+                 use_huber,
+                 use_xla,
+                 fused_critics):
         """Instantiate the base policy object.
 
         Parameters
@@ -98,6 +114,12 @@ class ActorCriticPolicy(object):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer
         """
         self.sess = sess
         self.ob_space = ob_space
@@ -114,6 +136,15 @@ class ActorCriticPolicy(object):
         self.layer_norm = layer_norm
         self.act_fun = act_fun
         self.use_huber = use_huber
+        self.use_xla = use_xla
+        self.fused_critics = fused_critics
+        self.summary_tensors = {}
+        self.summary_stats = StreamingMean()
+
+        # the number of summaries created before the policy, used to collect
+        # the summary tensors of the policy
+        self._summaries_start = len(tf.compat.v1.get_collection(
+            tf.compat.v1.GraphKeys.SUMMARIES))
 
     def initialize(self):
         """Initialize the policy.
@@ -202,6 +233,22 @@ class ActorCriticPolicy(object):
         """Return dict map for the summary (to be run in the algorithm)."""
         raise NotImplementedError
 
+    def get_summary(self):
+        """Return the tensorboard statistics of the recent training steps.
+
+        The statistics are the averages of the scalar summaries of the policy
+        over the batches it was trained on since the last call to this method.
+
+        Returns
+        -------
+        dict < str, float >
+            the average value of every scalar summary, by tag. Empty if the
+            policy was not trained since the last call.
+        """
+        summary = self.summary_stats.mean()
+        self.summary_stats.reset()
+        return summary
+
     @staticmethod
     def _get_obs(obs, context, axis=0):
         """Return the processed observation.
@@ -114,12 +114,29 @@ class AntMazeEnv(gym.Env):
             (x - torso_x, y - torso_y)
             for x, y in self._find_all_robots()]
 
+        # Line segments (corresponding to the outer boundary) of each
+        # immovable block or drop-off, used by the range sensors.
+        self._static_segments, self._static_segment_types = \
+            self._get_static_segments()
+
         self._xy_to_rowcol = lambda x, y: (
             2 + (y + size_scaling / 2) / size_scaling,
             2 + (x + size_scaling / 2) / size_scaling)
         # walls (immovable), chasms (fall), movable blocks
         self._view = np.zeros([5, 5, 3])
 
+        # Rasterized immovable blocks and chasms, as well as the positions of
+        # every row and column of the maze, used by the top-down view. These
+        # do not depend on the position of the robot.
+        self._static_layers = np.array([
+            [[float(struct == 1) for struct in row] for row in structure],
+            [[float(struct == -1) for struct in row] for row in structure],
+        ])
+        self._maze_ys = np.array([
+            i * size_scaling - torso_y for i in range(len(structure))])
+        self._maze_xs = np.array([
+            j * size_scaling - torso_x for j in range(len(structure[0]))])
+
         height_offset = 0.
         if self.elevated:
             # Increase initial z-pos of ant.
@@ -282,123 +299,155 @@ class AntMazeEnv(gym.Env):
         return self.wrapped_env.get_ori()
 
     def get_top_down_view(self):
-        """Return the top-down view."""
-        self._view = np.zeros_like(self._view)
-
-        def valid(row, col):
-            return self._view.shape[0] > row >= 0 and self._view.shape[
-                1] > col >= 0
-
-        def update_view(x, y, d, row=None, col=None):
-            if row is None or col is None:
-                x = x - self._robot_x
-                y = y - self._robot_y
-                # th = self._robot_ori
-
-                row, col = self._xy_to_rowcol(x, y)
-                update_view(x, y, d, row=row, col=col)
-                return
-
-            row, row_frac, col, col_frac = int(row), row % 1, int(col), col % 1
-            if row_frac < 0:
-                row_frac += 1
-            if col_frac < 0:
-                col_frac += 1
-
-            if valid(row, col):
-                self._view[row, col, d] += (
-                        (min(1., row_frac + 0.5) - max(0., row_frac - 0.5)) *
-                        (min(1., col_frac + 0.5) - max(0., col_frac - 0.5)))
-            if valid(row - 1, col):
-                self._view[row - 1, col, d] += (
-                        (max(0., 0.5 - row_frac)) *
-                        (min(1., col_frac + 0.5) - max(0., col_frac - 0.5)))
-            if valid(row + 1, col):
-                self._view[row + 1, col, d] += (
-                        (max(0., row_frac - 0.5)) *
-                        (min(1., col_frac + 0.5) - max(0., col_frac - 0.5)))
-            if valid(row, col - 1):
-                self._view[row, col - 1, d] += (
-                        (min(1., row_frac + 0.5) - max(0., row_frac - 0.5)) *
-                        (max(0., 0.5 - col_frac)))
-            if valid(row, col + 1):
-                self._view[row, col + 1, d] += (
-                        (min(1., row_frac + 0.5) - max(0., row_frac - 0.5)) *
-                        (max(0., col_frac - 0.5)))
-            if valid(row - 1, col - 1):
-                self._view[row - 1, col - 1, d] += (
-                        (max(0., 0.5 - row_frac)) * max(0., 0.5 - col_frac))
-            if valid(row - 1, col + 1):
-                self._view[row - 1, col + 1, d] += (
-                        (max(0., 0.5 - row_frac)) * max(0., col_frac - 0.5))
-            if valid(row + 1, col + 1):
-                self._view[row + 1, col + 1, d] += (
-                        (max(0., row_frac - 0.5)) * max(0., col_frac - 0.5))
-            if valid(row + 1, col - 1):
-                self._view[row + 1, col - 1, d] += (
-                        (max(0., row_frac - 0.5)) * max(0., 0.5 - col_frac))
-
+        """Return the top-down view.
+
+        Every block is splatted onto the cells of the view surrounding its
+        position relative to the robot. This is separable along the rows and
+        columns of the view, so the immovable blocks and chasms are computed
+        from the pre-rasterized static layers of the maze via two small matrix
+        products, while the movable blocks are splatted together in the same
+        manner.
+        """
         # Draw ant.
         robot_x, robot_y = self.wrapped_env.get_body_com("torso")[:2]
         self._robot_x = robot_x
         self._robot_y = robot_y
         self._robot_ori = self.get_ori()
 
-        structure = self.MAZE_STRUCTURE
-        size_scaling = self.MAZE_SIZE_SCALING
-        # height = self.MAZE_HEIGHT
+        self._view = np.zeros_like(self._view)
 
         # Draw immovable blocks and chasms.
-        for i in range(len(structure)):
-            for j in range(len(structure[0])):
-                if structure[i][j] == 1:  # Wall.
-                    update_view(j * size_scaling - self._init_torso_x,
-                                i * size_scaling - self._init_torso_y,
-                                0)
-                if structure[i][j] == -1:  # Chasm.
-                    update_view(j * size_scaling - self._init_torso_x,
-                                i * size_scaling - self._init_torso_y,
-                                1)
+        row_weights = self._splat_weights(
+            self._maze_ys - robot_y, self._view.shape[0])
+        col_weights = self._splat_weights(
+            self._maze_xs - robot_x, self._view.shape[1])
+        for d in range(2):
+            self._view[:, :, d] = \
+                row_weights.dot(self._static_layers[d]).dot(col_weights.T)
 
         # Draw movable blocks.
-        for block_name, block_type in self.movable_blocks:
-            block_x, block_y = self.wrapped_env.get_body_com(block_name)[:2]
-            update_view(block_x, block_y, 2)
+        if len(self.movable_blocks) > 0:
+            block_xy = np.array([
+                self.wrapped_env.get_body_com(block_name)[:2]
+                for block_name, _ in self.movable_blocks])
+            row_weights = self._splat_weights(
+                block_xy[:, 1] - robot_y, self._view.shape[0])
+            col_weights = self._splat_weights(
+                block_xy[:, 0] - robot_x, self._view.shape[1])
+            self._view[:, :, 2] = row_weights.dot(col_weights.T)
 
         return self._view
 
-    def get_range_sensor_obs(self):
-        """Return egocentric range sensor observations of maze."""
-        robot_x, robot_y, robot_z = self.wrapped_env.get_body_com("torso")[:3]
-        ori = self.get_ori()
+    def _splat_weights(self, pos, size):
+        """Return the weight of every position in each row/column of the view.
+
+        Every object is treated as a unit square centered at its (fractional)
+        row/column in the view, and the weights are the overlap of this square
+        with each row/column.
+
+        Parameters
+        ----------
+        pos : array_like
+            the y (for rows) or x (for columns) coordinates of the objects,
+            relative to the robot
+        size : int
+            the number of rows/columns in the view
+
+        Returns
+        -------
+        array_like
+            the weights of every object in each row/column, of shape
+            (size, len(pos))
+        """
+        size_scaling = self.MAZE_SIZE_SCALING
+        pos = 2 + (np.asarray(pos) + size_scaling / 2) / size_scaling
+        index = np.trunc(pos).astype(int)
+        frac = pos % 1
+
+        # weights of the previous, current, and next row/column
+        offset_weights = [
+            np.maximum(0., 0.5 - frac),
+            np.minimum(1., frac + 0.5) - np.maximum(0., frac - 0.5),
+            np.maximum(0., frac - 0.5),
+        ]
+
+        weights = np.zeros((size, len(pos)))
+        for offset, weight in zip([-1, 0, 1], offset_weights):
+            target = index + offset
+            valid = np.logical_and(target >= 0, target < size)
+            weights[target[valid], np.nonzero(valid)[0]] += weight[valid]
+
+        return weights
+
+    def _get_static_segments(self):
+        """Return the line segments of every immovable block or drop-off.
 
+        Returns
+        -------
+        array_like
+            the (x1, y1, x2, y2) values of the start and stop points of every
+            segment, of shape (S, 4)
+        array_like
+            the structure type of every segment, of shape (S,)
+        """
         structure = self.MAZE_STRUCTURE
         size_scaling = self.MAZE_SIZE_SCALING
-        height = self.MAZE_HEIGHT
 
         segments = []
-        # Get line segments (corresponding to outer boundary) of each immovable
-        # block or drop-off.
+        segment_types = []
         for i in range(len(structure)):
             for j in range(len(structure[0])):
                 if structure[i][j] in [1, -1]:  # There's a wall or drop-off.
                     cx = j * size_scaling - self._init_torso_x
                     cy = i * size_scaling - self._init_torso_y
-                    x1 = cx - 0.5 * size_scaling
-                    x2 = cx + 0.5 * size_scaling
-                    y1 = cy - 0.5 * size_scaling
-                    y2 = cy + 0.5 * size_scaling
-                    struct_segments = [
-                        ((x1, y1), (x2, y1)),
-                        ((x2, y1), (x2, y2)),
-                        ((x2, y2), (x1, y2)),
-                        ((x1, y2), (x1, y1)),
-                    ]
-                    for seg in struct_segments:
-                        segments.append(dict(
-                            segment=seg,
-                            type=structure[i][j],
-                        ))
+                    segments.extend(self._block_segments(cx, cy))
+                    segment_types.extend([structure[i][j]] * 4)
+
+        return np.array(segments, dtype=np.float64).reshape(-1, 4), \
+            np.array(segment_types, dtype=np.int64)
+
+    def _block_segments(self, cx, cy):
+        """Return the line segments of the outer boundary of a block.
+
+        Parameters
+        ----------
+        cx : float
+            x-coordinate of the center of the block
+        cy : float
+            y-coordinate of the center of the block
+
+        Returns
+        -------
+        list of (float, float, float, float)
+            the (x1, y1, x2, y2) values of the four segments
+        """
+        size_scaling = self.MAZE_SIZE_SCALING
+        x1 = cx - 0.5 * size_scaling
+        x2 = cx + 0.5 * size_scaling
+        y1 = cy - 0.5 * size_scaling
+        y2 = cy + 0.5 * size_scaling
+        return [
+            (x1, y1, x2, y1),
+            (x2, y1, x2, y2),
+            (x2, y2, x1, y2),
+            (x1, y2, x1, y1),
+        ]
+
+    def get_range_sensor_obs(self):
+        """Return egocentric range sensor observations of maze.
+
+        The static segments of the maze are computed once during
+        initialization, and all rays are tested against all segments at once
+        via `maze_env_utils.nearest_ray_segment_intersect`.
+        """
+        robot_x, robot_y, robot_z = self.wrapped_env.get_body_com("torso")[:3]
+        ori = self.get_ori()
+
+        size_scaling = self.MAZE_SIZE_SCALING
+        height = self.MAZE_HEIGHT
+
+        segments = [self._static_segments]
+        segment_types = [self._static_segment_types]
         # Get line segments (corresponding to outer boundary) of each movable
         # block within the agent's z-view.
         for block_name, block_type in self.movable_blocks:
@@ -407,55 +456,38 @@ class AntMazeEnv(gym.Env):
             # Block in view.
             if block_z + height * size_scaling / 2 \
                     >= robot_z >= block_z - height * size_scaling / 2:
-                x1 = block_x - 0.5 * size_scaling
-                x2 = block_x + 0.5 * size_scaling
-                y1 = block_y - 0.5 * size_scaling
-                y2 = block_y + 0.5 * size_scaling
-                struct_segments = [
-                    ((x1, y1), (x2, y1)),
-                    ((x2, y1), (x2, y2)),
-                    ((x2, y2), (x1, y2)),
-                    ((x1, y2), (x1, y1)),
-                ]
-                for seg in struct_segments:
-                    segments.append(dict(
-                        segment=seg,
-                        type=block_type,
-                    ))
+                segments.append(np.array(
+                    self._block_segments(block_x, block_y), dtype=np.float64))
+                segment_types.append(np.array([block_type] * 4))
+        segments = np.concatenate(segments, axis=0)
+        segment_types = np.concatenate(segment_types, axis=0)
 
         # 3 for wall, drop-off, block
         sensor_readings = np.zeros((self._n_bins, 3))
+        if self._n_bins == 0:
+            return sensor_readings
+
+        ray_oris = [
+            ori - self._sensor_span * 0.5 +
+            (2 * ray_idx + 1.0) / (2 * self._n_bins) * self._sensor_span
+            for ray_idx in range(self._n_bins)]
+
+        # Find out which segment is intersected first by every ray.
+        index, distance = maze_env_utils.nearest_ray_segment_intersect(
+            ray_origin=(robot_x, robot_y),
+            ray_thetas=ray_oris,
+            segments=segments)
+
         for ray_idx in range(self._n_bins):
-            ray_ori = (ori - self._sensor_span * 0.5 +
-                       (2 * ray_idx + 1.0) / (
-                                   2 * self._n_bins) * self._sensor_span)
-            ray_segments = []
-            # Get all segments that intersect with ray.
-            for seg in segments:
-                p = maze_env_utils.ray_segment_intersect(
-                    ray=((robot_x, robot_y), ray_ori),
-                    segment=seg["segment"])
-                if p is not None:
-                    ray_segments.append(dict(
-                        segment=seg["segment"],
-                        type=seg["type"],
-                        ray_ori=ray_ori,
-                        distance=maze_env_utils.point_distance(
-                            p, (robot_x, robot_y)),
-                    ))
-            if len(ray_segments) > 0:
-                # Find out which segment is intersected first.
-                first_seg = sorted(ray_segments, key=lambda x: x["distance"])[
-                    0]
-                seg_type = first_seg["type"]
-                idx = (0 if seg_type == 1 else  # Wall.
-                       1 if seg_type == -1 else  # Drop-off.
-                       2 if maze_env_utils.can_move(seg_type) else  # Block.
-                       None)
-                if first_seg["distance"] <= self._sensor_range:
-                    sensor_readings[ray_idx][idx] = \
-                        (self._sensor_range - first_seg["distance"]) \
-                        / self._sensor_range
+            if index[ray_idx] < 0 or distance[ray_idx] > self._sensor_range:
+                continue
+            seg_type = segment_types[index[ray_idx]]
+            idx = (0 if seg_type == 1 else  # Wall.
+                   1 if seg_type == -1 else  # Drop-off.
+                   2 if maze_env_utils.can_move(seg_type) else  # Block.
+                   None)
+            sensor_readings[ray_idx][idx] = \
+                (self._sensor_range - distance[ray_idx]) / self._sensor_range
 
         return sensor_readings
 
@@ -4,6 +4,7 @@ import random
 from gym.spaces import Box
 
 from hbaselines.utils.reward_fns import negative_distance
+from hbaselines.utils.misc import cached_space
 from hbaselines.envs.efficient_hrl.ant_maze_env import AntMazeEnv
 
 # scale to the contextual reward. Does not affect the environmental reward.
@@ -103,6 +104,8 @@ class UniversalAntMazeEnv(AntMazeEnv):
                     "values."
 
     @property
+    @cached_space(lambda self: (
+        self.use_contexts, self.random_contexts, repr(self.context_range)))
     def context_space(self):
         """Return the shape and bounds of the contextual term."""
         # Check if the environment is using contexts, and if not, return a None
@@ -17,6 +17,7 @@
 Adapted from rllab maze_env_utils.py.
 """
 import math
+import numpy as np
 
 
 class Move(object):
@@ -301,3 +302,82 @@ def point_distance(p1, p2):
     x1, y1 = p1
     x2, y2 = p2
     return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
+
+
+def nearest_ray_segment_intersect(ray_origin, ray_thetas, segments):
+    """Compute the first segment intersected by each of a set of rays.
+
+    This is a vectorized version of `ray_segment_intersect`, evaluated for
+    every ray and segment pair at once. The arithmetic follows that of
+    `line_intersect` exactly, so the returned distances match those computed
+    via `ray_segment_intersect` and `point_distance`.
+
+    Parameters
+    ----------
+    ray_origin : (float, float)
+        x,y coordinates of the origin of all rays
+    ray_thetas : array_like
+        the direction of every ray, of shape (R,)
+    segments : array_like
+        x, y values of the start and stop points of every segment, of shape
+        (S, 4), with each row containing (x1, y1, x2, y2)
+
+    Returns
+    -------
+    array_like
+        the index of the first segment intersected by every ray, of shape
+        (R,). Set to -1 for rays that do not intersect any segment.
+    array_like
+        the distance from the ray origin to the first intersection, of shape
+        (R,). Set to inf for rays that do not intersect any segment.
+    """
+    det_tolerance = 0.00000001
+    x1, y1 = ray_origin
+    n_rays = len(ray_thetas)
+
+    # Compute the second point of each ray, as done in ray_segment_intersect.
+    # math.cos/sin are used for consistency with the scalar implementation.
+    x2 = np.array([x1 + math.cos(theta) for theta in ray_thetas])[:, None]
+    y2 = np.array([y1 + math.sin(theta) for theta in ray_thetas])[:, None]
+    dx1 = x2 - x1
+    dy1 = y2 - y1
+
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    if segments.shape[0] == 0:
+        return np.full(n_rays, -1), np.full(n_rays, np.inf)
+    x = segments[None, :, 0]
+    y = segments[None, :, 1]
+    dx = segments[None, :, 2] - x
+    dy = segments[None, :, 3] - y
+
+    det = (-dx1 * dy + dy1 * dx)
+    valid = np.abs(det) >= det_tolerance
+    with np.errstate(divide="ignore", invalid="ignore"):
+        det_inv = 1.0 / np.where(valid, det, 1.)
+
+    # the scalar amounts along the ray and segments
+    r = det_inv * (-dy * (x - x1) + dx * (y - y1))
+    s = det_inv * (-dy1 * (x - x1) + dx1 * (y - y1))
+    hit = valid & (r >= 0) & (s >= 0) & (s <= 1)
+
+    # the intersection points
+    xi = (x1 + r * dx1 + x + s * dx) / 2.0
+    yi = (y1 + r * dy1 + y + s * dy) / 2.0
+
+    # Find the candidates for the nearest intersection of every ray. A small
+    # tolerance is used to capture ties that only arise from rounding.
+    sq_dist = np.where(hit, (xi - x1) ** 2 + (yi - y1) ** 2, np.inf)
+    min_sq_dist = np.min(sq_dist, axis=1, keepdims=True)
+    candidates = hit & (sq_dist <= min_sq_dist * (1 + 1e-12))
+
+    # Compute the distances of the candidates as done in point_distance, and
+    # choose the first nearest one, in the order of the segments.
+    index = np.full(n_rays, -1)
+    distance = np.full(n_rays, np.inf)
+    for i, j in zip(*np.nonzero(candidates)):
+        dist = point_distance((xi[i, j], yi[i, j]), (x1, y1))
+        if dist < distance[i]:
+            index[i] = j
+            distance[i] = dist
+
+    return index, distance
@@ -5,6 +5,7 @@ from gym.spaces import Box
 import os
 from hbaselines.envs.hac.env_utils import check_validity
 from hbaselines.utils.reward_fns import negative_distance
+from hbaselines.utils.misc import cached_space
 
 try:
     import mujoco_py
@@ -13,6 +14,74 @@ except ImportError:
     import hbaselines.envs.hac.dummy_mujoco as mujoco_py
 
 
+def ur5_forward_kinematics(joint_angles):
+    """Compute the positions of the joints of a batch of UR5 arms.
+
+    Parameters
+    ----------
+    joint_angles : array_like
+        the angles of the shoulder, upper arm, and forearm joints, of shape
+        (N, 3)
+
+    Returns
+    -------
+    array_like
+        the positions of the upper arms, of shape (N, 3)
+    array_like
+        the positions of the forearms, of shape (N, 3)
+    array_like
+        the positions of the first wrist joints, of shape (N, 3)
+    """
+    joint_angles = np.asarray(joint_angles)
+    cos = np.cos(joint_angles)
+    sin = np.sin(joint_angles)
+    num_arms = joint_angles.shape[0]
+
+    # shoulder_pos_1 = np.array([0, 0, 0, 1])
+    upper_arm_pos_2 = np.array([0, 0.13585, 0, 1])
+    forearm_pos_3 = np.array([0.425, 0, 0, 1])
+    wrist_1_pos_4 = np.array([0.39225, -0.1197, 0, 1])
+
+    # Transformation matrix from shoulder to base reference frame
+    t_1_0 = np.array([[1, 0, 0, 0],
+                      [0, 1, 0, 0],
+                      [0, 0, 1, 0.089159],
+                      [0, 0, 0, 1]])
+
+    # Transformation matrices from upper arm to shoulder reference frame
+    t_2_1 = np.tile(np.eye(4), (num_arms, 1, 1))
+    t_2_1[:, 0, 0] = cos[:, 0]
+    t_2_1[:, 0, 1] = -sin[:, 0]
+    t_2_1[:, 1, 0] = sin[:, 0]
+    t_2_1[:, 1, 1] = cos[:, 0]
+
+    # Transformation matrices from forearm to upper arm reference frame
+    t_3_2 = np.tile(np.eye(4), (num_arms, 1, 1))
+    t_3_2[:, 0, 0] = cos[:, 1]
+    t_3_2[:, 0, 2] = sin[:, 1]
+    t_3_2[:, 1, 3] = 0.13585
+    t_3_2[:, 2, 0] = -sin[:, 1]
+    t_3_2[:, 2, 2] = cos[:, 1]
+
+    # Transformation matrices from wrist 1 to forearm reference frame
+    t_4_3 = np.tile(np.eye(4), (num_arms, 1, 1))
+    t_4_3[:, 0, 0] = cos[:, 2]
+    t_4_3[:, 0, 2] = sin[:, 2]
+    t_4_3[:, 0, 3] = 0.425
+    t_4_3[:, 2, 0] = -sin[:, 2]
+    t_4_3[:, 2, 2] = cos[:, 2]
+
+    # Determine joint positions relative to original reference frame
+    t_2_0 = np.matmul(t_1_0, t_2_1)
+    t_3_0 = np.matmul(t_2_0, t_3_2)
+    t_4_0 = np.matmul(t_3_0, t_4_3)
+    upper_arm_pos = t_2_0.dot(upper_arm_pos_2)[:, :3]
+    forearm_pos = t_3_0.dot(forearm_pos_3)[:, :3]
+    wrist_1_pos = t_4_0.dot(wrist_1_pos_4)[:, :3]
+
+    return upper_arm_pos, forearm_pos, wrist_1_pos
+
+
 class Environment(gym.Env):
     """Base environment class.
 
@@ -233,6 +302,8 @@ class Environment(gym.Env):
         return self.max_actions
 
     @property
+    @cached_space(lambda self: (
+        self.use_contexts, self.random_contexts, repr(self.context_range)))
     def context_space(self):
         """Return the shape and bounds of the contextual term."""
         # Check if the environment is using contexts, and if not, return a None
@@ -264,13 +335,17 @@ class UR5(Environment):
 
     In this environment, a UR5 reacher object is tasked with reaching an end
     goal consisting of the desired joint positions for the 3 main joints.
+
+    Feasible end goals are sampled in batches and stored in a pool, from which
+    they are popped during every reset.
     """
 
     def __init__(self,
                  use_contexts=False,
                  random_contexts=False,
                  context_range=None,
-                 show=False):
+                 show=False,
+                 goal_pool_size=1000):
         """Initialize the UR5 environment.
 
         Parameters
@@ -286,6 +361,9 @@ class UR5(Environment):
             each dimension of the goal
         show : bool
             specifies whether to render the environment
+        goal_pool_size : int
+            number of feasible end goals to sample whenever the pool of goals
+            runs out
 
         Raises
         ------
@@ -355,6 +433,9 @@ class UR5(Environment):
             context_range=context_range,
         )
 
+        self.goal_pool_size = goal_pool_size
+        self._goal_pool = np.zeros((0, 3))
+
     @property
     def observation_space(self):
         """Return the observation space."""
@@ -379,113 +460,62 @@ class UR5(Environment):
 
     def get_next_goal(self):
         """See parent class."""
-        end_goal = np.zeros(shape=(len(self.context_range),))
-        goal_possible = False
-
-        while not goal_possible:
-            end_goal = np.zeros(shape=(len(self.context_range),))
-
-            end_goal[0] = np.random.uniform(self.context_range[0][0],
-                                            self.context_range[0][1])
-            end_goal[1] = np.random.uniform(self.context_range[1][0],
-                                            self.context_range[1][1])
-            end_goal[2] = np.random.uniform(self.context_range[2][0],
-                                            self.context_range[2][1])
-
-            # Next need to ensure chosen joint angles result in achievable
-            # task (i.e., desired end effector position is above ground)
-            theta_1 = end_goal[0]
-            theta_2 = end_goal[1]
-            theta_3 = end_goal[2]
-
-            # shoulder_pos_1 = np.array([0, 0, 0, 1])
-            # upper_arm_pos_2 = np.array([0, 0.13585, 0, 1])
-            forearm_pos_3 = np.array([0.425, 0, 0, 1])
-            wrist_1_pos_4 = np.array([0.39225, -0.1197, 0, 1])
-
-            # Transformation matrix from shoulder to base reference frame
-            t_1_0 = np.array([[1, 0, 0, 0], [0, 1, 0, 0],
-                              [0, 0, 1, 0.089159], [0, 0, 0, 1]])
-
-            # Transformation matrix from upper arm to shoulder reference frame
-            t_2_1 = np.array([[np.cos(theta_1), -np.sin(theta_1), 0, 0],
-                              [np.sin(theta_1), np.cos(theta_1), 0, 0],
-                              [0, 0, 1, 0],
-                              [0, 0, 0, 1]])
-
-            # Transformation matrix from forearm to upper arm reference frame
-            t_3_2 = np.array([[np.cos(theta_2), 0, np.sin(theta_2), 0],
-                              [0, 1, 0, 0.13585],
-                              [-np.sin(theta_2), 0, np.cos(theta_2), 0],
-                              [0, 0, 0, 1]])
-
-            # Transformation matrix from wrist 1 to forearm reference frame
-            t_4_3 = np.array([[np.cos(theta_3), 0, np.sin(theta_3), 0.425],
-                              [0, 1, 0, 0],
-                              [-np.sin(theta_3), 0, np.cos(theta_3), 0],
-                              [0, 0, 0, 1]])
-
-            forearm_pos = t_1_0.dot(t_2_1).dot(t_3_2).dot(
-                forearm_pos_3)[:3]
-            wrist_1_pos = t_1_0.dot(t_2_1).dot(t_3_2).dot(t_4_3).dot(
-                wrist_1_pos_4)[:3]
+        if len(self._goal_pool) == 0:
+            self._goal_pool = self.sample_feasible_goals(self.goal_pool_size)
 
-            # Make sure wrist 1 pos is above ground so can actually be reached
-            if np.absolute(end_goal[0]) > np.pi / 4 \
-                    and forearm_pos[2] > 0.05 and wrist_1_pos[2] > 0.15:
-                goal_possible = True
+        end_goal = self._goal_pool[0].copy()
+        self._goal_pool = self._goal_pool[1:]
 
         # Visualize End Goal
         self.display_end_goal(end_goal)
 
         return end_goal
 
+    def sample_feasible_goals(self, num_goals):
+        """Sample a batch of feasible end goals.
+
+        Candidate goals are drawn uniformly from the context range in blocks,
+        and are kept if the chosen joint angles result in an achievable task
+        (i.e., desired end effector position is above ground).
+
+        Parameters
+        ----------
+        num_goals : int
+            number of end goals to sample
+
+        Returns
+        -------
+        array_like
+            the end goals, of shape (num_goals, 3)
+        """
+        low = np.array([context[0] for context in self.context_range])
+        high = np.array([context[1] for context in self.context_range])
+
+        goals = []
+        num_feasible = 0
+        while num_feasible < num_goals:
+            candidates = np.random.uniform(
+                low, high, size=(num_goals, len(self.context_range)))
+            _, forearm_pos, wrist_1_pos = ur5_forward_kinematics(candidates)
+
+            # Make sure wrist 1 pos is above ground so can actually be reached
+            feasible = np.logical_and.reduce([
+                np.absolute(candidates[:, 0]) > np.pi / 4,
+                forearm_pos[:, 2] > 0.05,
+                wrist_1_pos[:, 2] > 0.15,
+            ])
+
+            goals.append(candidates[feasible])
+            num_feasible += np.sum(feasible)
+
+        return np.concatenate(goals)[:num_goals]
+
     def display_end_goal(self, end_goal):
         """See parent class."""
-        theta_1 = end_goal[0]
-        theta_2 = end_goal[1]
-        theta_3 = end_goal[2]
-
-        # shoulder_pos_1 = np.array([0, 0, 0, 1])
-        upper_arm_pos_2 = np.array([0, 0.13585, 0, 1])
-        forearm_pos_3 = np.array([0.425, 0, 0, 1])
-        wrist_1_pos_4 = np.array([0.39225, -0.1197, 0, 1])
-
-        # Transformation matrix from shoulder to base reference frame
-        t_1_0 = np.array([[1, 0, 0, 0],
-                          [0, 1, 0, 0],
-                          [0, 0, 1, 0.089159],
-                          [0, 0, 0, 1]])
-
-        # Transformation matrix from upper arm to shoulder reference frame
-        t_2_1 = np.array([[np.cos(theta_1), -np.sin(theta_1), 0, 0],
-                          [np.sin(theta_1), np.cos(theta_1), 0, 0],
-                          [0, 0, 1, 0],
-                          [0, 0, 0, 1]])
-
-        # Transformation matrix from forearm to upper arm reference frame
-        t_3_2 = np.array([[np.cos(theta_2), 0, np.sin(theta_2), 0],
-                          [0, 1, 0, 0.13585],
-                          [-np.sin(theta_2), 0, np.cos(theta_2), 0],
-                          [0, 0, 0, 1]])
-
-        # Transformation matrix from wrist 1 to forearm reference frame
-        t_4_3 = np.array([[np.cos(theta_3), 0, np.sin(theta_3), 0.425],
-                          [0, 1, 0, 0],
-                          [-np.sin(theta_3), 0, np.cos(theta_3), 0],
-                          [0, 0, 0, 1]])
-
-        # Determine joint position relative to original reference frame
-        # shoulder_pos = T_1_0.dot(shoulder_pos_1)
-        upper_arm_pos = t_1_0.dot(t_2_1).dot(upper_arm_pos_2)[:3]
-        forearm_pos = t_1_0.dot(t_2_1).dot(t_3_2).dot(forearm_pos_3)[:3]
-        wrist_1_pos = t_1_0.dot(t_2_1).dot(t_3_2).dot(t_4_3).dot(
-            wrist_1_pos_4)[:3]
-
-        joint_pos = [upper_arm_pos, forearm_pos, wrist_1_pos]
+        joint_pos = ur5_forward_kinematics([end_goal[:3]])
 
         for i in range(3):
-            self.sim.data.mocap_pos[i] = joint_pos[i]
+            self.sim.data.mocap_pos[i] = joint_pos[i][0]
 
 
 class Pendulum(Environment):
@@ -5,6 +5,8 @@ from copy import deepcopy
 import numpy as np
 from flow.utils.registry import make_create_env
 
+from hbaselines.utils.misc import cached_space
+
 
 class FlowEnv(gym.Env):
     """Create a flow-specific environment, as provided by this repository.
@@ -70,6 +72,7 @@ class FlowEnv(gym.Env):
         self.horizon = self.wrapped_env.env_params.horizon
 
     @property
+    @cached_space(lambda self: self.wrapped_env.action_space)
     def action_space(self):
         """See wrapped environment."""
         if self.multiagent and not self.shared:
@@ -78,6 +81,7 @@ class FlowEnv(gym.Env):
             return self.wrapped_env.action_space
 
     @property
+    @cached_space(lambda self: self.wrapped_env.observation_space)
     def observation_space(self):
         """See wrapped environment."""
         if self.multiagent and not self.shared:
@@ -124,6 +128,7 @@ class FlowEnv(gym.Env):
         return obs
 
     @property
+    @cached_space(lambda self: self.wrapped_env.network)
     def all_observation_space(self):
         """Return the shape of the full observation space."""
         if self.full_observation_fn is None:
@@ -8,6 +8,11 @@ import random
 from flow.envs import Env
 from flow.core.params import VehicleParams
 
+from hbaselines.envs.mixed_autonomy.kernel import init_numpy_env
+from hbaselines.envs.mixed_autonomy.kernel import reset_numpy_env
+from hbaselines.envs.mixed_autonomy.kernel import step_numpy_env
+from hbaselines.utils.misc import cached_space
+
 
 BASE_ENV_PARAMS = dict(
     # maximum acceleration for autonomous vehicles, in m/s^2
@@ -108,12 +113,16 @@ class AVEnv(Env):
             if p not in env_params.additional_params:
                 raise KeyError('Env parameter "{}" not supplied'.format(p))
 
-        super(AVEnv, self).__init__(
-            env_params=env_params,
-            sim_params=sim_params,
-            network=network,
-            simulator=simulator,
-        )
+        if simulator == "numpy":
+            # Use the NumPy stand-in simulator instead of a Flow kernel.
+            init_numpy_env(self, env_params, sim_params, network)
+        else:
+            super(AVEnv, self).__init__(
+                env_params=env_params,
+                sim_params=sim_params,
+                network=network,
+                simulator=simulator,
+            )
 
         self.leader = []
         self.follower = []
@@ -127,6 +136,7 @@ class AVEnv(Env):
         return self.k.vehicle.get_rl_ids()
 
     @property
+    @cached_space(lambda self: self.num_rl)
     def action_space(self):
         """See class definition."""
         return Box(
@@ -136,6 +146,7 @@ class AVEnv(Env):
             dtype=np.float32)
 
     @property
+    @cached_space(lambda self: (self.num_rl, self.network))
     def observation_space(self):
         """See class definition."""
         # maximum number of lanes in any section
@@ -270,6 +281,17 @@ class AVEnv(Env):
         for veh_id in self.leader + self.follower:
             self.k.vehicle.set_observed(veh_id)
 
+    def step(self, rl_actions):
+        """See parent class.
+
+        If the NumPy simulator is used, the step is performed by
+        hbaselines.envs.mixed_autonomy.kernel.step_numpy_env.
+        """
+        if self.simulator == "numpy":
+            return step_numpy_env(self, rl_actions)
+        else:
+            return super().step(rl_actions)
+
     def reset(self):
         """See parent class.
 
@@ -278,7 +300,10 @@ class AVEnv(Env):
         """
         self.leader = []
         self.follower = []
-        return super().reset()
+        if self.simulator == "numpy":
+            return reset_numpy_env(self)
+        else:
+            return super().reset()
 
 
 class AVClosedEnv(AVEnv):
@@ -8,6 +8,11 @@ import random
 from flow.envs.multiagent import MultiEnv
 from flow.core.params import VehicleParams
 
+from hbaselines.envs.mixed_autonomy.kernel import init_numpy_env
+from hbaselines.envs.mixed_autonomy.kernel import reset_numpy_env
+from hbaselines.envs.mixed_autonomy.kernel import step_numpy_env
+from hbaselines.utils.misc import cached_space
+
 
 BASE_ENV_PARAMS = dict(
     # maximum acceleration for autonomous vehicles, in m/s^2
@@ -104,12 +109,16 @@ class AVMultiAgentEnv(MultiEnv):
             if p not in env_params.additional_params:
                 raise KeyError('Env parameter "{}" not supplied'.format(p))
 
-        super(MultiEnv, self).__init__(
-            env_params=env_params,
-            sim_params=sim_params,
-            network=network,
-            simulator=simulator,
-        )
+        if simulator == "numpy":
+            # Use the NumPy stand-in simulator instead of a Flow kernel.
+            init_numpy_env(self, env_params, sim_params, network)
+        else:
+            super(MultiEnv, self).__init__(
+                env_params=env_params,
+                sim_params=sim_params,
+                network=network,
+                simulator=simulator,
+            )
 
         self.leader = []
         self.follower = []
@@ -124,6 +133,7 @@ class AVMultiAgentEnv(MultiEnv):
         return self.k.vehicle.get_rl_ids()
 
     @property
+    @cached_space(lambda self: None)
     def action_space(self):
         """See class definition."""
         return Box(
@@ -133,6 +143,7 @@ class AVMultiAgentEnv(MultiEnv):
             dtype=np.float32)
 
     @property
+    @cached_space(lambda self: self.network)
     def observation_space(self):
         """See class definition."""
         # maximum number of lanes in any section
@@ -183,7 +194,7 @@ class AVMultiAgentEnv(MultiEnv):
 
             # Penalize the sum of squares of the accelerations.
             if penalty_type in ["acceleration", "both"]:
-                accel = rl_actions.items()
+                accel = np.array(list(rl_actions.values())).flatten()
                 reward -= penalty_scale * sum(np.square(accel[:self.num_rl]))
 
             # Penalize small time headways.
@@ -268,6 +279,17 @@ class AVMultiAgentEnv(MultiEnv):
         for veh_id in self.leader + self.follower:
             self.k.vehicle.set_observed(veh_id)
 
+    def step(self, rl_actions):
+        """See parent class.
+
+        If the NumPy simulator is used, the step is performed by
+        hbaselines.envs.mixed_autonomy.kernel.step_numpy_env.
+        """
+        if self.simulator == "numpy":
+            return step_numpy_env(self, rl_actions, multiagent=True)
+        else:
+            return super().step(rl_actions)
+
     def reset(self, new_inflow_rate=None):
         """See parent class.
 
@@ -276,7 +298,10 @@ class AVMultiAgentEnv(MultiEnv):
         """
         self.leader = []
         self.follower = []
-        return super().reset(new_inflow_rate)
+        if self.simulator == "numpy":
+            return reset_numpy_env(self)
+        else:
+            return super().reset(new_inflow_rate)
 
 
 class AVClosedMultiAgentEnv(AVMultiAgentEnv):
@@ -21,6 +21,51 @@ IMITATION_PARAMS = {
 }
 
 
+def get_expert_actions(env, expert_models, rl_ids):
+    """Compute the expert actions of all RL vehicles in a single pass.
+
+    Expert controllers are cached in `expert_models` by vehicle ID. A new
+    controller is only created for vehicles that do not have one yet, and the
+    controllers of vehicles that are no longer in `rl_ids` (e.g. that exited
+    the network) are evicted before any actions are computed.
+
+    Parameters
+    ----------
+    env : flow.envs.Env
+        the environment whose vehicles are being controlled
+    expert_models : dict
+        the cache of expert controllers, keyed by vehicle ID. Modified in
+        place.
+    rl_ids : list of str
+        the IDs of the RL vehicles that should be assigned expert actions
+
+    Returns
+    -------
+    list of float
+        the expert action of every vehicle in `rl_ids`, in the same order
+    """
+    # Evict experts of vehicles that are no longer controlled. The keys are
+    # copied to avoid modifying the dictionary while iterating through it.
+    current_ids = set(rl_ids)
+    for veh_id in list(expert_models.keys()):
+        if veh_id not in current_ids:
+            del expert_models[veh_id]
+
+    # Add experts for vehicles that are not currently available.
+    new_ids = [veh_id for veh_id in rl_ids if veh_id not in expert_models]
+    if len(new_ids) > 0:
+        model, params = env.env_params.additional_params["expert_model"]
+        car_following_params = SumoCarFollowingParams(min_gap=0.5)
+        for veh_id in new_ids:
+            expert_models[veh_id] = model(
+                veh_id,
+                car_following_params=car_following_params,
+                **params)
+
+    # Compute the expert actions.
+    return [expert_models[veh_id].get_action(env) for veh_id in rl_ids]
+
+
 class AVImitationEnv(AVEnv):
     """Imitation variant of AVEnv."""
 
@@ -54,19 +99,16 @@ class AVImitationEnv(AVEnv):
         """
         del obs  # unused
 
-        expert_actions = []
-        for veh_id in self.rl_ids():
-            # Add experts that are not currently available.
-            model, params = self.env_params.additional_params["expert_model"]
-            self._expert_models[veh_id] = model(
-                veh_id,
-                car_following_params=SumoCarFollowingParams(min_gap=0.5),
-                **params)
+        return get_expert_actions(self, self._expert_models, self.rl_ids())
 
-            # Compute the expert action.
-            expert_actions.append(self._expert_models[veh_id].get_action(self))
+    def reset(self):
+        """See parent class.
 
-        return expert_actions
+        The expert models are also cleared, as vehicle IDs may be reused by new
+        vehicles after a reset.
+        """
+        self._expert_models.clear()
+        return super(AVImitationEnv, self).reset()
 
 
 class AVClosedImitationEnv(AVClosedEnv):
@@ -102,19 +144,16 @@ class AVClosedImitationEnv(AVClosedEnv):
         """
         del obs  # unused
 
-        expert_actions = []
-        for veh_id in self.rl_ids():
-            # Add experts that are not currently available.
-            model, params = self.env_params.additional_params["expert_model"]
-            self._expert_models[veh_id] = model(
-                veh_id,
-                car_following_params=SumoCarFollowingParams(min_gap=0.5),
-                **params)
+        return get_expert_actions(self, self._expert_models, self.rl_ids())
 
-            # Compute the expert action.
-            expert_actions.append(self._expert_models[veh_id].get_action(self))
+    def reset(self):
+        """See parent class.
 
-        return expert_actions
+        The expert models are also cleared, as vehicle IDs may be reused by new
+        vehicles after a reset.
+        """
+        self._expert_models.clear()
+        return super(AVClosedImitationEnv, self).reset()
 
 
 class AVOpenImitationEnv(AVOpenEnv):
@@ -150,25 +189,20 @@ class AVOpenImitationEnv(AVOpenEnv):
         """
         del obs  # unused
 
-        # Remove experts that are no longer in the environment.
-        for veh_id in self._expert_models.keys():
-            if veh_id not in self.rl_ids():
-                del self._expert_models[veh_id]
-
-        expert_actions = []
-        for veh_id in self.rl_ids():
-            # Add experts that are not currently available.
-            model, params = self.env_params.additional_params["expert_model"]
-            self._expert_models[veh_id] = model(
-                veh_id,
-                car_following_params=SumoCarFollowingParams(min_gap=0.5),
-                **params)
-
-            # Compute the expert action.
-            expert_actions.append(self._expert_models[veh_id].get_action(self))
+        expert_actions = get_expert_actions(
+            self, self._expert_models, self.rl_ids())
 
         # Pad the actions for the non-existent vehicles with zeroes.
         for _ in range(self.action_space.shape[0] - len(expert_actions)):
             expert_actions.append(0)
 
         return expert_actions
+
+    def reset(self):
+        """See parent class.
+
+        The expert models are also cleared, as vehicle IDs may be reused by new
+        vehicles after a reset.
+        """
+        self._expert_models.clear()
+        return super(AVOpenImitationEnv, self).reset()
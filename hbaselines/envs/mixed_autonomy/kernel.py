@@ -0,0 +1,1053 @@
+"""A pure-NumPy stand-in for the Flow simulation kernel.
+
+This module contains a lightweight, in-process car-following simulator that
+can be used in place of SUMO (through Flow's traci kernel) by the environments
+in hbaselines/envs/mixed_autonomy/envs. It is selected by setting the
+"simulator" term in the flow parameters to "numpy".
+
+The simulator supports single-lane ring roads (RingNetwork) and single-lane
+highways with inflows (HighwayNetwork). Human-driven vehicles follow either
+the IDM or Bando-FTL car-following models, vectorized over all vehicles in the
+network, while automated vehicles are assigned the accelerations provided via
+`apply_acceleration`. Only the subset of the Flow kernel API that is used by
+the environments in this repository is implemented: speeds, headways,
+leaders/followers, positions, accelerations and vehicle IDs.
+
+Note that this simulator is meant for prototyping and testing purposes. It
+does not model lane changes, junctions, or the safety checks performed by
+SUMO, and as such its dynamics will differ from SUMO's.
+"""
+import numpy as np
+from copy import deepcopy
+
+from flow.controllers import BandoFTLController
+from flow.controllers import RLController
+
+# length of every vehicle in the network, in meters. This matches the SUMO
+# default.
+VEHICLE_LENGTH = 5
+# headway assigned to vehicles without a leader, in meters
+NO_LEADER_HEADWAY = 1000
+# error value returned for vehicles that are not in the network
+ERROR_VALUE = -1001
+
+# default parameters of the IDM model (see flow.controllers.IDMController)
+IDM_PARAMS = dict(v0=30, T=1, a=1, b=1.5, delta=4, s0=2, noise=0)
+# default parameters of the Bando-FTL model (see
+# flow.controllers.BandoFTLController)
+BANDO_PARAMS = dict(
+    alpha=.5, beta=20, h_st=2, h_go=10, v_max=32, want_max_accel=False,
+    noise=0)
+
+
+def idm_accel(v, v_lead, h, has_leader, v0, T, a, b, delta, s0):
+    """Compute the IDM accelerations of a set of vehicles.
+
+    All arguments are arrays of the same shape, or scalars.
+
+    Parameters
+    ----------
+    v : array_like
+        the speeds of the ego vehicles
+    v_lead : array_like
+        the speeds of the leading vehicles
+    h : array_like
+        the bumper-to-bumper headways of the ego vehicles
+    has_leader : array_like
+        whether each vehicle has a leader
+    v0, T, a, b, delta, s0 : array_like
+        parameters of the IDM model (see flow.controllers.IDMController)
+
+    Returns
+    -------
+    array_like
+        the accelerations of the vehicles
+    """
+    h = np.where(np.abs(h) < 1e-3, 1e-3, h)
+    s_star = s0 + np.maximum(
+        0, v * T + v * (v - v_lead) / (2 * np.sqrt(a * b)))
+    s_star = np.where(has_leader, s_star, 0)
+    return a * (1 - (v / v0) ** delta - (s_star / h) ** 2)
+
+
+def bando_accel(v, v_lead, h, has_leader, alpha, beta, h_st, h_go, v_max,
+                want_max_accel, max_accel):
+    """Compute the Bando-FTL accelerations of a set of vehicles.
+
+    All arguments are arrays of the same shape, or scalars.
+
+    Parameters
+    ----------
+    v : array_like
+        the speeds of the ego vehicles
+    v_lead : array_like
+        the speeds of the leading vehicles
+    h : array_like
+        the bumper-to-bumper headways of the ego vehicles
+    has_leader : array_like
+        whether each vehicle has a leader
+    alpha, beta, h_st, h_go, v_max, want_max_accel : array_like
+        parameters of the Bando-FTL model (see
+        flow.controllers.BandoFTLController)
+    max_accel : array_like
+        the maximum acceleration of the vehicles, used if the vehicle does not
+        have a leader and want_max_accel is set to True
+
+    Returns
+    -------
+    array_like
+        the accelerations of the vehicles
+    """
+    v_h = v_max * ((np.tanh(h / h_st - 2) + np.tanh(2)) / (1 + np.tanh(2)))
+    s_dot = v_lead - v
+    accel = alpha * (v_h - v) + beta * s_dot / (h ** 2)
+    return np.where(
+        np.logical_and(~has_leader, want_max_accel), max_accel, accel)
+
+
+class NumpyKernel(object):
+    """Container for the NumPy network, vehicle, and simulation kernels.
+
+    This object mimics flow.core.kernel.Kernel.
+
+    Attributes
+    ----------
+    network : NumpyNetworkKernel
+        the network kernel
+    vehicle : NumpyVehicleKernel
+        the vehicle kernel
+    simulation : NumpySimulationKernel
+        the simulation kernel
+    """
+
+    def __init__(self, sim_params):
+        """Instantiate the kernel.
+
+        Parameters
+        ----------
+        sim_params : flow.core.params.SimParams
+            simulation-specific parameters
+        """
+        self.kernel_api = None
+        self.network = NumpyNetworkKernel(self)
+        self.vehicle = NumpyVehicleKernel(self, sim_params)
+        self.simulation = NumpySimulationKernel(self, sim_params)
+
+    def update(self, reset):
+        """Update the vehicle kernel with the current state of the network.
+
+        Parameters
+        ----------
+        reset : bool
+            specifies whether the simulator was reset in the last simulation
+            step
+        """
+        self.vehicle.update(reset)
+
+    def close(self):
+        """Terminate all components of the kernel."""
+        pass
+
+
+class NumpyNetworkKernel(object):
+    """Network kernel of the NumPy simulator.
+
+    The network is represented by a single lane of length `length()`. Ring
+    roads wrap around at the end of the lane, while vehicles on a highway exit
+    the network once they reach it.
+
+    Attributes
+    ----------
+    ring : bool
+        whether the network is a ring road. Otherwise, it is treated as a
+        highway.
+    inflows : list of dict
+        the inflows of vehicles into the network (highway only)
+    """
+
+    def __init__(self, master_kernel):
+        """Instantiate the network kernel.
+
+        Parameters
+        ----------
+        master_kernel : NumpyKernel
+            the higher level kernel
+        """
+        self.master_kernel = master_kernel
+        self.ring = True
+        self.inflows = []
+        self._length = 0
+        self._lanes = 1
+        self._edges = []
+        self._edge_starts = np.array([])
+        self._speed_limits = np.array([])
+
+    def generate_network(self, network):
+        """Generate the network from a Flow network object.
+
+        Parameters
+        ----------
+        network : flow.networks.Network
+            the network to simulate. Must be a single-lane RingNetwork or
+            HighwayNetwork.
+
+        Raises
+        ------
+        ValueError
+            if the network is not supported by this simulator
+        """
+        net_params = network.net_params.additional_params
+        network_name = network.__class__.__name__
+
+        if net_params.get("lanes", 1) != 1:
+            raise ValueError(
+                "Only single-lane networks are supported by the numpy "
+                "simulator.")
+
+        speed_limit = net_params.get("speed_limit", 30)
+        self._lanes = 1
+
+        if network_name == "RingNetwork":
+            self.ring = True
+            self._length = net_params["length"]
+            self._edges = ["bottom", "right", "top", "left"]
+            self._edge_starts = np.arange(4) * self._length / 4
+            self._speed_limits = np.array([speed_limit] * 4)
+            self.inflows = []
+        elif network_name == "HighwayNetwork":
+            self.ring = False
+            num_edges = net_params.get("num_edges", 1)
+            length = net_params["length"]
+            self._edges = ["highway_{}".format(i) for i in range(num_edges)]
+            self._edge_starts = np.arange(num_edges) * length / num_edges
+            self._speed_limits = np.array([speed_limit] * num_edges)
+            self._length = length
+
+            # Add a ghost edge at the end of the highway.
+            if net_params.get("use_ghost_edge", False):
+                self._edges.append("highway_end")
+                self._edge_starts = np.append(self._edge_starts, length)
+                self._speed_limits = np.append(
+                    self._speed_limits,
+                    net_params.get("ghost_speed_limit", speed_limit))
+                self._length += 500
+
+            self.inflows = deepcopy(network.net_params.inflows.get())
+        else:
+            raise ValueError(
+                "Network {} is not supported by the numpy simulator.".format(
+                    network_name))
+
+    def length(self):
+        """Return the total length of the network."""
+        return self._length
+
+    def max_speed(self):
+        """Return the maximum speed limit of any edge in the network."""
+        return max(self._speed_limits)
+
+    def num_lanes(self, edge_id):
+        """Return the number of lanes of a specific edge."""
+        del edge_id  # all edges are single-lane
+        return self._lanes
+
+    def get_edge_list(self):
+        """Return the names of all edges in the network."""
+        return list(self._edges)
+
+    def edge_index(self, pos):
+        """Return the index of the edge of each position in the network.
+
+        Parameters
+        ----------
+        pos : array_like
+            the absolute positions in the network
+
+        Returns
+        -------
+        array_like
+            the indices of the edges the positions are located in
+        """
+        return np.searchsorted(self._edge_starts, pos, side="right") - 1
+
+    def speed_limit(self, pos):
+        """Return the speed limit at every position in the network.
+
+        Parameters
+        ----------
+        pos : array_like
+            the absolute positions in the network
+
+        Returns
+        -------
+        array_like
+            the speed limits at every position
+        """
+        index = np.clip(self.edge_index(pos), 0, len(self._edges) - 1)
+        return self._speed_limits[index]
+
+
+class NumpyVehicleKernel(object):
+    """Vehicle kernel of the NumPy simulator.
+
+    The state of all vehicles is stored in arrays, with the i-th element of
+    every array corresponding to the i-th element of `get_ids()`.
+
+    Attributes
+    ----------
+    num_vehicles : int
+        the number of vehicles currently in the network
+    num_rl_vehicles : int
+        the number of automated vehicles currently in the network
+    type_parameters : dict
+        the parameters of every vehicle type, as specified by VehicleParams
+    """
+
+    def __init__(self, master_kernel, sim_params):
+        """Instantiate the vehicle kernel.
+
+        Parameters
+        ----------
+        master_kernel : NumpyKernel
+            the higher level kernel
+        sim_params : flow.core.params.SimParams
+            simulation-specific parameters
+        """
+        self.master_kernel = master_kernel
+        self.sim_step = sim_params.sim_step
+        self.num_vehicles = 0
+        self.num_rl_vehicles = 0
+        self.type_parameters = {}
+
+        self._ids = []
+        self._index = {}
+        self._types = []
+        self._observed = set()
+        self._arrived_ids = []
+        self._departed_ids = []
+
+        # state of every vehicle
+        self._pos = np.array([])
+        self._speed = np.array([])
+        self._accel = np.array([])
+        self._is_rl = np.array([], dtype=bool)
+
+        # accelerations commanded via apply_acceleration for the next step
+        self._commanded_accel = np.array([])
+        self._commanded = np.array([], dtype=bool)
+
+        # car-following model of every vehicle
+        self._model_params = {}
+
+        # leader/follower information, updated by update()
+        self._leader = np.array([], dtype=int)
+        self._follower = np.array([], dtype=int)
+        self._headway = np.array([])
+
+    def initialize(self, vehicles, initial_config=None):
+        """Place the initial vehicles in the network.
+
+        Parameters
+        ----------
+        vehicles : flow.core.params.VehicleParams
+            the initial vehicles and their types
+        initial_config : flow.core.params.InitialConfig
+            parameters affecting the positioning of vehicles. "spacing" may be
+            one of {"uniform", "random"}.
+        """
+        self.type_parameters = deepcopy(vehicles.type_parameters)
+        self._clear()
+
+        ids = list(vehicles.ids)
+        if len(ids) == 0:
+            self.update(reset=True)
+            return
+
+        length = self.master_kernel.network.length()
+        x0 = getattr(initial_config, "x0", 0)
+        min_gap = getattr(initial_config, "min_gap", 0)
+        spacing = getattr(initial_config, "spacing", "uniform")
+
+        # Shuffle the order of vehicles in the network, if requested.
+        if getattr(initial_config, "shuffle", False):
+            ids = [ids[i] for i in np.random.permutation(len(ids))]
+
+        # Compute the initial positions of all vehicles.
+        n = len(ids)
+        if spacing == "random":
+            free_space = max(length - n * (VEHICLE_LENGTH + min_gap), 0)
+            gaps = np.random.uniform(size=n)
+            gaps = gaps / gaps.sum() * free_space + VEHICLE_LENGTH + min_gap
+            pos = x0 + np.cumsum(gaps) - gaps[0]
+        else:
+            pos = x0 + np.arange(n) * length / n
+        pos = np.mod(pos, length)
+
+        for veh_id, x in zip(ids, pos):
+            type_id = vehicles.get_type(veh_id)
+            speed = self.type_parameters[type_id].get("initial_speed", 0)
+            self._add(veh_id, type_id, x, speed)
+
+        self.update(reset=True)
+
+    def update(self, reset):
+        """Update the leaders, followers, and headways of all vehicles.
+
+        Parameters
+        ----------
+        reset : bool
+            specifies whether the simulator was reset in the last simulation
+            step
+        """
+        if reset:
+            self._arrived_ids = []
+            self._departed_ids = []
+
+        n = len(self._ids)
+        self.num_vehicles = n
+        self.num_rl_vehicles = int(np.sum(self._is_rl))
+        self._index = {veh_id: i for i, veh_id in enumerate(self._ids)}
+
+        if n == 0:
+            self._leader = np.array([], dtype=int)
+            self._follower = np.array([], dtype=int)
+            self._headway = np.array([])
+            return
+
+        length = self.master_kernel.network.length()
+        order = np.argsort(self._pos, kind="stable")
+
+        # The leader of every vehicle is the next vehicle in the order of
+        # increasing positions.
+        leader = np.empty(n, dtype=int)
+        leader[order] = np.roll(order, -1)
+        follower = np.empty(n, dtype=int)
+        follower[order] = np.roll(order, 1)
+
+        if self.master_kernel.network.ring:
+            headway = np.where(
+                leader == np.arange(n), length - VEHICLE_LENGTH,
+                np.mod(self._pos[leader] - self._pos, length) - VEHICLE_LENGTH)
+        else:
+            headway = self._pos[leader] - self._pos - VEHICLE_LENGTH
+
+            # The front and rear vehicles have no leader and follower.
+            leader[order[-1]] = -1
+            follower[order[0]] = -1
+            headway[order[-1]] = NO_LEADER_HEADWAY
+
+        self._leader = leader
+        self._follower = follower
+        self._headway = headway
+
+    def get_ids(self):
+        """Return the names of all vehicles currently in the network."""
+        return list(self._ids)
+
+    def get_rl_ids(self):
+        """Return the names of all automated vehicles in the network."""
+        return [veh_id for veh_id, is_rl in zip(self._ids, self._is_rl)
+                if is_rl]
+
+    def get_human_ids(self):
+        """Return the names of all human-driven vehicles in the network."""
+        return [veh_id for veh_id, is_rl in zip(self._ids, self._is_rl)
+                if not is_rl]
+
+    def get_controlled_ids(self):
+        """Return the names of vehicles controlled by Flow controllers.
+
+        Human-driven vehicles are advanced internally by the vectorized
+        car-following models, so this is always empty.
+        """
+        return []
+
+    def get_controlled_lc_ids(self):
+        """Return the names of vehicles with Flow lane-change controllers."""
+        return []
+
+    def get_arrived_ids(self):
+        """Return the names of vehicles that exited the network last step."""
+        return list(self._arrived_ids)
+
+    def get_departed_ids(self):
+        """Return the names of vehicles that entered the network last step."""
+        return list(self._departed_ids)
+
+    def get_type(self, veh_id):
+        """Return the type of a vehicle."""
+        return self._types[self._index[veh_id]]
+
+    def get_routing_controller(self, veh_id, error=None):
+        """Return the routing controller of a vehicle (always None)."""
+        return error
+
+    def choose_routes(self, veh_ids, route_choices):
+        """Update the routes of vehicles (no-op)."""
+        pass
+
+    def set_observed(self, veh_id):
+        """Add a vehicle to the list of observed vehicles."""
+        self._observed.add(veh_id)
+
+    def remove_observed(self, veh_id):
+        """Remove a vehicle from the list of observed vehicles."""
+        self._observed.discard(veh_id)
+
+    def get_observed_ids(self):
+        """Return the list of observed vehicles."""
+        return list(self._observed)
+
+    def update_vehicle_colors(self):
+        """Update the colors of vehicles (no-op)."""
+        pass
+
+    def update_accel(self, veh_id, accel, noise=True, failsafe=True):
+        """Store the acceleration of a vehicle (no-op).
+
+        Accelerations are stored when the simulation is advanced.
+        """
+        pass
+
+    def get_speed(self, veh_id, error=ERROR_VALUE):
+        """Return the speed of the specified vehicle(s)."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_speed(vid, error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        return error if i is None else float(self._speed[i])
+
+    def get_accel(self, veh_id, noise=True, failsafe=True,
+                  error=ERROR_VALUE):
+        """Return the acceleration of the vehicle(s) in the last step."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_accel(vid, error=error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        return error if i is None else float(self._accel[i])
+
+    def get_x_by_id(self, veh_id, error=ERROR_VALUE):
+        """Return the position of the specified vehicle(s) in the network."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_x_by_id(vid, error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        return error if i is None else float(self._pos[i])
+
+    def get_position(self, veh_id, error=ERROR_VALUE):
+        """Return the position of the specified vehicle(s) on their edge."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_position(vid, error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        if i is None:
+            return error
+        network = self.master_kernel.network
+        edge = network.edge_index(self._pos[i])
+        return float(self._pos[i] - network._edge_starts[edge])
+
+    def get_edge(self, veh_id, error=""):
+        """Return the edge the specified vehicle(s) are currently on."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_edge(vid, error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        if i is None:
+            return error
+        network = self.master_kernel.network
+        return network.get_edge_list()[network.edge_index(self._pos[i])]
+
+    def get_lane(self, veh_id, error=ERROR_VALUE):
+        """Return the lane index of the specified vehicle(s)."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_lane(vid, error) for vid in veh_id]
+        return error if veh_id not in self._index else 0
+
+    def get_length(self, veh_id, error=ERROR_VALUE):
+        """Return the length of the specified vehicle(s)."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_length(vid, error) for vid in veh_id]
+        return error if veh_id not in self._index else VEHICLE_LENGTH
+
+    def get_headway(self, veh_id, error=ERROR_VALUE):
+        """Return the bumper-to-bumper headway of the specified vehicle(s)."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_headway(vid, error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        return error if i is None else float(self._headway[i])
+
+    def get_leader(self, veh_id, error=""):
+        """Return the leader of the specified vehicle(s)."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_leader(vid, error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        if i is None or self._leader[i] < 0:
+            return error
+        return self._ids[self._leader[i]]
+
+    def get_follower(self, veh_id, error=""):
+        """Return the follower of the specified vehicle(s)."""
+        if isinstance(veh_id, (list, np.ndarray)):
+            return [self.get_follower(vid, error) for vid in veh_id]
+        i = self._index.get(veh_id)
+        if i is None or self._follower[i] < 0:
+            return error
+        return self._ids[self._follower[i]]
+
+    def apply_acceleration(self, veh_ids, acc):
+        """Apply the accelerations to the specified vehicles.
+
+        The accelerations are applied the next time the simulation is
+        advanced. Vehicles that are not assigned an acceleration follow the
+        car-following model of their type.
+
+        Parameters
+        ----------
+        veh_ids : str or list of str
+            the vehicles to assign accelerations to
+        acc : float or array_like
+            the requested accelerations
+        """
+        if isinstance(veh_ids, str):
+            veh_ids = [veh_ids]
+        acc = np.atleast_1d(np.asarray(acc, dtype=np.float64)).flatten()
+
+        for veh_id, a in zip(veh_ids, acc):
+            i = self._index.get(veh_id)
+            if i is not None and not np.isnan(a):
+                self._commanded_accel[i] = a
+                self._commanded[i] = True
+
+    def step(self, dt, use_ballistic):
+        """Advance the state of all vehicles by one simulation step.
+
+        Parameters
+        ----------
+        dt : float
+            the simulation step size, in seconds
+        use_ballistic : bool
+            whether to use the ballistic position update rule. Otherwise,
+            the Euler update rule is used.
+
+        Returns
+        -------
+        bool
+            True if a collision occurred during the step
+        """
+        network = self.master_kernel.network
+        self._arrived_ids = []
+        self._departed_ids = []
+
+        if len(self._ids) > 0:
+            v = self._speed
+            has_leader = self._leader >= 0
+            v_lead = np.where(has_leader, self._speed[self._leader], v)
+            h = self._headway
+            p = self._model_params
+
+            # Compute the accelerations from both car-following models, and
+            # choose the one that matches the type of each vehicle.
+            accel = np.where(
+                p["bando"].astype(bool),
+                bando_accel(
+                    v, v_lead, h, has_leader, p["alpha"], p["beta"],
+                    p["h_st"], p["h_go"], p["v_max"], p["want_max_accel"],
+                    p["max_accel"]),
+                idm_accel(
+                    v, v_lead, h, has_leader, p["v0"], p["T"], p["a"],
+                    p["b"], p["delta"], p["s0"]),
+            )
+
+            # Add noise to the accelerations of vehicles that are not being
+            # controlled by the agent.
+            if np.any(p["noise"] > 0):
+                accel += np.sqrt(dt) * np.random.normal(0, 1, accel.shape) \
+                    * p["noise"]
+
+            # Use the accelerations commanded by the agent, where available.
+            accel = np.where(self._commanded, self._commanded_accel, accel)
+
+            # Bound the accelerations and speeds by the limits of each
+            # vehicle and the speed limit.
+            accel = np.clip(accel, -p["max_decel"], p["max_accel"])
+            new_v = np.maximum(v + accel * dt, 0)
+            new_v = np.minimum(new_v, network.speed_limit(self._pos))
+
+            # Compute the distance traveled by every vehicle.
+            if use_ballistic:
+                dist = dt * (v + new_v) / 2
+            else:
+                dist = dt * new_v
+
+            # Bound the distances so that the gap to the leader after the step
+            # is at least the minimum gap (or the current gap, if smaller).
+            # Reducing the distance of one vehicle may reduce the safe
+            # distance of its follower, so this is repeated until no further
+            # distances are modified.
+            for _ in range(len(self._ids)):
+                safe_dist = np.maximum(
+                    h - p["min_gap"] + dist[self._leader], 0)
+                safe_dist = np.where(has_leader, safe_dist, np.inf)
+                if np.all(dist <= safe_dist):
+                    break
+                dist = np.minimum(dist, safe_dist)
+
+            # Reduce the speeds of vehicles whose distances were bounded.
+            if use_ballistic:
+                new_v = np.minimum(new_v, np.maximum(2 * dist / dt - v, 0))
+            else:
+                new_v = np.minimum(new_v, dist / dt)
+
+            self._pos = self._pos + dist
+            self._accel = (new_v - v) / dt
+            self._speed = new_v
+            self._commanded = np.zeros(len(self._ids), dtype=bool)
+
+            if network.ring:
+                self._pos = np.mod(self._pos, network.length())
+            else:
+                # Remove vehicles that exited the network.
+                exited = self._pos >= network.length()
+                self._arrived_ids = [
+                    veh_id for veh_id, e in zip(self._ids, exited) if e]
+                if np.any(exited):
+                    self._filter(~exited)
+
+        self.update(reset=False)
+
+        # Check for collisions.
+        return bool(np.any(self._headway < 0))
+
+    def add_inflow_vehicle(self, veh_id, type_id, speed):
+        """Add a vehicle at the start of the network, if there is space.
+
+        Parameters
+        ----------
+        veh_id : str
+            name of the vehicle
+        type_id : str
+            type of vehicle, as specified in VehicleParams
+        speed : float
+            initial speed of the vehicle
+
+        Returns
+        -------
+        bool
+            True if the vehicle was added, False otherwise
+        """
+        # Only insert the vehicle if it can follow the last vehicle in the
+        # network with a time headway of at least one second.
+        min_gap = self._vehicle_params(type_id)["min_gap"]
+        if len(self._ids) > 0 and \
+                np.min(self._pos) < VEHICLE_LENGTH + min_gap + speed:
+            return False
+
+        self._add(veh_id, type_id, 0., speed)
+        self._departed_ids.append(veh_id)
+        self.update(reset=False)
+        return True
+
+    def remove(self, veh_id):
+        """Remove a vehicle from the network."""
+        if veh_id in self._index:
+            keep = np.ones(len(self._ids), dtype=bool)
+            keep[self._index[veh_id]] = False
+            self._filter(keep)
+            self.update(reset=False)
+
+    def reset(self):
+        """Reset the vehicle kernel (no-op)."""
+        pass
+
+    def _clear(self):
+        """Remove all vehicles from the network."""
+        self._ids = []
+        self._index = {}
+        self._types = []
+        self._observed = set()
+        self._pos = np.array([])
+        self._speed = np.array([])
+        self._accel = np.array([])
+        self._is_rl = np.array([], dtype=bool)
+        self._commanded_accel = np.array([])
+        self._commanded = np.array([], dtype=bool)
+        self._model_params = {
+            key: np.array([]) for key in self._vehicle_params(None).keys()
+            if key != "is_rl"}
+
+    def _add(self, veh_id, type_id, pos, speed):
+        """Append a vehicle to the state arrays."""
+        params = self._vehicle_params(type_id)
+
+        self._ids.append(veh_id)
+        self._types.append(type_id)
+        self._pos = np.append(self._pos, pos)
+        self._speed = np.append(self._speed, speed)
+        self._accel = np.append(self._accel, 0.)
+        self._is_rl = np.append(self._is_rl, params.pop("is_rl"))
+        self._commanded_accel = np.append(self._commanded_accel, 0.)
+        self._commanded = np.append(self._commanded, False)
+        for key, val in params.items():
+            self._model_params[key] = np.append(self._model_params[key], val)
+        self._index[veh_id] = len(self._ids) - 1
+
+    def _filter(self, keep):
+        """Keep only the vehicles for which `keep` is True."""
+        self._ids = [v for v, k in zip(self._ids, keep) if k]
+        self._types = [t for t, k in zip(self._types, keep) if k]
+        self._pos = self._pos[keep]
+        self._speed = self._speed[keep]
+        self._accel = self._accel[keep]
+        self._is_rl = self._is_rl[keep]
+        self._commanded_accel = self._commanded_accel[keep]
+        self._commanded = self._commanded[keep]
+        for key in self._model_params.keys():
+            self._model_params[key] = self._model_params[key][keep]
+        self._leader = np.array([], dtype=int)
+        self._follower = np.array([], dtype=int)
+
+    def _vehicle_params(self, type_id):
+        """Return the car-following parameters of a vehicle type.
+
+        Vehicles that are not controlled by a Bando-FTL controller, including
+        automated vehicles that are not assigned an action, follow the IDM
+        model.
+        """
+        params = dict(IDM_PARAMS)
+        params.update(BANDO_PARAMS)
+        params.update(bando=False, is_rl=False, max_accel=3., max_decel=3.,
+                      min_gap=2.5)
+        if type_id is None:
+            return params
+
+        type_params = self.type_parameters[type_id]
+        controller, ctrl_params = type_params["acceleration_controller"]
+        car_following_params = type_params.get("car_following_params")
+        if car_following_params is not None:
+            cf = car_following_params.controller_params
+            params["max_accel"] = float(cf.get("accel", 3.))
+            params["max_decel"] = float(cf.get("decel", 3.))
+            params["min_gap"] = float(cf.get("minGap", 2.5))
+
+        params["is_rl"] = controller == RLController
+        params["bando"] = controller == BandoFTLController
+        for key in ctrl_params.keys():
+            if key in params:
+                params[key] = ctrl_params[key]
+
+        # Automated vehicles follow a noise-free car-following model when no
+        # action is provided.
+        if params["is_rl"]:
+            params["noise"] = 0
+
+        return params
+
+
+class NumpySimulationKernel(object):
+    """Simulation kernel of the NumPy simulator.
+
+    Attributes
+    ----------
+    sim_step : float
+        the simulation step size, in seconds
+    use_ballistic : bool
+        whether to use the ballistic position update rule
+    time : float
+        the current simulation time, in seconds
+    """
+
+    def __init__(self, master_kernel, sim_params):
+        """Instantiate the simulation kernel.
+
+        Parameters
+        ----------
+        master_kernel : NumpyKernel
+            the higher level kernel
+        sim_params : flow.core.params.SimParams
+            simulation-specific parameters
+        """
+        self.master_kernel = master_kernel
+        self.sim_step = sim_params.sim_step
+        self.use_ballistic = getattr(sim_params, "use_ballistic", False)
+        self.time = 0
+        self._collision = False
+        self._inflow_count = []
+
+    def start_simulation(self, network, vehicles, initial_config):
+        """Start a new simulation.
+
+        Parameters
+        ----------
+        network : flow.networks.Network
+            the network to simulate
+        vehicles : flow.core.params.VehicleParams
+            the initial vehicles and their types
+        initial_config : flow.core.params.InitialConfig
+            parameters affecting the positioning of vehicles
+        """
+        self.master_kernel.network.generate_network(network)
+        self.master_kernel.vehicle.initialize(vehicles, initial_config)
+        self.time = 0
+        self._collision = False
+
+        self._inflow_count = [0 for _ in self.master_kernel.network.inflows]
+
+    def simulation_step(self):
+        """Advance the simulation by one step."""
+        vehicle = self.master_kernel.vehicle
+        self._collision = vehicle.step(self.sim_step, self.use_ballistic)
+        self.time += self.sim_step
+
+        # Add new vehicles from the inflows. Vehicles that could not be
+        # inserted are delayed until there is space, and are inserted in the
+        # order of their scheduled departure times.
+        inflows = self.master_kernel.network.inflows
+        backlog = []
+        for i, inflow in enumerate(inflows):
+            rate = inflow.get("vehsPerHour", inflow.get("vehs_per_hour"))
+            if rate is None or rate <= 0:
+                continue
+            depart_time = self._inflow_count[i] * 3600. / rate
+            if depart_time <= self.time:
+                backlog.append((depart_time, i))
+
+        for _, i in sorted(backlog):
+            inflow = inflows[i]
+            veh_id = "{}.{}".format(inflow["name"], self._inflow_count[i])
+            speed = inflow.get("departSpeed", 0)
+            speed = speed if isinstance(speed, (int, float)) else 0
+            if not vehicle.add_inflow_vehicle(veh_id, inflow["vtype"], speed):
+                break
+            self._inflow_count[i] += 1
+
+    def check_collision(self):
+        """Return whether a collision occurred in the last step."""
+        return self._collision
+
+    def close(self):
+        """Close the simulation (no-op)."""
+        pass
+
+
+def init_numpy_env(env, env_params, sim_params, network):
+    """Initialize a Flow environment that uses the NumPy simulator.
+
+    This replaces the initialization procedure of flow.envs.Env, which starts
+    a SUMO instance.
+
+    Parameters
+    ----------
+    env : flow.envs.Env
+        the environment to initialize
+    env_params : flow.core.params.EnvParams
+        environment-specific parameters
+    sim_params : flow.core.params.SimParams
+        simulation-specific parameters
+    network : flow.networks.Network
+        the network to simulate
+    """
+    env.env_params = env_params
+    env.network = network
+    env.net_params = network.net_params
+    env.initial_config = network.initial_config
+    env.sim_params = deepcopy(sim_params)
+    env.should_render = False
+    env.sim_params.render = False
+    env.simulator = "numpy"
+    env.time_counter = 0
+    env.step_counter = 0
+    env.state = None
+
+    env.k = NumpyKernel(env.sim_params)
+    env.k.simulation.start_simulation(
+        network, network.vehicles, network.initial_config)
+
+    env.available_routes = {}
+    env.initial_ids = deepcopy(network.vehicles.ids)
+    env.initial_vehicles = deepcopy(network.vehicles)
+
+
+def reset_numpy_env(env):
+    """Reset a Flow environment that uses the NumPy simulator.
+
+    The simulation is restarted from the network currently assigned to the
+    environment, so changes to `env.network` (e.g. the number of vehicles) are
+    taken into account.
+
+    Parameters
+    ----------
+    env : flow.envs.Env
+        the environment to reset
+
+    Returns
+    -------
+    array_like or dict
+        the initial observation
+    """
+    env.time_counter = 0
+
+    env.k.simulation.start_simulation(
+        env.network, env.network.vehicles, env.network.initial_config)
+    env.initial_ids = deepcopy(env.network.vehicles.ids)
+
+    # Perform (optional) warm-up steps before training.
+    for _ in range(env.env_params.warmup_steps):
+        env.step(rl_actions=None)
+
+    return env.get_state()
+
+
+def step_numpy_env(env, rl_actions, multiagent=False):
+    """Advance a Flow environment that uses the NumPy simulator.
+
+    This mirrors flow.envs.Env.step and flow.envs.multiagent.MultiEnv.step.
+
+    Parameters
+    ----------
+    env : flow.envs.Env
+        the environment to advance
+    rl_actions : array_like or dict
+        the actions by the automated vehicles
+    multiagent : bool
+        whether the environment is a multi-agent environment
+
+    Returns
+    -------
+    array_like or dict
+        the next observation
+    float or dict
+        the reward
+    bool or dict
+        the done mask
+    dict
+        additional information
+    """
+    crash = False
+    for _ in range(env.env_params.sims_per_step):
+        env.time_counter += 1
+        env.step_counter += 1
+
+        env.apply_rl_actions(rl_actions)
+        env.additional_command()
+
+        # Advance the simulation by one step.
+        env.k.simulation.simulation_step()
+        env.k.update(reset=False)
+
+        # Stop collecting new simulation steps if there is a collision.
+        crash = env.k.simulation.check_collision()
+        if crash:
+            break
+
+    states = env.get_state()
+    done = crash or env.time_counter >= env.env_params.sims_per_step * (
+        env.env_params.warmup_steps + env.env_params.horizon)
+
+    if multiagent:
+        arrived_ids = env.k.vehicle.get_arrived_ids()
+        dones = {key: key in arrived_ids for key in states.keys()}
+        dones["__all__"] = done
+        infos = {key: {} for key in states.keys()}
+        reward = env.compute_reward(env.clip_actions(rl_actions), fail=crash)
+        return states, reward, dones, infos
+    else:
+        env.state = np.asarray(states).T
+        if env.env_params.clip_actions:
+            rl_actions = env.clip_actions(rl_actions)
+        reward = env.compute_reward(rl_actions, fail=crash)
+        return np.copy(states), reward, done, {}
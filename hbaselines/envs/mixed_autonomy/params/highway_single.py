@@ -33,7 +33,10 @@ PENETRATION_RATE = 0.1
 INCLUDE_NOISE = False
 
 
-def get_flow_params(evaluate=False, multiagent=False, imitation=False):
+def get_flow_params(evaluate=False,
+                    multiagent=False,
+                    imitation=False,
+                    simulator="traci"):
     """Return the flow-specific parameters of the single lane highway network.
 
     Parameters
@@ -46,6 +49,10 @@ def get_flow_params(evaluate=False, multiagent=False, imitation=False):
         assigned by a separate policy call
     imitation : bool
         whether to use the imitation environment
+    simulator : str
+        the simulator used, one of {'traci', 'numpy'}. 'numpy' refers to the
+        stand-in simulator in hbaselines/envs/mixed_autonomy/kernel.py, which
+        does not require SUMO
 
     Returns
     -------
@@ -161,7 +168,7 @@ def get_flow_params(evaluate=False, multiagent=False, imitation=False):
         network=HighwayNetwork,
 
         # simulator that is used by the experiment
-        simulator='traci',
+        simulator=simulator,
 
         # environment related parameters (see flow.core.params.EnvParams)
         env=EnvParams(
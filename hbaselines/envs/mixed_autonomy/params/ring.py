@@ -42,7 +42,9 @@ def get_flow_params(num_automated=5,
     num_automated : int
         number of automated (RL) vehicles
     simulator : str
-        the simulator used, one of {'traci', 'aimsun'}
+        the simulator used, one of {'traci', 'aimsun', 'numpy'}. 'numpy'
+        refers to the stand-in simulator in
+        hbaselines/envs/mixed_autonomy/kernel.py, which does not require SUMO
     evaluate : bool
         whether to compute the evaluation reward
     multiagent : bool
@@ -8,6 +8,94 @@ from multiworld.core.multitask_env import MultitaskEnv
 from multiworld.core.serializable import Serializable
 from multiworld.envs.pygame.pygame_viewer import PygameViewer
 
+# RGB values of the colors used when rendering the environment
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+
+
+def disk_mask(radius):
+    """Return the pixels covered by a solid circle.
+
+    This follows the midpoint algorithm used by pygame.draw.circle, so that
+    images match those produced by the PygameViewer.
+
+    Parameters
+    ----------
+    radius : int
+        the radius of the circle, in pixels
+
+    Returns
+    -------
+    array_like
+        boolean mask of shape (2 * radius, 2 * radius). Element [i, j]
+        corresponds to the pixel at (x, y) = (j - radius, i - radius) relative
+        to the center of the circle.
+    """
+    radius = max(radius, 0)
+    mask = np.zeros((2 * radius, 2 * radius), dtype=bool)
+
+    f = 1 - radius
+    ddf_x = 0
+    ddf_y = -2 * radius
+    x = 0
+    y = radius
+    while x < y:
+        if f >= 0:
+            y -= 1
+            ddf_y += 2
+            f += ddf_y
+        x += 1
+        ddf_x += 2
+        f += ddf_x + 1
+
+        if f >= 0:
+            mask[radius + y - 1, radius - x:radius + x] = True
+            mask[radius - y, radius - x:radius + x] = True
+        mask[radius + x - 1, radius - y:radius + y] = True
+        mask[radius - x, radius - y:radius + y] = True
+
+    return mask
+
+
+def line_pixels(p1, p2):
+    """Return the pixels covered by a one pixel wide line segment.
+
+    This follows the Bresenham algorithm used by pygame.draw.line.
+
+    Parameters
+    ----------
+    p1 : (int, int)
+        the x,y pixel coordinates of the start of the segment
+    p2 : (int, int)
+        the x,y pixel coordinates of the end of the segment
+
+    Returns
+    -------
+    list of (int, int)
+        the x,y pixel coordinates of every pixel in the segment
+    """
+    (x1, y1), (x2, y2) = p1, p2
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = dx - dy
+
+    pixels = [(x1, y1)]
+    while (x1, y1) != (x2, y2):
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x1 += sx
+        if e2 < dx:
+            err += dx
+            y1 += sy
+        pixels.append((x1, y1))
+
+    return pixels
+
 
 class Point2DEnv(MultitaskEnv, Serializable):
     """A little 2D point whose life goal is to reach a target.
@@ -63,9 +151,9 @@ class Point2DEnv(MultitaskEnv, Serializable):
         the context space of the environment
     observation_space : gym.spaces.*
         the observation space of the environment
-    drawer : multiworld.envs.pygame.pygame_viewer.PygameViewer or None
-        The drawer for the images of the environment. Set to None if images are
-        not being used.
+    drawer : dict or None
+        the cached elements used to render images of the environment, see
+        _init_drawer. Set to None if images have not been rendered yet.
     render_drawer : multiworld.envs.pygame.pygame_viewer.PygameViewer or None
         The drawer for the images of the environment if the environment is
         being rendered. Set to None if images are not being used.
@@ -284,8 +372,7 @@ class Point2DEnv(MultitaskEnv, Serializable):
         See States in the description of the environment for more.
         """
         if self.images_in_obs:
-            img = self.get_image(
-                32, 32).reshape([-1]).astype(np.float32) / 255.0
+            img = self.get_image(32, 32, dtype=np.float32).reshape([-1])
             return np.concatenate([img, self._position.copy()], 0)
         else:
             return self._position.copy()
@@ -338,28 +425,141 @@ class Point2DEnv(MultitaskEnv, Serializable):
     #                     Functions for ImageEnv wrapper                      #
     # ======================================================================= #
 
-    def get_image(self, width=None, height=None):
-        """Return a black and white image."""
+    def get_image(self, width=None, height=None, dtype=np.uint8):
+        """Return a black and white image.
+
+        The image is rendered with NumPy, and matches the image drawn by a
+        PygameViewer via the draw method. The walls are rasterized once into
+        a background mask, and the goal and ball are drawn with precomputed
+        disk masks.
+
+        Parameters
+        ----------
+        width : int
+            width of the image, in pixels
+        height : int
+            height of the image, in pixels
+        dtype : type
+            the data type of the image. Images of floating point types are
+            scaled to lie between 0 and 1.
+
+        Returns
+        -------
+        array_like
+            the image. If images_are_rgb is set to True, this is of shape
+            (height, width, 3), otherwise it is flattened from an array of
+            shape (height, width).
+        """
         if self.drawer is None:
             if width != height:
                 raise NotImplementedError()
-            self.drawer = PygameViewer(
-                screen_width=width,
-                screen_height=height,
-                x_bounds=(-self.boundary_dist - self.ball_radius,
-                          self.boundary_dist + self.ball_radius),
-                y_bounds=(-self.boundary_dist - self.ball_radius,
-                          self.boundary_dist + self.ball_radius),
-                render_onscreen=self.render_onscreen,
-            )
-        self.draw(self.drawer)
-        img = self.drawer.get_image()
+            self.drawer = self._init_drawer(width, height)
+        drawer = self.drawer
+
+        colors = drawer["colors"].get(dtype)
+        if colors is None:
+            colors = self._get_colors(dtype)
+            drawer["colors"][dtype] = colors
+        white, black, green, blue = colors
+
+        img = np.empty(drawer["shape"], dtype=dtype)
+        img[:] = white
+        if self.show_goal:
+            self._draw_disk(
+                img, self._target_position, drawer["target_mask"], green)
+        self._draw_disk(img, self._position, drawer["ball_mask"], blue)
+        if len(drawer["walls"][0]) > 0:
+            img[drawer["walls"]] = black
+
         if self.images_are_rgb:
-            return img.transpose((1, 0, 2))
-        else:
-            r, b = img[:, :, 0], img[:, :, 2]
-            img = (-r + b).transpose().flatten()
             return img
+        else:
+            return img.flatten()
+
+    def _init_drawer(self, width, height):
+        """Create the cached elements used to render images.
+
+        Parameters
+        ----------
+        width : int
+            width of the image, in pixels
+        height : int
+            height of the image, in pixels
+
+        Returns
+        -------
+        dict
+            the rendering elements, consisting of the image shape, the
+            transformation from positions to pixels, the pixels of the walls,
+            the masks of the target and ball, and the colors for every data
+            type
+        """
+        x_bounds = (-self.boundary_dist - self.ball_radius,
+                    self.boundary_dist + self.ball_radius)
+        y_bounds = (-self.boundary_dist - self.ball_radius,
+                    self.boundary_dist + self.ball_radius)
+        scale = (width / (x_bounds[1] - x_bounds[0]),
+                 height / (y_bounds[1] - y_bounds[0]))
+        offset = (x_bounds[0], y_bounds[0])
+
+        drawer = {
+            "shape": (height, width, 3) if self.images_are_rgb else
+            (height, width),
+            "scale": scale,
+            "offset": offset,
+            "colors": {},
+        }
+
+        # rasterize the walls into a background mask
+        walls = np.zeros((height, width), dtype=bool)
+        for wall in self.walls:
+            endpoints = [self._to_pixel(drawer, p) for p in (
+                wall.endpoint1, wall.endpoint2, wall.endpoint3,
+                wall.endpoint4)]
+            for p1, p2 in zip(endpoints, endpoints[1:] + endpoints[:1]):
+                for x, y in line_pixels(p1, p2):
+                    if 0 <= x < width and 0 <= y < height:
+                        walls[y, x] = True
+        drawer["walls"] = np.nonzero(walls)
+
+        drawer["target_mask"] = disk_mask(int(self.target_radius * scale[0]))
+        drawer["ball_mask"] = disk_mask(int(self.ball_radius * scale[0]))
+
+        return drawer
+
+    def _get_colors(self, dtype):
+        """Return the white, black, green, and blue pixel values.
+
+        For black and white images, a pixel's value is the difference between
+        its blue and red channels (mod 256).
+        """
+        colors = np.array([WHITE, BLACK, GREEN, BLUE])
+        if not self.images_are_rgb:
+            colors = (colors[:, 2] - colors[:, 0]) % 256
+        if np.issubdtype(dtype, np.floating):
+            colors = colors / 255.0
+        return colors.astype(dtype)
+
+    @staticmethod
+    def _to_pixel(drawer, point):
+        """Convert an x,y position to pixel coordinates."""
+        return (int(drawer["scale"][0] * (point[0] - drawer["offset"][0])),
+                int(drawer["scale"][1] * (point[1] - drawer["offset"][1])))
+
+    def _draw_disk(self, img, center, mask, color):
+        """Draw a solid circle onto an image, clipped at its edges."""
+        height, width = img.shape[:2]
+        radius = mask.shape[0] // 2
+        x, y = self._to_pixel(self.drawer, center)
+
+        x0, x1 = max(x - radius, 0), min(x + radius, width)
+        y0, y1 = max(y - radius, 0), min(y + radius, height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        mask = mask[y0 - y + radius:y1 - y + radius,
+                    x0 - x + radius:x1 - x + radius]
+        img[y0:y1, x0:x1][mask] = color
 
     def draw(self, drawer):
         """Create the image corresponding to the current state."""
@@ -428,7 +628,7 @@ class Point2DEnv(MultitaskEnv, Serializable):
     # ======================================================================= #
 
     @staticmethod
-    def true_model(state, action):
+    def true_model(state, action, boundary_dist=4):
         """Return the next position by the agent.
 
         Parameters
@@ -437,6 +637,8 @@ class Point2DEnv(MultitaskEnv, Serializable):
             the state by the agent
         action : array_like
             the action by the agent
+        boundary_dist : float
+            the distance from the center to the boundary
 
         Returns
         -------
@@ -448,12 +650,12 @@ class Point2DEnv(MultitaskEnv, Serializable):
         new_position = position + velocities
         return np.clip(
             new_position,
-            a_min=-Point2DEnv.boundary_dist,
-            a_max=Point2DEnv.boundary_dist,
+            a_min=-boundary_dist,
+            a_max=boundary_dist,
         )
 
     @staticmethod
-    def true_states(state, actions):
+    def true_states(state, actions, boundary_dist=4):
         """Return the next states given a set of states and actions.
 
         Parameters
@@ -462,6 +664,8 @@ class Point2DEnv(MultitaskEnv, Serializable):
             the states by the agent
         actions : array_like
             the actions by the agent
+        boundary_dist : float
+            the distance from the center to the boundary
 
         Returns
         -------
@@ -470,11 +674,74 @@ class Point2DEnv(MultitaskEnv, Serializable):
         """
         real_states = [state]
         for action in actions:
-            next_state = Point2DEnv.true_model(state, action)
+            next_state = Point2DEnv.true_model(state, action, boundary_dist)
             real_states.append(next_state)
             state = next_state
         return real_states
 
+    @staticmethod
+    def batch_true_model(states, actions, boundary_dist=4, wall_bounds=None):
+        """Return the next positions of a batch of agents.
+
+        Parameters
+        ----------
+        states : array_like
+            the states of the agents, of shape (B, 2)
+        actions : array_like
+            the actions by the agents, of shape (B, 2)
+        boundary_dist : float
+            the distance from the center to the boundary
+        wall_bounds : array_like or None
+            the x_min, x_max, y_min, and y_max of every wall, see
+            get_wall_bounds. If set to None, walls are ignored.
+
+        Returns
+        -------
+        array_like
+            the next positions, of shape (B, 2)
+        """
+        states = np.asarray(states, dtype=np.float64)
+        new_states = states + np.clip(actions, a_min=-1, a_max=1)
+        if wall_bounds is not None and len(wall_bounds) > 0:
+            new_states = handle_wall_collisions(
+                states, new_states, wall_bounds)
+        return np.clip(new_states, a_min=-boundary_dist, a_max=boundary_dist)
+
+    @staticmethod
+    def batch_true_states(states, actions, boundary_dist=4, wall_bounds=None):
+        """Return the trajectories of a batch of agents.
+
+        All B trajectories are rolled out together, one time step at a time.
+
+        Parameters
+        ----------
+        states : array_like
+            the initial states of the agents, of shape (B, 2)
+        actions : array_like
+            the sequences of actions by the agents, of shape (B, T, 2)
+        boundary_dist : float
+            the distance from the center to the boundary
+        wall_bounds : array_like or None
+            the x_min, x_max, y_min, and y_max of every wall, see
+            get_wall_bounds. If set to None, walls are ignored.
+
+        Returns
+        -------
+        array_like
+            the states of the agents, including the initial states, of shape
+            (B, T + 1, 2)
+        """
+        actions = np.asarray(actions)
+        num_steps = actions.shape[1]
+
+        real_states = np.empty((actions.shape[0], num_steps + 1, 2))
+        real_states[:, 0] = states
+        for t in range(num_steps):
+            real_states[:, t + 1] = Point2DEnv.batch_true_model(
+                real_states[:, t], actions[:, t], boundary_dist, wall_bounds)
+
+        return real_states
+
     def plot_trajectory(self, ax, states, actions, goal=None):
         """Plot the trajectory of an agent.
 
@@ -563,3 +830,341 @@ class Point2DEnv(MultitaskEnv, Serializable):
             -self.boundary_dist - 1,
             self.boundary_dist + 1,
         )
+
+
+def get_wall_bounds(walls):
+    """Return the axis-aligned bounds of a set of walls.
+
+    Parameters
+    ----------
+    walls : list of multiworld.envs.pygame.walls.Wall
+        the walls. The bounds of each wall are its min_x, max_x, min_y, and
+        max_y, which already include its minimum distance and thickness. These
+        are the segments that Wall.handle_collision collides the agents
+        against in Point2DEnv.step.
+
+    Returns
+    -------
+    array_like
+        the x_min, x_max, y_min, and y_max of every wall, of shape
+        (len(walls), 4)
+    """
+    bounds = np.zeros((len(walls), 4))
+    for i, wall in enumerate(walls):
+        bounds[i] = [wall.min_x, wall.max_x, wall.min_y, wall.max_y]
+    return bounds
+
+
+def handle_wall_collisions(start, end, wall_bounds, reverse=False):
+    """Resolve the collisions of a batch of agents with a set of walls.
+
+    The trajectory of every agent is intersected with the walls, in order. If
+    an agent enters a wall, it is stopped at the face of the wall it entered
+    from, while its movement along the face is preserved. As in
+    Point2DEnv.step, the walls are processed again in the reverse order for
+    agents whose movement was blocked along both axes.
+
+    Parameters
+    ----------
+    start : array_like
+        the initial positions of the agents, of shape (N, 2)
+    end : array_like
+        the desired next positions of the agents, of shape (N, 2)
+    wall_bounds : array_like
+        the x_min, x_max, y_min, and y_max of every wall, see get_wall_bounds
+    reverse : bool
+        whether to process the walls in the reverse order
+
+    Returns
+    -------
+    array_like
+        the next positions of the agents, of shape (N, 2)
+    """
+    new_end = np.array(end, dtype=np.float64)
+
+    for x_min, x_max, y_min, y_max in (
+            wall_bounds[::-1] if reverse else wall_bounds):
+        delta = new_end - start
+
+        # times at which the trajectories enter and exit the wall's slabs
+        t_near = np.empty_like(new_end)
+        t_far = np.empty_like(new_end)
+        for axis, (low, high) in enumerate([(x_min, x_max), (y_min, y_max)]):
+            d = delta[:, axis]
+            p = start[:, axis]
+            moving = d != 0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t1 = (low - p) / d
+                t2 = (high - p) / d
+            inside = np.logical_and(low < p, p < high)
+            t_near[:, axis] = np.where(
+                moving, np.minimum(t1, t2), np.where(inside, -np.inf, np.inf))
+            t_far[:, axis] = np.where(
+                moving, np.maximum(t1, t2), np.where(inside, np.inf, -np.inf))
+
+        t_enter = t_near.max(axis=1)
+        t_exit = t_far.min(axis=1)
+        hit = np.logical_and.reduce(
+            [t_enter < t_exit, t_enter >= 0, t_enter < 1])
+        if not hit.any():
+            continue
+
+        # stop the agents at the face they hit
+        hit_x = np.logical_and(hit, t_near[:, 0] >= t_near[:, 1])
+        hit_y = np.logical_and(hit, t_near[:, 0] < t_near[:, 1])
+        new_end[hit_x, 0] = np.where(delta[hit_x, 0] > 0, x_min, x_max)
+        new_end[hit_y, 1] = np.where(delta[hit_y, 1] > 0, y_min, y_max)
+
+    if not reverse and len(wall_bounds) > 1:
+        # Hack: sometimes you get caught on two walls at a time. If you
+        # process the input in the other direction, you might only get caught
+        # on one wall instead.
+        stuck = np.sum(new_end != end, axis=1) > 1
+        if stuck.any():
+            new_end[stuck] = handle_wall_collisions(
+                start[stuck], end[stuck], wall_bounds, reverse=True)
+
+    return new_end
+
+
+class VecPoint2DEnv(object):
+    """A batch of Point2DEnv agents that are stepped together.
+
+    The positions and goals of all agents are stored as arrays, and every
+    operation, including collisions with the walls, is vectorized across the
+    agents. Images are not supported, so the observations are the positions
+    of the agents.
+
+    Unlike Point2DEnv, which relies on the collision handling of the walls
+    themselves, the walls are treated as the axis-aligned boxes bounded by
+    the collision segments of each wall (see get_wall_bounds), which results
+    in the same positions; see handle_wall_collisions.
+
+    Attributes
+    ----------
+    num_envs : int
+        number of agents
+    reward_type : str
+        the reward type. Must be one of: "sparse", "dense", or
+        "vectorized_dense"
+    action_scale : float
+        the multiple from action to velocity
+    target_radius : float
+        the radius of the targeted position
+    boundary_dist : float
+        the distance from the center to the boundary
+    walls : list of multiworld.envs.pygame.walls.Wall
+        the walls in the environment
+    wall_bounds : array_like
+        the x_min, x_max, y_min, and y_max of every wall
+    fixed_goal : [float, float] or None
+        the goal to use. If set to None, it is picked randomly.
+    randomize_position_on_reset : bool
+        whether to initialize the position of the agents randomly
+    action_space : gym.spaces.*
+        the action space of a single agent
+    obs_range : gym.spaces.*
+        the range of the initial position of the agents
+    context_space  : gym.spaces.*
+        the context space of a single agent
+    observation_space : gym.spaces.*
+        the observation space of a single agent
+    horizon : int
+        environment time horizon
+    t : int
+        number of steps since the start of the most recent episode
+    """
+
+    def __init__(self,
+                 num_envs,
+                 reward_type="dense",
+                 action_scale=1.0,
+                 target_radius=0.60,
+                 boundary_dist=4,
+                 walls=None,
+                 fixed_goal=None,
+                 randomize_position_on_reset=True,
+                 horizon=200):
+        """Instantiate the environment.
+
+        Parameters
+        ----------
+        num_envs : int
+            number of agents
+        reward_type : str
+            the reward type. Must be one of: "sparse", "dense", or
+            "vectorized_dense"
+        action_scale : float
+            the multiple from action to velocity
+        target_radius : float
+            the radius of the targeted position
+        boundary_dist : float
+            the distance from the center to the boundary
+        walls : list of multiworld.envs.pygame.walls.Wall or None
+            the walls in the environment
+        fixed_goal : [float, float] or None
+            the goal to use. If set to None, it is picked randomly.
+        randomize_position_on_reset : bool
+            whether to initialize the position of the agents randomly
+        horizon : int
+            environment time horizon
+        """
+        if walls is None:
+            walls = []
+        if fixed_goal is not None:
+            fixed_goal = np.array(fixed_goal)
+
+        self.num_envs = num_envs
+        self.reward_type = reward_type
+        self.action_scale = action_scale
+        self.target_radius = target_radius
+        self.boundary_dist = boundary_dist
+        self.walls = walls
+        self.wall_bounds = get_wall_bounds(walls)
+        self.fixed_goal = fixed_goal
+        self.randomize_position_on_reset = randomize_position_on_reset
+
+        self._target_position = None
+        self._position = np.zeros((num_envs, 2))
+
+        u = np.ones(2)
+        self.action_space = spaces.Box(-u, u, dtype=np.float32)
+
+        o = self.boundary_dist * np.ones(2)
+        self.obs_range = spaces.Box(-o, o, dtype='float32')
+        self.context_space = spaces.Box(-o, o, dtype='float32')
+        self.observation_space = spaces.Box(-o, o, dtype='float32')
+
+        self.horizon = horizon
+        self.t = 0
+
+    @property
+    def current_context(self):
+        """Return the current goals of the agents."""
+        return self._target_position
+
+    def step(self, velocities):
+        """Advance the simulation of every agent by one step.
+
+        Parameters
+        ----------
+        velocities : array_like
+            the actions by the agents, defined as their velocities in the x and
+            y directions, of shape (num_envs, 2)
+
+        Returns
+        -------
+        array_like
+            the observations of the agents, of shape (num_envs, 2)
+        array_like
+            the rewards of the agents. This is of shape (num_envs, 2) if
+            reward_type is "vectorized_dense", and (num_envs,) otherwise.
+        array_like
+            whether the episode of every agent has ended
+        dict
+            the diagnostic information of every agent. Each element is an
+            array with one entry per agent.
+        """
+        assert self.action_scale <= 1.0
+        velocities = np.clip(
+            velocities, a_min=-1, a_max=1) * self.action_scale
+        new_position = self._position + velocities
+        if len(self.wall_bounds) > 0:
+            new_position = handle_wall_collisions(
+                self._position, new_position, self.wall_bounds)
+
+        self.t += 1
+
+        self._position = np.clip(
+            new_position,
+            a_min=-self.boundary_dist,
+            a_max=self.boundary_dist,
+        )
+        distance_to_target = np.linalg.norm(
+            self._position - self._target_position, axis=1)
+        is_success = distance_to_target < self.target_radius
+
+        obs = self._get_obs()
+        reward = self.compute_rewards(velocities, {'ob': obs})
+        info = {
+            'radius': self.target_radius,
+            'target_position': self._target_position,
+            'distance_to_target': distance_to_target,
+            'velocity': velocities,
+            'speed': np.linalg.norm(velocities, axis=1),
+            'is_success': is_success,
+        }
+        done = np.full(self.num_envs, self.t >= self.horizon)
+        return obs, reward, done, info
+
+    def reset(self):
+        """Reset every agent in the environment."""
+        self.t = 0
+        self._target_position = self.sample_goals(self.num_envs)['goals']
+        if self.randomize_position_on_reset:
+            self._position = self._sample_positions(
+                self.num_envs,
+                self.obs_range.low,
+                self.obs_range.high,
+            )
+
+        return self._get_obs()
+
+    def _positions_inside_walls(self, pos):
+        """Return True for every position that is in a wall."""
+        inside = np.zeros(len(pos), dtype=bool)
+        for x_min, x_max, y_min, y_max in self.wall_bounds:
+            inside |= np.logical_and.reduce([
+                x_min < pos[:, 0], pos[:, 0] < x_max,
+                y_min < pos[:, 1], pos[:, 1] < y_max])
+        return inside
+
+    def _sample_positions(self, num_positions, low, high):
+        """Sample positions that are not inside any wall."""
+        pos = np.random.uniform(low, high, size=(num_positions, len(low)))
+        inside = self._positions_inside_walls(pos)
+        while inside.any():
+            pos[inside] = np.random.uniform(
+                low, high, size=(inside.sum(), len(low)))
+            inside = self._positions_inside_walls(pos)
+        return pos
+
+    def _get_obs(self):
+        """Return the observations of the agents."""
+        return self._position.copy()
+
+    def compute_rewards(self, actions, obs):
+        """Return the rewards of the agents.
+
+        See Point2DEnv.compute_rewards.
+        """
+        achieved_goals = obs['ob']
+        desired_goals = self._target_position
+        d = np.linalg.norm(achieved_goals - desired_goals, axis=-1)
+        if self.reward_type == "sparse":
+            return -(d > self.target_radius).astype(np.float32)
+        elif self.reward_type == "dense":
+            return -d
+        elif self.reward_type == 'vectorized_dense':
+            return -np.abs(achieved_goals - desired_goals)
+        else:
+            raise NotImplementedError()
+
+    def get_goal(self):
+        """Return the goals of the agents."""
+        return self._target_position.copy()
+
+    def sample_goals(self, batch_size):
+        """Sample a batch of goals.
+
+        The goal is the desired x,y coordinates.
+        """
+        if self.fixed_goal is not None:
+            goals = np.repeat(self.fixed_goal.copy()[None], batch_size, 0)
+        else:
+            goals = self._sample_positions(
+                batch_size,
+                self.obs_range.low,
+                self.obs_range.high,
+            )
+        return {'goals': goals}
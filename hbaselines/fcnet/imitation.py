@@ -1,4 +1,5 @@
 """Script containing the fcnet variant of the imitation learning policy."""
+import numpy as np
 import tensorflow as tf
 
 from hbaselines.base_policies import ImitationLearningPolicy
@@ -11,6 +12,7 @@ from hbaselines.utils.tf_util import gaussian_likelihood
 from hbaselines.utils.tf_util import apply_squashing_func
 from hbaselines.utils.tf_util import get_trainable_vars
 from hbaselines.utils.tf_util import print_params_shape
+from hbaselines.utils.misc import prefetch
 
 
 class FeedForwardPolicy(ImitationLearningPolicy):
@@ -33,6 +35,11 @@ class FeedForwardPolicy(ImitationLearningPolicy):
         the operation that computes the loss
     optimizer : tf.Operation
         the operation that updates the trainable parameters of the policy
+    fused_updates : dict < int, tuple >
+        the placeholders, loss, and optimizer operations that perform a given
+        number of gradient steps within a single session run, indexed by the
+        number of steps. These are created the first time they are used by
+        `update_epoch`.
     """
 
     def __init__(self,
@@ -142,11 +149,13 @@ class FeedForwardPolicy(ImitationLearningPolicy):
         self.logp_ac = None
 
         # Create networks and core TF parts that are shared across setup parts.
-        with tf.compat.v1.variable_scope("model", reuse=False):
+        with tf.compat.v1.variable_scope("model", reuse=False) as vs:
+            self._model_scope = vs
             if self.stochastic:
-                self._setup_stochastic_policy(self.obs_ph, self.action_ph)
+                self.policy, self.logp_ac = self._setup_stochastic_policy(
+                    self.obs_ph, self.action_ph)
             else:
-                self._setup_deterministic_policy(self.obs_ph)
+                self.policy = self._setup_deterministic_policy(self.obs_ph)
 
         # =================================================================== #
         # Step 4: Setup the optimizer.                                        #
@@ -154,6 +163,9 @@ class FeedForwardPolicy(ImitationLearningPolicy):
 
         self.loss = None
         self.optimizer = None
+        self.fused_updates = {}
+        self._optimizer_obj = None
+        self._optimizer_vars = None
 
         with tf.compat.v1.variable_scope("Optimizer", reuse=False):
             if self.stochastic:
@@ -182,6 +194,13 @@ class FeedForwardPolicy(ImitationLearningPolicy):
             whether or not to reuse parameters
         scope : str
             the scope name of the policy
+
+        Returns
+        -------
+        tf.Variable
+            the output from the policy
+        tf.Variable
+            the log-probability of the input action
         """
         with tf.compat.v1.variable_scope(scope, reuse=reuse):
             pi_h = obs
@@ -222,9 +241,7 @@ class FeedForwardPolicy(ImitationLearningPolicy):
         _, _, logp_ac = apply_squashing_func(policy_mean, action, logp_ac)
         _, policy, _ = apply_squashing_func(policy_mean, policy, logp_pi)
 
-        # Store the variables under their respective parameters.
-        self.policy = policy
-        self.logp_ac = logp_ac
+        return policy, logp_ac
 
     def _setup_stochastic_optimizer(self, scope):
         """Create the loss and optimizer of a stochastic policy."""
@@ -237,15 +254,17 @@ class FeedForwardPolicy(ImitationLearningPolicy):
             print_params_shape(scope_name, "policy")
 
         # Define the loss function.
-        self.loss = - tf.reduce_mean(self.logp_ac)
+        self.loss = self._get_loss(self.action_ph, self.policy, self.logp_ac)
 
         # Create an optimizer object.
-        optimizer = tf.compat.v1.train.AdamOptimizer(self.learning_rate)
+        self._optimizer_obj = tf.compat.v1.train.AdamOptimizer(
+            self.learning_rate)
+        self._optimizer_vars = get_trainable_vars(scope_name)
 
         # Create the optimizer operation.
-        self.optimizer = optimizer.minimize(
+        self.optimizer = self._optimizer_obj.minimize(
             loss=self.loss,
-            var_list=get_trainable_vars(scope_name)
+            var_list=self._optimizer_vars
         )
 
     def _setup_deterministic_policy(self, obs, reuse=False, scope="pi"):
@@ -259,6 +278,11 @@ class FeedForwardPolicy(ImitationLearningPolicy):
             whether or not to reuse parameters
         scope : str
             the scope name of the policy
+
+        Returns
+        -------
+        tf.Variable
+            the output from the policy
         """
         with tf.compat.v1.variable_scope(scope, reuse=reuse):
             pi_h = obs
@@ -285,8 +309,7 @@ class FeedForwardPolicy(ImitationLearningPolicy):
 
             policy = ac_means + ac_magnitudes * tf.to_float(policy)
 
-        # Store the variables under their respective parameters.
-        self.policy = policy
+        return policy
 
     def _setup_deterministic_optimizer(self, action, scope=None):
         """Create the loss and optimizer of a deterministic policy."""
@@ -298,23 +321,118 @@ class FeedForwardPolicy(ImitationLearningPolicy):
             print('setting up optimizer')
             print_params_shape(scope_name, "policy")
 
+        # Define the loss function.
+        self.loss = self._get_loss(action, self.policy)
+
+        # Create an optimizer object.
+        self._optimizer_obj = tf.compat.v1.train.AdamOptimizer(
+            self.learning_rate)
+        self._optimizer_vars = get_trainable_vars(scope_name)
+
+        # Create the optimizer operation.
+        self.optimizer = self._optimizer_obj.minimize(
+            loss=self.loss,
+            var_list=self._optimizer_vars
+        )
+
+    def _get_loss(self, action, policy, logp_ac=None):
+        """Return the loss of the policy for a batch of expert actions.
+
+        Parameters
+        ----------
+        action : tf.Variable
+            the expert actions
+        policy : tf.Variable
+            the output from the policy
+        logp_ac : tf.Variable or None
+            the log-probability of the expert actions. Only applies to
+            stochastic policies.
+
+        Returns
+        -------
+        tf.Variable
+            the loss
+        """
+        if self.stochastic:
+            return - tf.reduce_mean(logp_ac)
+
         # Choose the loss function.
         if self.use_huber:
             loss_fn = tf.compat.v1.losses.huber_loss
         else:
             loss_fn = tf.compat.v1.losses.mean_squared_error
 
-        # Define the loss function.
-        self.loss = loss_fn(action, self.policy)
+        return loss_fn(action, policy)
 
-        # Create an optimizer object.
-        optimizer = tf.compat.v1.train.AdamOptimizer(self.learning_rate)
+    def _setup_fused_update(self, num_steps):
+        """Create the operations that perform several gradient steps at once.
 
-        # Create the optimizer operation.
-        self.optimizer = optimizer.minimize(
-            loss=self.loss,
-            var_list=get_trainable_vars(scope_name)
-        )
+        Each gradient step is computed from its own batch, and only after the
+        update from the previous step has been applied, so that running these
+        operations is equivalent to calling `update_from_batch` on each batch
+        in sequence.
+
+        Parameters
+        ----------
+        num_steps : int
+            the number of gradient steps
+
+        Returns
+        -------
+        tf.compat.v1.placeholder
+            placeholder for the observations, with an additional leading
+            dimension over the gradient steps
+        tf.compat.v1.placeholder
+            placeholder for the actions, with an additional leading dimension
+            over the gradient steps
+        tf.Operation
+            the operation that computes the loss, averaged over all steps
+        tf.Operation
+            the operation that performs all the gradient steps
+        """
+        ob_dim = self._get_ob_dim(self.ob_space, self.co_space)
+
+        def read_after_update(getter, *args, **kwargs):
+            # The value of the variable is read when the read operation runs,
+            # thereby accounting for the control dependencies below.
+            return getter(*args, **kwargs).read_value()
+
+        with self.sess.graph.as_default():
+            with tf.compat.v1.variable_scope("fused_{}".format(num_steps)):
+                obs_ph = tf.compat.v1.placeholder(
+                    tf.float32,
+                    shape=(num_steps, None) + ob_dim,
+                    name='obs0')
+                action_ph = tf.compat.v1.placeholder(
+                    tf.float32,
+                    shape=(num_steps, None) + self.ac_space.shape,
+                    name='actions')
+
+            losses = []
+            optimizer = tf.no_op()
+            for i in range(num_steps):
+                with tf.control_dependencies([optimizer]):
+                    with tf.compat.v1.variable_scope(
+                            self._model_scope, reuse=True,
+                            custom_getter=read_after_update):
+                        if self.stochastic:
+                            policy, logp_ac = self._setup_stochastic_policy(
+                                obs_ph[i], action_ph[i], reuse=True)
+                        else:
+                            logp_ac = None
+                            policy = self._setup_deterministic_policy(
+                                obs_ph[i], reuse=True)
+
+                    loss = self._get_loss(action_ph[i], policy, logp_ac)
+                    optimizer = self._optimizer_obj.minimize(
+                        loss=loss,
+                        var_list=self._optimizer_vars
+                    )
+                losses.append(loss)
+
+            loss = tf.reduce_mean(losses)
+
+        return obs_ph, action_ph, loss, optimizer
 
     def _setup_stats(self, base):
         """Create the running means and std of the model inputs and outputs.
@@ -377,6 +495,54 @@ class FeedForwardPolicy(ImitationLearningPolicy):
 
         return loss
 
+    def update_epoch(self, num_steps=1, prefetch_size=2):
+        """Perform one pass of gradient updates over the replay buffer.
+
+        Unlike `update`, which samples a batch with replacement on every call,
+        this method shuffles the replay buffer once and visits every sample
+        once (see `ReplayBuffer.sample_epoch`). The batches are gathered from
+        the replay buffer by a background thread while the previous batches
+        are being trained on, and `num_steps` gradient steps are performed
+        within every session run.
+
+        Parameters
+        ----------
+        num_steps : int
+            the number of gradient steps (i.e. batches) per session run
+        prefetch_size : int
+            the number of groups of batches gathered in advance
+
+        Returns
+        -------
+        float
+            policy loss, averaged over the epoch
+        """
+        # Not enough samples in the replay buffer.
+        if not self.replay_buffer.can_sample():
+            return 0
+
+        # Create the operations the first time they are needed.
+        if num_steps > 1 and num_steps not in self.fused_updates:
+            self.fused_updates[num_steps] = self._setup_fused_update(
+                num_steps)
+
+        losses = []
+        for obs0, actions, _, _, _ in prefetch(
+                self.replay_buffer.sample_epoch(num_steps), prefetch_size):
+            if obs0.shape[0] == num_steps > 1:
+                obs_ph, action_ph, loss, optimizer = \
+                    self.fused_updates[num_steps]
+                loss, *_ = self.sess.run(
+                    [loss, optimizer],
+                    feed_dict={obs_ph: obs0, action_ph: actions})
+                losses.extend([loss] * num_steps)
+            else:
+                # Fewer batches are left at the end of the epoch.
+                for obs0_i, actions_i in zip(obs0, actions):
+                    losses.append(self.update_from_batch(obs0_i, actions_i))
+
+        return np.mean(losses)
+
     def get_action(self, obs, context):
         """See parent class."""
         # Add the contextual observation, if applicable.
@@ -1,4 +1,4 @@
-"""Script containing the ReplayBuffer object."""
+"""Script containing the ReplayBuffer and StackedReplayBuffer objects."""
 import numpy as np
 
 
@@ -88,6 +88,44 @@ class ReplayBuffer(object):
         self._next_idx = (self._next_idx + 1) % self._maxsize
         self._size = min(self._size + 1, self._maxsize)
 
+    def add_batch(self, obs_t, action, reward, obs_tp1, done):
+        """Add a batch of transitions to the buffer.
+
+        This is equivalent to calling `add` on every transition in order, but
+        copies the transitions into the buffer in bulk.
+
+        Parameters
+        ----------
+        obs_t : array_like
+            the last observations
+        action : array_like
+            the actions
+        reward : array_like
+            the rewards of the transitions
+        obs_tp1 : array_like
+            the current observations
+        done : array_like
+            the done masks
+        """
+        num_samples = len(reward)
+
+        # Only the most recent transitions fit in the buffer.
+        start = max(num_samples - self._maxsize, 0)
+        idxes = (self._next_idx + np.arange(start, num_samples)) \
+            % self._maxsize
+
+        self.obs_t[idxes, :] = obs_t[start:]
+        self.action_t[idxes, :] = action[start:]
+        self.reward[idxes] = reward[start:]
+        self.obs_tp1[idxes, :] = obs_tp1[start:]
+        self.done[idxes] = done[start:]
+
+        # Increment the next index and size terms
+        if num_samples > 0:
+            self._current_idx = idxes[-1]
+            self._next_idx = (idxes[-1] + 1) % self._maxsize
+            self._size = min(self._size + num_samples, self._maxsize)
+
     def sample(self):
         """Sample a batch of experiences.
 
@@ -109,3 +147,144 @@ class ReplayBuffer(object):
 
         return self.obs_t[idxes, :], self.action_t[idxes, :], \
             self.reward[idxes], self.obs_tp1[idxes, :], self.done[idxes]
+
+    def sample_epoch(self, num_batches=1):
+        """Iterate over all experiences in the buffer once.
+
+        The experiences are shuffled once, and split into batches of size
+        `batch_size` without replacement. Experiences that do not fill a
+        complete batch at the end of the epoch are skipped. The batches are
+        grouped `num_batches` at a time, so that several batches may be
+        processed together.
+
+        Parameters
+        ----------
+        num_batches : int
+            number of batches to group together. The last group of the epoch
+            may contain fewer batches.
+
+        Returns
+        -------
+        generator
+            a generator over the groups of batches. Each element is a tuple
+            that matches the output of `sample`, except with an additional
+            leading dimension over the batches in the group
+        """
+        num_total = self._size // self._batch_size
+        idxes = np.random.permutation(self._size)[
+            :num_total * self._batch_size].reshape(
+            (num_total, self._batch_size))
+
+        for i in range(0, num_total, num_batches):
+            idx = idxes[i:i + num_batches]
+            yield self.obs_t[idx], self.action_t[idx], self.reward[idx], \
+                self.obs_tp1[idx], self.done[idx]
+
+
+class StackedReplayBuffer(object):
+    """Experience replay buffers of a set of stacked models.
+
+    Every model stores its samples in a separate buffer. The batches sampled
+    from every buffer are stacked along a new leading dimension, so that they
+    may be fed to policies whose parameters are stacked.
+
+    Attributes
+    ----------
+    buffers : list of hbaselines.fcnet.replay_buffer.ReplayBuffer
+        the replay buffer of every model
+    """
+
+    def __init__(self, num_models, buffer_size, batch_size, obs_dim, ac_dim):
+        """Instantiate the replay buffers.
+
+        Parameters
+        ----------
+        num_models : int
+            the number of models
+        buffer_size : int
+            Max number of transitions to store in the buffer of every model.
+            When a buffer overflows the old memories are dropped.
+        batch_size : int
+            number of elements that are to be returned as a batch for every
+            model
+        obs_dim : int
+            number of elements in the observations
+        ac_dim : int
+            number of elements in the actions
+        """
+        self.buffers = [
+            ReplayBuffer(buffer_size, batch_size, obs_dim, ac_dim)
+            for _ in range(num_models)
+        ]
+
+    def __len__(self):
+        """Return the smallest number of elements stored by a model."""
+        return min(len(buffer) for buffer in self.buffers)
+
+    @property
+    def buffer_size(self):
+        """Return the (float) max capacity of the buffer of every model."""
+        return self.buffers[0].buffer_size
+
+    def can_sample(self):
+        """Check if a batch can be sampled from the buffer of every model.
+
+        Returns
+        -------
+        bool
+            True if enough sample exist, False otherwise
+        """
+        return all(buffer.can_sample() for buffer in self.buffers)
+
+    def is_full(self):
+        """Check whether the replay buffers are full or not.
+
+        Returns
+        -------
+        bool
+            True if the buffers of all models are full, False otherwise
+        """
+        return all(buffer.is_full() for buffer in self.buffers)
+
+    def add(self, index, obs_t, action, reward, obs_tp1, done):
+        """Add a new transition to the buffer of a model.
+
+        Parameters
+        ----------
+        index : int
+            the index of the model
+        obs_t : Any
+            the last observation
+        action : array_like
+            the action
+        reward : float
+            the reward of the transition
+        obs_tp1 : Any
+            the current observation
+        done : float
+            is the episode done
+        """
+        self.buffers[index].add(obs_t, action, reward, obs_tp1, done)
+
+    def sample(self):
+        """Sample a batch of experiences for every model.
+
+        The batches of all models are stacked along the first dimension.
+
+        Returns
+        -------
+        array_like
+            batch of observations
+        array_like
+            batch of actions executed given obs_batch
+        array_like
+            rewards received as results of executing act_batch
+        array_like
+            next set of observations seen after executing act_batch
+        numpy bool
+            done_mask[i] = 1 if executing act_batch[i] resulted in the end of
+            an episode and 0 otherwise.
+        """
+        samples = [buffer.sample() for buffer in self.buffers]
+
+        return tuple(np.stack(val) for val in zip(*samples))
@@ -1,12 +1,18 @@
 """SAC-compatible feedforward policy."""
 import tensorflow as tf
 import numpy as np
+from functools import partial
 
 from hbaselines.base_policies import ActorCriticPolicy
 from hbaselines.fcnet.replay_buffer import ReplayBuffer
+from hbaselines.fcnet.replay_buffer import StackedReplayBuffer
 from hbaselines.utils.tf_util import layer
+from hbaselines.utils.tf_util import stacked_layer
 from hbaselines.utils.tf_util import get_trainable_vars
 from hbaselines.utils.tf_util import reduce_std
+from hbaselines.utils.tf_util import model_mean
+from hbaselines.utils.tf_util import get_summary_tensors
+from hbaselines.utils.tf_util import xla_scope
 from hbaselines.utils.tf_util import gaussian_likelihood
 from hbaselines.utils.tf_util import apply_squashing_func
 from hbaselines.utils.tf_util import print_params_shape
@@ -54,6 +60,12 @@ class FeedForwardPolicy(ActorCriticPolicy):
         specifies whether to use the huber distance function as the loss for
         the critic. If set to False, the mean-squared error metric is used
         instead
+    use_xla : bool
+        whether to compile the update operations of the policy with XLA.
+        If XLA is not available, the operations are not compiled.
+    fused_critics : bool
+        whether to represent the twin critics as a single network with stacked
+        parameters, trained by a single optimizer
     target_entropy : float
         target entropy used when learning the entropy coefficient
     zero_fingerprint : bool
@@ -63,8 +75,13 @@ class FeedForwardPolicy(ActorCriticPolicy):
     fingerprint_dim : bool
         the number of fingerprint elements in the observation. Used when trying
         to zero the fingerprint elements.
-    replay_buffer : hbaselines.fcnet.replay_buffer.ReplayBuffer
-        the replay buffer
+    num_models : int or None
+        the number of independent models whose parameters are stacked. If set
+        to None, a single model is created.
+    replay_buffer : hbaselines.fcnet.replay_buffer.ReplayBuffer or \
+            hbaselines.fcnet.replay_buffer.StackedReplayBuffer
+        the replay buffer. A separate buffer is used by every model if the
+        parameters are stacked.
     terminals1 : tf.compat.v1.placeholder
         placeholder for the next step terminals
     rew_ph : tf.compat.v1.placeholder
@@ -139,10 +156,13 @@ class FeedForwardPolicy(ActorCriticPolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  target_entropy,
                  scope=None,
                  zero_fingerprint=False,
-                 fingerprint_dim=2):
+                 fingerprint_dim=2,
+                 num_models=None):
         """Instantiate the feed-forward neural network policy.
 
         Parameters
@@ -180,6 +200,12 @@ class FeedForwardPolicy(ActorCriticPolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer
         target_entropy : float
             target entropy used when learning the entropy coefficient. If set
             to None, a heuristic value is used.
@@ -192,6 +218,12 @@ class FeedForwardPolicy(ActorCriticPolicy):
         fingerprint_dim : bool
             the number of fingerprint elements in the observation. Used when
             trying to zero the fingerprint elements.
+        num_models : int or None
+            the number of independent models whose parameters are stacked.
+            The models are computed and updated by the same operations, and
+            the inputs and outputs of the policy have an additional leading
+            dimension over the models. If set to None, a single model is
+            created. Used by policies that call this one.
         """
         super(FeedForwardPolicy, self).__init__(
             sess=sess,
@@ -208,7 +240,9 @@ class FeedForwardPolicy(ActorCriticPolicy):
             layer_norm=layer_norm,
             layers=layers,
             act_fun=act_fun,
-            use_huber=use_huber
+            use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics
         )
 
         if target_entropy is None:
@@ -218,6 +252,7 @@ class FeedForwardPolicy(ActorCriticPolicy):
 
         self.zero_fingerprint = zero_fingerprint
         self.fingerprint_dim = fingerprint_dim
+        self.num_models = num_models
         self._ac_means = 0.5 * (ac_space.high + ac_space.low)
         self._ac_magnitudes = 0.5 * (ac_space.high - ac_space.low)
 
@@ -229,37 +264,49 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # Step 1: Create a replay buffer object.                              #
         # =================================================================== #
 
-        self.replay_buffer = ReplayBuffer(
-            buffer_size=self.buffer_size,
-            batch_size=self.batch_size,
-            obs_dim=ob_dim[0],
-            ac_dim=self.ac_space.shape[0],
-        )
+        if num_models is None:
+            self.replay_buffer = ReplayBuffer(
+                buffer_size=self.buffer_size,
+                batch_size=self.batch_size,
+                obs_dim=ob_dim[0],
+                ac_dim=self.ac_space.shape[0],
+            )
+        else:
+            self.replay_buffer = StackedReplayBuffer(
+                num_models=num_models,
+                buffer_size=self.buffer_size,
+                batch_size=self.batch_size,
+                obs_dim=ob_dim[0],
+                ac_dim=self.ac_space.shape[0],
+            )
 
         # =================================================================== #
         # Step 2: Create input variables.                                     #
         # =================================================================== #
 
+        # the leading dimensions of the inputs
+        batch_shape = (None,) if num_models is None else (num_models, None)
+
         with tf.compat.v1.variable_scope("input", reuse=False):
             self.terminals1 = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None, 1),
+                shape=batch_shape + (1,),
                 name='terminals1')
             self.rew_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None, 1),
+                shape=batch_shape + (1,),
                 name='rewards')
             self.action_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None,) + ac_space.shape,
+                shape=batch_shape + ac_space.shape,
                 name='actions')
             self.obs_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None,) + ob_dim,
+                shape=batch_shape + ob_dim,
                 name='obs0')
             self.obs1_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None,) + ob_dim,
+                shape=batch_shape + ob_dim,
                 name='obs1')
 
         # logging of rewards to tensorboard
@@ -271,6 +318,8 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # =================================================================== #
 
         # Create networks and core TF parts that are shared across setup parts.
+        # These are also used to compute actions, so they are not compiled
+        # with XLA, even if use_xla is set to True.
         with tf.compat.v1.variable_scope("model", reuse=False):
             self.deterministic_action, self.policy_out, self.logp_pi, \
                 self.logp_action = self.make_actor(self.obs_ph, self.action_ph)
@@ -283,22 +332,27 @@ class FeedForwardPolicy(ActorCriticPolicy):
 
             # The entropy coefficient or entropy can be learned automatically,
             # see Automating Entropy Adjustment for Maximum Entropy RL section
-            # of https://arxiv.org/abs/1812.05905
+            # of https://arxiv.org/abs/1812.05905. Every model has its own
+            # coefficient if the parameters are stacked.
             self.log_alpha = tf.compat.v1.get_variable(
                 'log_alpha',
                 dtype=tf.float32,
-                initializer=0.0)
+                initializer=0.0 if num_models is None
+                else tf.zeros((num_models, 1, 1)))
             self.alpha = tf.exp(self.log_alpha)
 
-        with tf.compat.v1.variable_scope("target", reuse=False):
+        with tf.compat.v1.variable_scope("target", reuse=False), \
+                xla_scope(self.use_xla):
             # Create the value network
             _, _, value_target = self.make_critic(
                 self.obs1_ph, create_qf=False, create_vf=True)
             self.value_target = value_target
 
         # Create the target update operations.
-        init, soft = self._setup_target_updates(
-            'model/value_fns/vf', 'target/value_fns/vf', scope, tau, verbose)
+        with xla_scope(self.use_xla):
+            init, soft = self._setup_target_updates(
+                'model/value_fns/vf', 'target/value_fns/vf', scope, tau,
+                verbose)
         self.target_init_updates = init
         self.target_soft_updates = soft
 
@@ -306,14 +360,20 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # Step 4: Setup the optimizers for the actor and critic.              #
         # =================================================================== #
 
-        with tf.compat.v1.variable_scope("Optimizer", reuse=False):
+        with tf.compat.v1.variable_scope("Optimizer", reuse=False), \
+                xla_scope(self.use_xla):
             self._setup_actor_optimizer(scope)
             self._setup_critic_optimizer(scope)
-            tf.compat.v1.summary.scalar('alpha_loss', self.alpha_loss)
-            tf.compat.v1.summary.scalar('actor_loss', self.actor_loss)
-            tf.compat.v1.summary.scalar('Q1_loss', self.critic_loss[0])
-            tf.compat.v1.summary.scalar('Q2_loss', self.critic_loss[1])
-            tf.compat.v1.summary.scalar('value_loss', self.critic_loss[2])
+            tf.compat.v1.summary.scalar(
+                'alpha_loss', tf.reduce_mean(self.alpha_loss))
+            tf.compat.v1.summary.scalar(
+                'actor_loss', tf.reduce_mean(self.actor_loss))
+            tf.compat.v1.summary.scalar(
+                'Q1_loss', tf.reduce_mean(self.critic_loss[0]))
+            tf.compat.v1.summary.scalar(
+                'Q2_loss', tf.reduce_mean(self.critic_loss[1]))
+            tf.compat.v1.summary.scalar(
+                'value_loss', tf.reduce_mean(self.critic_loss[2]))
 
         # =================================================================== #
         # Step 5: Setup the operations for computing model statistics.        #
@@ -323,6 +383,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # and outputs.
         self.stats_ops, self.stats_names = self._setup_stats(scope or "Model")
 
+        # Collect the tensorboard summaries of the policy. These are computed
+        # from the batches used by the training operations.
+        self.summary_tensors = get_summary_tensors(self._summaries_start)
+
     def make_actor(self, obs, action, reuse=False, scope="pi"):
         """Create the actor variables.
 
@@ -366,7 +430,8 @@ class FeedForwardPolicy(ActorCriticPolicy):
                 pi_h = layer(
                     pi_h,  layer_size, 'fc{}'.format(i),
                     act_fun=self.act_fun,
-                    layer_norm=self.layer_norm
+                    layer_norm=self.layer_norm,
+                    num_models=self.num_models
                 )
 
             # create the output mean
@@ -374,13 +439,15 @@ class FeedForwardPolicy(ActorCriticPolicy):
                 pi_h, self.ac_space.shape[0], 'mean',
                 act_fun=None,
                 kernel_initializer=tf.random_uniform_initializer(
-                    minval=-3e-3, maxval=3e-3)
+                    minval=-3e-3, maxval=3e-3),
+                num_models=self.num_models
             )
 
             # create the output log_std
             log_std = layer(
                 pi_h, self.ac_space.shape[0], 'log_std',
                 act_fun=None,
+                num_models=self.num_models
             )
 
         # OpenAI Variation to cap the standard deviation
@@ -399,6 +466,12 @@ class FeedForwardPolicy(ActorCriticPolicy):
         deterministic_policy, policy, logp_pi = apply_squashing_func(
             policy_mean, policy, logp_pi)
 
+        if self.num_models is not None:
+            # Broadcast the log-probabilities of every model against its
+            # Q-values the same way as when the parameters are not stacked.
+            logp_pi = tf.expand_dims(logp_pi, axis=1)
+            logp_ac = tf.expand_dims(logp_ac, axis=1)
+
         return deterministic_policy, policy, logp_pi, logp_ac
 
     def make_critic(self,
@@ -410,6 +483,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
                     create_vf=True):
         """Create the critic variables.
 
+        If `fused_critics` is set to True, both Q-functions are computed by a
+        single network, whose parameters are stacked along their first
+        dimension (see `hbaselines.utils.tf_util.stacked_layer`).
+
         Parameters
         ----------
         obs : tf.compat.v1.placeholder
@@ -457,20 +534,55 @@ class FeedForwardPolicy(ActorCriticPolicy):
                         vf_h = layer(
                             vf_h, layer_size, 'fc{}'.format(i),
                             act_fun=self.act_fun,
-                            layer_norm=self.layer_norm
+                            layer_norm=self.layer_norm,
+                            num_models=self.num_models
                         )
 
                     # create the output layer
                     value_fn = layer(
                         vf_h, 1, 'vf_output',
                         kernel_initializer=tf.random_uniform_initializer(
-                            minval=-3e-3, maxval=3e-3)
+                            minval=-3e-3, maxval=3e-3),
+                        num_models=self.num_models
                     )
             else:
                 value_fn = None
 
             # Double Q values to reduce overestimation
-            if create_qf:
+            if create_qf and self.fused_critics:
+                # Both Q-functions are computed by a single network, whose
+                # parameters are stacked along their first dimension.
+                with tf.compat.v1.variable_scope('qf', reuse=reuse):
+                    # concatenate the observations and actions
+                    qf_h = tf.concat([obs, action], axis=-1)
+
+                    # If the models are stacked, the Q-functions of all models
+                    # are stacked as well, with the first Q-functions first.
+                    num_critics = 2
+                    if self.num_models is not None:
+                        num_critics *= self.num_models
+                        qf_h = tf.concat([qf_h, qf_h], axis=0)
+
+                    # create the hidden layers
+                    for i, layer_size in enumerate(self.layers):
+                        qf_h = stacked_layer(
+                            qf_h, num_critics, layer_size, 'fc{}'.format(i),
+                            act_fun=self.act_fun,
+                            layer_norm=self.layer_norm
+                        )
+
+                    # create the output layer
+                    qf = stacked_layer(
+                        qf_h, num_critics, 1, 'qf_output',
+                        kernel_initializer=tf.random_uniform_initializer(
+                            minval=-3e-3, maxval=3e-3)
+                    )
+
+                if self.num_models is None:
+                    qf1, qf2 = tf.unstack(qf, axis=0)
+                else:
+                    qf1, qf2 = tf.split(qf, 2, axis=0)
+            elif create_qf:
                 with tf.compat.v1.variable_scope('qf1', reuse=reuse):
                     # concatenate the observations and actions
                     qf1_h = tf.concat([obs, action], axis=-1)
@@ -480,14 +592,16 @@ class FeedForwardPolicy(ActorCriticPolicy):
                         qf1_h = layer(
                             qf1_h, layer_size, 'fc{}'.format(i),
                             act_fun=self.act_fun,
-                            layer_norm=self.layer_norm
+                            layer_norm=self.layer_norm,
+                            num_models=self.num_models
                         )
 
                     # create the output layer
                     qf1 = layer(
                         qf1_h, 1, 'qf_output',
                         kernel_initializer=tf.random_uniform_initializer(
-                            minval=-3e-3, maxval=3e-3)
+                            minval=-3e-3, maxval=3e-3),
+                        num_models=self.num_models
                     )
 
                 with tf.compat.v1.variable_scope('qf2', reuse=reuse):
@@ -499,14 +613,16 @@ class FeedForwardPolicy(ActorCriticPolicy):
                         qf2_h = layer(
                             qf2_h, layer_size, 'fc{}'.format(i),
                             act_fun=self.act_fun,
-                            layer_norm=self.layer_norm
+                            layer_norm=self.layer_norm,
+                            num_models=self.num_models
                         )
 
                     # create the output layer
                     qf2 = layer(
                         qf2_h, 1, 'qf_output',
                         kernel_initializer=tf.random_uniform_initializer(
-                            minval=-3e-3, maxval=3e-3)
+                            minval=-3e-3, maxval=3e-3),
+                        num_models=self.num_models
                     )
             else:
                 qf1, qf2 = None, None
@@ -519,13 +635,16 @@ class FeedForwardPolicy(ActorCriticPolicy):
         Returns
         -------
         [float, float]
-            Q1 loss, Q2 loss
+            Q1 loss, Q2 loss. Arrays with the loss of every model if the
+            parameters are stacked.
         float
-            actor loss
+            actor loss. An array with the loss of every model if the
+            parameters are stacked.
         """
         # Not enough samples in the replay buffer.
         if not self.replay_buffer.can_sample():
-            return [0, 0], 0
+            zero = 0 if self.num_models is None else np.zeros(self.num_models)
+            return [zero, zero], zero
 
         # Get a batch
         obs0, actions, rewards, obs1, done1 = self.replay_buffer.sample()
@@ -555,9 +674,11 @@ class FeedForwardPolicy(ActorCriticPolicy):
         Returns
         -------
         [float, float]
-            Q1 loss, Q2 loss
+            Q1 loss, Q2 loss. Arrays with the loss of every model if the
+            parameters are stacked.
         float
-            actor loss
+            actor loss. An array with the loss of every model if the
+            parameters are stacked.
         """
         del update_actor  # unused by this method
 
@@ -565,8 +686,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
         actions = (actions - self._ac_means) / self._ac_magnitudes
 
         # Reshape to match previous behavior and placeholder shape.
-        rewards = rewards.reshape(-1, 1)
-        terminals1 = terminals1.reshape(-1, 1)
+        shape = (-1, 1) if self.num_models is None \
+            else (self.num_models, -1, 1)
+        rewards = rewards.reshape(shape)
+        terminals1 = terminals1.reshape(shape)
 
         # Collect all update and loss call operations.
         step_ops = [
@@ -579,6 +702,7 @@ class FeedForwardPolicy(ActorCriticPolicy):
             self.actor_optimizer,
             self.alpha_optimizer,
             self.target_soft_updates,
+            self.summary_tensors,
         ]
 
         # Prepare the feed_dict information.
@@ -591,18 +715,29 @@ class FeedForwardPolicy(ActorCriticPolicy):
         }
 
         # Perform the update operations and collect the actor and critic loss.
-        q1_loss, q2_loss, vf_loss, actor_loss, *_ = self.sess.run(
+        q1_loss, q2_loss, vf_loss, actor_loss, *_vals = self.sess.run(
             step_ops, feed_dict)
 
+        # Add the summaries to their averages.
+        self.summary_stats.update(_vals[-1])
+
         return [q1_loss, q2_loss], actor_loss  # FIXME: add vf_loss
 
     def get_action(self, obs, context, apply_noise, random_actions):
-        """See parent class."""
+        """See parent class.
+
+        If the parameters are stacked, the observations and contexts of every
+        model are stacked along the first dimension, and so are the actions.
+        """
         # Add the contextual observation, if applicable.
-        obs = self._get_obs(obs, context, axis=1)
+        obs = self._get_obs(obs, context, axis=-1)
 
         if random_actions:
-            return np.array([self.ac_space.sample()])
+            if self.num_models is None:
+                return np.array([self.ac_space.sample()])
+            else:
+                return np.array([[self.ac_space.sample()]
+                                 for _ in range(self.num_models)])
         elif apply_noise:
             normalized_action = self.sess.run(
                 self.policy_out, feed_dict={self.obs_ph: obs})
@@ -627,7 +762,11 @@ class FeedForwardPolicy(ActorCriticPolicy):
 
         if self.verbose >= 2:
             print('setting up critic optimizer')
-            for name in ['qf1', 'qf2', 'vf']:
+            if self.fused_critics:
+                names = ['qf', 'vf']
+            else:
+                names = ['qf1', 'qf2', 'vf']
+            for name in names:
                 scope_i = '{}/{}'.format(scope_name, name)
                 print_params_shape(scope_i, name)
 
@@ -645,6 +784,11 @@ class FeedForwardPolicy(ActorCriticPolicy):
         else:
             loss_fn = tf.compat.v1.losses.mean_squared_error
 
+        if self.num_models is not None:
+            # Compute the loss of every model separately.
+            loss_fn = partial(
+                self._model_loss, loss_fn=loss_fn, num_models=self.num_models)
+
         # Compute Q-Function loss
         qf1_loss = loss_fn(q_backup, self.qf1)
         qf2_loss = loss_fn(q_backup, self.qf2)
@@ -657,8 +801,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
 
         self.critic_loss = (qf1_loss, qf2_loss, value_loss)
 
-        # Combine the loss functions for the optimizer.
-        critic_loss = qf1_loss + qf2_loss + value_loss
+        # Combine the loss functions for the optimizer. The losses of stacked
+        # models are summed, and the parameters of every model are updated by
+        # the gradients of its own loss.
+        critic_loss = tf.reduce_sum(qf1_loss + qf2_loss + value_loss)
 
         # Critic train op
         critic_optimizer = tf.compat.v1.train.AdamOptimizer(self.critic_lr)
@@ -666,6 +812,14 @@ class FeedForwardPolicy(ActorCriticPolicy):
             critic_loss,
             var_list=get_trainable_vars(scope_name))
 
+    @staticmethod
+    def _model_loss(labels, predictions, loss_fn, num_models):
+        """Return the loss of every model, if the parameters are stacked."""
+        return model_mean(
+            loss_fn(labels, predictions,
+                    reduction=tf.compat.v1.losses.Reduction.NONE),
+            num_models)
+
     def _setup_actor_optimizer(self, scope):
         """Create minimization operations for policy and entropy.
 
@@ -687,25 +841,27 @@ class FeedForwardPolicy(ActorCriticPolicy):
         min_qf_pi = tf.minimum(self.qf1_pi, self.qf2_pi)
 
         # Compute the entropy temperature loss.
-        self.alpha_loss = -tf.reduce_mean(
+        self.alpha_loss = -model_mean(
             self.log_alpha
-            * tf.stop_gradient(self.logp_pi + self.target_entropy))
+            * tf.stop_gradient(self.logp_pi + self.target_entropy),
+            self.num_models)
 
         alpha_optimizer = tf.compat.v1.train.AdamOptimizer(self.actor_lr)
 
         self.alpha_optimizer = alpha_optimizer.minimize(
-            self.alpha_loss,
+            tf.reduce_sum(self.alpha_loss),
             var_list=self.log_alpha)
 
         # Compute the policy loss
-        self.actor_loss = tf.reduce_mean(self.alpha * self.logp_pi - min_qf_pi)
+        self.actor_loss = model_mean(
+            self.alpha * self.logp_pi - min_qf_pi, self.num_models)
 
         # Policy train op (has to be separate from value train op, because
         # min_qf_pi appears in policy_loss)
         actor_optimizer = tf.compat.v1.train.AdamOptimizer(self.actor_lr)
 
         self.actor_optimizer = actor_optimizer.minimize(
-            self.actor_loss,
+            tf.reduce_sum(self.actor_loss),
             var_list=get_trainable_vars(scope_name))
 
     def _setup_stats(self, base):
@@ -759,13 +915,52 @@ class FeedForwardPolicy(ActorCriticPolicy):
 
     def store_transition(self, obs0, context0, action, reward, obs1, context1,
                          done, is_final_step, evaluate=False):
-        """See parent class."""
-        if not evaluate:
-            # Add the contextual observation, if applicable.
-            obs0 = self._get_obs(obs0, context0, axis=0)
-            obs1 = self._get_obs(obs1, context1, axis=0)
+        """See parent class.
+
+        If the parameters are stacked, `obs0`, `context0`, `action`, `reward`,
+        `obs1`, `context1`, `done`, and `is_final_step` contain the value of
+        every model. The contexts may be set to None if no context is provided
+        by the environment. Models whose observation is set to None are
+        skipped.
+        """
+        if evaluate:
+            return
 
+        if self.num_models is None:
+            self._store_sample(
+                obs0, context0, action, reward, obs1, context1, done)
+        else:
+            for i in range(self.num_models):
+                if obs0[i] is None:
+                    continue
+
+                self._store_sample(
+                    obs0[i],
+                    None if context0 is None else context0[i],
+                    action[i],
+                    reward[i],
+                    obs1[i],
+                    None if context1 is None else context1[i],
+                    done[i],
+                    index=i)
+
+    def _store_sample(self, obs0, context0, action, reward, obs1, context1,
+                      done, index=None):
+        """Store a sample in the replay buffer of a model.
+
+        See store_transition for a description of the arguments. The index
+        specifies the model, and is set to None if the parameters are not
+        stacked.
+        """
+        # Add the contextual observation, if applicable.
+        obs0 = self._get_obs(obs0, context0, axis=0)
+        obs1 = self._get_obs(obs1, context1, axis=0)
+
+        if index is None:
             self.replay_buffer.add(obs0, action, reward, obs1, float(done))
+        else:
+            self.replay_buffer.add(
+                index, obs0, action, reward, obs1, float(done))
 
     def get_td_map(self):
         """See parent class."""
@@ -781,8 +976,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
     def get_td_map_from_batch(self, obs0, actions, rewards, obs1, terminals1):
         """Convert a batch to a td_map."""
         # Reshape to match previous behavior and placeholder shape.
-        rewards = rewards.reshape(-1, 1)
-        terminals1 = terminals1.reshape(-1, 1)
+        shape = (-1, 1) if self.num_models is None \
+            else (self.num_models, -1, 1)
+        rewards = rewards.reshape(shape)
+        terminals1 = terminals1.reshape(shape)
 
         td_map = {
             self.obs_ph: obs0,
@@ -4,9 +4,14 @@ import numpy as np
 
 from hbaselines.base_policies import ActorCriticPolicy
 from hbaselines.fcnet.replay_buffer import ReplayBuffer
+from hbaselines.fcnet.replay_buffer import StackedReplayBuffer
 from hbaselines.utils.tf_util import layer
+from hbaselines.utils.tf_util import stacked_layer
 from hbaselines.utils.tf_util import get_trainable_vars
 from hbaselines.utils.tf_util import reduce_std
+from hbaselines.utils.tf_util import model_mean
+from hbaselines.utils.tf_util import get_summary_tensors
+from hbaselines.utils.tf_util import xla_scope
 from hbaselines.utils.tf_util import print_params_shape
 
 
@@ -47,6 +52,12 @@ class FeedForwardPolicy(ActorCriticPolicy):
         specifies whether to use the huber distance function as the loss for
         the critic. If set to False, the mean-squared error metric is used
         instead
+    use_xla : bool
+        whether to compile the update operations of the policy with XLA.
+        If XLA is not available, the operations are not compiled.
+    fused_critics : bool
+        whether to represent the twin critics as a single network with stacked
+        parameters, trained by a single optimizer
     noise : float
         scaling term to the range of the action space, that is subsequently
         used as the standard deviation of Gaussian noise added to the action if
@@ -63,8 +74,13 @@ class FeedForwardPolicy(ActorCriticPolicy):
     fingerprint_dim : int
         the number of fingerprint elements in the observation. Used when trying
         to zero the fingerprint elements.
-    replay_buffer : hbaselines.fcnet.replay_buffer.ReplayBuffer
-        the replay buffer
+    num_models : int or None
+        the number of independent models whose parameters are stacked. If set
+        to None, a single model is created.
+    replay_buffer : hbaselines.fcnet.replay_buffer.ReplayBuffer or \
+            hbaselines.fcnet.replay_buffer.StackedReplayBuffer
+        the replay buffer. A separate buffer is used by every model if the
+        parameters are stacked.
     terminals1 : tf.compat.v1.placeholder
         placeholder for the next step terminals
     rew_ph : tf.compat.v1.placeholder
@@ -94,8 +110,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
         the operation that updates the trainable parameters of the actor
     critic_loss : tf.Operation
         the operation that returns the loss of the critic
-    critic_optimizer : tf.Operation
-        the operation that updates the trainable parameters of the critic
+    critic_optimizer : list of tf.Operation
+        the operations that update the trainable parameters of the critics.
+        A single operation updates both critics if `fused_critics` is set to
+        True.
     """
 
     def __init__(self,
@@ -114,12 +132,15 @@ class FeedForwardPolicy(ActorCriticPolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  noise,
                  target_policy_noise,
                  target_noise_clip,
                  scope=None,
                  zero_fingerprint=False,
-                 fingerprint_dim=2):
+                 fingerprint_dim=2,
+                 num_models=None):
         """Instantiate the feed-forward neural network policy.
 
         Parameters
@@ -157,6 +178,12 @@ class FeedForwardPolicy(ActorCriticPolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer
         noise : float
             scaling term to the range of the action space, that is subsequently
             used as the standard deviation of Gaussian noise added to the
@@ -175,6 +202,12 @@ class FeedForwardPolicy(ActorCriticPolicy):
         fingerprint_dim : int
             the number of fingerprint elements in the observation. Used when
             trying to zero the fingerprint elements.
+        num_models : int or None
+            the number of independent models whose parameters are stacked.
+            The models are computed and updated by the same operations, and
+            the inputs and outputs of the policy have an additional leading
+            dimension over the models. If set to None, a single model is
+            created. Used by policies that call this one.
 
         Raises
         ------
@@ -196,7 +229,9 @@ class FeedForwardPolicy(ActorCriticPolicy):
             layer_norm=layer_norm,
             layers=layers,
             act_fun=act_fun,
-            use_huber=use_huber
+            use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics
         )
 
         # action magnitudes
@@ -207,6 +242,7 @@ class FeedForwardPolicy(ActorCriticPolicy):
         self.target_noise_clip = np.array([ac_mag * target_noise_clip])
         self.zero_fingerprint = zero_fingerprint
         self.fingerprint_dim = fingerprint_dim
+        self.num_models = num_models
         assert len(self.layers) >= 1, \
             "Error: must have at least one hidden layer for the policy."
 
@@ -218,37 +254,49 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # Step 1: Create a replay buffer object.                              #
         # =================================================================== #
 
-        self.replay_buffer = ReplayBuffer(
-            buffer_size=self.buffer_size,
-            batch_size=self.batch_size,
-            obs_dim=ob_dim[0],
-            ac_dim=self.ac_space.shape[0],
-        )
+        if num_models is None:
+            self.replay_buffer = ReplayBuffer(
+                buffer_size=self.buffer_size,
+                batch_size=self.batch_size,
+                obs_dim=ob_dim[0],
+                ac_dim=self.ac_space.shape[0],
+            )
+        else:
+            self.replay_buffer = StackedReplayBuffer(
+                num_models=num_models,
+                buffer_size=self.buffer_size,
+                batch_size=self.batch_size,
+                obs_dim=ob_dim[0],
+                ac_dim=self.ac_space.shape[0],
+            )
 
         # =================================================================== #
         # Step 2: Create input variables.                                     #
         # =================================================================== #
 
+        # the leading dimensions of the inputs
+        batch_shape = (None,) if num_models is None else (num_models, None)
+
         with tf.compat.v1.variable_scope("input", reuse=False):
             self.terminals1 = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None, 1),
+                shape=batch_shape + (1,),
                 name='terminals1')
             self.rew_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None, 1),
+                shape=batch_shape + (1,),
                 name='rewards')
             self.action_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None,) + ac_space.shape,
+                shape=batch_shape + ac_space.shape,
                 name='actions')
             self.obs_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None,) + ob_dim,
+                shape=batch_shape + ob_dim,
                 name='obs0')
             self.obs1_ph = tf.compat.v1.placeholder(
                 tf.float32,
-                shape=(None,) + ob_dim,
+                shape=batch_shape + ob_dim,
                 name='obs1')
 
         # logging of rewards to tensorboard
@@ -260,20 +308,16 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # =================================================================== #
 
         # Create networks and core TF parts that are shared across setup parts.
+        # These are also used to compute actions, so they are not compiled
+        # with XLA, even if use_xla is set to True.
         with tf.compat.v1.variable_scope("model", reuse=False):
             self.actor_tf = self.make_actor(self.obs_ph)
-            self.critic_tf = [
-                self.make_critic(self.obs_ph, self.action_ph,
-                                 scope="qf_{}".format(i))
-                for i in range(2)
-            ]
-            self.critic_with_actor_tf = [
-                self.make_critic(self.obs_ph, self.actor_tf, reuse=True,
-                                 scope="qf_{}".format(i))
-                for i in range(2)
-            ]
+            self.critic_tf = self.make_critics(self.obs_ph, self.action_ph)
+            self.critic_with_actor_tf = self.make_critics(
+                self.obs_ph, self.actor_tf, reuse=True)
 
-        with tf.compat.v1.variable_scope("target", reuse=False):
+        with tf.compat.v1.variable_scope("target", reuse=False), \
+                xla_scope(self.use_xla):
             # create the target actor policy
             actor_target = self.make_actor(self.obs1_ph)
 
@@ -291,15 +335,13 @@ class FeedForwardPolicy(ActorCriticPolicy):
             )
 
             # create the target critic policies
-            critic_target = [
-                self.make_critic(self.obs1_ph, noisy_actor_target,
-                                 scope="qf_{}".format(i))
-                for i in range(2)
-            ]
+            critic_target = self.make_critics(
+                self.obs1_ph, noisy_actor_target)
 
         # Create the target update operations.
-        init, soft = self._setup_target_updates(
-            'model', 'target', scope, tau, verbose)
+        with xla_scope(self.use_xla):
+            init, soft = self._setup_target_updates(
+                'model', 'target', scope, tau, verbose)
         self.target_init_updates = init
         self.target_soft_updates = soft
 
@@ -307,12 +349,16 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # Step 4: Setup the optimizers for the actor and critic.              #
         # =================================================================== #
 
-        with tf.compat.v1.variable_scope("Optimizer", reuse=False):
+        with tf.compat.v1.variable_scope("Optimizer", reuse=False), \
+                xla_scope(self.use_xla):
             self._setup_actor_optimizer(scope)
             self._setup_critic_optimizer(critic_target, scope)
-            tf.compat.v1.summary.scalar('actor_loss', self.actor_loss)
-            tf.compat.v1.summary.scalar('Q1_loss', self.critic_loss[0])
-            tf.compat.v1.summary.scalar('Q2_loss', self.critic_loss[1])
+            tf.compat.v1.summary.scalar(
+                'actor_loss', tf.reduce_mean(self.actor_loss))
+            tf.compat.v1.summary.scalar(
+                'Q1_loss', tf.reduce_mean(self.critic_loss[0]))
+            tf.compat.v1.summary.scalar(
+                'Q2_loss', tf.reduce_mean(self.critic_loss[1]))
 
         # =================================================================== #
         # Step 5: Setup the operations for computing model statistics.        #
@@ -322,6 +368,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
         # and outputs.
         self.stats_ops, self.stats_names = self._setup_stats(scope or "Model")
 
+        # Collect the tensorboard summaries of the policy. These are computed
+        # from the batches used by the training operations.
+        self.summary_tensors = get_summary_tensors(self._summaries_start)
+
     def _setup_actor_optimizer(self, scope):
         """Create the actor loss, gradient, and optimizer."""
         scope_name = 'model/pi/'
@@ -333,13 +383,14 @@ class FeedForwardPolicy(ActorCriticPolicy):
             print_params_shape(scope_name, "actor")
 
         # compute the actor loss
-        self.actor_loss = -tf.reduce_mean(self.critic_with_actor_tf[0])
+        self.actor_loss = -model_mean(
+            self.critic_with_actor_tf[0], self.num_models)
 
         # create an optimizer object
         optimizer = tf.compat.v1.train.AdamOptimizer(self.actor_lr)
 
         self.actor_optimizer = optimizer.minimize(
-            self.actor_loss,
+            tf.reduce_sum(self.actor_loss),
             var_list=get_trainable_vars(scope_name)
         )
 
@@ -363,12 +414,30 @@ class FeedForwardPolicy(ActorCriticPolicy):
         else:
             loss_fn = tf.compat.v1.losses.mean_squared_error
 
-        self.critic_loss = [loss_fn(q, target_q) for q in self.critic_tf]
+        if self.num_models is None:
+            self.critic_loss = [loss_fn(q, target_q) for q in self.critic_tf]
+        else:
+            # Compute the loss of every model separately.
+            reduction = tf.compat.v1.losses.Reduction.NONE
+            self.critic_loss = [
+                model_mean(loss_fn(q, target_q, reduction=reduction),
+                           self.num_models)
+                for q in self.critic_tf
+            ]
+
+        if self.fused_critics:
+            # A single optimizer updates both critics. Their parameters are
+            # disjoint, so the gradients of the sum of their losses with
+            # respect to the parameters of every critic match those of its
+            # own loss.
+            critic_losses = [("model/qf/", tf.add_n(self.critic_loss))]
+        else:
+            critic_losses = [("model/qf_{}/".format(i), critic_loss)
+                             for i, critic_loss in enumerate(self.critic_loss)]
 
         self.critic_optimizer = []
 
-        for i, critic_loss in enumerate(self.critic_loss):
-            scope_name = 'model/qf_{}/'.format(i)
+        for i, (scope_name, critic_loss) in enumerate(critic_losses):
             if scope is not None:
                 scope_name = scope + '/' + scope_name
 
@@ -378,9 +447,11 @@ class FeedForwardPolicy(ActorCriticPolicy):
             # create an optimizer object
             optimizer = tf.compat.v1.train.AdamOptimizer(self.critic_lr)
 
-            # create the optimizer object
+            # create the optimizer object. The losses of stacked models are
+            # summed, and the parameters of every model are updated by the
+            # gradients of its own loss.
             self.critic_optimizer.append(optimizer.minimize(
-                loss=critic_loss,
+                loss=tf.reduce_sum(critic_loss),
                 var_list=get_trainable_vars(scope_name)))
 
     def make_actor(self, obs, reuse=False, scope="pi"):
@@ -417,7 +488,8 @@ class FeedForwardPolicy(ActorCriticPolicy):
                 pi_h = layer(
                     pi_h,  layer_size, 'fc{}'.format(i),
                     act_fun=self.act_fun,
-                    layer_norm=self.layer_norm
+                    layer_norm=self.layer_norm,
+                    num_models=self.num_models
                 )
 
             # create the output layer
@@ -425,7 +497,8 @@ class FeedForwardPolicy(ActorCriticPolicy):
                 pi_h, self.ac_space.shape[0], 'output',
                 act_fun=tf.nn.tanh,
                 kernel_initializer=tf.random_uniform_initializer(
-                    minval=-3e-3, maxval=3e-3)
+                    minval=-3e-3, maxval=3e-3),
+                num_models=self.num_models
             )
 
             # scaling terms to the output from the policy
@@ -473,18 +546,87 @@ class FeedForwardPolicy(ActorCriticPolicy):
                 qf_h = layer(
                     qf_h,  layer_size, 'fc{}'.format(i),
                     act_fun=self.act_fun,
-                    layer_norm=self.layer_norm
+                    layer_norm=self.layer_norm,
+                    num_models=self.num_models
                 )
 
             # create the output layer
             qvalue_fn = layer(
                 qf_h, 1, 'qf_output',
                 kernel_initializer=tf.random_uniform_initializer(
-                    minval=-3e-3, maxval=3e-3)
+                    minval=-3e-3, maxval=3e-3),
+                num_models=self.num_models
             )
 
         return qvalue_fn
 
+    def make_critics(self, obs, action, reuse=False):
+        """Create the tensors of the twin critics.
+
+        If `fused_critics` is set to True, the critics are computed by a single
+        network, whose parameters are stacked along their first dimension (see
+        `hbaselines.utils.tf_util.stacked_layer`). Otherwise, a separate
+        network is created for every critic.
+
+        Parameters
+        ----------
+        obs : tf.compat.v1.placeholder
+            the input observation placeholder
+        action : tf.compat.v1.placeholder
+            the input action placeholder
+        reuse : bool
+            whether or not to reuse parameters
+
+        Returns
+        -------
+        list of tf.Variable
+            the output from every critic
+        """
+        if not self.fused_critics:
+            return [self.make_critic(obs, action, reuse=reuse,
+                                     scope="qf_{}".format(i))
+                    for i in range(2)]
+
+        with tf.compat.v1.variable_scope("qf", reuse=reuse):
+            # concatenate the observations and actions
+            qf_h = tf.concat([obs, action], axis=-1)
+
+            # zero out the fingerprint observations for the worker policy
+            if self.zero_fingerprint:
+                qf_h = self._remove_fingerprint(
+                    qf_h,
+                    self.ob_space.shape[0],
+                    self.fingerprint_dim,
+                    self.co_space.shape[0] + self.ac_space.shape[0]
+                )
+
+            # If the models are stacked, the critics of all models are stacked
+            # as well, with the first critics of every model first.
+            num_critics = 2
+            if self.num_models is not None:
+                num_critics *= self.num_models
+                qf_h = tf.concat([qf_h, qf_h], axis=0)
+
+            # create the hidden layers
+            for i, layer_size in enumerate(self.layers):
+                qf_h = stacked_layer(
+                    qf_h, num_critics, layer_size, 'fc{}'.format(i),
+                    act_fun=self.act_fun,
+                    layer_norm=self.layer_norm
+                )
+
+            # create the output layer
+            qvalue_fn = stacked_layer(
+                qf_h, num_critics, 1, 'qf_output',
+                kernel_initializer=tf.random_uniform_initializer(
+                    minval=-3e-3, maxval=3e-3)
+            )
+
+        if self.num_models is None:
+            return tf.unstack(qvalue_fn, axis=0)
+        else:
+            return tf.split(qvalue_fn, 2, axis=0)
+
     def update(self, update_actor=True, **kwargs):
         """Perform a gradient update step.
 
@@ -500,13 +642,16 @@ class FeedForwardPolicy(ActorCriticPolicy):
         Returns
         -------
         [float, float]
-            Q1 loss, Q2 loss
+            Q1 loss, Q2 loss. Arrays with the loss of every model if the
+            parameters are stacked.
         float
-            actor loss
+            actor loss. An array with the loss of every model if the
+            parameters are stacked.
         """
         # Not enough samples in the replay buffer.
         if not self.replay_buffer.can_sample():
-            return [0, 0], 0
+            zero = 0 if self.num_models is None else np.zeros(self.num_models)
+            return [zero, zero], zero
 
         # Get a batch
         obs0, actions, rewards, obs1, terminals1 = self.replay_buffer.sample()
@@ -544,24 +689,29 @@ class FeedForwardPolicy(ActorCriticPolicy):
         Returns
         -------
         [float, float]
-            Q1 loss, Q2 loss
+            Q1 loss, Q2 loss. Arrays with the loss of every model if the
+            parameters are stacked.
         float
-            actor loss
+            actor loss. An array with the loss of every model if the
+            parameters are stacked.
         """
         # Reshape to match previous behavior and placeholder shape.
-        rewards = rewards.reshape(-1, 1)
-        terminals1 = terminals1.reshape(-1, 1)
+        shape = (-1, 1) if self.num_models is None \
+            else (self.num_models, -1, 1)
+        rewards = rewards.reshape(shape)
+        terminals1 = terminals1.reshape(shape)
 
         # Update operations for the critic networks.
-        step_ops = [self.critic_loss,
-                    self.critic_optimizer[0],
-                    self.critic_optimizer[1]]
+        step_ops = [self.critic_loss, self.critic_optimizer]
 
         if update_actor:
-            # Actor updates and target soft update operation.
+            # Actor updates and target soft update operation. The summaries
+            # are collected during these steps, in which the outputs of the
+            # actor are computed as well.
             step_ops += [self.actor_loss,
                          self.actor_optimizer,
-                         self.target_soft_updates]
+                         self.target_soft_updates,
+                         self.summary_tensors]
 
         # Perform the update operations and collect the critic loss.
         critic_loss, *_vals = self.sess.run(step_ops, feed_dict={
@@ -572,18 +722,31 @@ class FeedForwardPolicy(ActorCriticPolicy):
             self.terminals1: terminals1
         })
 
-        # Extract the actor loss.
-        actor_loss = _vals[2] if update_actor else 0
+        # Extract the actor loss and add the summaries to their averages.
+        if update_actor:
+            actor_loss = _vals[1]
+            self.summary_stats.update(_vals[4])
+        else:
+            actor_loss = 0 if self.num_models is None \
+                else np.zeros(self.num_models)
 
         return critic_loss, actor_loss
 
     def get_action(self, obs, context, apply_noise, random_actions):
-        """See parent class."""
+        """See parent class.
+
+        If the parameters are stacked, the observations and contexts of every
+        model are stacked along the first dimension, and so are the actions.
+        """
         # Add the contextual observation, if applicable.
-        obs = self._get_obs(obs, context, axis=1)
+        obs = self._get_obs(obs, context, axis=-1)
 
         if random_actions:
-            action = np.array([self.ac_space.sample()])
+            if self.num_models is None:
+                action = np.array([self.ac_space.sample()])
+            else:
+                action = np.array([[self.ac_space.sample()]
+                                   for _ in range(self.num_models)])
         else:
             action = self.sess.run(self.actor_tf, {self.obs_ph: obs})
 
@@ -599,17 +762,58 @@ class FeedForwardPolicy(ActorCriticPolicy):
 
     def store_transition(self, obs0, context0, action, reward, obs1, context1,
                          done, is_final_step, evaluate=False):
-        """See parent class."""
-        if not evaluate:
-            # Add the contextual observation, if applicable.
-            obs0 = self._get_obs(obs0, context0, axis=0)
-            obs1 = self._get_obs(obs1, context1, axis=0)
+        """See parent class.
 
-            # Modify the done mask in accordance with the TD3 algorithm. Done
-            # masks that correspond to the final step are set to False.
-            done = done and not is_final_step
+        If the parameters are stacked, `obs0`, `context0`, `action`, `reward`,
+        `obs1`, `context1`, `done`, and `is_final_step` contain the value of
+        every model. The contexts may be set to None if no context is provided
+        by the environment. Models whose observation is set to None are
+        skipped.
+        """
+        if evaluate:
+            return
 
+        if self.num_models is None:
+            self._store_sample(
+                obs0, context0, action, reward, obs1, context1, done,
+                is_final_step)
+        else:
+            for i in range(self.num_models):
+                if obs0[i] is None:
+                    continue
+
+                self._store_sample(
+                    obs0[i],
+                    None if context0 is None else context0[i],
+                    action[i],
+                    reward[i],
+                    obs1[i],
+                    None if context1 is None else context1[i],
+                    done[i],
+                    is_final_step[i],
+                    index=i)
+
+    def _store_sample(self, obs0, context0, action, reward, obs1, context1,
+                      done, is_final_step, index=None):
+        """Store a sample in the replay buffer of a model.
+
+        See store_transition for a description of the arguments. The index
+        specifies the model, and is set to None if the parameters are not
+        stacked.
+        """
+        # Add the contextual observation, if applicable.
+        obs0 = self._get_obs(obs0, context0, axis=0)
+        obs1 = self._get_obs(obs1, context1, axis=0)
+
+        # Modify the done mask in accordance with the TD3 algorithm. Done
+        # masks that correspond to the final step are set to False.
+        done = done and not is_final_step
+
+        if index is None:
             self.replay_buffer.add(obs0, action, reward, obs1, float(done))
+        else:
+            self.replay_buffer.add(
+                index, obs0, action, reward, obs1, float(done))
 
     def initialize(self):
         """See parent class.
@@ -673,8 +877,10 @@ class FeedForwardPolicy(ActorCriticPolicy):
     def get_td_map_from_batch(self, obs0, actions, rewards, obs1, terminals1):
         """Convert a batch to a td_map."""
         # Reshape to match previous behavior and placeholder shape.
-        rewards = rewards.reshape(-1, 1)
-        terminals1 = terminals1.reshape(-1, 1)
+        shape = (-1, 1) if self.num_models is None \
+            else (self.num_models, -1, 1)
+        rewards = rewards.reshape(shape)
+        terminals1 = terminals1.reshape(shape)
 
         td_map = {
             self.obs_ph: obs0,
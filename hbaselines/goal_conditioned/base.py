@@ -109,6 +109,8 @@ class GoalConditionedPolicy(ActorCriticPolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  num_levels,
                  meta_period,
                  intrinsic_reward_scale,
@@ -162,6 +164,12 @@ class GoalConditionedPolicy(ActorCriticPolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer
         num_levels : int
             number of levels within the hierarchy. Must be greater than 1. Two
             levels correspond to a Manager/Worker paradigm.
@@ -220,7 +228,9 @@ class GoalConditionedPolicy(ActorCriticPolicy):
             layer_norm=layer_norm,
             layers=layers,
             act_fun=act_fun,
-            use_huber=use_huber
+            use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics
         )
 
         assert num_levels >= 2, "num_levels must be greater than or equal to 2"
@@ -284,6 +294,8 @@ class GoalConditionedPolicy(ActorCriticPolicy):
                     layers=layers,
                     act_fun=act_fun,
                     use_huber=use_huber,
+                    use_xla=use_xla,
+                    fused_critics=fused_critics,
                     scope="level_{}".format(i),
                     zero_fingerprint=zero_fingerprint_i,
                     fingerprint_dim=self.fingerprint_dim[0],
@@ -658,6 +670,14 @@ class GoalConditionedPolicy(ActorCriticPolicy):
 
         return td_map
 
+    def get_summary(self):
+        """See parent class."""
+        summary = {}
+        for i in range(self.num_levels):
+            summary.update(self.policy[i].get_summary())
+
+        return summary
+
     # ======================================================================= #
     #                       Auxiliary methods for HIRO                        #
     # ======================================================================= #
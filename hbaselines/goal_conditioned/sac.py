@@ -33,6 +33,8 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  target_entropy,
                  num_levels,
                  meta_period,
@@ -84,6 +86,12 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer
         target_entropy : float
             target entropy used when learning the entropy coefficient. If set
             to None, a heuristic value is used.
@@ -139,6 +147,8 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
             layers=layers,
             act_fun=act_fun,
             use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics,
             num_levels=num_levels,
             meta_period=meta_period,
             intrinsic_reward_scale=intrinsic_reward_scale,
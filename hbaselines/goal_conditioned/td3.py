@@ -38,6 +38,8 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  num_levels,
                  meta_period,
                  intrinsic_reward_scale,
@@ -97,6 +99,12 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer
         num_levels : int
             number of levels within the hierarchy. Must be greater than 1. Two
             levels correspond to a Manager/Worker paradigm.
@@ -149,6 +157,8 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
             layers=layers,
             act_fun=act_fun,
             use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics,
             num_levels=num_levels,
             meta_period=meta_period,
             intrinsic_reward_scale=intrinsic_reward_scale,
@@ -299,8 +309,8 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
 
         # create the worker policy with inputs directly from the manager
         with tf.compat.v1.variable_scope("level_1/model"):
-            worker_with_meta_obs = self.policy[-1].make_critic(
-                obs, self.policy[-1].action_ph, reuse=True, scope="qf_0")
+            worker_with_meta_obs = self.policy[-1].make_critics(
+                obs, self.policy[-1].action_ph, reuse=True)[0]
 
         # create a tensorflow operation that mimics the reward function that is
         # used to provide feedback to the worker
@@ -369,8 +379,7 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
 
         # Update operations for the critic networks.
         step_ops = [self.policy[0].critic_loss,
-                    self.policy[0].critic_optimizer[0],
-                    self.policy[0].critic_optimizer[1]]
+                    self.policy[0].critic_optimizer]
 
         feed_dict = {
             self.policy[0].obs_ph: obs0[0],
@@ -384,7 +393,8 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
             # Actor updates and target soft update operation.
             step_ops += [self.policy[0].actor_loss,
                          self.cg_optimizer,  # This is what's replaced.
-                         self.policy[0].target_soft_updates]
+                         self.policy[0].target_soft_updates,
+                         self.policy[0].summary_tensors]
 
             feed_dict.update({
                 self.policy[-1].obs_ph: obs0[-1],
@@ -395,7 +405,9 @@ class GoalConditionedPolicy(BaseGoalConditionedPolicy):
         # Perform the update operations and collect the critic loss.
         critic_loss, *_vals = self.sess.run(step_ops, feed_dict=feed_dict)
 
-        # Extract the actor loss.
-        actor_loss = _vals[2] if update_actor else 0
+        # Extract the actor loss and add the summaries to their averages.
+        actor_loss = _vals[1] if update_actor else 0
+        if update_actor:
+            self.policy[0].summary_stats.update(_vals[4])
 
         return critic_loss, actor_loss
@@ -1,5 +1,6 @@
 """Base multi-agent feed-forward policy."""
 import tensorflow as tf
+import numpy as np
 
 from hbaselines.base_policies import ActorCriticPolicy
 
@@ -69,6 +70,23 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
       we use a single centralized value function instead of a value function
       for each agent.
 
+    The parameters of independent learners may additionally be stored in
+    stacked tensors by setting the `stacked` attribute to True. The actions of
+    all agents are then computed by a single call to the policy, and all agents
+    are updated by a single optimizer step, while each agent keeps its own
+    parameters and replay buffer. This requires all agents to have the same
+    observation, action, and context spaces.
+
+      >>> from hbaselines.algorithms.off_policy import OffPolicyRLAlgorithm
+      >>>
+      >>> alg = OffPolicyRLAlgorithm(
+      >>>     policy=MultiFeedForwardPolicy,
+      >>>     env="...",  # replace with an appropriate environment
+      >>>     policy_kwargs={
+      >>>         "stacked": True,
+      >>>     }
+      >>> )
+
     Attributes
     ----------
     zero_fingerprint : bool
@@ -82,6 +100,9 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
         whether to use a shared policy for all agents
     maddpg : bool
         whether to use an algorithm-specific variant of the MADDPG algorithm
+    stacked : bool
+        whether to store the parameters of the independent agents in stacked
+        tensors. Only used if `shared` and `maddpg` are set to False.
     all_ob_space : gym.spaces.*
         the observation space of the full state space. Used by MADDPG variants
         of the policy.
@@ -97,7 +118,11 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
         class when instantiating other (child) policies.
     agents : dict <str, hbaselines.base_policies.ActorCriticPolicy>
         Actor policy for each agent in the network. If MADDPG variants of the
-        policy are being used, this attribute is not used.
+        policy are being used, this attribute is not used. If the policy is
+        shared or stacked, a single policy is stored under the "policy" key.
+    agent_keys : list of str
+        the keys of the agents, in the order of the stacked models. Only used
+        if the parameters are stacked.
     """
 
     def __init__(self,
@@ -116,8 +141,11 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  shared,
                  maddpg,
+                 stacked,
                  base_policy,
                  all_ob_space=None,
                  n_agents=1,
@@ -165,11 +193,24 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer. Only used by
+            the policies of the agents if `maddpg` is set to False.
         shared : bool
             whether to use a shared policy for all agents
         maddpg : bool
             whether to use an algorithm-specific variant of the MADDPG
             algorithm
+        stacked : bool
+            whether to store the parameters of the independent agents in
+            stacked tensors, and compute the actions and updates of all agents
+            with single operations. Only used if `shared` and `maddpg` are
+            set to False. All agents must have the same observation, action,
+            and context spaces.
         base_policy : type [ hbaselines.base_policies.ActorCriticPolicy ]
             the base (single agent) policy model used by all agents within the
             network
@@ -211,13 +252,17 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
             layer_norm=layer_norm,
             layers=layers,
             act_fun=act_fun,
-            use_huber=use_huber
+            use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics
         )
 
         self.zero_fingerprint = zero_fingerprint
         self.fingerprint_dim = fingerprint_dim
         self.shared = shared
         self.maddpg = maddpg
+        self.stacked = stacked and not (shared or maddpg)
+        self.agent_keys = None
         self.all_ob_space = all_ob_space
         self.n_agents = n_agents
         self.base_policy = base_policy
@@ -354,6 +399,13 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
         else:
             return self._get_td_map_basic()
 
+    def get_summary(self):
+        """See parent class."""
+        if self.maddpg:
+            return super(MultiFeedForwardPolicy, self).get_summary()
+        else:
+            return self._get_summary_basic()
+
     # ======================================================================= #
     #               Basic version of required abstract methods.               #
     # ======================================================================= #
@@ -368,6 +420,12 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
         Then agents in this case are created using the base_policy class. No
         separate replay buffers, centralized value functions, or optimization
         operations are created.
+
+        Raises
+        ------
+        ValueError
+            if the parameters are stacked and the agents have different
+            observation, action, or context spaces
         """
         policy_parameters = dict(
             buffer_size=self.buffer_size,
@@ -381,6 +439,8 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
             layers=self.layers,
             act_fun=self.act_fun,
             use_huber=self.use_huber,
+            use_xla=self.use_xla,
+            fused_critics=self.fused_critics,
             zero_fingerprint=self.zero_fingerprint,
             fingerprint_dim=self.fingerprint_dim,
             **self.additional_params
@@ -398,6 +458,27 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
                 scope=scope,
                 **policy_parameters
             )
+        elif self.stacked:
+            # One policy whose models are the parameters of every agent.
+            self.agent_keys = list(self.ob_space.keys())
+            key0 = self.agent_keys[0]
+            for key in self.agent_keys:
+                if self.ob_space[key] != self.ob_space[key0] \
+                        or self.ac_space[key] != self.ac_space[key0] \
+                        or self.co_space[key] != self.co_space[key0]:
+                    raise ValueError(
+                        "Stacked policies require all agents to have the same "
+                        "observation, action, and context spaces.")
+
+            self.agents["policy"] = self.base_policy(
+                sess=self.sess,
+                ob_space=self.ob_space[key0],
+                ac_space=self.ac_space[key0],
+                co_space=self.co_space[key0],
+                scope=scope,
+                num_models=len(self.agent_keys),
+                **policy_parameters
+            )
         else:
             for key in self.ob_space.keys():
                 # Add the outer scope if provided.
@@ -423,15 +504,29 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
         """See update."""
         actor_loss = {}
         critic_loss = {}
-        for key in self.agents.keys():
-            c, a = self.agents[key].update(update_actor=update_actor, **kwargs)
-            critic_loss[key] = c
-            actor_loss[key] = a
+
+        if self.stacked:
+            # Split the losses of the stacked models between the agents.
+            c, a = self.agents["policy"].update(
+                update_actor=update_actor, **kwargs)
+            for i, key in enumerate(self.agent_keys):
+                critic_loss[key] = [c[0][i], c[1][i]]
+                actor_loss[key] = a[i]
+        else:
+            for key in self.agents.keys():
+                c, a = self.agents[key].update(
+                    update_actor=update_actor, **kwargs)
+                critic_loss[key] = c
+                actor_loss[key] = a
 
         return critic_loss, actor_loss
 
     def _get_action_basic(self, obs, context, apply_noise, random_actions):
         """See get_action."""
+        if self.stacked:
+            return self._get_action_stacked(
+                obs, context, apply_noise, random_actions)
+
         actions = {}
 
         for key in obs.keys():
@@ -449,6 +544,30 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
 
         return actions
 
+    def _get_action_stacked(self, obs, context, apply_noise, random_actions):
+        """Compute the actions of all agents of a stacked policy at once.
+
+        The observations (and contexts) of the agents are stacked in the order
+        of the models. Agents that are not in the environment are assigned
+        zero observations, and their actions are discarded.
+        """
+        ob_shape = obs[next(iter(obs))].shape
+
+        def stack(inputs, shape):
+            return np.array([
+                inputs[key] if key in obs else np.zeros(shape)
+                for key in self.agent_keys])
+
+        obs_stacked = stack(obs, ob_shape)
+        context_stacked = None if context is None else stack(
+            context, context[next(iter(obs))].shape)
+
+        action = self.agents["policy"].get_action(
+            obs_stacked, context_stacked, apply_noise, random_actions)
+
+        return {key: action[i] for i, key in enumerate(self.agent_keys)
+                if key in obs}
+
     def _store_transition_basic(self,
                                 obs0,
                                 context0,
@@ -460,6 +579,30 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
                                 is_final_step,
                                 evaluate):
         """See store_transition."""
+        if self.stacked:
+            # Agents that are not in the environment, or have exited it, are
+            # skipped.
+            keys = [key if key in obs0.keys() and key in reward.keys()
+                    else None for key in self.agent_keys]
+
+            def stack(inputs):
+                if inputs is None:
+                    return None
+                return [None if key is None else inputs[key] for key in keys]
+
+            self.agents["policy"].store_transition(
+                obs0=stack(obs0),
+                context0=stack(context0),
+                action=stack(action),
+                reward=stack(reward),
+                obs1=stack(obs1),
+                context1=stack(context1),
+                done=[done] * len(keys),
+                is_final_step=[is_final_step] * len(keys),
+                evaluate=evaluate,
+            )
+            return
+
         for key in obs0.keys():
             # If the agent has exited the environment, ignore it.
             if key not in reward.keys():
@@ -497,6 +640,14 @@ class MultiFeedForwardPolicy(ActorCriticPolicy):
 
         return combines_td_maps
 
+    def _get_summary_basic(self):
+        """See get_summary."""
+        summary = {}
+        for key in self.agents.keys():
+            summary.update(self.agents[key].get_summary())
+
+        return summary
+
     # ======================================================================= #
     #               MADDPG version of required abstract methods.              #
     #                  Filled in by the specific algorithms.                  #
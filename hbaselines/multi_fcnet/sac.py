@@ -9,6 +9,8 @@ from hbaselines.multi_fcnet.replay_buffer import SharedReplayBuffer
 from hbaselines.utils.tf_util import layer
 from hbaselines.utils.tf_util import get_trainable_vars
 from hbaselines.utils.tf_util import reduce_std
+from hbaselines.utils.tf_util import get_summary_tensors
+from hbaselines.utils.tf_util import xla_scope
 from hbaselines.utils.tf_util import gaussian_likelihood
 from hbaselines.utils.tf_util import apply_squashing_func
 from hbaselines.utils.tf_util import print_params_shape
@@ -110,9 +112,12 @@ class MultiFeedForwardPolicy(BasePolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  target_entropy,
                  shared,
                  maddpg,
+                 stacked,
                  all_ob_space=None,
                  n_agents=1,
                  scope=None,
@@ -155,6 +160,13 @@ class MultiFeedForwardPolicy(BasePolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer. Only used by
+            the policies of the agents if `maddpg` is set to False.
         target_entropy : float
             target entropy used when learning the entropy coefficient. If set
             to None, a heuristic value is used.
@@ -163,6 +175,12 @@ class MultiFeedForwardPolicy(BasePolicy):
         maddpg : bool
             whether to use an algorithm-specific variant of the MADDPG
             algorithm
+        stacked : bool
+            whether to store the parameters of the independent agents in
+            stacked tensors, and compute the actions and updates of all agents
+            with single operations. Only used if `shared` and `maddpg` are
+            set to False. All agents must have the same observation, action,
+            and context spaces.
         all_ob_space : gym.spaces.*
             the observation space of the full state space. Used by MADDPG
             variants of the policy.
@@ -250,8 +268,11 @@ class MultiFeedForwardPolicy(BasePolicy):
             layers=layers,
             act_fun=act_fun,
             use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics,
             shared=shared,
             maddpg=maddpg,
+            stacked=stacked,
             all_ob_space=all_ob_space,
             n_agents=n_agents,
             base_policy=FeedForwardPolicy,
@@ -398,6 +419,9 @@ class MultiFeedForwardPolicy(BasePolicy):
             policy_out=self.policy_out
         )
 
+        # Collect the tensorboard summaries of the policy.
+        self.summary_tensors = get_summary_tensors(self._summaries_start)
+
     def _setup_maddpg_independent(self, scope):
         """Perform independent form of MADDPG setup."""
         self.all_obs_ph = {}
@@ -529,6 +553,10 @@ class MultiFeedForwardPolicy(BasePolicy):
             # Append the key to the outer scope term.
             scope_i = key if scope is None else "{}/{}".format(scope, key)
 
+            # the number of summaries created before those of the agent
+            summaries_start = len(tf.compat.v1.get_collection(
+                tf.compat.v1.GraphKeys.SUMMARIES))
+
             # Create the policy update and logging operations of the agent.
             with tf.compat.v1.variable_scope(key, reuse=False):
                 (self.critic_loss[key],
@@ -555,6 +583,10 @@ class MultiFeedForwardPolicy(BasePolicy):
                     policy_out=self.policy_out[key]
                 )
 
+            # Collect the tensorboard summaries of the agent, which are
+            # fetched when the agent is trained.
+            self.summary_tensors[key] = get_summary_tensors(summaries_start)
+
     def _setup_agent(self,
                      obs_ph,
                      action_ph,
@@ -715,40 +747,42 @@ class MultiFeedForwardPolicy(BasePolicy):
                 create_qf=True, create_vf=False, reuse=True
             )
 
-        # Setup the target critic and critic update procedure.
-        critic_loss, critic_optimizer = self._setup_critic_update(
-            qf1_pi=qf1_pi,
-            qf2_pi=qf2_pi,
-            rew_ph=rew_ph,
-            terminals1=terminals1,
-            value_target=value_target,
-            qf1=qf1,
-            qf2=qf2,
-            alpha=alpha,
-            logp_pi=logp_pi,
-            value_fn=value_fn,
-            scope=scope
-        )
+        # Compile the update operations with XLA, if requested.
+        with xla_scope(self.use_xla):
+            # Setup the target critic and critic update procedure.
+            critic_loss, critic_optimizer = self._setup_critic_update(
+                qf1_pi=qf1_pi,
+                qf2_pi=qf2_pi,
+                rew_ph=rew_ph,
+                terminals1=terminals1,
+                value_target=value_target,
+                qf1=qf1,
+                qf2=qf2,
+                alpha=alpha,
+                logp_pi=logp_pi,
+                value_fn=value_fn,
+                scope=scope
+            )
 
-        # Create the target update operations.
-        init, soft = self._setup_target_updates(
-            model_scope='model/centralized_value_fns/vf',
-            target_scope='target/centralized_value_fns/vf',
-            scope=scope,
-            tau=self.tau,
-            verbose=self.verbose
-        )
+            # Create the target update operations.
+            init, soft = self._setup_target_updates(
+                model_scope='model/centralized_value_fns/vf',
+                target_scope='target/centralized_value_fns/vf',
+                scope=scope,
+                tau=self.tau,
+                verbose=self.verbose
+            )
 
-        # Setup the actor update procedure.
-        alpha_l, alpha_o, actor_l, actor_o = self._setup_actor_update(
-            qf1_pi=qf1_pi,
-            qf2_pi=qf2_pi,
-            log_alpha=log_alpha,
-            alpha=alpha,
-            logp_pi=logp_pi,
-            target_entropy=target_entropy,
-            scope=scope
-        )
+            # Setup the actor update procedure.
+            alpha_l, alpha_o, actor_l, actor_o = self._setup_actor_update(
+                qf1_pi=qf1_pi,
+                qf2_pi=qf2_pi,
+                log_alpha=log_alpha,
+                alpha=alpha,
+                logp_pi=logp_pi,
+                target_entropy=target_entropy,
+                scope=scope
+            )
 
         # Setup the running means and standard deviations of the model
         # inputs and outputs.
@@ -1243,6 +1277,7 @@ class MultiFeedForwardPolicy(BasePolicy):
                 self.actor_optimizer,
                 self.alpha_optimizer,
                 self.target_soft_updates,
+                self.summary_tensors,
             ]
 
             # Prepare the feed_dict information.
@@ -1264,11 +1299,14 @@ class MultiFeedForwardPolicy(BasePolicy):
 
             # Perform the update operations and collect the actor and critic
             # loss.
-            q1_loss, q2_loss, vf_loss, actor_loss, *_ = self.sess.run(
+            q1_loss, q2_loss, vf_loss, actor_loss, *_vals = self.sess.run(
                 step_ops, feed_dict)
             critic_loss = {"policy": [q1_loss, q2_loss]}
             actor_loss = {"policy": actor_loss}
 
+            # Add the summaries to their averages.
+            self.summary_stats.update(_vals[-1])
+
         # =================================================================== #
         #                    Independent update procedure                     #
         # =================================================================== #
@@ -1307,6 +1345,7 @@ class MultiFeedForwardPolicy(BasePolicy):
                     self.actor_optimizer[key],
                     self.alpha_optimizer[key],
                     self.target_soft_updates[key],
+                    self.summary_tensors[key],
                 ]
 
                 # Prepare the feed_dict information.
@@ -1323,10 +1362,13 @@ class MultiFeedForwardPolicy(BasePolicy):
 
                 # Perform the update operations and collect the actor and
                 # critic loss.
-                q1_loss, q2_loss, vf_loss, actor_loss[key], *_ = \
+                q1_loss, q2_loss, vf_loss, actor_loss[key], *_vals = \
                     self.sess.run(step_ops, feed_dict)
                 critic_loss[key] = [q1_loss, q2_loss]
 
+                # Add the summaries to their averages.
+                self.summary_stats.update(_vals[-1])
+
         return critic_loss, actor_loss
 
     def _get_action_maddpg(self, obs, context, apply_noise, random_actions):
@@ -10,6 +10,8 @@ from hbaselines.multi_fcnet.replay_buffer import SharedReplayBuffer
 from hbaselines.utils.tf_util import layer
 from hbaselines.utils.tf_util import get_trainable_vars
 from hbaselines.utils.tf_util import reduce_std
+from hbaselines.utils.tf_util import get_summary_tensors
+from hbaselines.utils.tf_util import xla_scope
 
 
 class MultiFeedForwardPolicy(BasePolicy):
@@ -89,11 +91,14 @@ class MultiFeedForwardPolicy(BasePolicy):
                  layers,
                  act_fun,
                  use_huber,
+                 use_xla,
+                 fused_critics,
                  noise,
                  target_policy_noise,
                  target_noise_clip,
                  shared,
                  maddpg,
+                 stacked,
                  all_ob_space=None,
                  n_agents=1,
                  scope=None,
@@ -136,6 +141,13 @@ class MultiFeedForwardPolicy(BasePolicy):
             specifies whether to use the huber distance function as the loss
             for the critic. If set to False, the mean-squared error metric is
             used instead
+        use_xla : bool
+            whether to compile the update operations of the policy with
+            XLA. If XLA is not available, the operations are not compiled.
+        fused_critics : bool
+            whether to represent the twin critics as a single network with
+            stacked parameters, trained by a single optimizer. Only used by
+            the policies of the agents if `maddpg` is set to False.
         noise : float
             scaling term to the range of the action space, that is subsequently
             used as the standard deviation of Gaussian noise added to the
@@ -150,6 +162,12 @@ class MultiFeedForwardPolicy(BasePolicy):
         maddpg : bool
             whether to use an algorithm-specific variant of the MADDPG
             algorithm
+        stacked : bool
+            whether to store the parameters of the independent agents in
+            stacked tensors, and compute the actions and updates of all agents
+            with single operations. Only used if `shared` and `maddpg` are
+            set to False. All agents must have the same observation, action,
+            and context spaces.
         all_ob_space : gym.spaces.*
             the observation space of the full state space. Used by MADDPG
             variants of the policy.
@@ -225,8 +243,11 @@ class MultiFeedForwardPolicy(BasePolicy):
             layers=layers,
             act_fun=act_fun,
             use_huber=use_huber,
+            use_xla=use_xla,
+            fused_critics=fused_critics,
             shared=shared,
             maddpg=maddpg,
+            stacked=stacked,
             all_ob_space=all_ob_space,
             n_agents=n_agents,
             base_policy=FeedForwardPolicy,
@@ -359,6 +380,9 @@ class MultiFeedForwardPolicy(BasePolicy):
             combined_actors=combined_actors
         )
 
+        # Collect the tensorboard summaries of the policy.
+        self.summary_tensors = get_summary_tensors(self._summaries_start)
+
     def _setup_maddpg_independent(self, scope):
         """Perform independent form of MADDPG setup."""
         self.all_obs_ph = {}
@@ -478,6 +502,10 @@ class MultiFeedForwardPolicy(BasePolicy):
             # Append the key to the outer scope term.
             scope_i = key if scope is None else "{}/{}".format(scope, key)
 
+            # the number of summaries created before those of the agent
+            summaries_start = len(tf.compat.v1.get_collection(
+                tf.compat.v1.GraphKeys.SUMMARIES))
+
             # Create the policy update and logging operations of the agent.
             with tf.compat.v1.variable_scope(key, reuse=False):
                 (self.critic_loss[key],
@@ -497,6 +525,10 @@ class MultiFeedForwardPolicy(BasePolicy):
                     combined_actors=combined_actors
                 )
 
+            # Collect the tensorboard summaries of the agent, which are
+            # fetched when the agent is trained.
+            self.summary_tensors[key] = get_summary_tensors(summaries_start)
+
     def _setup_agent(self,
                      obs_ph,
                      obs1_ph,
@@ -614,26 +646,28 @@ class MultiFeedForwardPolicy(BasePolicy):
         tf.Operation
             the operation that updates the trainable parameters of the actor
         """
-        # Setup the target critic and critic update procedure.
-        critic_loss, critic_optimizer = self._setup_critic_update(
-            critic=critic_tf,
-            all_obs1_ph=all_obs1_ph,
-            actor_target=noisy_actor_target,
-            rew_ph=rew_ph,
-            done1=terminals1,
-            scope=scope
-        )
+        # Compile the update operations with XLA, if requested.
+        with xla_scope(self.use_xla):
+            # Setup the target critic and critic update procedure.
+            critic_loss, critic_optimizer = self._setup_critic_update(
+                critic=critic_tf,
+                all_obs1_ph=all_obs1_ph,
+                actor_target=noisy_actor_target,
+                rew_ph=rew_ph,
+                done1=terminals1,
+                scope=scope
+            )
 
-        # Create the target update operations.
-        init, soft = self._setup_target_updates(
-            'model', 'target', scope, self.tau, self.verbose)
+            # Create the target update operations.
+            init, soft = self._setup_target_updates(
+                'model', 'target', scope, self.tau, self.verbose)
 
-        # Setup the actor update procedure.
-        actor_loss, actor_optimizer = self._setup_actor_update(
-            all_obs_ph=all_obs_ph,
-            combined_actors=combined_actors,
-            scope=scope
-        )
+            # Setup the actor update procedure.
+            actor_loss, actor_optimizer = self._setup_actor_update(
+                all_obs_ph=all_obs_ph,
+                combined_actors=combined_actors,
+                scope=scope
+            )
 
         # Setup the running means and standard deviations of the model
         # inputs and outputs.
@@ -953,10 +987,11 @@ class MultiFeedForwardPolicy(BasePolicy):
                         self.critic_optimizer[1]]
 
             if update_actor:
-                # Actor updates and target soft update operation.
+                # Actor updates, target soft update operation, and summaries.
                 step_ops += [self.actor_loss,
                              self.actor_optimizer,
-                             self.target_soft_updates]
+                             self.target_soft_updates,
+                             self.summary_tensors]
 
             # Prepare the feed_dict information.
             feed_dict = {
@@ -979,9 +1014,11 @@ class MultiFeedForwardPolicy(BasePolicy):
             critic_loss, *_vals = self.sess.run(step_ops, feed_dict=feed_dict)
             critic_loss = {"policy": critic_loss}
 
-            # Extract the actor loss.
+            # Extract the actor loss and add the summaries to their averages.
             actor_loss = _vals[2] if update_actor else 0
             actor_loss = {"policy": actor_loss}
+            if update_actor:
+                self.summary_stats.update(_vals[5])
 
         # =================================================================== #
         #                    Independent update procedure                     #
@@ -1013,10 +1050,12 @@ class MultiFeedForwardPolicy(BasePolicy):
                             self.critic_optimizer[key][1]]
 
                 if update_actor:
-                    # Actor updates and target soft update operation.
+                    # Actor updates, target soft update operation, and
+                    # summaries.
                     step_ops += [self.actor_loss[key],
                                  self.actor_optimizer[key],
-                                 self.target_soft_updates[key]]
+                                 self.target_soft_updates[key],
+                                 self.summary_tensors[key]]
 
                 # Prepare the feed_dict information.
                 feed_dict = {
@@ -1034,8 +1073,11 @@ class MultiFeedForwardPolicy(BasePolicy):
                 critic_loss[key], *_vals = self.sess.run(
                     step_ops, feed_dict=feed_dict)
 
-                # Extract the actor loss.
+                # Extract the actor loss and add the summaries to their
+                # averages.
                 actor_loss[key] = _vals[2] if update_actor else 0
+                if update_actor:
+                    self.summary_stats.update(_vals[5])
 
         return critic_loss, actor_loss
 
@@ -0,0 +1,182 @@
+"""Utility methods for saving checkpoints without blocking training."""
+import os
+import glob
+import queue
+import threading
+import tensorflow as tf
+
+
+class CheckpointWriter(object):
+    """Asynchronous checkpoint writer object.
+
+    The values of the variables are copied to memory when `save` is called,
+    and are written to the disk by a background thread. The checkpoints use
+    the same format as `tf.compat.v1.train.Saver`, so that they may be
+    restored via `Saver.restore` and found via `tf.train.latest_checkpoint`.
+
+    Older checkpoints are deleted once they are neither among the `keep_last`
+    most recent checkpoints, nor among the `keep_best` checkpoints with the
+    highest scores.
+
+    Attributes
+    ----------
+    sess : tf.compat.v1.Session
+        the current TensorFlow session
+    var_list : list of tf.Variable
+        the variables to save
+    save_dir : str
+        the directory the checkpoints are stored in
+    keep_last : int or None
+        the number of most recent checkpoints to keep. If set to None, all
+        checkpoints are kept.
+    keep_best : int
+        the number of checkpoints with the highest scores to keep, in addition
+        to the most recent checkpoints
+    checkpoints : list of (str, float or None)
+        the path and score of every checkpoint on the disk, from oldest to
+        newest
+    """
+
+    def __init__(self, sess, var_list, save_dir, keep_last=5, keep_best=1):
+        """Instantiate the writer.
+
+        Parameters
+        ----------
+        sess : tf.compat.v1.Session
+            the current TensorFlow session
+        var_list : list of tf.Variable
+            the variables to save
+        save_dir : str
+            the directory the checkpoints are stored in
+        keep_last : int or None
+            the number of most recent checkpoints to keep. If set to None, all
+            checkpoints are kept.
+        keep_best : int
+            the number of checkpoints with the highest scores to keep, in
+            addition to the most recent checkpoints
+        """
+        self.sess = sess
+        self.var_list = var_list
+        self.save_dir = save_dir
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.checkpoints = []
+
+        # Create an operation that writes the values of placeholders, under
+        # the names used by tf.compat.v1.train.Saver.
+        with sess.graph.as_default(), tf.compat.v1.name_scope("ckpt_writer"):
+            self._prefix_ph = tf.compat.v1.placeholder(tf.string, shape=())
+            self._value_phs = [
+                tf.compat.v1.placeholder(var.dtype.base_dtype, var.shape)
+                for var in var_list]
+            self._save_op = tf.raw_ops.SaveV2(
+                prefix=self._prefix_ph,
+                tensor_names=[var.op.name for var in var_list],
+                shape_and_slices=["" for _ in var_list],
+                tensors=self._value_phs,
+            )
+
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def save(self, save_path, global_step, score=None):
+        """Save the current values of the variables.
+
+        Only the copy of the values to memory is performed by the calling
+        thread.
+
+        Parameters
+        ----------
+        save_path : str
+            prefix of filenames created for the checkpoint
+        global_step : int
+            the training step, appended to the prefix
+        score : float or None
+            the score of the checkpoint, used to keep the best checkpoints.
+            Checkpoints without a score are only kept if they are recent.
+
+        Returns
+        -------
+        str
+            the path of the checkpoint
+
+        Raises
+        ------
+        RuntimeError
+            if a previous checkpoint could not be written
+        """
+        self._raise_error()
+        values = self.sess.run(self.var_list)
+        path = "{}-{}".format(save_path, global_step)
+        self._queue.put((path, values, score))
+        return path
+
+    def wait(self):
+        """Wait until all pending checkpoints have been written.
+
+        Raises
+        ------
+        RuntimeError
+            if a checkpoint could not be written
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Write the pending checkpoints and stop the background thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        """Raise the error of the background thread, if any occurred."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Failed to write a checkpoint.") from error
+
+    def _run(self):
+        """Write the checkpoints in the queue."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path, values, score):
+        """Write a checkpoint, and delete the checkpoints no longer kept."""
+        feed_dict = dict(zip(self._value_phs, values))
+        feed_dict[self._prefix_ph] = path
+        self.sess.run(self._save_op, feed_dict=feed_dict)
+
+        self.checkpoints = [
+            ckpt for ckpt in self.checkpoints if ckpt[0] != path]
+        self.checkpoints.append((path, score))
+
+        # Choose the checkpoints to keep.
+        if self.keep_last is not None:
+            start = max(len(self.checkpoints) - self.keep_last, 0)
+            keep = set(ckpt[0] for ckpt in self.checkpoints[start:])
+            scored = [ckpt for ckpt in self.checkpoints if ckpt[1] is not None]
+            scored = sorted(scored, key=lambda ckpt: ckpt[1], reverse=True)
+            keep.update(ckpt[0] for ckpt in scored[:self.keep_best])
+
+            for ckpt_path, _ in self.checkpoints:
+                if ckpt_path not in keep:
+                    for filename in glob.glob(ckpt_path + ".*"):
+                        os.remove(filename)
+            self.checkpoints = [
+                ckpt for ckpt in self.checkpoints if ckpt[0] in keep]
+
+        # Update the checkpoint state file, used by latest_checkpoint.
+        tf.compat.v1.train.update_checkpoint_state(
+            self.save_dir,
+            model_checkpoint_path=path,
+            all_model_checkpoint_paths=[ckpt[0] for ckpt in self.checkpoints],
+        )
@@ -1,41 +1,85 @@
 """Utility methods when instantiating environments."""
+import importlib
 import numpy as np
 from gym.spaces import Box
 import gym
 
-from hbaselines.envs.deeploco.envs import BipedalSoccer
-from hbaselines.envs.deeploco.envs import BipedalObstacles
-from hbaselines.envs.efficient_hrl.envs import AntMaze
-from hbaselines.envs.efficient_hrl.envs import AntFall
-from hbaselines.envs.efficient_hrl.envs import AntPush
-from hbaselines.envs.efficient_hrl.envs import AntFourRooms
-from hbaselines.envs.hac.envs import UR5, Pendulum
-
-try:
-    from hbaselines.envs.snn4hrl.envs import AntGatherEnv
-except (ImportError, ModuleNotFoundError):
-    pass
-
-try:
-    from flow.utils.registry import make_create_env
-    from hbaselines.envs.mixed_autonomy import FlowEnv
-    from hbaselines.envs.mixed_autonomy.params.merge \
-        import get_flow_params as merge
-    from hbaselines.envs.mixed_autonomy.params.ring \
-        import get_flow_params as ring
-    from hbaselines.envs.mixed_autonomy.params.ring_small \
-        import get_flow_params as ring_small
-    from hbaselines.envs.mixed_autonomy.params.figure_eight \
-        import get_flow_params as figure_eight
-    from hbaselines.envs.mixed_autonomy.params.highway_single \
-        import get_flow_params as highway_single
-except (ImportError, ModuleNotFoundError):  # pragma: no cover
-    pass  # pragma: no cover
-
-try:
-    from hbaselines.envs.point2d import Point2DEnv
-except (ImportError, ModuleNotFoundError):
-    pass
+
+class LazyImport(object):
+    """A placeholder for an object that is imported on first use.
+
+    This allows the environments below to be registered without importing
+    their modules (and their dependencies, e.g. MuJoCo or Flow) until an
+    environment is actually needed. Calling the placeholder, or accessing any
+    of its attributes, imports the object and forwards the call/access to it.
+
+    Attributes
+    ----------
+    module : str
+        the path to the module the object is located in
+    name : str
+        the name of the object within the module
+    """
+
+    def __init__(self, module, name):
+        """Instantiate the placeholder.
+
+        Parameters
+        ----------
+        module : str
+            the path to the module the object is located in
+        name : str
+            the name of the object within the module
+        """
+        self.module = module
+        self.name = name
+        self._obj = None
+
+    def load(self):
+        """Import and return the object."""
+        if self._obj is None:
+            module = importlib.import_module(self.module)
+            self._obj = getattr(module, self.name)
+        return self._obj
+
+    def __call__(self, *args, **kwargs):
+        """Call the imported object."""
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, item):
+        """Return an attribute of the imported object."""
+        if item in ["module", "name", "_obj"]:
+            # The placeholder is not initialized (e.g. while being copied).
+            raise AttributeError(item)
+        return getattr(self.load(), item)
+
+
+BipedalSoccer = LazyImport(
+    "hbaselines.envs.deeploco.envs", "BipedalSoccer")
+BipedalObstacles = LazyImport(
+    "hbaselines.envs.deeploco.envs", "BipedalObstacles")
+AntMaze = LazyImport("hbaselines.envs.efficient_hrl.envs", "AntMaze")
+AntFall = LazyImport("hbaselines.envs.efficient_hrl.envs", "AntFall")
+AntPush = LazyImport("hbaselines.envs.efficient_hrl.envs", "AntPush")
+AntFourRooms = LazyImport(
+    "hbaselines.envs.efficient_hrl.envs", "AntFourRooms")
+UR5 = LazyImport("hbaselines.envs.hac.envs", "UR5")
+Pendulum = LazyImport("hbaselines.envs.hac.envs", "Pendulum")
+AntGatherEnv = LazyImport("hbaselines.envs.snn4hrl.envs", "AntGatherEnv")
+make_create_env = LazyImport("flow.utils.registry", "make_create_env")
+FlowEnv = LazyImport("hbaselines.envs.mixed_autonomy", "FlowEnv")
+merge = LazyImport(
+    "hbaselines.envs.mixed_autonomy.params.merge", "get_flow_params")
+ring = LazyImport(
+    "hbaselines.envs.mixed_autonomy.params.ring", "get_flow_params")
+ring_small = LazyImport(
+    "hbaselines.envs.mixed_autonomy.params.ring_small", "get_flow_params")
+figure_eight = LazyImport(
+    "hbaselines.envs.mixed_autonomy.params.figure_eight", "get_flow_params")
+highway_single = LazyImport(
+    "hbaselines.envs.mixed_autonomy.params.highway_single",
+    "get_flow_params")
+Point2DEnv = LazyImport("hbaselines.envs.point2d", "Point2DEnv")
 
 
 # This dictionary element contains all relevant information when instantiating
@@ -51,6 +95,10 @@ except (ImportError, ModuleNotFoundError):
 #   the Worker's state space
 # - env: a lambda term that takes an input (evaluate, render, multiagent,
 #   shared, maddpg) and return an environment or list of environments
+#
+# The environment classes and parameter functions referenced here are
+# LazyImport placeholders, so the modules of an environment are only imported
+# once the environment is created (or its attributes are needed).
 ENV_ATTRIBUTES = {
 
     # ======================================================================= #
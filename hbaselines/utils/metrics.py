@@ -0,0 +1,275 @@
+"""Utility methods for writing training and evaluation statistics.
+
+Statistics are logged as rows of named fields, and every sequence of rows
+(e.g. "train" or "eval_0") is written to its own file in the log directory. The
+rows are written by a background thread that keeps the files open, and writes
+the rows it receives in batches, so that logging does not block training. Two
+formats are supported:
+
+* "csv": one line per row, preceded by a header with the names of the fields.
+* "npy": a compact columnar format. The file contains a sequence of NumPy
+  arrays. The first array lists the names of the fields, and every subsequent
+  array contains a batch of rows, with one row per field and one column per
+  logged row. Only numeric values are supported.
+
+Files in either format may be read via `read_metrics`.
+"""
+import os
+import csv
+import time
+import queue
+import threading
+import numpy as np
+
+# the file extension of each supported format
+FORMATS = {"csv": ".csv", "npy": ".npy"}
+
+# the queue item that requests the buffered rows to be written
+_FLUSH = "flush"
+
+
+class MetricsWriter(object):
+    """Asynchronous metrics writer object.
+
+    Rows are buffered in memory by a background thread, and written to their
+    files every `flush_interval` seconds, as well as when `flush` or `close`
+    are called. If a file already exists, the new rows are appended to it.
+
+    Attributes
+    ----------
+    log_dir : str
+        the directory the files are stored in
+    fmt : str
+        the format of the files. Must be one of {"csv", "npy"}.
+    flush_interval : float or None
+        the number of seconds between two writes of the buffered rows. If set
+        to None, rows are only written when `flush` or `close` are called.
+    fieldnames : dict < str, list of str >
+        the names of the fields of every sequence of rows, as defined by its
+        first row
+    """
+
+    def __init__(self, log_dir, fmt="csv", flush_interval=10.):
+        """Instantiate the writer.
+
+        Parameters
+        ----------
+        log_dir : str
+            the directory the files are stored in
+        fmt : str
+            the format of the files. Must be one of {"csv", "npy"}.
+        flush_interval : float or None
+            the number of seconds between two writes of the buffered rows. If
+            set to None, rows are only written when `flush` or `close` are
+            called.
+
+        Raises
+        ------
+        ValueError
+            if the format is not supported
+        """
+        if fmt not in FORMATS:
+            raise ValueError("Unknown format: {}. Must be one of {}.".format(
+                fmt, sorted(FORMATS.keys())))
+
+        self.log_dir = log_dir
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.fieldnames = {}
+
+        # the open files and buffered rows of every sequence of rows. Only
+        # accessed by the background thread.
+        self._files = {}
+        self._rows = {}
+
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, name, row):
+        """Log a row of statistics.
+
+        Parameters
+        ----------
+        name : str
+            the name of the sequence of rows, used as the name of the file
+            (without its extension)
+        row : dict
+            the value of every field
+
+        Raises
+        ------
+        ValueError
+            if the fields differ from those of the previous rows of the
+            sequence, or if a value is not numeric in the "npy" format
+        RuntimeError
+            if previous rows could not be written
+        """
+        self._raise_error()
+
+        fieldnames = self.fieldnames.setdefault(name, list(row.keys()))
+        if set(row.keys()) != set(fieldnames):
+            raise ValueError(
+                "The fields of {} cannot change. Expected {}, got {}.".format(
+                    name, sorted(fieldnames), sorted(row.keys())))
+
+        if self.fmt == "npy":
+            row = {key: float(val) for key, val in row.items()}
+        else:
+            row = dict(row)
+
+        self._queue.put((name, row))
+
+    def flush(self):
+        """Write all logged rows to the disk.
+
+        Raises
+        ------
+        RuntimeError
+            if the rows could not be written
+        """
+        self._queue.put(_FLUSH)
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Write the logged rows, close the files, and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        """Raise the error of the background thread, if any occurred."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Failed to write the metrics.") from error
+
+    def _run(self):
+        """Buffer the logged rows, and write them periodically."""
+        last_flush = time.time()
+        while True:
+            if self.flush_interval is None:
+                timeout = None
+            else:
+                timeout = max(
+                    last_flush + self.flush_interval - time.time(), 0)
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # The flush interval has elapsed.
+                self._try(self._flush)
+                last_flush = time.time()
+                continue
+
+            try:
+                if item is None:
+                    self._try(self._flush)
+                    self._try(self._close_files)
+                    return
+                elif item == _FLUSH:
+                    self._try(self._flush)
+                    last_flush = time.time()
+                else:
+                    name, row = item
+                    self._rows.setdefault(name, []).append(row)
+            finally:
+                self._queue.task_done()
+
+    def _try(self, fn):
+        """Run a method, and store the error it raises, if any."""
+        try:
+            fn()
+        except Exception as e:
+            self._error = e
+
+    def _flush(self):
+        """Write the buffered rows to their files."""
+        for name, rows in self._rows.items():
+            if len(rows) == 0:
+                continue
+
+            f, writer = self._get_file(name)
+            if self.fmt == "csv":
+                writer.writerows(rows)
+            else:
+                np.save(f, np.array([[row[key] for row in rows]
+                                     for key in self.fieldnames[name]]))
+            f.flush()
+
+            self._rows[name] = []
+
+    def _get_file(self, name):
+        """Return the open file of a sequence of rows, and its CSV writer."""
+        if name not in self._files:
+            path = os.path.join(self.log_dir, name + FORMATS[self.fmt])
+            exists = os.path.exists(path) and os.path.getsize(path) > 0
+            fieldnames = self.fieldnames[name]
+
+            if self.fmt == "csv":
+                f = open(path, "a")
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                if not exists:
+                    writer.writeheader()
+            else:
+                f = open(path, "ab")
+                writer = None
+                if not exists:
+                    np.save(f, np.array(fieldnames))
+
+            self._files[name] = (f, writer)
+
+        return self._files[name]
+
+    def _close_files(self):
+        """Close all open files."""
+        for f, _ in self._files.values():
+            f.close()
+        self._files = {}
+
+
+def read_metrics(path):
+    """Read a file written by a metrics writer.
+
+    Parameters
+    ----------
+    path : str
+        the path to the file. The format is defined by its extension, and must
+        be one of {".csv", ".npy"}.
+
+    Returns
+    -------
+    dict < str, np.ndarray >
+        the values of every field, in the order they were logged. The values
+        must be numeric.
+
+    Raises
+    ------
+    ValueError
+        if the format is not supported
+    """
+    if path.endswith(FORMATS["csv"]):
+        with open(path, "r") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = reader.fieldnames or []
+        return {key: np.array([float(row[key]) for row in rows])
+                for key in fieldnames}
+
+    elif path.endswith(FORMATS["npy"]):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            fieldnames = [str(key) for key in np.load(f)]
+            batches = []
+            while f.tell() < size:
+                batches.append(np.load(f))
+
+        if len(batches) > 0:
+            values = np.concatenate(batches, axis=1)
+        else:
+            values = np.zeros((len(fieldnames), 0))
+        return dict(zip(fieldnames, values))
+
+    else:
+        raise ValueError("Unknown format: {}".format(path))
@@ -1,6 +1,10 @@
 """Miscellaneous utility methods for this repository."""
 import os
+import math
 import errno
+import functools
+import threading
+from queue import Queue, Full
 
 
 def ensure_dir(path):
@@ -11,3 +15,169 @@ def ensure_dir(path):
         if exception.errno != errno.EEXIST:
             raise  # pragma: no cover
     return path
+
+
+def cached_space(key):
+    """Cache the space returned by a method until its configuration changes.
+
+    This is meant to decorate the methods behind the space properties of
+    environments, which may otherwise rebuild the space (and scan the
+    environment) every time they are accessed. The space is recomputed
+    whenever the key returned by `key` differs from the one it was computed
+    with, for example when the number of RL vehicles or the network changes.
+
+    Parameters
+    ----------
+    key : callable
+        a function that takes the environment as an input and returns a value
+        describing the configuration the space depends on. The value must
+        support equality comparisons.
+
+    Returns
+    -------
+    callable
+        the decorator
+    """
+    def decorator(fn):
+        attr_name = "_cached_{}".format(fn.__name__)
+
+        @functools.wraps(fn)
+        def wrapper(self):
+            current_key = key(self)
+            cached = self.__dict__.get(attr_name)
+            if cached is None or cached[0] != current_key:
+                cached = (current_key, fn(self))
+                self.__dict__[attr_name] = cached
+            return cached[1]
+
+        return wrapper
+
+    return decorator
+
+
+def prefetch(iterable, buffer_size=2):
+    """Iterate over an iterable from a background thread.
+
+    The next `buffer_size` elements are computed by the background thread
+    while the current element is being processed, which hides the time needed
+    to produce the elements (e.g. to gather batches from a replay buffer)
+    behind the time needed to process them. If the generator is closed before
+    the iterable is exhausted (e.g. the consumer breaks out of its loop), the
+    background thread stops after computing at most one more element.
+
+    Parameters
+    ----------
+    iterable : iterable
+        the iterable to iterate over
+    buffer_size : int
+        the maximum number of elements to compute in advance
+
+    Returns
+    -------
+    generator
+        a generator over the elements of the iterable
+
+    Raises
+    ------
+    Exception
+        any exception raised while iterating over the iterable
+    """
+    queue = Queue(maxsize=buffer_size)
+    done = object()
+    stop = threading.Event()
+
+    def put(item):
+        # Wait for space in the queue, unless the consumer has stopped.
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def worker():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((None, e))
+            return
+        put((done, None))
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+
+
+class StreamingMean(object):
+    """Streaming average of named scalar values.
+
+    This is used to average statistics that are fetched at every training
+    step (e.g. losses) over the steps between two logging operations.
+
+    Standard deviations cannot be averaged. The standard deviation of a batch
+    (a statistic whose name ends with "_std") is instead pooled with the mean
+    of the same batch (the statistic of the same name ending with "_mean"),
+    which results in the standard deviation over all batches, assuming the
+    batches are of equal size.
+    """
+
+    def __init__(self):
+        """Instantiate the accumulator."""
+        self._sum = {}
+        self._sum_sq = {}
+        self._count = {}
+
+    def update(self, values):
+        """Add the values of a step to the averages.
+
+        Parameters
+        ----------
+        values : dict < str, float >
+            the value of each statistic, by name
+        """
+        for key, value in values.items():
+            self._sum[key] = self._sum.get(key, 0.) + float(value)
+            self._sum_sq[key] = self._sum_sq.get(key, 0.) + float(value) ** 2
+            self._count[key] = self._count.get(key, 0) + 1
+
+    def mean(self):
+        """Return the average of each statistic since the last reset.
+
+        Returns
+        -------
+        dict < str, float >
+            the average of each statistic, by name. Standard deviations with a
+            matching mean are pooled over the batches instead.
+        """
+        means = {key: self._sum[key] / self._count[key] for key in self._sum}
+
+        for key in means:
+            mean_key = key[:-len("_std")] + "_mean"
+            if key.endswith("_std") and mean_key in means \
+                    and self._count[key] == self._count[mean_key]:
+                # The second moment over all batches is the average over the
+                # batches of their variance plus their squared mean.
+                var = (self._sum_sq[key] + self._sum_sq[mean_key]) \
+                    / self._count[key] - means[mean_key] ** 2
+                means[key] = math.sqrt(max(var, 0.))
+
+        return means
+
+    def reset(self):
+        """Clear the values added so far."""
+        self._sum = {}
+        self._sum_sq = {}
+        self._count = {}
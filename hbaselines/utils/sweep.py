@@ -0,0 +1,169 @@
+"""Utility methods for tuning hyperparameters via successive halving.
+
+A sweep trains every configuration for a small number of steps, keeps the
+best performing fraction of the configurations, and continues training these
+for a larger number of steps, until the total number of steps is reached. The
+training operations of each such round (or rung) are performed in parallel
+processes, and every trial stores the results of each rung in its own
+directory:
+
+    <trial>/rung_0/eval_0.csv
+    <trial>/rung_0/checkpoints/...
+    <trial>/rung_1/eval_0.csv
+    ...
+
+Promoted trials resume training from the results of their previous rungs.
+"""
+import os
+import csv
+import itertools
+import numpy as np
+
+from hbaselines.utils.train import run_parallel
+
+
+def get_configurations(space, num_samples=None, seed=None):
+    """Return the configurations of a hyperparameter search space.
+
+    Parameters
+    ----------
+    space : dict < str, list >
+        the values of every hyperparameter that is tuned
+    num_samples : int or None
+        the number of configurations to sample from the grid of all
+        combinations of values. If set to None, or if the grid is smaller, all
+        combinations are returned.
+    seed : int or None
+        the seed used to sample the configurations
+
+    Returns
+    -------
+    list of dict
+        the hyperparameter values of every configuration
+    """
+    keys = sorted(space.keys())
+    grid = [dict(zip(keys, values))
+            for values in itertools.product(*[space[key] for key in keys])]
+
+    if num_samples is not None and num_samples < len(grid):
+        indices = np.random.RandomState(seed).choice(
+            len(grid), num_samples, replace=False)
+        grid = [grid[i] for i in sorted(indices)]
+
+    return grid
+
+
+def get_rungs(min_steps, max_steps, eta):
+    """Return the number of training steps a trial has performed at each rung.
+
+    Parameters
+    ----------
+    min_steps : int
+        the number of training steps of the first rung
+    max_steps : int
+        the number of training steps of the trials that reach the last rung
+    eta : int
+        the factor the number of steps is increased by from one rung to the
+        next
+
+    Returns
+    -------
+    list of int
+        the total number of training steps at the end of each rung
+    """
+    rungs = []
+    steps = min_steps
+    while steps < max_steps:
+        rungs.append(steps)
+        steps *= eta
+    rungs.append(max_steps)
+
+    return rungs
+
+
+def get_score(dir_name):
+    """Return the last evaluation return of a training operation.
+
+    Parameters
+    ----------
+    dir_name : str
+        the directory the results of the training operation are stored in
+
+    Returns
+    -------
+    float
+        the average return of the last evaluation, or -inf if no evaluation
+        was performed
+    """
+    eval_filepath = os.path.join(dir_name, "eval_0.csv")
+    if not os.path.exists(eval_filepath):
+        return -float("inf")
+
+    with open(eval_filepath, "r") as f:
+        rows = list(csv.DictReader(f))
+
+    return float(rows[-1]["average_return"]) if rows else -float("inf")
+
+
+def successive_halving(run_fn, trials, rungs, eta, n_parallel):
+    """Perform a hyperparameter sweep via successive halving.
+
+    All trials are trained until the first rung. At the end of each rung, the
+    `1 / eta` fraction of the trials with the highest scores (see `get_score`)
+    is promoted to the next rung, and the other trials are stopped. Trials that
+    fail, or that do not perform any evaluation, are never promoted.
+
+    Parameters
+    ----------
+    run_fn : function
+        the method that performs a training operation. Takes as input the
+        elements of a trial, as well as the number of steps to train for
+        ("steps"), the output directory of the rung ("dir_name"), the output
+        directories of the previous rungs of the trial to resume from
+        ("load_dirs"), and the number of CPUs ("num_cpus") that tensorflow may
+        use.
+    trials : list of dict
+        the keyword arguments of each trial. Must contain the output directory
+        of the trial ("dir_name").
+    rungs : list of int
+        the total number of training steps at the end of each rung (see
+        `get_rungs`)
+    eta : int
+        the inverse of the fraction of trials that is promoted at every rung
+    n_parallel : int
+        the maximum number of training operations to perform at a time
+
+    Returns
+    -------
+    list of list of float
+        the scores of each trial at every rung it reached
+    """
+    scores = [[] for _ in trials]
+    active = list(range(len(trials)))
+
+    for rung, steps in enumerate(rungs):
+        runs = []
+        for i in active:
+            trial_dir = trials[i]["dir_name"]
+            run = trials[i].copy()
+            run.update(
+                steps=steps - (rungs[rung - 1] if rung > 0 else 0),
+                dir_name=os.path.join(trial_dir, "rung_{}".format(rung)),
+                load_dirs=[os.path.join(trial_dir, "rung_{}".format(j))
+                           for j in range(rung)],
+            )
+            runs.append(run)
+
+        results = run_parallel(run_fn, runs, n_parallel)
+
+        for i, (dir_name, exit_code) in zip(active, results):
+            scores[i].append(
+                get_score(dir_name) if exit_code == 0 else -float("inf"))
+
+        # Promote the best trials to the next rung.
+        num_promoted = max(1, len(active) // eta)
+        active = [i for i in active if scores[i][-1] > -float("inf")]
+        active = sorted(active, key=lambda i: scores[i][-1], reverse=True)
+        active = sorted(active[:num_promoted])
+
+    return scores
@@ -2,7 +2,9 @@
 import tensorflow as tf
 import tensorflow.contrib.slim as slim
 import numpy as np
-from functools import reduce
+from functools import reduce, lru_cache
+from contextlib import contextmanager
+from tensorflow.python.client import device_lib
 
 # Stabilizing term to avoid NaN (prevents division by zero or log of zero)
 EPS = 1e-6
@@ -32,6 +34,52 @@ def make_session(num_cpu, graph=None):
     return tf.compat.v1.Session(config=tf_config, graph=graph)
 
 
+@lru_cache(maxsize=None)
+def xla_available():
+    """Return whether XLA compilation is supported by tensorflow.
+
+    Returns
+    -------
+    bool
+        True if XLA devices are available for the CPU
+    """
+    available = any(device.device_type == "XLA_CPU"
+                    for device in device_lib.list_local_devices())
+    if not available:
+        print("XLA is not available. Operations will not be compiled.")
+    return available
+
+
+@contextmanager
+def _empty_scope():
+    """Return a scope with no effect."""
+    yield
+
+
+def xla_scope(use_xla):
+    """Return a scope in which operations are compiled with XLA.
+
+    The operations created within the scope are compiled just-in-time into
+    clusters of fused kernels. Operations that cannot be compiled (e.g.
+    assignments to reference variables) are executed as usual.
+
+    Parameters
+    ----------
+    use_xla : bool
+        whether to compile the operations. If XLA is not available, the
+        operations are not compiled.
+
+    Returns
+    -------
+    contextmanager
+        the scope
+    """
+    if use_xla and xla_available():
+        return tf.xla.experimental.jit_scope(compile_ops=True)
+    else:
+        return _empty_scope()
+
+
 def get_trainable_vars(name=None):
     """Return the trainable variables.
 
@@ -66,6 +114,34 @@ def get_globals_vars(name=None):
         tf.compat.v1.GraphKeys.GLOBAL_VARIABLES, scope=name)
 
 
+def get_summary_tensors(start=0):
+    """Return the values of the scalar tensorboard summaries, by tag.
+
+    Parameters
+    ----------
+    start : int
+        the number of summaries in the graph to skip. This may be used to only
+        return the summaries that were created after a certain point.
+
+    Returns
+    -------
+    dict < str, tf.Tensor >
+        the tensor that is summarized by each scalar summary, by tag
+    """
+    summaries = tf.compat.v1.get_collection(
+        tf.compat.v1.GraphKeys.SUMMARIES)[start:]
+
+    ret = {}
+    for summary in summaries:
+        if summary.op.type == "ScalarSummary":
+            # The tag is returned as a 0-d array of bytes.
+            tag = tf.get_static_value(summary.op.inputs[0])
+            ret[tf.compat.as_str(np.asarray(tag).item())] = \
+                summary.op.inputs[1]
+
+    return ret
+
+
 def reduce_std(tensor, axis=None, keepdims=False):
     """Get the standard deviation of a Tensor.
 
@@ -108,6 +184,31 @@ def reduce_var(tensor, axis=None, keepdims=False):
     return tf.reduce_mean(devs_squared, axis=axis, keepdims=keepdims)
 
 
+def model_mean(tensor, num_models=None):
+    """Compute the mean of a tensor, separately for every stacked model.
+
+    Parameters
+    ----------
+    tensor : tf.Tensor
+        the input tensor. If `num_models` is set, the first dimension indexes
+        the models.
+    num_models : int or None
+        the number of stacked models. If set to None, the mean of all elements
+        is returned.
+
+    Returns
+    -------
+    tf.Tensor
+        the mean, of shape (num_models,) if `num_models` is set, and a scalar
+        otherwise
+    """
+    if num_models is None:
+        return tf.reduce_mean(tensor)
+    else:
+        return tf.reduce_mean(
+            tensor, axis=list(range(1, tensor.shape.ndims)))
+
+
 def get_target_updates(_vars, target_vars, tau, verbose=0):
     """Get target update operations.
 
@@ -172,7 +273,7 @@ def gaussian_likelihood(input_, mu_, log_std):
     pre_sum = -0.5 * (((input_ - mu_) / (
                 tf.exp(log_std) + EPS)) ** 2 + 2 * log_std + np.log(
         2 * np.pi))
-    return tf.reduce_sum(pre_sum, axis=1)
+    return tf.reduce_sum(pre_sum, axis=-1)
 
 
 def apply_squashing_func(mu_, pi_, logp_pi):
@@ -204,7 +305,7 @@ def apply_squashing_func(mu_, pi_, logp_pi):
     policy = tf.nn.tanh(pi_)
 
     # Squash correction (from original implementation)
-    logp_pi -= tf.reduce_sum(tf.math.log(1 - policy ** 2 + EPS), axis=1)
+    logp_pi -= tf.reduce_sum(tf.math.log(1 - policy ** 2 + EPS), axis=-1)
 
     return deterministic_policy, policy, logp_pi
 
@@ -231,7 +332,8 @@ def layer(val,
           act_fun=None,
           kernel_initializer=slim.variance_scaling_initializer(
               factor=1.0 / 3.0, mode='FAN_IN', uniform=True),
-          layer_norm=False):
+          layer_norm=False,
+          num_models=None):
     """Create a fully-connected layer.
 
     Parameters
@@ -248,12 +350,23 @@ def layer(val,
         the initializing operation to the weights of the layer
     layer_norm : bool
         whether to enable layer normalization
+    num_models : int or None
+        the number of independent models computed by the layer. If set, the
+        parameters of the models are stacked (see `stacked_layer`), and the
+        input and output have an additional leading dimension of this size.
 
     Returns
     -------
     tf.Variable
         the output from the layer
     """
+    if num_models is not None:
+        return stacked_layer(
+            val, num_models, num_outputs, name,
+            act_fun=act_fun,
+            kernel_initializer=kernel_initializer,
+            layer_norm=layer_norm)
+
     val = tf.layers.dense(
         val, num_outputs, name=name, kernel_initializer=kernel_initializer)
 
@@ -264,3 +377,89 @@ def layer(val,
         val = act_fun(val)
 
     return val
+
+
+def _stacked_initializer(initializer):
+    """Return an initializer of stacked weights.
+
+    Every slice along the first dimension is initialized separately, so that
+    the initial values follow the same distribution as those of the unstacked
+    weights (the fans of variance scaling initializers are otherwise computed
+    over all slices).
+    """
+    def _initializer(shape, dtype=tf.float32, partition_info=None):
+        return tf.stack([initializer(shape[1:], dtype=dtype)
+                         for _ in range(shape[0])])
+
+    return _initializer
+
+
+def stacked_layer(val,
+                  num_models,
+                  num_outputs,
+                  name,
+                  act_fun=None,
+                  kernel_initializer=slim.variance_scaling_initializer(
+                      factor=1.0 / 3.0, mode='FAN_IN', uniform=True),
+                  layer_norm=False):
+    """Create a fully-connected layer for a batch of independent models.
+
+    The weights of every model are stacked along the first dimension of the
+    kernel and bias, and the outputs of all models are computed via a single
+    batched matrix multiplication. The math of every model is identical to
+    that of `layer`.
+
+    Parameters
+    ----------
+    val : tf.Variable
+        the input to the layer, of shape (num_models, batch_size, num_inputs).
+        An input of shape (batch_size, num_inputs) is fed to every model.
+    num_models : int
+        the number of models
+    num_outputs : int
+        number of outputs from the layer of every model
+    name : str
+        the scope of the layer
+    act_fun : tf.nn.* or None
+        the activation function
+    kernel_initializer : Any
+        the initializing operation to the weights of the layer of every model
+    layer_norm : bool
+        whether to enable layer normalization
+
+    Returns
+    -------
+    tf.Variable
+        the output from the layer, of shape
+        (num_models, batch_size, num_outputs)
+    """
+    if val.shape.ndims == 2:
+        val = tf.tile(tf.expand_dims(val, 0), [num_models, 1, 1])
+    num_inputs = val.shape[-1].value
+
+    with tf.compat.v1.variable_scope(name):
+        kernel = tf.compat.v1.get_variable(
+            "kernel", [num_models, num_inputs, num_outputs],
+            initializer=_stacked_initializer(kernel_initializer))
+        bias = tf.compat.v1.get_variable(
+            "bias", [num_models, 1, num_outputs],
+            initializer=tf.zeros_initializer())
+
+        val = tf.matmul(val, kernel) + bias
+
+        if layer_norm:
+            # This matches the normalization of tf.contrib.layers.layer_norm.
+            beta = tf.compat.v1.get_variable(
+                "LayerNorm/beta", [num_models, 1, num_outputs],
+                initializer=tf.zeros_initializer())
+            gamma = tf.compat.v1.get_variable(
+                "LayerNorm/gamma", [num_models, 1, num_outputs],
+                initializer=tf.ones_initializer())
+            mean, variance = tf.nn.moments(val, [2], keepdims=True)
+            val = tf.nn.batch_normalization(
+                val, mean, variance, beta, gamma, variance_epsilon=1e-12)
+
+    if act_fun is not None:
+        val = act_fun(val)
+
+    return val
@@ -1,5 +1,8 @@
 """Utility methods when performing training."""
+import os
 import argparse
+import multiprocessing
+from multiprocessing.connection import wait
 from hbaselines.algorithms.off_policy import TD3_PARAMS
 from hbaselines.algorithms.off_policy import SAC_PARAMS
 from hbaselines.algorithms.off_policy import FEEDFORWARD_PARAMS
@@ -34,6 +37,8 @@ def get_hyperparameters(args, policy):
         "gamma": args.gamma,
         "layer_norm": args.layer_norm,
         "use_huber": args.use_huber,
+        "use_xla": args.use_xla,
+        "fused_critics": args.fused_critics,
     }
 
     # add TD3 parameters
@@ -71,6 +76,7 @@ def get_hyperparameters(args, policy):
         policy_kwargs.update({
             "shared": args.shared,
             "maddpg": args.maddpg,
+            "stacked": args.stacked,
         })
 
     # add the policy_kwargs term to the algorithm parameters
@@ -109,6 +115,16 @@ def parse_options(description, example_usage, args):
         '--n_training', type=int, default=1,
         help='Number of training operations to perform. Each training '
              'operation is performed on a new seed. Defaults to 1.')
+    parser.add_argument(
+        '--n_parallel', type=int, default=1,
+        help='Number of training operations to perform in parallel, each in '
+             'a separate process with its own subset of the CPUs. Defaults '
+             'to 1.')
+    parser.add_argument(
+        '--num_seeds', type=int, default=1,
+        help='Number of seeds to train together in each training operation, '
+             'with the parameters of every seed stacked in a single policy. '
+             'Only supported by feed-forward policies. Defaults to 1.')
     parser.add_argument(
         '--total_steps',  type=int, default=1000000,
         help='Total number of timesteps used during training.')
@@ -144,6 +160,97 @@ def parse_options(description, example_usage, args):
     return flags
 
 
+def get_cpu_groups(n_parallel):
+    """Split the CPUs available to this process into one group per worker.
+
+    The groups consist of consecutive CPUs, and differ in size by at most one
+    CPU. If there are fewer CPUs than workers, the CPUs are shared by several
+    workers.
+
+    Parameters
+    ----------
+    n_parallel : int
+        the number of workers
+
+    Returns
+    -------
+    list of list of int
+        the CPUs assigned to each worker
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count()))  # pragma: no cover
+
+    if len(cpus) < n_parallel:
+        return [[cpus[i % len(cpus)]] for i in range(n_parallel)]
+
+    return [cpus[i * len(cpus) // n_parallel:
+                 (i + 1) * len(cpus) // n_parallel]
+            for i in range(n_parallel)]
+
+
+def _run_worker(run_fn, cpus, kwargs):
+    """Perform a training operation on a given subset of the CPUs."""
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    run_fn(num_cpus=len(cpus), **kwargs)
+
+
+def run_parallel(run_fn, runs, n_parallel):
+    """Perform several training operations in parallel processes.
+
+    At most `n_parallel` operations are run at a time. Each process is pinned
+    to its own group of CPUs (see `get_cpu_groups`), and the number of threads
+    used by tensorflow is set to the size of the group, so that the processes
+    do not compete for the same cores. Once a process terminates, the next
+    operation is started on its CPUs.
+
+    Parameters
+    ----------
+    run_fn : function
+        the method that performs a training operation. Takes as input the
+        elements of a run, as well as the number of CPUs ("num_cpus") that
+        tensorflow may use.
+    runs : list of dict
+        the keyword arguments of each training operation. Must contain the
+        output directory of the operation ("dir_name").
+    n_parallel : int
+        the maximum number of operations to perform at a time
+
+    Returns
+    -------
+    list of (str, int)
+        the output directory and exit status of each training operation
+    """
+    free_cpus = get_cpu_groups(n_parallel)
+    pending = list(enumerate(runs))
+    running = {}
+    exit_codes = [None for _ in runs]
+
+    while pending or running:
+        # Start new processes on the free CPUs.
+        while pending and free_cpus:
+            i, kwargs = pending.pop(0)
+            cpus = free_cpus.pop(0)
+            process = multiprocessing.Process(
+                target=_run_worker, args=(run_fn, cpus, kwargs))
+            process.start()
+            running[process.sentinel] = (i, cpus, process)
+            print("Started {} on CPUs {}.".format(kwargs["dir_name"], cpus))
+
+        # Wait for a process to terminate, and free its CPUs.
+        for sentinel in wait(list(running.keys())):
+            i, cpus, process = running.pop(sentinel)
+            process.join()
+            exit_codes[i] = process.exitcode
+            free_cpus.append(cpus)
+            print("Finished {} with exit status {}.".format(
+                runs[i]["dir_name"], process.exitcode))
+
+    return [(run["dir_name"], code) for run, code in zip(runs, exit_codes)]
+
+
 def create_algorithm_parser(parser):
     """Add the algorithm hyperparameters to the parser."""
     parser.add_argument(
@@ -261,6 +368,16 @@ def create_feedforward_parser(parser):
         help="specifies whether to use the huber distance function as the "
              "loss for the critic. If set to False, the mean-squared error "
              "metric is used instead")
+    parser.add_argument(
+        "--use_xla",
+        action="store_true",
+        help="whether to compile the update operations of the policy with "
+             "XLA. If XLA is not available, the operations are not compiled.")
+    parser.add_argument(
+        "--fused_critics",
+        action="store_true",
+        help="whether to represent the twin critics as a single network with "
+             "stacked parameters, trained by a single optimizer")
 
     return parser
 
@@ -343,5 +460,11 @@ def create_multi_feedforward_parser(parser):
         action="store_true",
         help="whether to use an algorithm-specific variant of the MADDPG "
              "algorithm")
+    parser.add_argument(
+        "--stacked",
+        action="store_true",
+        help="whether to store the parameters of the independent agents in "
+             "stacked tensors. Only used if `shared` and `maddpg` are set to "
+             "False.")
 
     return parser
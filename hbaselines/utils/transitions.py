@@ -0,0 +1,344 @@
+"""Utility methods for recording and loading environment transitions.
+
+Transitions are stored in append-only shards, each of which is a directory
+with one NumPy file per recorded field, and an index file listing the shards:
+
+    <path>/index.json
+    <path>/shard_00000/action.npy
+    <path>/shard_00000/obs.npy
+    ...
+
+To avoid storing every observation twice (as the current and next
+observation of consecutive transitions), observations are stored along the
+trajectories: every sequence of consecutive transitions within a shard
+contributes its initial observation and the next observation of each of its
+transitions. The `start` field marks the transitions that begin a new
+sequence. Fields that are dictionaries (e.g. the observations of multi-agent
+environments) are stored as one field per key, named "<field>.<key>".
+
+The shards are memory mapped when loaded, so that datasets that are larger
+than the available memory may be used to fill replay buffers.
+"""
+import os
+import json
+import numpy as np
+
+from hbaselines.utils.misc import ensure_dir
+from hbaselines.fcnet.replay_buffer import ReplayBuffer
+from hbaselines.goal_conditioned.replay_buffer import HierReplayBuffer
+from hbaselines.base_policies import ImitationLearningPolicy
+
+# name of the file containing the list of shards
+INDEX_FILE = "index.json"
+
+# fields that are stored along the trajectories
+TRAJECTORY_FIELDS = ["obs", "all_obs"]
+
+
+class TransitionRecorder(object):
+    """Transition recorder object.
+
+    Transitions are buffered in memory and written to a new shard once
+    `shard_size` transitions have been collected, or when `flush` is called.
+    If the directory already contains recorded transitions, the new shards
+    are appended to them.
+
+    Attributes
+    ----------
+    path : str
+        the directory the shards are stored in
+    shard_size : int
+        the maximum number of transitions in a shard
+    index : dict
+        the content of the index file
+    """
+
+    def __init__(self, path, shard_size=10000):
+        """Instantiate the recorder.
+
+        Parameters
+        ----------
+        path : str
+            the directory the shards are stored in
+        shard_size : int
+            the maximum number of transitions in a shard
+        """
+        self.path = ensure_dir(path)
+        self.shard_size = shard_size
+
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, "r") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {"num_samples": 0, "shards": []}
+
+        # the fields of the transitions and trajectories in the current shard
+        self._steps = []
+        self._trajectory = []
+        self._done = True
+
+    def __len__(self):
+        """Return the number of transitions recorded, including unsaved."""
+        return self.index["num_samples"] + len(self._steps)
+
+    def add(self,
+            obs0,
+            context0,
+            action,
+            reward,
+            obs1,
+            done,
+            is_final_step,
+            all_obs0=None,
+            all_obs1=None,
+            meta_action=None):
+        """Record a transition.
+
+        Transitions are expected to be added in the order they occurred, so
+        that the current observation of a transition is the next observation
+        of the previous one, unless the previous transition was terminal.
+
+        Parameters
+        ----------
+        obs0 : array_like or dict < str, array_like >
+            the last observation
+        context0 : array_like or None
+            the contextual term. Set to None if no context is provided by the
+            environment.
+        action : array_like or dict < str, array_like >
+            the action
+        reward : float or dict < str, float >
+            the reward
+        obs1 : array_like or dict < str, array_like >
+            the current observation
+        done : bool
+            is the episode done
+        is_final_step : bool
+            whether the time horizon was met in the step corresponding to the
+            current sample
+        all_obs0 : array_like or None
+            the last full-state observation, for policies using MADDPG
+        all_obs1 : array_like or None
+            the current full-state observation, for policies using MADDPG
+        meta_action : list of array_like or None
+            the current actions of the higher-level policies, for hierarchical
+            policies
+        """
+        start = self._done
+        if start:
+            self._trajectory.append(_flatten(obs=obs0, all_obs=all_obs0))
+        self._trajectory.append(_flatten(obs=obs1, all_obs=all_obs1))
+
+        self._steps.append(_flatten(
+            context=context0,
+            action=action,
+            reward=reward,
+            done=done,
+            is_final_step=is_final_step,
+            meta_action=meta_action,
+            start=start,
+        ))
+        self._done = done
+
+        if len(self._steps) >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """Write the transitions that have not been saved to a new shard."""
+        if len(self._steps) == 0:
+            return
+
+        name = "shard_{:05d}".format(len(self.index["shards"]))
+        shard_path = ensure_dir(os.path.join(self.path, name))
+        for rows in [self._steps, self._trajectory]:
+            for key in sorted(set().union(*rows)):
+                np.save(os.path.join(shard_path, key + ".npy"),
+                        _stack([row.get(key) for row in rows]))
+
+        # Add the shard to the index file.
+        self.index["num_samples"] += len(self._steps)
+        self.index["shards"].append(
+            {"name": name, "num_samples": len(self._steps)})
+        index_path = os.path.join(self.path, INDEX_FILE)
+        with open(index_path + ".tmp", "w") as f:
+            json.dump(self.index, f, indent=4)
+        os.replace(index_path + ".tmp", index_path)
+
+        # Every shard begins a new sequence of transitions.
+        self._steps = []
+        self._trajectory = []
+        self._done = True
+
+    def close(self):
+        """Write the remaining transitions to the disk."""
+        self.flush()
+
+
+def load_shards(path):
+    """Iterate over the shards of recorded transitions.
+
+    Parameters
+    ----------
+    path : str
+        the directory the shards are stored in
+
+    Returns
+    -------
+    generator
+        a generator over the shards. Each element is a dictionary of the fields
+        of the transitions in the shard. The observations are returned as the
+        fields "obs0" and "obs1" (and similarly "all_obs0" and "all_obs1").
+        All other fields are memory mapped arrays.
+    """
+    with open(os.path.join(path, INDEX_FILE), "r") as f:
+        index = json.load(f)
+
+    for shard in index["shards"]:
+        shard_path = os.path.join(path, shard["name"])
+        data = {
+            fname[:-4]: np.load(os.path.join(shard_path, fname),
+                                mmap_mode="r")
+            for fname in os.listdir(shard_path) if fname.endswith(".npy")
+        }
+
+        # the index of the current observation of every transition within the
+        # trajectory fields
+        start = np.asarray(data.pop("start"))
+        idx = np.arange(len(start)) + np.cumsum(start) - 1
+
+        for key in list(data.keys()):
+            field = key.split(".")[0]
+            if field in TRAJECTORY_FIELDS:
+                # e.g. "obs.rl_0" -> "obs0.rl_0" and "obs1.rl_0"
+                values = data.pop(key)
+                data[field + "0" + key[len(field):]] = values[idx]
+                data[field + "1" + key[len(field):]] = values[idx + 1]
+
+        yield data
+
+
+def load_into_policy(policy, path, reward_scale=1.):
+    """Fill the replay buffer of a policy with recorded transitions.
+
+    The buffers of feedforward policies (including imitation learning
+    policies) are filled in bulk, one shard at a time. Hierarchical policies
+    compute the samples of their replay buffer from consecutive transitions,
+    so the transitions are passed to their `store_transition` method, along
+    with the recorded actions of the higher-level policies. The transitions
+    of the episode the policy is currently in, if any, are kept aside while
+    doing so, and restored afterwards.
+
+    Multi-agent policies are not supported.
+
+    Parameters
+    ----------
+    policy : hbaselines.base_policies.ActorCriticPolicy or \
+            hbaselines.base_policies.ImitationLearningPolicy
+        the policy object
+    path : str
+        the directory the shards are stored in
+    reward_scale : float
+        the value the rewards should be scaled by
+
+    Raises
+    ------
+    ValueError
+        if the policy is not supported
+    """
+    replay_buffer = getattr(policy, "replay_buffer", None)
+
+    if isinstance(replay_buffer, ReplayBuffer):
+        imitation = isinstance(policy, ImitationLearningPolicy)
+        for shard in load_shards(path):
+            obs0 = shard["obs0"]
+            obs1 = shard["obs1"]
+            if "context" in shard:
+                obs0 = np.concatenate((obs0, shard["context"]), axis=1)
+                obs1 = np.concatenate((obs1, shard["context"]), axis=1)
+
+            if imitation:
+                reward = np.zeros(len(obs0))
+                done = np.zeros(len(obs0))
+            else:
+                # Modify the done mask in accordance with the TD3 algorithm.
+                reward = reward_scale * shard["reward"]
+                done = np.logical_and(shard["done"], ~shard["is_final_step"])
+
+            replay_buffer.add_batch(obs0, shard["action"], reward, obs1, done)
+
+    elif isinstance(replay_buffer, HierReplayBuffer):
+        num_meta = policy.num_levels - 1
+
+        # Keep aside the transitions and goals of the current episode of the
+        # policy, so that they are not combined with the loaded transitions.
+        memory = {key: getattr(policy, key) for key in [
+            "_actions", "_rewards", "_observations", "_contexts", "_dones",
+            "_meta_action"]}
+
+        policy.clear_memory()
+        for shard in load_shards(path):
+            context = shard.get("context")
+            for t in range(len(shard["action"])):
+                policy._meta_action = [
+                    np.asarray(shard["meta_action.{}".format(i)][t:t+1])
+                    for i in range(num_meta)]
+                policy.store_transition(
+                    obs0=shard["obs0"][t],
+                    context0=None if context is None else context[t],
+                    action=shard["action"][t],
+                    reward=reward_scale * shard["reward"][t],
+                    obs1=shard["obs1"][t],
+                    context1=None if context is None else context[t],
+                    done=bool(shard["done"][t]),
+                    is_final_step=bool(shard["is_final_step"][t]),
+                )
+
+        # Resume the current episode of the policy.
+        for key, value in memory.items():
+            setattr(policy, key, value)
+
+    else:
+        raise ValueError(
+            "Loading transitions is only supported for feedforward and "
+            "goal-conditioned policies, not {} (replay buffer: {}).".format(
+                type(policy).__name__, type(replay_buffer).__name__))
+
+
+def _flatten(**fields):
+    """Return the recorded fields as a flat dictionary of arrays.
+
+    Fields that are None are skipped, and fields that are dictionaries or lists
+    are split into one field per element.
+    """
+    ret = {}
+    for name, value in fields.items():
+        if value is None:
+            continue
+        elif isinstance(value, dict):
+            for key, val in value.items():
+                ret["{}.{}".format(name, key)] = np.asarray(val)
+        elif isinstance(value, list):
+            for key, val in enumerate(value):
+                ret["{}.{}".format(name, key)] = np.asarray(val).flatten()
+        else:
+            ret[name] = np.asarray(value)
+    return ret
+
+
+def _stack(values):
+    """Stack the values of a field into a single array.
+
+    Floating point values are stored with single precision. Missing values
+    (e.g. for agents that were not in the network at a given step) are set to
+    NaN for floating point fields and zero otherwise.
+    """
+    template = next(val for val in values if val is not None)
+    dtype = np.float32 if template.dtype.kind == "f" else template.dtype
+    ret = np.zeros((len(values),) + template.shape, dtype=dtype)
+    if dtype == np.float32:
+        ret.fill(np.nan)
+    for i, val in enumerate(values):
+        if val is not None:
+            ret[i] = val
+    return ret
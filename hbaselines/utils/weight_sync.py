@@ -0,0 +1,260 @@
+"""Utility methods for sharing the actor parameters of a policy with workers.
+
+The parameters are stored in a single flat shared-memory buffer, alongside a
+version counter. The learner writes the current parameters to the buffer, and
+processes performing rollouts or evaluations copy them whenever the version
+changes, without writing checkpoints to the disk or pickling the parameters.
+
+The buffer is allocated by the learner, and is passed to the workers when they
+are created, e.g. as an argument of `multiprocessing.Process`:
+
+    weights = SharedWeights.from_vars(get_actor_vars(policy))
+    sync = WeightSync(weights, policy.sess, get_actor_vars(policy))
+    sync.push()  # in the learner
+    ...
+    sync.pull()  # in the worker, with its own session and variables
+
+Only a single process (the learner) may write to the buffer.
+"""
+import re
+import ctypes
+import numpy as np
+import tensorflow as tf
+from multiprocessing.sharedctypes import RawArray, RawValue
+
+
+def get_actor_vars(policy):
+    """Return the actor parameters of a policy.
+
+    These are the trainable variables in the "model/pi" scope of every policy,
+    e.g. the policies of every level of a hierarchical policy or of every
+    agent of a multi-agent policy.
+
+    Parameters
+    ----------
+    policy : hbaselines.base_policies.ActorCriticPolicy
+        the policy object
+
+    Returns
+    -------
+    list of tf.Variable
+        the actor parameters
+    """
+    return [var for var in policy.sess.graph.get_collection(
+                tf.compat.v1.GraphKeys.TRAINABLE_VARIABLES)
+            if re.search("(^|/)model/pi/", var.name)]
+
+
+class SharedWeights(object):
+    """Shared-memory buffer of parameters.
+
+    The parameters are stored in a flat single precision buffer. The version
+    counter is incremented before and after every write, so that readers may
+    detect, and retry, reads that occurred during a write.
+
+    Attributes
+    ----------
+    names : list of str
+        the name of every parameter
+    shapes : list of tuple of int
+        the shape of every parameter
+    size : int
+        the total number of elements of the parameters
+    """
+
+    def __init__(self, names, shapes):
+        """Instantiate the buffer.
+
+        Parameters
+        ----------
+        names : list of str
+            the name of every parameter
+        shapes : list of tuple of int
+            the shape of every parameter
+        """
+        self.names = list(names)
+        self.shapes = [tuple(shape) for shape in shapes]
+        self.size = int(sum(np.prod(shape) for shape in self.shapes))
+
+        self._raw_buffer = RawArray(ctypes.c_float, self.size)
+        self._raw_version = RawValue(ctypes.c_int64, 0)
+        self._buffer = self._get_buffer()
+
+    @classmethod
+    def from_vars(cls, var_list):
+        """Create a buffer with the names and shapes of variables.
+
+        Parameters
+        ----------
+        var_list : list of tf.Variable
+            the variables
+
+        Returns
+        -------
+        SharedWeights
+            the buffer
+        """
+        return cls([var.op.name for var in var_list],
+                   [var.shape.as_list() for var in var_list])
+
+    def __getstate__(self):
+        """Return the state to send to a new process."""
+        state = self.__dict__.copy()
+        del state["_buffer"]
+        return state
+
+    def __setstate__(self, state):
+        """Map the buffer in a new process."""
+        self.__dict__.update(state)
+        self._buffer = self._get_buffer()
+
+    def _get_buffer(self):
+        """Return a read-only array view of the buffer."""
+        buffer = np.frombuffer(self._raw_buffer, dtype=np.float32)
+        buffer.flags.writeable = False
+        return buffer
+
+    @property
+    def version(self):
+        """Return the number of completed writes."""
+        return self._raw_version.value // 2
+
+    def write(self, values):
+        """Write new values of the parameters.
+
+        Parameters
+        ----------
+        values : list of array_like
+            the value of every parameter
+
+        Returns
+        -------
+        int
+            the new version of the parameters
+
+        Raises
+        ------
+        ValueError
+            if the shapes of the values do not match those of the parameters
+        """
+        if [np.shape(val) for val in values] != self.shapes:
+            raise ValueError("Expected values with shapes {}, got {}.".format(
+                self.shapes, [np.shape(val) for val in values]))
+
+        # Mark the buffer as being written by making the counter odd.
+        self._raw_version.value += 1
+        buffer = np.frombuffer(self._raw_buffer, dtype=np.float32)
+        start = 0
+        for val in values:
+            end = start + np.size(val)
+            buffer[start:end] = np.ravel(val)
+            start = end
+        self._raw_version.value += 1
+
+        return self.version
+
+    def read(self):
+        """Return the current values of the parameters.
+
+        Returns
+        -------
+        int
+            the version of the values
+        list of np.ndarray
+            the value of every parameter
+        """
+        while True:
+            version = self._raw_version.value
+            if version % 2 == 0:
+                buffer = self._buffer.copy()
+                if self._raw_version.value == version:
+                    break
+
+        values = []
+        start = 0
+        for shape in self.shapes:
+            end = start + int(np.prod(shape))
+            values.append(buffer[start:end].reshape(shape))
+            start = end
+
+        return version // 2, values
+
+
+class WeightSync(object):
+    """Synchronization of variables through a shared-memory buffer.
+
+    Attributes
+    ----------
+    weights : hbaselines.utils.weight_sync.SharedWeights
+        the shared-memory buffer
+    sess : tf.compat.v1.Session
+        the session of the variables
+    var_list : list of tf.Variable
+        the variables, in the order of the parameters of the buffer
+    version : int
+        the version of the values last written or loaded by this object
+    """
+
+    def __init__(self, weights, sess, var_list):
+        """Instantiate the synchronization object.
+
+        Parameters
+        ----------
+        weights : hbaselines.utils.weight_sync.SharedWeights
+            the shared-memory buffer
+        sess : tf.compat.v1.Session
+            the session of the variables
+        var_list : list of tf.Variable
+            the variables, in the order of the parameters of the buffer
+
+        Raises
+        ------
+        ValueError
+            if the variables do not match the parameters of the buffer
+        """
+        if [var.shape.as_list() for var in var_list] != \
+                [list(shape) for shape in weights.shapes]:
+            raise ValueError("The variables do not match the parameters of "
+                             "the shared weights.")
+
+        self.weights = weights
+        self.sess = sess
+        self.var_list = var_list
+        self.version = 0
+
+        # Create an operation that loads the values of all variables at once.
+        with sess.graph.as_default(), tf.compat.v1.name_scope("weight_sync"):
+            self._value_phs = [
+                tf.compat.v1.placeholder(var.dtype.base_dtype, var.shape)
+                for var in var_list]
+            self._load_op = tf.group(*[
+                tf.compat.v1.assign(var, ph)
+                for var, ph in zip(var_list, self._value_phs)])
+
+    def push(self):
+        """Write the current values of the variables to the buffer.
+
+        Returns
+        -------
+        int
+            the new version of the parameters
+        """
+        self.version = self.weights.write(self.sess.run(self.var_list))
+        return self.version
+
+    def pull(self):
+        """Load the values in the buffer, if they changed since the last call.
+
+        Returns
+        -------
+        bool
+            whether new values were loaded
+        """
+        if self.weights.version == self.version:
+            return False
+
+        self.version, values = self.weights.read()
+        self.sess.run(self._load_op,
+                      feed_dict=dict(zip(self._value_phs, values)))
+
+        return True
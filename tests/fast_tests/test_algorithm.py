@@ -5,14 +5,23 @@ import random
 import shutil
 import os
 import csv
+import gym
+from gym.spaces import Box
 
 from hbaselines.algorithms import OffPolicyRLAlgorithm
+from hbaselines.algorithms import DAggerAlgorithm
+from hbaselines.algorithms import SeedEnsembleRLAlgorithm
 from hbaselines.utils.tf_util import get_trainable_vars
+from hbaselines.utils.metrics import MetricsWriter
 from hbaselines.fcnet.td3 import FeedForwardPolicy
 from hbaselines.goal_conditioned.td3 import GoalConditionedPolicy
 from hbaselines.algorithms.off_policy import TD3_PARAMS
 from hbaselines.algorithms.off_policy import FEEDFORWARD_PARAMS
 from hbaselines.algorithms.off_policy import GOAL_CONDITIONED_PARAMS
+from hbaselines.algorithms.dagger import FEEDFORWARD_PARAMS as \
+    DAGGER_FEEDFORWARD_PARAMS
+from hbaselines.fcnet.imitation import FeedForwardPolicy as \
+    ImitationFeedForwardPolicy
 
 
 class TestOffPolicyRLAlgorithm(unittest.TestCase):
@@ -325,19 +334,20 @@ class TestOffPolicyRLAlgorithm(unittest.TestCase):
         rewards = [0, 1, 2]
         successes = [True, False, False]
         info = {"test": 5}
+        alg.metrics = MetricsWriter(".", fmt="csv")
         alg._log_eval(
-            file_path="test_eval.csv",
             start_time=0,
             rewards=rewards,
             successes=successes,
             info=info
         )
+        alg.metrics.close()
 
         # check that the file was generated
-        self.assertTrue(os.path.exists('test_eval_0.csv'))
+        self.assertTrue(os.path.exists('eval_0.csv'))
 
         # import the stored data
-        reader = csv.DictReader(open('test_eval_0.csv', 'r'))
+        reader = csv.DictReader(open('eval_0.csv', 'r'))
         results = {"successes": [], "rewards": [], "test": []}
         for line in reader:
             results["successes"].append(float(line["success_rate"]))
@@ -350,23 +360,24 @@ class TestOffPolicyRLAlgorithm(unittest.TestCase):
         self.assertListEqual(results["test"], [5])
 
         # Delete generated files.
-        os.remove('test_eval_0.csv')
+        os.remove('eval_0.csv')
 
         # test for one evaluation environment with no successes
         successes = []
+        alg.metrics = MetricsWriter(".", fmt="csv")
         alg._log_eval(
-            file_path="test_eval.csv",
             start_time=0,
             rewards=rewards,
             successes=successes,
             info=info
         )
+        alg.metrics.close()
 
         # check that the file was generated
-        self.assertTrue(os.path.exists('test_eval_0.csv'))
+        self.assertTrue(os.path.exists('eval_0.csv'))
 
         # import the stored data
-        reader = csv.DictReader(open('test_eval_0.csv', 'r'))
+        reader = csv.DictReader(open('eval_0.csv', 'r'))
         results = {"successes": []}
         for line in reader:
             results["successes"].append(float(line["success_rate"]))
@@ -375,7 +386,267 @@ class TestOffPolicyRLAlgorithm(unittest.TestCase):
         self.assertListEqual(results["successes"], [0])
 
         # Delete generated files.
-        os.remove('test_eval_0.csv')
+        os.remove('eval_0.csv')
+
+
+class ExpertEnv(gym.Env):
+    """A simple environment with an expert, used to test DAgger and seeds.
+
+    The expert moves the first element of the observation halfway to zero.
+    """
+
+    def __init__(self, horizon=5):
+        self.observation_space = Box(-1, 1, (2,), dtype=np.float32)
+        self.action_space = Box(-1, 1, (1,), dtype=np.float32)
+        self.horizon = horizon
+        self.t = 0
+        self.state = None
+        self.rng = np.random.RandomState(0)
+
+    def reset(self):
+        self.t = 0
+        self.state = self.rng.uniform(-1, 1, 2)
+        return self.state.copy()
+
+    def step(self, action):
+        self.t += 1
+        self.state[0] = np.clip(self.state[0] + action[0], -1, 1)
+        done = self.t >= self.horizon
+        return self.state.copy(), -abs(self.state[0]), done, {}
+
+    def query_expert(self, obs):
+        return [-0.5 * obs[0]]
+
+
+class TestDAggerAlgorithm(unittest.TestCase):
+    """Test the components of the DAggerAlgorithm algorithm."""
+
+    def setUp(self):
+        self.init_parameters = {
+            'policy': ImitationFeedForwardPolicy,
+            'env': [ExpertEnv(), ExpertEnv()],
+            'nb_train_steps': 1,
+            'nb_rollout_steps': 3,
+            'beta': 1.,
+            'beta_decay': 0.9,
+            'render': False,
+            'verbose': 0,
+            'policy_kwargs': {'batch_size': 4},
+            '_init_setup_model': True
+        }
+
+    def test_init(self):
+        """Ensure that the parameters at init are as expected."""
+        # Create the algorithm object.
+        policy_params = self.init_parameters.copy()
+        policy_params['_init_setup_model'] = False
+        alg = DAggerAlgorithm(**policy_params)
+
+        # Test the attribute values.
+        self.assertEqual(alg.policy, self.init_parameters['policy'])
+        self.assertEqual(alg.num_envs, 2)
+        self.assertEqual(alg.nb_train_steps,
+                         self.init_parameters['nb_train_steps'])
+        self.assertEqual(alg.nb_rollout_steps,
+                         self.init_parameters['nb_rollout_steps'])
+        self.assertEqual(alg.beta, self.init_parameters['beta'])
+        self.assertEqual(alg.beta_decay, self.init_parameters['beta_decay'])
+        self.assertEqual(alg.render, self.init_parameters['render'])
+        self.assertEqual(alg.verbose, self.init_parameters['verbose'])
+
+        # check the policy_kwargs term
+        policy_kwargs = DAGGER_FEEDFORWARD_PARAMS.copy()
+        policy_kwargs['batch_size'] = 4
+        policy_kwargs['verbose'] = self.init_parameters['verbose']
+        self.assertDictEqual(alg.policy_kwargs, policy_kwargs)
+
+    def test_collect_samples(self):
+        """Validate the functionality of the _collect_samples method.
+
+        The expert actions should be stored for every sample collected by every
+        worker, regardless of whether the expert or policy acted.
+        """
+        policy_params = self.init_parameters.copy()
+        policy_params['beta'] = 0.5
+        alg = DAggerAlgorithm(**policy_params)
+
+        with alg.sess.as_default(), alg.graph.as_default():
+            alg.obs = [env.reset() for env in alg.env]
+            alg._collect_samples()
+
+        # Check the number of collected samples.
+        replay_buffer = alg.policy_tf.replay_buffer
+        self.assertEqual(alg.total_steps, 6)
+        self.assertEqual(len(replay_buffer), 6)
+        self.assertGreater(alg.expert_query_time, 0)
+
+        # Check that the stored actions are the expert actions.
+        np.testing.assert_almost_equal(
+            replay_buffer.action_t[:6, 0],
+            -0.5 * replay_buffer.obs_t[:6, 0])
+
+        # Check that the episodes are completed and reset.
+        alg._collect_samples()
+        self.assertEqual(alg.episodes, 2)
+        self.assertListEqual(alg.episode_step, [1, 1])
+        self.assertListEqual(alg.epoch_episode_steps, [5, 5])
+
+        # Check that training occurs once enough samples are available.
+        with alg.sess.as_default(), alg.graph.as_default():
+            alg._train()
+        self.assertEqual(len(alg.epoch_loss), 1)
+
+    def test_learn_init(self):
+        """Test the non-loop components of the `learn` method."""
+        alg = DAggerAlgorithm(**self.init_parameters)
+
+        # Run the learn operation for zero timesteps.
+        alg.learn(0, log_dir='results')
+        self.assertEqual(alg.episodes, 0)
+        self.assertEqual(alg.total_steps, 0)
+        self.assertEqual(alg.epoch, 0)
+        self.assertEqual(alg.beta, 1.)
+        self.assertIsNone(alg.checkpoint_writer)
+        self.assertIsNone(alg.metrics)
+        shutil.rmtree('results')
+
+        # Test the seeds.
+        alg.learn(0, log_dir='results', seed=1)
+        self.assertEqual(np.random.sample(), 0.417022004702574)
+        self.assertEqual(random.uniform(0, 1), 0.13436424411240122)
+        shutil.rmtree('results')
+
+    def test_learn_log_interval(self):
+        """Check that training progresses with a small log interval.
+
+        The log interval is smaller than the number of samples collected by
+        every rollout, so every epoch should still run one rollout, and the
+        statistics and checkpoints should be written.
+        """
+        alg = DAggerAlgorithm(**self.init_parameters)
+        alg.learn(12, log_dir='results', log_interval=1, save_interval=6)
+
+        self.assertEqual(alg.total_steps, 12)
+        self.assertEqual(alg.epoch, 2)
+        self.assertTrue(os.path.exists('results/train.csv'))
+        self.assertTrue(os.path.exists('results/checkpoints/checkpoint'))
+        shutil.rmtree('results')
+
+
+class TestSeedEnsembleRLAlgorithm(unittest.TestCase):
+    """Test the components of the SeedEnsembleRLAlgorithm algorithm."""
+
+    def setUp(self):
+        self.init_parameters = {
+            'policy': FeedForwardPolicy,
+            'env': [ExpertEnv(), ExpertEnv(), ExpertEnv()],
+            'num_seeds': 3,
+            'eval_env': [ExpertEnv(), ExpertEnv(), ExpertEnv()],
+            'nb_train_steps': 1,
+            'nb_rollout_steps': 3,
+            'nb_eval_episodes': 2,
+            'render': False,
+            'verbose': 0,
+            'policy_kwargs': {'batch_size': 4},
+            '_init_setup_model': True
+        }
+
+    def test_init(self):
+        """Ensure that the parameters at init are as expected.
+
+        This also checks that the policy stacks the parameters of every seed,
+        and that unsupported policies and numbers of environments are caught.
+        """
+        alg = SeedEnsembleRLAlgorithm(**self.init_parameters)
+
+        # Test the attribute values.
+        self.assertEqual(alg.num_seeds, 3)
+        self.assertEqual(len(alg.env), 3)
+        self.assertEqual(len(alg.eval_env), 3)
+        self.assertEqual(alg.policy_kwargs['num_models'], 3)
+        self.assertEqual(alg.policy_tf.num_models, 3)
+        self.assertListEqual(alg.episode_step, [0, 0, 0])
+
+        # Check that only feed-forward policies are supported.
+        policy_params = self.init_parameters.copy()
+        policy_params['policy'] = GoalConditionedPolicy
+        self.assertRaises(ValueError, SeedEnsembleRLAlgorithm,
+                          **policy_params)
+
+        # Check that an environment is needed for every seed.
+        policy_params = self.init_parameters.copy()
+        policy_params['env'] = [ExpertEnv(), ExpertEnv()]
+        self.assertRaises(ValueError, SeedEnsembleRLAlgorithm,
+                          **policy_params)
+
+    def test_collect_samples(self):
+        """Validate the functionality of the _collect_samples method.
+
+        Every rollout step should store a sample in the replay buffer of every
+        seed, and the episodes of every seed should be tracked separately.
+        """
+        alg = SeedEnsembleRLAlgorithm(**self.init_parameters)
+
+        with alg.sess.as_default(), alg.graph.as_default():
+            alg._reset_env(total_timesteps=10)
+            alg._collect_samples(total_timesteps=10)
+
+        # Check the number of collected samples.
+        replay_buffer = alg.policy_tf.replay_buffer
+        self.assertEqual(alg.total_steps, 3)
+        self.assertListEqual(
+            [len(buffer) for buffer in replay_buffer.buffers], [3, 3, 3])
+
+        # Check that the episodes are completed and reset.
+        with alg.sess.as_default(), alg.graph.as_default():
+            alg._collect_samples(total_timesteps=10)
+        self.assertEqual(alg.episodes, 3)
+        self.assertListEqual(alg.seed_episodes, [1, 1, 1])
+        self.assertListEqual(alg.episode_step, [1, 1, 1])
+        self.assertListEqual(alg.epoch_episode_steps, [5, 5, 5])
+        self.assertListEqual(alg.seed_epoch_episode_steps, [[5], [5], [5]])
+
+        # Check that training occurs once enough samples are available.
+        with alg.sess.as_default(), alg.graph.as_default():
+            alg._train()
+
+    def test_evaluate(self):
+        """Validate the functionality of the _evaluate method.
+
+        The rewards of every episode of every seed should be returned.
+        """
+        alg = SeedEnsembleRLAlgorithm(**self.init_parameters)
+
+        with alg.sess.as_default(), alg.graph.as_default():
+            rewards, successes, info = alg._evaluate(0, alg.eval_env)
+
+        self.assertListEqual([len(rew) for rew in rewards], [2, 2, 2])
+        self.assertListEqual(successes, [[], [], []])
+        self.assertEqual(len(info), 3)
+
+    def test_learn_init(self):
+        """Test the non-loop components of the `learn` method.
+
+        The statistics of every seed should be written to a separate
+        subdirectory of the log directory.
+        """
+        alg = SeedEnsembleRLAlgorithm(**self.init_parameters)
+
+        # Run the learn operation for zero timesteps.
+        alg.learn(0, log_dir='results', initial_exploration_steps=0)
+        self.assertEqual(alg.episodes, 0)
+        self.assertEqual(alg.total_steps, 0)
+        self.assertEqual(alg.epoch, 0)
+        self.assertListEqual(alg.seed_episodes, [0, 0, 0])
+        for i in range(3):
+            self.assertTrue(
+                os.path.isdir(os.path.join('results', 'seed_{}'.format(i))))
+        self.assertIsNone(alg.seed_metrics)
+        shutil.rmtree('results')
+
+        # Check that recording transitions is not supported.
+        self.assertRaises(ValueError, alg.learn, 0, log_dir='results',
+                          record_transitions=True)
 
 
 if __name__ == '__main__':
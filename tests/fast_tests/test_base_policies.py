@@ -48,6 +48,9 @@ class TestActorCriticPolicy(unittest.TestCase):
         self.assertEqual(policy.layer_norm, self.policy_params['layer_norm'])
         self.assertEqual(policy.act_fun, self.policy_params['act_fun'])
         self.assertEqual(policy.use_huber, self.policy_params['use_huber'])
+        self.assertEqual(policy.use_xla, self.policy_params['use_xla'])
+        self.assertEqual(policy.fused_critics,
+                         self.policy_params['fused_critics'])
 
         # Check that the abstract class has all the required methods.
         self.assertRaises(NotImplementedError, policy.initialize)
@@ -62,6 +65,9 @@ class TestActorCriticPolicy(unittest.TestCase):
                           is_final_step=None, evaluate=False)
         self.assertRaises(NotImplementedError, policy.get_td_map)
 
+        # Check that no summaries are returned before training.
+        self.assertDictEqual(policy.get_summary(), {})
+
     def test_get_obs(self):
         """Check the functionality of the _get_obs() method.
 
@@ -8,7 +8,8 @@ from flow.core.params import EnvParams
 from flow.controllers import IDMController
 
 from hbaselines.envs.efficient_hrl.maze_env_utils import line_intersect, \
-    point_distance, construct_maze
+    point_distance, construct_maze, ray_segment_intersect, \
+    nearest_ray_segment_intersect
 from hbaselines.envs.efficient_hrl.envs import AntMaze
 from hbaselines.envs.efficient_hrl.envs import AntFall
 from hbaselines.envs.efficient_hrl.envs import AntPush
@@ -16,6 +17,7 @@ from hbaselines.envs.efficient_hrl.envs import AntFourRooms
 
 from hbaselines.envs.hac.env_utils import check_validity
 from hbaselines.envs.hac.envs import UR5, Pendulum
+from hbaselines.envs.hac.envs import ur5_forward_kinematics
 
 from hbaselines.envs.mixed_autonomy import FlowEnv
 
@@ -32,6 +34,7 @@ from hbaselines.envs.mixed_autonomy.params.highway_single \
 
 from hbaselines.envs.mixed_autonomy.envs.av import AVEnv
 from hbaselines.envs.mixed_autonomy.envs.av import AVClosedEnv
+from hbaselines.envs.mixed_autonomy.envs.av import AVOpenEnv
 from hbaselines.envs.mixed_autonomy.envs.av \
     import CLOSED_ENV_PARAMS as SA_CLOSED_ENV_PARAMS
 from hbaselines.envs.mixed_autonomy.envs.av \
@@ -43,6 +46,12 @@ from hbaselines.envs.mixed_autonomy.envs.imitation import AVImitationEnv
 from hbaselines.envs.mixed_autonomy.envs.imitation import AVClosedImitationEnv
 from hbaselines.envs.mixed_autonomy.envs.imitation import AVOpenImitationEnv
 from hbaselines.envs.point2d import Point2DEnv
+from hbaselines.envs.point2d import disk_mask
+from hbaselines.envs.point2d import VecPoint2DEnv
+try:
+    from multiworld.envs.pygame.walls import VerticalWall, HorizontalWall
+except ImportError:  # pragma: no cover
+    VerticalWall = HorizontalWall = None
 
 
 class TestEfficientHRLEnvironments(unittest.TestCase):
@@ -70,6 +79,46 @@ class TestEfficientHRLEnvironments(unittest.TestCase):
         self.assertAlmostEqual(x, 1)
         self.assertAlmostEqual(y, 1)
 
+        # test nearest_ray_segment_intersect
+        segments = np.array([
+            [1, -1, 1, 1],  # vertical segment at x=1
+            [2, -1, 2, 1],  # vertical segment at x=2
+            [-1, 3, 1, 3],  # horizontal segment at y=3
+        ])
+        thetas = [0, np.pi / 2, np.pi]
+        index, distance = nearest_ray_segment_intersect(
+            (0, 0), thetas, segments)
+        np.testing.assert_array_equal(index, [0, 2, -1])
+        np.testing.assert_almost_equal(distance, [1, 3, np.inf])
+
+        # compare against ray_segment_intersect
+        for theta, i, d in zip(thetas, index, distance):
+            if i >= 0:
+                p = ray_segment_intersect(
+                    ((0, 0), theta), (segments[i, :2], segments[i, 2:]))
+                self.assertEqual(point_distance(p, (0, 0)), d)
+
+    def test_top_down_view(self):
+        """Validate the splatting of blocks onto the top-down view."""
+        env = AntMaze(use_contexts=True, context_range=[0, 0])
+        scaling = env.MAZE_SIZE_SCALING
+
+        # an object at the robot is placed entirely in the center cell
+        np.testing.assert_almost_equal(
+            env._splat_weights([0.], 5)[:, 0], [0, 0, 1, 0, 0])
+
+        # an object a quarter cell away is split among two cells
+        np.testing.assert_almost_equal(
+            env._splat_weights([scaling / 4], 5)[:, 0], [0, 0, 0.75, 0.25, 0])
+
+        # objects outside the view are dropped
+        np.testing.assert_almost_equal(
+            env._splat_weights([10 * scaling], 5)[:, 0], [0, 0, 0, 0, 0])
+
+        view = env.get_top_down_view()
+        self.assertEqual(view.shape, (5, 5, 3))
+        np.testing.assert_almost_equal(view[:, :, 2], np.zeros((5, 5)))
+
     def test_contextual_reward(self):
         """Check the functionality of the context_space attribute.
 
@@ -315,6 +364,33 @@ class TestUR5(unittest.TestCase):
             self.assertTrue(state[i] >= self.env.initial_state_space[i][0])
             self.assertTrue(state[i] <= self.env.initial_state_space[i][1])
 
+    def test_get_next_goal(self):
+        """Validate the functionality of the get_next_goal method.
+
+        This also tests the sample_feasible_goals method and the pool of goals
+        the next goals are popped from.
+        """
+        np.random.seed(0)
+        goals = self.env.sample_feasible_goals(100)
+        self.assertEqual(goals.shape, (100, 3))
+
+        # check that all goals are feasible
+        _, forearm_pos, wrist_1_pos = ur5_forward_kinematics(goals)
+        self.assertTrue(all(np.absolute(goals[:, 0]) > np.pi / 4))
+        self.assertTrue(all(forearm_pos[:, 2] > 0.05))
+        self.assertTrue(all(wrist_1_pos[:, 2] > 0.15))
+
+        # check that goals are popped from the pool
+        pool = self.env._goal_pool.copy()
+        np.testing.assert_array_almost_equal(self.env.get_next_goal(), pool[0])
+        np.testing.assert_array_almost_equal(self.env._goal_pool, pool[1:])
+
+        # check that the pool is refilled once it is empty
+        self.env._goal_pool = self.env._goal_pool[:0]
+        self.env.get_next_goal()
+        self.assertEqual(len(self.env._goal_pool),
+                         self.env.goal_pool_size - 1)
+
 
 class TestPendulum(unittest.TestCase):
     """Tests the Pendulum environment class."""
@@ -1409,6 +1485,19 @@ class TestAVImitation(unittest.TestCase):
             [0.0850658, 0.1037863, 0.092358, 0.0760671, -0.1428318]
         )
 
+        # Check that the expert models are cached between calls.
+        expert_models = dict(env._expert_models)
+        self.assertListEqual(
+            sorted(expert_models.keys()), sorted(env.rl_ids()))
+        env.query_expert(None)
+        for veh_id in env.rl_ids():
+            self.assertIs(env._expert_models[veh_id], expert_models[veh_id])
+
+        # Check that the expert models are evicted when vehicles exit.
+        env._expert_models["exited_veh"] = None
+        env.query_expert(None)
+        self.assertNotIn("exited_veh", env._expert_models.keys())
+
     def test_closed_env(self):
         """Validate the functionality of the AVClosedImitationEnv class.
 
@@ -1542,6 +1631,98 @@ class TestAVImitation(unittest.TestCase):
             [0.0730258, -0.0180382, 0., 0., 0.]
         )
 
+        # Check that only the controlled vehicles are assigned experts.
+        self.assertListEqual(
+            sorted(env._expert_models.keys()), sorted(env.rl_ids()))
+
+
+class TestNumpyKernel(unittest.TestCase):
+    """Test the functionality of features in mixed_autonomy/kernel.py."""
+
+    def test_ring(self):
+        """Validate the ring road variant of the NumPy simulator.
+
+        This tests checks for the following cases:
+
+        1. that the headways of all vehicles add up to the length of the ring
+        2. that the leaders and followers of vehicles are consistent
+        3. that no collisions occur during a rollout
+        """
+        flow_params = deepcopy(ring(simulator="numpy"))
+        network = flow_params["network"](
+            name="test_numpy",
+            vehicles=flow_params["veh"],
+            net_params=flow_params["net"],
+            initial_config=flow_params["initial"],
+        )
+        env_params = flow_params["env"]
+        env_params.additional_params = SA_CLOSED_ENV_PARAMS.copy()
+        env_params.additional_params["num_vehicles"] = None
+
+        env = AVClosedEnv(
+            env_params=env_params,
+            sim_params=flow_params["sim"],
+            network=network,
+            simulator="numpy",
+        )
+        env.reset()
+
+        # test case 1
+        veh_ids = env.k.vehicle.get_ids()
+        self.assertEqual(len(veh_ids), 50)
+        self.assertAlmostEqual(
+            sum(env.k.vehicle.get_headway(veh_ids)) + 5 * len(veh_ids),
+            env.k.network.length())
+
+        # test case 2
+        for veh_id in veh_ids:
+            self.assertEqual(
+                env.k.vehicle.get_follower(env.k.vehicle.get_leader(veh_id)),
+                veh_id)
+
+        # test case 3
+        for _ in range(100):
+            _, _, done, _ = env.step(np.zeros(env.action_space.shape[0]))
+            self.assertFalse(env.k.simulation.check_collision())
+            if done:
+                break
+
+    def test_highway(self):
+        """Validate the highway variant of the NumPy simulator.
+
+        This tests checks for the following cases:
+
+        1. that vehicles enter the network through the inflows
+        2. that the first vehicle in the network has no leader
+        """
+        flow_params = deepcopy(highway_single(simulator="numpy"))
+        network = flow_params["network"](
+            name="test_numpy",
+            vehicles=flow_params["veh"],
+            net_params=flow_params["net"],
+        )
+        env_params = flow_params["env"]
+        env_params.additional_params = SA_OPEN_ENV_PARAMS.copy()
+        env_params.warmup_steps = 0
+
+        env = AVOpenEnv(
+            env_params=env_params,
+            sim_params=flow_params["sim"],
+            network=network,
+            simulator="numpy",
+        )
+        env.reset()
+        for _ in range(100):
+            env.step(None)
+
+        # test case 1
+        veh_ids = env.k.vehicle.get_ids()
+        self.assertGreater(len(veh_ids), 0)
+
+        # test case 2
+        first_veh = max(veh_ids, key=env.k.vehicle.get_x_by_id)
+        self.assertEqual(env.k.vehicle.get_leader(first_veh), "")
+
 
 class TestPoint2D(unittest.TestCase):
     """Test the functionality of features in envs/point2d.py."""
@@ -1680,9 +1861,43 @@ class TestPoint2D(unittest.TestCase):
     def test_get_image(self):
         """Validate the functionality of the get_image method.
 
-        TODO
+        This is tested for the following cases:
+
+        1. black and white images
+        2. RGB images
         """
-        pass  # TODO
+        # test case 1
+        env = self.env_cls(**self.env_params)
+        env.reset()
+        env._position = np.array([1, 1])
+
+        img = env.get_image(32, 32)
+        self.assertEqual(img.dtype, np.uint8)
+        self.assertEqual(img.shape, (1024,))
+        expected = np.zeros((32, 32), dtype=np.uint8)
+        expected[18:20, 18:20] = 255
+        np.testing.assert_array_equal(img, expected.flatten())
+
+        # images with floating point values are scaled to [0, 1]
+        img = env.get_image(32, 32, dtype=np.float32)
+        self.assertEqual(img.dtype, np.float32)
+        np.testing.assert_array_equal(img, expected.flatten() / 255)
+
+        # test case 2
+        params = deepcopy(self.env_params)
+        params['images_are_rgb'] = True
+        env = self.env_cls(**params)
+        env.reset()
+        env._position = np.array([1, 1])
+        env._target_position = np.array([-3, -3])
+
+        img = env.get_image(32, 32)
+        self.assertEqual(img.shape, (32, 32, 3))
+        np.testing.assert_array_equal(img[19, 19], [0, 0, 255])
+        np.testing.assert_array_equal(img[5, 5], [0, 255, 0])
+        np.testing.assert_array_equal(img[0, 0], [255, 255, 255])
+        self.assertEqual(np.all(img == [0, 255, 0], axis=-1).sum(),
+                         disk_mask(2).sum())
 
     def test_draw(self):
         """Validate the functionality of the draw method.
@@ -1694,16 +1909,39 @@ class TestPoint2D(unittest.TestCase):
     def test_true_model(self):
         """Validate the functionality of the true_model method.
 
-        TODO
+        This also tests the batch_true_model method.
         """
-        pass  # TODO
+        np.testing.assert_almost_equal(
+            self.env_cls.true_model(np.array([1, 3.5]), np.array([2, 1])),
+            [2, 4])
+
+        states = np.array([[1, 3.5], [0, 0], [0, -1]])
+        actions = np.array([[2, 1], [0.5, -0.5], [0, 2]])
+        np.testing.assert_almost_equal(
+            self.env_cls.batch_true_model(states, actions),
+            [self.env_cls.true_model(s, a) for s, a in zip(states, actions)])
+
+        # the last agent is stopped by a wall
+        wall_bounds = np.array([[-1, 1, -0.1, 0.1]])
+        np.testing.assert_almost_equal(
+            self.env_cls.batch_true_model(states, actions, 4, wall_bounds),
+            [[2, 4], [0.5, -0.5], [0, -0.1]])
 
     def test_true_states(self):
         """Validate the functionality of the true_states method.
 
-        TODO
+        This also tests the batch_true_states method.
         """
-        pass  # TODO
+        np.random.seed(0)
+        states = np.random.uniform(-4, 4, (5, 2))
+        actions = np.random.uniform(-1.5, 1.5, (5, 10, 2))
+
+        real_states = self.env_cls.batch_true_states(states, actions)
+        self.assertEqual(real_states.shape, (5, 11, 2))
+        for i in range(5):
+            np.testing.assert_almost_equal(
+                real_states[i],
+                self.env_cls.true_states(states[i], actions[i]))
 
     def test_plot_trajectory(self):
         """Validate the functionality of the plot_trajectory method.
@@ -1713,6 +1951,113 @@ class TestPoint2D(unittest.TestCase):
         pass  # TODO
 
 
+class TestVecPoint2D(unittest.TestCase):
+    """Test the functionality of the VecPoint2DEnv object."""
+
+    class Wall(object):
+        """A stand-in for the bounds of multiworld.envs.pygame.walls.Wall."""
+
+        def __init__(self, min_x, max_x, min_y, max_y):
+            self.min_x = min_x
+            self.max_x = max_x
+            self.min_y = min_y
+            self.max_y = max_y
+
+    def test_reset(self):
+        """Validate the functionality of the reset method.
+
+        This is done for two cases:
+
+        1. fixed_goal = None
+        2. fixed_goal = [0, 1]
+        """
+        np.random.seed(0)
+
+        # test case 1
+        env = VecPoint2DEnv(
+            num_envs=100, walls=[self.Wall(-1, 1, -1, 1)])
+        obs = env.reset()
+        self.assertEqual(obs.shape, (100, 2))
+        self.assertEqual(env.current_context.shape, (100, 2))
+        self.assertFalse(any(env._positions_inside_walls(obs)))
+        self.assertFalse(
+            any(env._positions_inside_walls(env.current_context)))
+
+        # test case 2
+        env = VecPoint2DEnv(num_envs=3, fixed_goal=[0, 1])
+        env.reset()
+        np.testing.assert_almost_equal(env.current_context, [[0, 1]] * 3)
+
+    def test_step(self):
+        """Validate the functionality of the step method.
+
+        This is done for two cases:
+
+        1. no walls
+        2. an agent moving towards, across, and along a wall
+        """
+        # test case 1
+        env = VecPoint2DEnv(num_envs=2, fixed_goal=[0, 0])
+        env.reset()
+        env._position = np.array([[0, 0], [3.5, 1]])
+
+        obs, reward, done, info = env.step(np.array([[2, 0.5], [1, 1]]))
+        np.testing.assert_almost_equal(obs, [[1, 0.5], [4, 2]])
+        np.testing.assert_almost_equal(
+            reward, [-np.sqrt(1.25), -np.sqrt(20)])
+        np.testing.assert_almost_equal(
+            info["speed"], [np.sqrt(1.25), np.sqrt(2)])
+        np.testing.assert_array_equal(done, [False, False])
+
+        # test case 2
+        env = VecPoint2DEnv(
+            num_envs=4,
+            fixed_goal=[0, 0],
+            walls=[self.Wall(-1, 1, -0.1, 0.1)])
+        env.reset()
+        env._position = np.array([[0, -1], [0, -0.5], [-2, 0], [0.5, -0.5]])
+
+        obs, _, _, _ = env.step(
+            np.array([[0, 1], [0, 1], [1, 0], [1, 1]]))
+        np.testing.assert_almost_equal(
+            obs, [[0, -0.1], [0, -0.1], [-1, 0], [1.5, -0.1]])
+
+    @unittest.skipIf(VerticalWall is None, "multiworld is not installed")
+    def test_step_matches_point2d(self):
+        """Check that the agents are moved as in Point2DEnv.
+
+        Agents are placed at random positions around a set of walls, and the
+        positions after a random action are compared to those of Point2DEnv
+        with the same walls, starting positions, and actions.
+        """
+        np.random.seed(0)
+        num_envs = 500
+        walls = [
+            HorizontalWall(0.1, 0, -2, 2),
+            VerticalWall(0.1, 3, -3, 3),
+            VerticalWall(0.1, -3, -3, -1, thickness=0.5),
+        ]
+
+        vec_env = VecPoint2DEnv(
+            num_envs=num_envs, fixed_goal=[0, 0], walls=walls)
+        vec_env.reset()
+        starts = vec_env._position.copy()
+        actions = np.random.uniform(-1, 1, size=(num_envs, 2))
+        vec_env.step(actions)
+
+        env = Point2DEnv(
+            images_in_obs=False,
+            walls=walls,
+            fixed_goal=[0, 0],
+            randomize_position_on_reset=False)
+        env.reset()
+        for i in range(num_envs):
+            env._position = starts[i].copy()
+            env.step(actions[i])
+            np.testing.assert_almost_equal(
+                vec_env._position[i], env._position)
+
+
 ###############################################################################
 #                              Utility methods                                #
 ###############################################################################
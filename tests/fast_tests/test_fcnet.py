@@ -170,6 +170,247 @@ class TestTD3FeedForwardPolicy(unittest.TestCase):
                 target_val = policy.sess.run(target)
             np.testing.assert_almost_equal(model_val, target_val)
 
+    def test_get_summary(self):
+        """Check the functionality of the get_summary() method.
+
+        This test validates that the summaries are averaged over the batches
+        the actor is trained on, and are cleared once they are returned.
+        """
+        policy = TD3FeedForwardPolicy(**self.policy_params)
+        policy.sess.run(tf.compat.v1.global_variables_initializer())
+        policy.initialize()
+
+        for reward, update_actor in [(1, True), (3, True), (100, False)]:
+            policy.update_from_batch(
+                obs0=np.zeros((4, 5)),
+                actions=np.zeros((4, 1)),
+                rewards=reward * np.ones(4),
+                obs1=np.zeros((4, 5)),
+                terminals1=np.zeros(4),
+                update_actor=update_actor,
+            )
+
+        summary = policy.get_summary()
+        self.assertListEqual(sorted(summary.keys()),
+                             sorted(policy.summary_tensors.keys()))
+        self.assertIn("Optimizer/actor_loss", summary)
+        self.assertIn("Model/reference_Q1_mean", summary)
+        self.assertAlmostEqual(summary["input_info/rewards"], 2)
+        self.assertDictEqual(policy.get_summary(), {})
+
+    def test_use_xla(self):
+        """Check that the compiled update operations match the original.
+
+        This test validates that the critic and actor losses of a batch are the
+        same whether the update operations are compiled with XLA or not. The
+        losses are computed before the update, since the actor loss fetched
+        by an update may be computed before or after the critic is updated.
+        """
+        losses = []
+        for use_xla in [False, True]:
+            with tf.Graph().as_default():
+                tf.compat.v1.set_random_seed(0)
+                policy_params = self.policy_params.copy()
+                policy_params['sess'] = tf.compat.v1.Session()
+                policy_params['use_xla'] = use_xla
+                # Remove the target noise, which may be sampled differently.
+                policy_params['target_policy_noise'] = 0
+                policy = TD3FeedForwardPolicy(**policy_params)
+                policy.sess.run(tf.compat.v1.global_variables_initializer())
+                policy.initialize()
+
+                losses.append(policy.sess.run(
+                    [policy.critic_loss, policy.actor_loss],
+                    feed_dict={
+                        policy.obs_ph: np.ones((4, 5)),
+                        policy.action_ph: np.zeros((4, 1)),
+                        policy.rew_ph: np.ones((4, 1)),
+                        policy.obs1_ph: np.ones((4, 5)),
+                        policy.terminals1: np.zeros((4, 1)),
+                    }))
+                policy.sess.close()
+
+        np.testing.assert_almost_equal(losses[0][0], losses[1][0], decimal=4)
+        np.testing.assert_almost_equal(losses[0][1], losses[1][1], decimal=4)
+
+    def test_fused_critics(self):
+        """Check the functionality of the fused_critics parameter.
+
+        This method is tested for the following features:
+
+        1. The critics are created with stacked parameters.
+        2. The critic outputs and losses match those of separate critics with
+           the same parameters, before and after a training step.
+        """
+        policy_params = self.policy_params.copy()
+        policy_params['fused_critics'] = True
+        policy = TD3FeedForwardPolicy(**policy_params)
+
+        # test case 1
+        self.assertDictEqual(
+            {var.name: var.shape.as_list()
+             for var in get_trainable_vars('model/qf')},
+            {'model/qf/fc0/bias:0': [2, 1, 256],
+             'model/qf/fc0/kernel:0': [2, 6, 256],
+             'model/qf/fc1/bias:0': [2, 1, 256],
+             'model/qf/fc1/kernel:0': [2, 256, 256],
+             'model/qf/qf_output/bias:0': [2, 1, 1],
+             'model/qf/qf_output/kernel:0': [2, 256, 1]}
+        )
+        self.assertEqual(len(policy.critic_optimizer), 1)
+
+        # test case 2
+        batch = dict(
+            obs0=np.random.uniform(-1, 1, (4, 5)),
+            actions=np.random.uniform(-1, 1, (4, 1)),
+            rewards=np.random.uniform(-1, 1, 4),
+            obs1=np.random.uniform(-1, 1, (4, 5)),
+            terminals1=np.zeros(4),
+        )
+
+        values = {}
+        outputs = []
+        for fused_critics in [False, True]:
+            with tf.Graph().as_default():
+                policy_params = self.policy_params.copy()
+                policy_params['sess'] = tf.compat.v1.Session()
+                policy_params['fused_critics'] = fused_critics
+                # Remove the target noise, which may be sampled differently.
+                policy_params['target_policy_noise'] = 0
+                policy = TD3FeedForwardPolicy(**policy_params)
+                policy.sess.run(tf.compat.v1.global_variables_initializer())
+
+                # Stack the parameters of the separate critics.
+                model_vars = get_trainable_vars('model')
+                if not fused_critics:
+                    values = dict(zip([var.name for var in model_vars],
+                                      policy.sess.run(model_vars)))
+                else:
+                    for var in model_vars:
+                        if var.name.startswith('model/qf/'):
+                            val = np.stack([values[var.name.replace(
+                                'model/qf/', 'model/qf_{}/'.format(i))]
+                                for i in range(2)])
+                        else:
+                            val = values[var.name]
+                        var.load(val.reshape(var.shape.as_list()),
+                                 policy.sess)
+                policy.initialize()
+
+                feed_dict = {
+                    policy.obs_ph: batch['obs0'],
+                    policy.action_ph: batch['actions'],
+                    policy.rew_ph: batch['rewards'].reshape(-1, 1),
+                    policy.obs1_ph: batch['obs1'],
+                    policy.terminals1: batch['terminals1'].reshape(-1, 1),
+                }
+                ops = [policy.critic_tf, policy.critic_loss]
+                before = policy.sess.run(ops, feed_dict=feed_dict)
+                policy.update_from_batch(update_actor=True, **batch)
+                after = policy.sess.run(ops, feed_dict=feed_dict)
+                outputs.append((before, after))
+                policy.sess.close()
+
+        for unfused, fused in zip(*outputs):
+            np.testing.assert_almost_equal(unfused[0], fused[0], decimal=5)
+            np.testing.assert_almost_equal(unfused[1], fused[1], decimal=5)
+
+    def test_num_models(self):
+        """Check the functionality of the num_models parameter.
+
+        This method is tested for the following features:
+
+        1. The parameters of every model are stacked.
+        2. The actions and critic outputs of every model match those of a
+           policy with the same parameters.
+        3. Samples are stored in the replay buffer of their model, and the
+           losses of every model are returned by the update method.
+        """
+        policy_params = self.policy_params.copy()
+        policy_params['num_models'] = 3
+        policy_params['batch_size'] = 4
+        policy = TD3FeedForwardPolicy(**policy_params)
+
+        # test case 1
+        self.assertDictEqual(
+            {var.name: var.shape.as_list()
+             for var in get_trainable_vars('model/pi')},
+            {'model/pi/fc0/bias:0': [3, 1, 256],
+             'model/pi/fc0/kernel:0': [3, 5, 256],
+             'model/pi/fc1/bias:0': [3, 1, 256],
+             'model/pi/fc1/kernel:0': [3, 256, 256],
+             'model/pi/output/bias:0': [3, 1, 1],
+             'model/pi/output/kernel:0': [3, 256, 1]}
+        )
+        self.assertListEqual(
+            policy.obs_ph.shape.as_list(), [3, None, 5])
+        self.assertListEqual(
+            policy.rew_ph.shape.as_list(), [3, None, 1])
+
+        # test case 2
+        obs = np.random.uniform(-1, 1, (3, 4, 5))
+        actions = np.random.uniform(-1, 1, (3, 4, 1))
+        policy.sess.run(tf.compat.v1.global_variables_initializer())
+        model_vars = get_trainable_vars('model')
+        values = dict(zip([var.name for var in model_vars],
+                          policy.sess.run(model_vars)))
+        stacked_out = policy.sess.run(
+            [policy.actor_tf, policy.critic_tf],
+            feed_dict={policy.obs_ph: obs, policy.action_ph: actions})
+
+        for i in range(3):
+            with tf.Graph().as_default():
+                policy_params = self.policy_params.copy()
+                policy_params['sess'] = tf.compat.v1.Session()
+                single_policy = TD3FeedForwardPolicy(**policy_params)
+                for var in get_trainable_vars('model'):
+                    var.load(values[var.name][i].reshape(var.shape.as_list()),
+                             single_policy.sess)
+                single_out = single_policy.sess.run(
+                    [single_policy.actor_tf, single_policy.critic_tf],
+                    feed_dict={single_policy.obs_ph: obs[i],
+                               single_policy.action_ph: actions[i]})
+                single_policy.sess.close()
+
+            np.testing.assert_almost_equal(
+                stacked_out[0][i], single_out[0], decimal=5)
+            for stacked_q, single_q in zip(stacked_out[1], single_out[1]):
+                np.testing.assert_almost_equal(
+                    stacked_q[i], single_q, decimal=5)
+
+        # test case 3
+        policy.initialize()
+        for step in range(4):
+            policy.store_transition(
+                obs0=[np.array([step, 0]), None, np.array([step, 2])],
+                context0=[np.array([0, 0, 0])] * 3,
+                action=[np.array([0])] * 3,
+                reward=[0, 1, 2],
+                obs1=[np.array([step, 0]), None, np.array([step, 2])],
+                context1=[np.array([0, 0, 0])] * 3,
+                done=[False] * 3,
+                is_final_step=[False] * 3,
+            )
+        self.assertListEqual(
+            [len(buffer) for buffer in policy.replay_buffer.buffers],
+            [4, 0, 4])
+        self.assertFalse(policy.replay_buffer.can_sample())
+
+        obs0, actions, rewards, obs1, terminals1 = [
+            np.stack([val] * 3) for val in
+            policy.replay_buffer.buffers[0].sample()]
+        critic_loss, actor_loss = policy.update_from_batch(
+            obs0, actions, rewards, obs1, terminals1)
+        self.assertTupleEqual(np.shape(critic_loss), (2, 3))
+        self.assertTupleEqual(np.shape(actor_loss), (3,))
+
+        action = policy.get_action(
+            obs, None, apply_noise=False, random_actions=False)
+        self.assertTupleEqual(action.shape, (3, 4, 1))
+        action = policy.get_action(
+            obs[:, :1], None, apply_noise=False, random_actions=True)
+        self.assertTupleEqual(action.shape, (3, 1, 1))
+
     def test_store_transition(self):
         """Test the `store_transition` method."""
         pass  # TODO
@@ -325,6 +566,193 @@ class TestSACFeedForwardPolicy(unittest.TestCase):
                 target_val = policy.sess.run(target)
             np.testing.assert_almost_equal(model_val, target_val)
 
+    def test_get_summary(self):
+        """Check the functionality of the get_summary() method.
+
+        This test validates that the summaries are averaged over the batches
+        the policy is trained on, and are cleared once they are returned.
+        """
+        policy = SACFeedForwardPolicy(**self.policy_params)
+        policy.sess.run(tf.compat.v1.global_variables_initializer())
+        policy.initialize()
+
+        for reward, update_actor in [(1, True), (3, True), (100, False)]:
+            policy.update_from_batch(
+                obs0=np.zeros((4, 5)),
+                actions=np.zeros((4, 1)),
+                rewards=reward * np.ones(4),
+                obs1=np.zeros((4, 5)),
+                terminals1=np.zeros(4),
+                update_actor=update_actor,
+            )
+
+        summary = policy.get_summary()
+        self.assertListEqual(sorted(summary.keys()),
+                             sorted(policy.summary_tensors.keys()))
+        self.assertIn("Optimizer/actor_loss", summary)
+        self.assertIn("Model/reference_Q1_mean", summary)
+        self.assertAlmostEqual(summary["input_info/rewards"], 104 / 3)
+        self.assertDictEqual(policy.get_summary(), {})
+
+    def test_fused_critics(self):
+        """Check the functionality of the fused_critics parameter.
+
+        This method is tested for the following features:
+
+        1. The Q-functions are created with stacked parameters.
+        2. The Q-function outputs and losses match those of separate
+           Q-functions with the same parameters, and the Q-function outputs
+           still match after a training step.
+        """
+        policy_params = self.policy_params.copy()
+        policy_params['fused_critics'] = True
+        SACFeedForwardPolicy(**policy_params)
+
+        # test case 1
+        self.assertDictEqual(
+            {var.name: var.shape.as_list()
+             for var in get_trainable_vars('model/value_fns/qf')},
+            {'model/value_fns/qf/fc0/bias:0': [2, 1, 256],
+             'model/value_fns/qf/fc0/kernel:0': [2, 6, 256],
+             'model/value_fns/qf/fc1/bias:0': [2, 1, 256],
+             'model/value_fns/qf/fc1/kernel:0': [2, 256, 256],
+             'model/value_fns/qf/qf_output/bias:0': [2, 1, 1],
+             'model/value_fns/qf/qf_output/kernel:0': [2, 256, 1]}
+        )
+
+        # test case 2
+        batch = dict(
+            obs0=np.random.uniform(-1, 1, (4, 5)),
+            actions=np.random.uniform(-1, 1, (4, 1)),
+            rewards=np.random.uniform(-1, 1, 4),
+            obs1=np.random.uniform(-1, 1, (4, 5)),
+            terminals1=np.zeros(4),
+        )
+
+        values = {}
+        outputs = []
+        for fused_critics in [False, True]:
+            with tf.Graph().as_default():
+                policy_params = self.policy_params.copy()
+                policy_params['sess'] = tf.compat.v1.Session()
+                policy_params['fused_critics'] = fused_critics
+                policy = SACFeedForwardPolicy(**policy_params)
+                policy.sess.run(tf.compat.v1.global_variables_initializer())
+
+                # Stack the parameters of the separate Q-functions.
+                model_vars = get_trainable_vars('model')
+                if not fused_critics:
+                    values = dict(zip([var.name for var in model_vars],
+                                      policy.sess.run(model_vars)))
+                else:
+                    for var in model_vars:
+                        if var.name.startswith('model/value_fns/qf/'):
+                            val = np.stack([values[var.name.replace(
+                                'value_fns/qf/', 'value_fns/qf{}/'.format(i))]
+                                for i in range(1, 3)])
+                        else:
+                            val = values[var.name]
+                        var.load(val.reshape(var.shape.as_list()),
+                                 policy.sess)
+                policy.initialize()
+
+                feed_dict = {
+                    policy.obs_ph: batch['obs0'],
+                    policy.action_ph: batch['actions'],
+                    policy.rew_ph: batch['rewards'].reshape(-1, 1),
+                    policy.obs1_ph: batch['obs1'],
+                    policy.terminals1: batch['terminals1'].reshape(-1, 1),
+                }
+                before = policy.sess.run(
+                    [policy.qf1, policy.qf2, policy.critic_loss[:2]],
+                    feed_dict=feed_dict)
+                # The Q-functions are not affected by the sampled actions.
+                policy.update_from_batch(**batch)
+                after = policy.sess.run(
+                    [policy.qf1, policy.qf2], feed_dict=feed_dict)
+                outputs.append((before, after))
+                policy.sess.close()
+
+        for unfused, fused in zip(*outputs):
+            for unfused_val, fused_val in zip(unfused, fused):
+                np.testing.assert_almost_equal(
+                    unfused_val, fused_val, decimal=5)
+
+    def test_num_models(self):
+        """Check the functionality of the num_models parameter.
+
+        This method is tested for the following features:
+
+        1. The parameters and entropy coefficients of every model are stacked.
+        2. The Q-function outputs of every model match those of a policy with
+           the same parameters.
+        3. The losses of every model are returned by the update method.
+        """
+        policy_params = self.policy_params.copy()
+        policy_params['num_models'] = 3
+        policy = SACFeedForwardPolicy(**policy_params)
+
+        # test case 1
+        self.assertDictEqual(
+            {var.name: var.shape.as_list()
+             for var in get_trainable_vars('model/pi')},
+            {'model/pi/fc0/bias:0': [3, 1, 256],
+             'model/pi/fc0/kernel:0': [3, 5, 256],
+             'model/pi/fc1/bias:0': [3, 1, 256],
+             'model/pi/fc1/kernel:0': [3, 256, 256],
+             'model/pi/log_std/bias:0': [3, 1, 1],
+             'model/pi/log_std/kernel:0': [3, 256, 1],
+             'model/pi/mean/bias:0': [3, 1, 1],
+             'model/pi/mean/kernel:0': [3, 256, 1]}
+        )
+        self.assertListEqual(policy.log_alpha.shape.as_list(), [3, 1, 1])
+
+        # test case 2
+        obs = np.random.uniform(-1, 1, (3, 4, 5))
+        actions = np.random.uniform(-1, 1, (3, 4, 1))
+        policy.sess.run(tf.compat.v1.global_variables_initializer())
+        model_vars = get_trainable_vars('model')
+        values = dict(zip([var.name for var in model_vars],
+                          policy.sess.run(model_vars)))
+        stacked_out = policy.sess.run(
+            [policy.qf1, policy.qf2, policy.value_fn],
+            feed_dict={policy.obs_ph: obs, policy.action_ph: actions})
+
+        for i in range(3):
+            with tf.Graph().as_default():
+                policy_params = self.policy_params.copy()
+                policy_params['sess'] = tf.compat.v1.Session()
+                single_policy = SACFeedForwardPolicy(**policy_params)
+                for var in get_trainable_vars('model'):
+                    var.load(values[var.name][i].reshape(var.shape.as_list()),
+                             single_policy.sess)
+                single_out = single_policy.sess.run(
+                    [single_policy.qf1, single_policy.qf2,
+                     single_policy.value_fn],
+                    feed_dict={single_policy.obs_ph: obs[i],
+                               single_policy.action_ph: actions[i]})
+                single_policy.sess.close()
+
+            for stacked_val, single_val in zip(stacked_out, single_out):
+                np.testing.assert_almost_equal(
+                    stacked_val[i], single_val, decimal=5)
+
+        # test case 3
+        policy.initialize()
+        critic_loss, actor_loss = policy.update_from_batch(
+            obs0=obs,
+            actions=actions,
+            rewards=np.random.uniform(-1, 1, (3, 4)),
+            obs1=obs,
+            terminals1=np.zeros((3, 4)),
+        )
+        self.assertTupleEqual(np.shape(critic_loss), (2, 3))
+        self.assertTupleEqual(np.shape(actor_loss), (3,))
+
+        action = policy.get_action(
+            obs, None, apply_noise=True, random_actions=False)
+        self.assertTupleEqual(action.shape, (3, 4, 1))
+
     def test_store_transition(self):
         """Check the functionality of the store_transition() method."""
         pass  # TODO
@@ -407,6 +835,50 @@ class TestImitationFeedForwardPolicy(unittest.TestCase):
         """Check the functionality of the store_transition() method."""
         pass  # TODO
 
+    def test_update_epoch(self):
+        """Check the functionality of the update_epoch() method.
+
+        This checks that performing several gradient steps per session run
+        results in the same parameters as performing the same steps with
+        update_from_batch().
+        """
+        policy_params = self.policy_params.copy()
+        policy_params["batch_size"] = 4
+        policy = ImitationFeedForwardPolicy(**policy_params)
+        sess = policy.sess
+        sess.run(tf.compat.v1.global_variables_initializer())
+        trainable_vars = get_trainable_vars()
+        init_vals = sess.run(trainable_vars)
+
+        # Add samples for two full batches and an incomplete one.
+        for _ in range(10):
+            policy.store_transition(
+                obs0=np.random.uniform(-2, 2, 2),
+                context0=np.random.uniform(-3, 3, 3),
+                action=np.random.uniform(-1, 1, 1),
+                obs1=np.random.uniform(-2, 2, 2),
+                context1=np.random.uniform(-3, 3, 3),
+            )
+
+        # Perform both gradient steps in one session run.
+        np.random.seed(0)
+        policy.update_epoch(num_steps=2)
+        fused_vals = sess.run(trainable_vars)
+        self.assertIn(2, policy.fused_updates)
+
+        # Perform the same gradient steps from the same initial parameters.
+        sess.run(tf.compat.v1.global_variables_initializer())
+        for var, val in zip(trainable_vars, init_vals):
+            var.load(val, sess)
+        np.random.seed(0)
+        for obs0, actions, _, _, _ in \
+                policy.replay_buffer.sample_epoch(num_batches=1):
+            policy.update_from_batch(obs0[0], actions[0])
+        expected_vals = sess.run(trainable_vars)
+
+        for val, expected_val in zip(fused_vals, expected_vals):
+            np.testing.assert_almost_equal(val, expected_val, decimal=5)
+
 
 if __name__ == '__main__':
     unittest.main()
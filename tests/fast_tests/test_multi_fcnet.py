@@ -853,6 +853,92 @@ class TestTD3MultiFeedForwardPolicy(unittest.TestCase):
                 target_val = policy.sess.run(target)
             np.testing.assert_almost_equal(model_val, target_val)
 
+    def test_stacked(self):
+        """Check the functionality of the stacked parameter.
+
+        This method is tested for the following features:
+
+        1. An error is raised if the agents have different spaces.
+        2. A single policy with the stacked parameters of every agent is
+           created.
+        3. Actions are only returned for the agents in the environment, and
+           samples are only stored for the agents that received a reward.
+        4. The losses of every agent are returned by the update method.
+        """
+        # test case 1
+        policy_params = self.policy_params_independent.copy()
+        policy_params["stacked"] = True
+        self.assertRaises(
+            ValueError, TD3MultiFeedForwardPolicy, **policy_params)
+
+        # test case 2
+        policy_params["ac_space"] = {
+            key: Box(low=-1, high=1, shape=(1,), dtype=np.float32)
+            for key in ["a", "b"]}
+        policy_params["co_space"] = None
+        policy_params["ob_space"] = {
+            key: Box(low=-5, high=5, shape=(5,), dtype=np.float32)
+            for key in ["a", "b"]}
+        policy_params["batch_size"] = 2
+        policy = TD3MultiFeedForwardPolicy(**policy_params)
+
+        self.assertTrue(policy.stacked)
+        self.assertListEqual(policy.agent_keys, ["a", "b"])
+        self.assertListEqual(list(policy.agents.keys()), ["policy"])
+        self.assertDictEqual(
+            {var.name: var.shape.as_list()
+             for var in get_trainable_vars('model/pi')},
+            {'model/pi/fc0/bias:0': [2, 1, 256],
+             'model/pi/fc0/kernel:0': [2, 5, 256],
+             'model/pi/fc1/bias:0': [2, 1, 256],
+             'model/pi/fc1/kernel:0': [2, 256, 256],
+             'model/pi/output/bias:0': [2, 1, 1],
+             'model/pi/output/kernel:0': [2, 256, 1]}
+        )
+
+        # test case 3
+        policy.sess.run(tf.compat.v1.global_variables_initializer())
+        policy.initialize()
+
+        action = policy.get_action(
+            {"b": np.zeros((1, 5))}, None,
+            apply_noise=False, random_actions=False)
+        self.assertListEqual(list(action.keys()), ["b"])
+        self.assertTupleEqual(action["b"].shape, (1, 1))
+
+        for _ in range(3):
+            policy.store_transition(
+                obs0={"a": np.zeros(5), "b": np.ones(5)},
+                context0=None,
+                action={"a": np.zeros(1), "b": np.ones(1)},
+                reward={"a": 0, "b": 1},
+                obs1={"a": np.zeros(5), "b": np.ones(5)},
+                context1=None,
+                done=False,
+                is_final_step=False,
+            )
+        policy.store_transition(
+            obs0={"a": np.zeros(5), "b": np.ones(5)},
+            context0=None,
+            action={"a": np.zeros(1), "b": np.ones(1)},
+            reward={"b": 1},
+            obs1={"a": np.zeros(5), "b": np.ones(5)},
+            context1=None,
+            done=False,
+            is_final_step=False,
+        )
+        self.assertListEqual(
+            [len(buffer) for buffer in
+             policy.agents["policy"].replay_buffer.buffers],
+            [3, 4])
+
+        # test case 4
+        critic_loss, actor_loss = policy.update()
+        self.assertListEqual(sorted(critic_loss.keys()), ["a", "b"])
+        self.assertListEqual(sorted(actor_loss.keys()), ["a", "b"])
+        self.assertEqual(len(critic_loss["a"]), 2)
+        self.assertTrue(np.isscalar(actor_loss["a"]))
+
 
 class TestSACMultiFeedForwardPolicy(unittest.TestCase):
     """Test MultiFeedForwardPolicy in hbaselines/multi_fcnet/sac.py."""
@@ -3,6 +3,7 @@ import random
 import numpy as np
 
 from hbaselines.fcnet.replay_buffer import ReplayBuffer
+from hbaselines.fcnet.replay_buffer import StackedReplayBuffer
 from hbaselines.goal_conditioned.replay_buffer import HierReplayBuffer
 from hbaselines.multi_fcnet.replay_buffer import MultiReplayBuffer
 from hbaselines.multi_fcnet.replay_buffer import SharedReplayBuffer
@@ -59,6 +60,131 @@ class TestReplayBuffer(unittest.TestCase):
         np.testing.assert_array_almost_equal(obs_tp1, [[3]])
         np.testing.assert_array_almost_equal(done, [False])
 
+    def test_add_batch(self):
+        """Test the `add_batch` method the replay buffer.
+
+        This checks that the older samples are overwritten once the buffer is
+        full, as is done by the `add` method.
+        """
+        replay_buffer = ReplayBuffer(
+            buffer_size=3, batch_size=1, obs_dim=1, ac_dim=1)
+
+        replay_buffer.add_batch(
+            obs_t=np.array([[0], [1]]),
+            action=np.array([[0], [1]]),
+            reward=np.array([0, 1]),
+            obs_tp1=np.array([[0], [1]]),
+            done=np.array([0, 0]),
+        )
+        self.assertEqual(len(replay_buffer), 2)
+        np.testing.assert_array_almost_equal(replay_buffer.reward, [0, 1, 0])
+
+        replay_buffer.add_batch(
+            obs_t=np.array([[2], [3], [4], [5]]),
+            action=np.array([[2], [3], [4], [5]]),
+            reward=np.array([2, 3, 4, 5]),
+            obs_tp1=np.array([[2], [3], [4], [5]]),
+            done=np.array([0, 0, 0, 1]),
+        )
+        self.assertEqual(len(replay_buffer), 3)
+        self.assertEqual(replay_buffer.is_full(), True)
+        np.testing.assert_array_almost_equal(replay_buffer.reward, [3, 4, 5])
+        np.testing.assert_array_almost_equal(
+            replay_buffer.obs_t, [[3], [4], [5]])
+        np.testing.assert_array_almost_equal(replay_buffer.done, [0, 0, 1])
+
+    def test_sample_epoch(self):
+        """Test the `sample_epoch` method the replay buffer.
+
+        This checks that every sample is returned at most once, and that only
+        the incomplete batch at the end of the epoch is skipped.
+        """
+        replay_buffer = ReplayBuffer(
+            buffer_size=5, batch_size=2, obs_dim=1, ac_dim=1)
+        for i in range(5):
+            replay_buffer.add(
+                obs_t=np.array([i]),
+                action=np.array([i]),
+                reward=i,
+                obs_tp1=np.array([i]),
+                done=False
+            )
+
+        # Test the output from one batch at a time.
+        batches = list(replay_buffer.sample_epoch(num_batches=1))
+        self.assertEqual(len(batches), 2)
+        for obs_t, actions_t, rewards, obs_tp1, done in batches:
+            self.assertTupleEqual(obs_t.shape, (1, 2, 1))
+            self.assertTupleEqual(actions_t.shape, (1, 2, 1))
+            self.assertTupleEqual(rewards.shape, (1, 2))
+            self.assertTupleEqual(obs_tp1.shape, (1, 2, 1))
+            self.assertTupleEqual(done.shape, (1, 2))
+        obs_t = np.concatenate([batch[0].flatten() for batch in batches])
+        self.assertEqual(len(set(obs_t)), 4)
+
+        # Test the output from several batches at a time.
+        batches = list(replay_buffer.sample_epoch(num_batches=3))
+        self.assertEqual(len(batches), 1)
+        self.assertTupleEqual(batches[0][0].shape, (2, 2, 1))
+
+
+class TestStackedReplayBuffer(unittest.TestCase):
+    """Tests for the StackedReplayBuffer object."""
+
+    def setUp(self):
+        self.replay_buffer = StackedReplayBuffer(
+            num_models=2, buffer_size=2, batch_size=1, obs_dim=1, ac_dim=1)
+
+    def tearDown(self):
+        del self.replay_buffer
+
+    def test_buffer_size(self):
+        """Validate the buffer_size output from the replay buffer."""
+        self.assertEqual(self.replay_buffer.buffer_size, 2)
+
+    def test_add_sample(self):
+        """Test the `add` and `sample` methods the replay buffer.
+
+        This checks that every model samples from its own buffer, and that
+        sampling is only possible once every buffer has enough samples.
+        """
+        # Add an element to the first model.
+        self.replay_buffer.add(
+            index=0,
+            obs_t=np.array([0]),
+            action=np.array([1]),
+            reward=2,
+            obs_tp1=np.array([3]),
+            done=False
+        )
+
+        # Check can_sample in the False case.
+        self.assertEqual(len(self.replay_buffer), 0)
+        self.assertEqual(self.replay_buffer.can_sample(), False)
+
+        # Add an element to the second model.
+        self.replay_buffer.add(
+            index=1,
+            obs_t=np.array([4]),
+            action=np.array([5]),
+            reward=6,
+            obs_tp1=np.array([7]),
+            done=True
+        )
+
+        # Check can_sample in the True case.
+        self.assertEqual(len(self.replay_buffer), 1)
+        self.assertEqual(self.replay_buffer.can_sample(), True)
+        self.assertEqual(self.replay_buffer.is_full(), False)
+
+        # Test the `sample` method.
+        obs_t, actions_t, rewards, obs_tp1, done = self.replay_buffer.sample()
+        np.testing.assert_array_almost_equal(obs_t, [[[0]], [[4]]])
+        np.testing.assert_array_almost_equal(actions_t, [[[1]], [[5]]])
+        np.testing.assert_array_almost_equal(rewards, [[2], [6]])
+        np.testing.assert_array_almost_equal(obs_tp1, [[[3]], [[7]]])
+        np.testing.assert_array_almost_equal(done, [[False], [True]])
+
 
 class TestHierReplayBuffer(unittest.TestCase):
     """Tests for the HierReplayBuffer object."""
@@ -1,13 +1,37 @@
 """Contains tests for the model abstractions and different models."""
 import unittest
+import os
+import sys
+import shutil
+import time
+import multiprocessing
 import tensorflow as tf
 import numpy as np
 from gym.spaces import Box
 
 from hbaselines.utils.train import parse_options, get_hyperparameters
+from hbaselines.utils.train import get_cpu_groups, run_parallel
 from hbaselines.utils.reward_fns import negative_distance
 from hbaselines.utils.env_util import get_meta_ac_space, get_state_indices
+from hbaselines.utils.env_util import LazyImport
+from hbaselines.utils.misc import cached_space
+from hbaselines.utils.misc import prefetch
+from hbaselines.utils.misc import StreamingMean
 from hbaselines.utils.tf_util import gaussian_likelihood
+from hbaselines.utils.tf_util import get_summary_tensors
+from hbaselines.utils.tf_util import get_target_updates
+from hbaselines.utils.tf_util import xla_scope, xla_available
+from hbaselines.utils.tf_util import layer, stacked_layer
+from hbaselines.utils.tf_util import get_trainable_vars
+from hbaselines.utils.transitions import TransitionRecorder
+from hbaselines.utils.transitions import load_shards, load_into_policy
+from hbaselines.utils.sweep import get_configurations, get_rungs, get_score
+from hbaselines.utils.sweep import successive_halving
+from hbaselines.utils.checkpoint import CheckpointWriter
+from hbaselines.utils.metrics import MetricsWriter, read_metrics
+from hbaselines.utils.weight_sync import get_actor_vars
+from hbaselines.utils.weight_sync import SharedWeights, WeightSync
+from hbaselines.fcnet.replay_buffer import ReplayBuffer
 from hbaselines.goal_conditioned.td3 import GoalConditionedPolicy
 from hbaselines.multi_fcnet.td3 import MultiFeedForwardPolicy
 from hbaselines.algorithms.off_policy import TD3_PARAMS
@@ -27,6 +51,8 @@ class TestTrain(unittest.TestCase):
             'alg': 'TD3',
             'evaluate': False,
             'n_training': 1,
+            'n_parallel': 1,
+            'num_seeds': 1,
             'total_steps': 1000000,
             'seed': 1,
             'log_interval': 2000,
@@ -54,6 +80,8 @@ class TestTrain(unittest.TestCase):
             'gamma': FEEDFORWARD_PARAMS['gamma'],
             'layer_norm': False,
             'use_huber': False,
+            'use_xla': False,
+            'fused_critics': False,
             'num_levels': GOAL_CONDITIONED_PARAMS['num_levels'],
             'meta_period': GOAL_CONDITIONED_PARAMS['meta_period'],
             'intrinsic_reward_scale':
@@ -69,6 +97,7 @@ class TestTrain(unittest.TestCase):
             'cg_weights': GOAL_CONDITIONED_PARAMS['cg_weights'],
             'shared': False,
             'maddpg': False,
+            'stacked': False,
         }
         self.assertDictEqual(vars(args), expected_args)
 
@@ -102,6 +131,8 @@ class TestTrain(unittest.TestCase):
             '--target_noise_clip', '22',
             '--layer_norm',
             '--use_huber',
+            '--use_xla',
+            '--fused_critics',
             '--num_levels', '23',
             '--meta_period', '24',
             '--intrinsic_reward_scale', '25',
@@ -115,6 +146,7 @@ class TestTrain(unittest.TestCase):
             '--cg_weights', '27',
             '--shared',
             '--maddpg',
+            '--stacked',
         ])
         hp = get_hyperparameters(args, GoalConditionedPolicy)
         expected_hp = {
@@ -140,6 +172,8 @@ class TestTrain(unittest.TestCase):
                 'target_noise_clip': 22.0,
                 'layer_norm': True,
                 'use_huber': True,
+                'use_xla': True,
+                'fused_critics': True,
                 'num_levels': 23,
                 'meta_period': 24,
                 'intrinsic_reward_scale': 25.0,
@@ -178,17 +212,64 @@ class TestTrain(unittest.TestCase):
                 'gamma': 19.0,
                 'layer_norm': True,
                 'use_huber': True,
+                'use_xla': True,
+                'fused_critics': True,
                 'noise': 20.0,
                 'target_policy_noise': 21.0,
                 'target_noise_clip': 22.0,
                 'shared': True,
                 'maddpg': True,
+                'stacked': True,
             }
         }
         self.assertDictEqual(hp, expected_hp)
         self.assertEqual(args.log_interval, 4)
         self.assertEqual(args.eval_interval, 5)
 
+    def test_get_cpu_groups(self):
+        """Validate the functionality of the get_cpu_groups method.
+
+        This checks that:
+
+        1. every CPU is assigned to exactly one worker
+        2. CPUs are shared when there are more workers than CPUs
+        """
+        cpus = sorted(os.sched_getaffinity(0))
+
+        # test case 1
+        groups = get_cpu_groups(min(2, len(cpus)))
+        self.assertListEqual(sum(groups, []), cpus)
+
+        # test case 2
+        groups = get_cpu_groups(len(cpus) + 1)
+        self.assertEqual(len(groups), len(cpus) + 1)
+        self.assertListEqual(groups[-1], [cpus[0]])
+
+    def test_run_parallel(self):
+        """Validate the functionality of the run_parallel method.
+
+        This checks that every operation is run with the number of CPUs it is
+        assigned, and that the exit status of each operation is returned.
+        """
+        runs = [{"dir_name": "test_run_{}".format(i), "exit_code": i}
+                for i in range(3)]
+        ret = run_parallel(_write_num_cpus, runs, n_parallel=2)
+
+        self.assertListEqual(
+            ret, [("test_run_0", 0), ("test_run_1", 1), ("test_run_2", 2)])
+        num_cpus = [len(group) for group in get_cpu_groups(2)]
+        for i in range(3):
+            with open("test_run_{}".format(i), "r") as f:
+                self.assertIn(int(f.read()), num_cpus)
+            os.remove("test_run_{}".format(i))
+
+
+def _write_num_cpus(dir_name, exit_code, num_cpus):
+    """Write the number of CPUs to a file, and exit with a given status."""
+    with open(dir_name, "w") as f:
+        f.write(str(num_cpus))
+    sys.exit(exit_code)
+
 
 class TestRewardFns(unittest.TestCase):
     """Test the reward_fns method."""
@@ -585,6 +666,503 @@ class TestMisc(unittest.TestCase):
             [1024, 1025]
         )
 
+    def test_cached_space(self):
+        """Validate the functionality of the cached_space decorator.
+
+        This checks that the space is only recomputed once its key changes.
+        """
+        class Env(object):
+            def __init__(self):
+                self.num_rl = 1
+                self.num_calls = 0
+
+            @property
+            @cached_space(lambda self: self.num_rl)
+            def action_space(self):
+                self.num_calls += 1
+                return Box(low=-1, high=1, shape=(self.num_rl,))
+
+        env = Env()
+        space = env.action_space
+        self.assertEqual(space.shape, (1,))
+        self.assertIs(env.action_space, space)
+        self.assertEqual(env.num_calls, 1)
+
+        env.num_rl = 2
+        self.assertEqual(env.action_space.shape, (2,))
+        self.assertEqual(env.num_calls, 2)
+
+    def test_lazy_import(self):
+        """Validate the functionality of the LazyImport object.
+
+        This checks that:
+
+        1. the object is not imported until it is used
+        2. calls and attributes are forwarded to the imported object
+        """
+        # test case 1
+        lazy_box = LazyImport("gym.spaces", "Box")
+        self.assertIsNone(lazy_box._obj)
+
+        # test case 2
+        box = lazy_box(low=0, high=1, shape=(2,), dtype=np.float32)
+        self.assertIsInstance(box, Box)
+        self.assertIs(lazy_box._obj, Box)
+        self.assertEqual(lazy_box.__name__, "Box")
+
+    def test_prefetch(self):
+        """Validate the functionality of the prefetch method.
+
+        This checks that:
+
+        1. the elements are returned in order
+        2. exceptions raised by the iterable are passed to the caller
+        3. the background thread stops if the generator is closed early
+        """
+        # test case 1
+        self.assertListEqual(list(prefetch(range(5), buffer_size=2)),
+                             [0, 1, 2, 3, 4])
+
+        # test case 2
+        def iterable():
+            yield 0
+            raise ValueError("test")
+
+        it = prefetch(iterable())
+        self.assertEqual(next(it), 0)
+        self.assertRaises(ValueError, next, it)
+
+        # test case 3
+        produced = []
+
+        def infinite_iterable():
+            while True:
+                produced.append(len(produced))
+                yield produced[-1]
+
+        it = prefetch(infinite_iterable(), buffer_size=2)
+        self.assertEqual(next(it), 0)
+        it.close()
+        time.sleep(0.5)
+        num_produced = len(produced)
+        time.sleep(0.5)
+        self.assertEqual(len(produced), num_produced)
+        self.assertLessEqual(num_produced, 4)
+
+    def test_streaming_mean(self):
+        """Validate the functionality of the StreamingMean object.
+
+        This checks that:
+
+        1. every value is averaged over the steps it was provided in
+        2. the averages are cleared by reset
+        3. standard deviations are pooled with the means of the same batches
+        """
+        stats = StreamingMean()
+        stats.update({"a": 1, "b": 2})
+        stats.update({"a": 3})
+
+        # test case 1
+        self.assertDictEqual(stats.mean(), {"a": 2, "b": 2})
+
+        # test case 2
+        stats.reset()
+        self.assertDictEqual(stats.mean(), {})
+
+        # test case 3
+        batches = [np.array([1., 2., 3., 4.]), np.array([5., 7., 9., 11.])]
+        for batch in batches:
+            stats.update({"x_mean": np.mean(batch), "x_std": np.std(batch)})
+        summary = stats.mean()
+        self.assertAlmostEqual(summary["x_mean"], np.mean(batches))
+        self.assertAlmostEqual(summary["x_std"], np.std(batches))
+
+
+class TestTransitions(unittest.TestCase):
+    """Test the methods for recording and loading transitions."""
+
+    def setUp(self):
+        # Record two episodes of lengths 3 and 4 over three shards.
+        self.obs = [np.array([i, -i], dtype=np.float32) for i in range(9)]
+        recorder = TransitionRecorder("transitions", shard_size=3)
+        for t in range(7):
+            i = t if t < 3 else t + 1
+            recorder.add(
+                obs0=self.obs[i],
+                context0=np.array([t]),
+                action=np.array([t]),
+                reward=t,
+                obs1=self.obs[i + 1],
+                done=t in [2, 6],
+                is_final_step=t == 6,
+            )
+        recorder.close()
+
+    def tearDown(self):
+        shutil.rmtree("transitions")
+
+    def test_load_shards(self):
+        """Validate the functionality of the load_shards method.
+
+        This checks that:
+
+        1. new shards are appended to the index once a shard is full
+        2. the loaded transitions match the recorded transitions
+        """
+        shards = list(load_shards("transitions"))
+
+        # test case 1
+        self.assertEqual(len(shards), 3)
+        self.assertListEqual([len(shard["action"]) for shard in shards],
+                             [3, 3, 1])
+
+        # test case 2
+        obs0 = np.concatenate([shard["obs0"] for shard in shards])
+        obs1 = np.concatenate([shard["obs1"] for shard in shards])
+        action = np.concatenate([shard["action"] for shard in shards])
+        done = np.concatenate([shard["done"] for shard in shards])
+        np.testing.assert_almost_equal(
+            obs0, [self.obs[i] for i in [0, 1, 2, 4, 5, 6, 7]])
+        np.testing.assert_almost_equal(
+            obs1, [self.obs[i] for i in [1, 2, 3, 5, 6, 7, 8]])
+        np.testing.assert_almost_equal(action, np.arange(7)[:, None])
+        np.testing.assert_array_equal(
+            done, [False, False, True, False, False, False, True])
+
+    def test_load_into_policy(self):
+        """Validate the functionality of the load_into_policy method.
+
+        This checks that the contextual terms are added to the observations,
+        and that the done masks of the final steps are set to False. It also
+        checks that policies without a supported replay buffer (e.g.
+        multi-agent policies) are rejected.
+        """
+        class Policy(object):
+            def __init__(self):
+                self.replay_buffer = ReplayBuffer(
+                    buffer_size=10, batch_size=1, obs_dim=3, ac_dim=1)
+
+        policy = Policy()
+        load_into_policy(policy, "transitions", reward_scale=2)
+
+        replay_buffer = policy.replay_buffer
+        self.assertEqual(len(replay_buffer), 7)
+        np.testing.assert_almost_equal(
+            replay_buffer.obs_t[:7, 2], np.arange(7))
+        np.testing.assert_almost_equal(
+            replay_buffer.obs_tp1[:7, :2],
+            [self.obs[i] for i in [1, 2, 3, 5, 6, 7, 8]])
+        np.testing.assert_almost_equal(
+            replay_buffer.reward[:7], 2 * np.arange(7))
+        np.testing.assert_almost_equal(
+            replay_buffer.done[:7], [0, 0, 1, 0, 0, 0, 0])
+
+        # Check that unsupported policies raise an error.
+        self.assertRaises(ValueError, load_into_policy, object(),
+                          "transitions")
+
+
+class TestSweep(unittest.TestCase):
+    """Test the methods for performing hyperparameter sweeps."""
+
+    def tearDown(self):
+        if os.path.exists("test_sweep"):
+            shutil.rmtree("test_sweep")
+
+    def test_get_configurations(self):
+        """Validate the functionality of the get_configurations method.
+
+        This checks that:
+
+        1. every combination of values is returned by default
+        2. a subset of the combinations is returned if num_samples is set
+        """
+        space = {"b": [1, 2], "a": [3, 4, 5]}
+
+        # test case 1
+        configs = get_configurations(space)
+        self.assertEqual(len(configs), 6)
+        self.assertDictEqual(configs[0], {"a": 3, "b": 1})
+        self.assertDictEqual(configs[-1], {"a": 5, "b": 2})
+
+        # test case 2
+        configs = get_configurations(space, num_samples=4, seed=1)
+        self.assertEqual(len(configs), 4)
+        self.assertEqual(len(set(str(c) for c in configs)), 4)
+        self.assertListEqual(
+            configs, get_configurations(space, num_samples=4, seed=1))
+
+    def test_get_rungs(self):
+        """Validate the functionality of the get_rungs method."""
+        self.assertListEqual(get_rungs(10, 100, 3), [10, 30, 90, 100])
+        self.assertListEqual(get_rungs(10, 90, 3), [10, 30, 90])
+        self.assertListEqual(get_rungs(10, 10, 3), [10])
+
+    def test_get_score(self):
+        """Validate the functionality of the get_score method.
+
+        This checks that the evaluation return is returned, and that -inf is
+        returned if no evaluation was performed.
+        """
+        self.assertEqual(get_score("test_sweep"), -float("inf"))
+
+        _write_score("test_sweep", [], value=2, steps=3)
+        self.assertEqual(get_score("test_sweep"), 6)
+
+    def test_successive_halving(self):
+        """Validate the functionality of the successive_halving method.
+
+        This checks that:
+
+        1. the best 1/eta trials are promoted at every rung
+        2. failed trials are not promoted
+        3. promoted trials are trained for the remaining number of steps of
+           every rung, and are provided the results of their previous rungs
+        """
+        trials = [
+            {"dir_name": "test_sweep/trial_{}".format(i), "value": value}
+            for i, value in enumerate([3, 1, -1, 4, 2, 5])]
+        scores = successive_halving(
+            _write_score, trials, rungs=[1, 3, 9], eta=2, n_parallel=2)
+
+        # test cases 1 and 2
+        self.assertListEqual(
+            scores, [[3, 9], [1], [-float("inf")], [4, 12], [2], [5, 15, 45]])
+
+        # test case 3
+        self.assertListEqual(sorted(os.listdir("test_sweep/trial_5")),
+                             ["rung_0", "rung_1", "rung_2"])
+        with open("test_sweep/trial_5/rung_2/eval_0.csv", "r") as f:
+            self.assertListEqual(
+                f.read().split(), ["average_return,total_step,load_dirs",
+                                   "45,9,test_sweep/trial_5/rung_0;"
+                                   "test_sweep/trial_5/rung_1"])
+
+
+def _write_score(dir_name, load_dirs, value, steps, num_cpus=1):
+    """Write a score proportional to the total number of steps of a trial.
+
+    The training operation fails if the value is negative.
+    """
+    if value < 0:
+        sys.exit(1)
+
+    # Add the number of steps of the previous rungs.
+    total_steps = steps
+    if len(load_dirs) > 0:
+        with open(os.path.join(load_dirs[-1], "eval_0.csv"), "r") as f:
+            total_steps += int(f.read().split()[-1].split(",")[1])
+
+    if not os.path.exists(dir_name):
+        os.makedirs(dir_name)
+    with open(os.path.join(dir_name, "eval_0.csv"), "a") as f:
+        f.write("average_return,total_step,load_dirs\n")
+        f.write("{},{},{}\n".format(
+            value * total_steps, total_steps, ";".join(load_dirs)))
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Test the methods for saving checkpoints."""
+
+    def setUp(self):
+        self.graph = tf.Graph()
+        with self.graph.as_default():
+            self.var = tf.compat.v1.Variable([0., 0.], name="var")
+            self.value_ph = tf.compat.v1.placeholder(tf.float32, (2,))
+            self.assign_op = tf.compat.v1.assign(self.var, self.value_ph)
+        self.sess = tf.compat.v1.Session(graph=self.graph)
+        self.sess.run(self.var.initializer)
+        os.makedirs("test_ckpt")
+
+    def tearDown(self):
+        self.sess.close()
+        shutil.rmtree("test_ckpt")
+
+    def test_checkpoint_writer(self):
+        """Validate the functionality of the CheckpointWriter object.
+
+        This checks that:
+
+        1. the saved values are the values at the time save is called
+        2. the checkpoints can be found and restored by tensorflow
+        3. only the most recent and best checkpoints are kept
+        """
+        writer = CheckpointWriter(
+            self.sess, [self.var], "test_ckpt", keep_last=2, keep_best=1)
+        for step, score in enumerate([1, 3, 2, None]):
+            self.sess.run(self.assign_op, {self.value_ph: [step, step]})
+            writer.save("test_ckpt/itr", global_step=step, score=score)
+        self.sess.run(self.assign_op, {self.value_ph: [-1, -1]})
+        writer.close()
+
+        # test cases 1 and 2
+        self.assertEqual(
+            tf.train.latest_checkpoint("test_ckpt"),
+            os.path.join("test_ckpt", "itr-3"))
+        with self.graph.as_default():
+            saver = tf.compat.v1.train.Saver([self.var])
+        saver.restore(self.sess, "test_ckpt/itr-1")
+        np.testing.assert_almost_equal(self.sess.run(self.var), [1, 1])
+
+        # test case 3
+        self.assertListEqual(
+            sorted(f for f in os.listdir("test_ckpt") if f.endswith(".index")),
+            ["itr-1.index", "itr-2.index", "itr-3.index"])
+        self.assertListEqual(
+            writer.checkpoints,
+            [("test_ckpt/itr-1", 3), ("test_ckpt/itr-2", 2),
+             ("test_ckpt/itr-3", None)])
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the methods for writing training and evaluation statistics."""
+
+    def setUp(self):
+        os.makedirs("test_metrics")
+
+    def tearDown(self):
+        shutil.rmtree("test_metrics")
+
+    def test_metrics_writer(self):
+        """Validate the functionality of the MetricsWriter object.
+
+        This checks that:
+
+        1. the rows are written in both formats, and can be read back
+        2. rows are only written once the buffered rows are flushed
+        3. new rows are appended to existing files
+        4. rows with different fields raise a ValueError
+        """
+        for fmt in ["csv", "npy"]:
+            writer = MetricsWriter("test_metrics", fmt=fmt,
+                                   flush_interval=None)
+            writer.write("train", {"steps": 1, "return": 0.5})
+            writer.write("train", {"steps": 2, "return": 1.5})
+            writer.write("eval_0", {"return": 3})
+
+            # test case 2
+            path = os.path.join("test_metrics", "train." + fmt)
+            self.assertFalse(os.path.exists(path))
+            writer.flush()
+            self.assertTrue(os.path.exists(path))
+
+            # test case 4
+            self.assertRaises(
+                ValueError, writer.write, "train", {"steps": 3})
+            writer.close()
+
+            # test case 3
+            writer = MetricsWriter("test_metrics", fmt=fmt)
+            writer.write("train", {"steps": 3, "return": 2.5})
+            writer.close()
+
+            # test case 1
+            train = read_metrics(path)
+            self.assertListEqual(sorted(train.keys()), ["return", "steps"])
+            np.testing.assert_almost_equal(train["steps"], [1, 2, 3])
+            np.testing.assert_almost_equal(train["return"], [0.5, 1.5, 2.5])
+            np.testing.assert_almost_equal(read_metrics(os.path.join(
+                "test_metrics", "eval_0." + fmt))["return"], [3])
+
+        # Check that unknown formats raise a ValueError.
+        self.assertRaises(ValueError, MetricsWriter, "test_metrics", "json")
+
+
+class TestWeightSync(unittest.TestCase):
+    """Test the methods for sharing parameters through shared memory."""
+
+    def test_shared_weights(self):
+        """Validate the functionality of the SharedWeights object.
+
+        This checks that:
+
+        1. the written values are read back, and the version is incremented
+        2. the values can be read by other processes, as a read-only buffer
+        3. values with the wrong shapes raise a ValueError
+        """
+        weights = SharedWeights(["a", "b"], [(2, 2), (3,)])
+        self.assertEqual(weights.size, 7)
+        self.assertEqual(weights.version, 0)
+
+        # test case 1
+        version = weights.write([[[1, 2], [3, 4]], [5, 6, 7]])
+        self.assertEqual(version, 1)
+        version, values = weights.read()
+        self.assertEqual(version, 1)
+        np.testing.assert_almost_equal(values[0], [[1, 2], [3, 4]])
+        np.testing.assert_almost_equal(values[1], [5, 6, 7])
+
+        # test case 2
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_read_weights, args=(weights, queue))
+        process.start()
+        version, values, writeable = queue.get()
+        process.join()
+        self.assertEqual(version, 1)
+        np.testing.assert_almost_equal(values[1], [5, 6, 7])
+        self.assertFalse(writeable)
+
+        # test case 3
+        self.assertRaises(ValueError, weights.write, [[1, 2], [3, 4, 5]])
+
+    def test_weight_sync(self):
+        """Validate the functionality of the WeightSync object.
+
+        This checks that:
+
+        1. the actor parameters of every level of a policy are shared
+        2. new values are loaded into the session of another policy, only if
+           the version changed
+        """
+        policy_params = {
+            'ac_space': Box(low=-1, high=1, shape=(1,), dtype=np.float32),
+            'ob_space': Box(low=-2, high=2, shape=(2,), dtype=np.float32),
+            'co_space': Box(low=-3, high=3, shape=(2,), dtype=np.float32),
+            'verbose': 0,
+        }
+        policy_params.update(TD3_PARAMS.copy())
+        policy_params.update(GOAL_CONDITIONED_PARAMS.copy())
+        policy_params['layers'] = [8]
+
+        syncs = []
+        for _ in range(2):
+            graph = tf.Graph()
+            with graph.as_default():
+                policy = GoalConditionedPolicy(
+                    sess=tf.compat.v1.Session(graph=graph), **policy_params)
+                policy.sess.run(tf.compat.v1.global_variables_initializer())
+            actor_vars = get_actor_vars(policy)
+
+            # test case 1
+            self.assertListEqual(
+                sorted(var.op.name for var in actor_vars),
+                ["level_{}/model/pi/{}/{}".format(i, layer, param)
+                 for i in range(2) for layer in ["fc0", "output"]
+                 for param in ["bias", "kernel"]])
+
+            if len(syncs) == 0:
+                weights = SharedWeights.from_vars(actor_vars)
+            syncs.append(WeightSync(weights, policy.sess, actor_vars))
+
+        # test case 2
+        self.assertFalse(syncs[1].pull())
+        self.assertEqual(syncs[0].push(), 1)
+        self.assertTrue(syncs[1].pull())
+        self.assertFalse(syncs[1].pull())
+        for var0, var1 in zip(syncs[0].var_list, syncs[1].var_list):
+            np.testing.assert_almost_equal(
+                syncs[0].sess.run(var0), syncs[1].sess.run(var1))
+
+        for sync in syncs:
+            sync.sess.close()
+
+
+def _read_weights(weights, queue):
+    """Send the values of shared weights read by another process."""
+    version, values = weights.read()
+    queue.put((version, values, weights._buffer.flags.writeable))
+
 
 class TestTFUtil(unittest.TestCase):
 
@@ -621,6 +1199,145 @@ class TestTFUtil(unittest.TestCase):
         # test case 5
         pass  # TODO
 
+    def test_get_summary_tensors(self):
+        """Check the functionality of the get_summary_tensors() method.
+
+        This method is tested for the following features:
+
+        1. the tensors of the scalar summaries are returned by tag
+        2. the summaries before the start index are skipped
+        """
+        with tf.Graph().as_default():
+            a = tf.constant(1.)
+            b = tf.constant(2.)
+            with tf.compat.v1.variable_scope("scope"):
+                tf.compat.v1.summary.scalar("a", a)
+            tf.compat.v1.summary.histogram("hist", tf.constant([1., 2.]))
+            tf.compat.v1.summary.scalar("b", b)
+
+            # test case 1
+            summary_tensors = get_summary_tensors()
+            self.assertListEqual(sorted(summary_tensors.keys()),
+                                 ["b", "scope/a"])
+            self.assertIs(summary_tensors["scope/a"], a)
+            self.assertIs(summary_tensors["b"], b)
+
+            # test case 2
+            self.assertListEqual(list(get_summary_tensors(2).keys()), ["b"])
+
+    def test_get_target_updates(self):
+        """Check the functionality of the get_target_updates() method.
+
+        This method is tested for the following features:
+
+        1. the initial updates set the targets to the model parameters
+        2. the soft updates perform Polyak averaging
+        """
+        with tf.Graph().as_default():
+            _vars = [tf.compat.v1.Variable([[1., 2.], [3., 4.]]),
+                     tf.compat.v1.Variable([5.])]
+            target_vars = [tf.compat.v1.Variable([[0., 0.], [0., 0.]]),
+                           tf.compat.v1.Variable([1.])]
+            init, soft = get_target_updates(_vars, target_vars, tau=0.25)
+
+            with tf.compat.v1.Session() as sess:
+                sess.run(tf.compat.v1.global_variables_initializer())
+
+                # test case 2
+                sess.run(soft)
+                target_values = sess.run(target_vars)
+                np.testing.assert_almost_equal(
+                    target_values[0], [[0.25, 0.5], [0.75, 1.]])
+                np.testing.assert_almost_equal(target_values[1], [2.])
+
+                # test case 1
+                sess.run(init)
+                target_values = sess.run(target_vars)
+                np.testing.assert_almost_equal(
+                    target_values[0], [[1., 2.], [3., 4.]])
+                np.testing.assert_almost_equal(target_values[1], [5.])
+
+    def test_stacked_layer(self):
+        """Check the functionality of the stacked_layer() method.
+
+        This method is tested for the following features:
+
+        1. the parameters of every model are stacked along the first dimension
+        2. the output of every model matches that of a layer with the same
+           parameters, for inputs that are shared and separate across models
+        """
+        with tf.Graph().as_default():
+            obs = tf.compat.v1.placeholder(tf.float32, (None, 3))
+            stacked_in = tf.compat.v1.placeholder(tf.float32, (2, None, 3))
+            for layer_norm in [False, True]:
+                name = 'layer_norm_{}'.format(layer_norm)
+                with tf.compat.v1.variable_scope(name):
+                    shared_out = stacked_layer(
+                        obs, 2, 4, 'fc', act_fun=tf.nn.relu,
+                        layer_norm=layer_norm)
+                with tf.compat.v1.variable_scope(name, reuse=True):
+                    stacked_out = stacked_layer(
+                        stacked_in, 2, 4, 'fc', act_fun=tf.nn.relu,
+                        layer_norm=layer_norm)
+                with tf.compat.v1.variable_scope(name + '_single'):
+                    single_out = [
+                        layer(obs, 4, 'fc{}'.format(i), act_fun=tf.nn.relu,
+                              layer_norm=layer_norm)
+                        for i in range(2)]
+
+                # test case 1
+                stacked_vars = get_trainable_vars(name + '/')
+                single_vars = get_trainable_vars(name + '_single/')
+                self.assertListEqual(
+                    [var.shape.as_list() for var in stacked_vars],
+                    [[2, 3, 4], [2, 1, 4]] + [[2, 1, 4]] * 2 * layer_norm)
+
+                # test case 2
+                with tf.compat.v1.Session() as sess:
+                    sess.run(tf.compat.v1.global_variables_initializer())
+
+                    # Copy the stacked parameters to the separate layers.
+                    stacked_values = sess.run(stacked_vars)
+                    n_vars = len(stacked_vars)
+                    for i in range(2):
+                        for var, val in zip(
+                                single_vars[i * n_vars:(i + 1) * n_vars],
+                                stacked_values):
+                            var.load(val[i].reshape(var.shape.as_list()),
+                                     sess)
+
+                    obs_val = np.random.uniform(-1, 1, (5, 3))
+                    shared_val, stacked_val, single_val = sess.run(
+                        [shared_out, stacked_out, single_out],
+                        feed_dict={obs: obs_val,
+                                   stacked_in: np.stack([obs_val] * 2)})
+                    np.testing.assert_almost_equal(
+                        shared_val, single_val, decimal=5)
+                    np.testing.assert_almost_equal(
+                        stacked_val, single_val, decimal=5)
+
+    def test_xla_scope(self):
+        """Check the functionality of the xla_scope() method.
+
+        This method is tested for the following features:
+
+        1. operations are not compiled if use_xla is set to False
+        2. operations are compiled if use_xla is set to True, and XLA is
+           available
+        """
+        with tf.Graph().as_default():
+            with xla_scope(False):
+                a = tf.constant(1.) + 1.
+            with xla_scope(True):
+                b = tf.constant(1.) + 1.
+
+            # test case 1
+            self.assertRaises(ValueError, a.op.get_attr, "_XlaCompile")
+
+            # test case 2
+            if xla_available():
+                self.assertTrue(b.op.get_attr("_XlaCompile"))
+
     def test_gaussian_likelihood(self):
         """Check the functionality of the gaussian_likelihood() method."""
         input_ = tf.constant([[0, 1, 2]], dtype=tf.float32)